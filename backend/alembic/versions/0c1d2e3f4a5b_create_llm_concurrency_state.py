@@ -0,0 +1,58 @@
+"""create llm concurrency state
+
+llm_concurrency_state (the adaptive concurrency limit, per-operation latency
+baselines and throttle counter of each LLM provider/model) and
+llm_concurrency_slots (leased rows of the calls waiting for or holding a
+slot), shared by the web process and every worker.py replica — see
+library/llm_concurrency.py. Rows are created on first use.
+
+Revision ID: 0c1d2e3f4a5b
+Revises: f6b7c8d9e0a1
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c1d2e3f4a5b'
+down_revision: Union[str, Sequence[str], None] = 'f6b7c8d9e0a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_concurrency_state",
+        sa.Column("provider", sa.String(length=40), primary_key=True),
+        sa.Column("model", sa.String(length=100), primary_key=True),
+        sa.Column("concurrency_limit", sa.Float(), nullable=False),
+        sa.Column("baselines", postgresql.JSONB(), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("last_decrease_at", sa.DateTime(timezone=True)),
+        sa.Column("throttled_total", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "llm_concurrency_slots",
+        sa.Column("id", sa.String(length=32), primary_key=True),
+        sa.Column("provider", sa.String(length=40), nullable=False),
+        sa.Column("model", sa.String(length=100), nullable=False),
+        sa.Column("state", sa.String(length=10), nullable=False),
+        sa.Column("operation", sa.String(length=100)),
+        sa.Column("holder", sa.String(length=200)),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.CheckConstraint("state IN ('waiting', 'running')", name="ck_llm_concurrency_slots_state"),
+    )
+    op.create_index(
+        "idx_llm_concurrency_slots_model_state", "llm_concurrency_slots",
+        ["provider", "model", "state", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_llm_concurrency_slots_model_state", table_name="llm_concurrency_slots")
+    op.drop_table("llm_concurrency_slots")
+    op.drop_table("llm_concurrency_state")
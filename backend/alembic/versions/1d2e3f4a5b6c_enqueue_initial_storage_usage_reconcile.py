@@ -0,0 +1,34 @@
+"""enqueue initial storage usage reconcile
+
+The storage_usage ledger (a1c2e3f4b5d6) started empty and only counts
+writes made after it was installed, so library.storage_usage.ledger_usage()
+ignores it until a first reconcile. Queue that reconcile now rather than
+waiting for the daily 03:30 run.
+
+Revision ID: 1d2e3f4a5b6c
+Revises: 0c1d2e3f4a5b
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d2e3f4a5b6c'
+down_revision: Union[str, Sequence[str], None] = '0c1d2e3f4a5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("""
+INSERT INTO jobs (id, type, parameters, idempotency_key)
+SELECT md5('storage_usage_reconcile:initial'), 'storage_usage_reconcile', '{}'::jsonb,
+       'storage_usage_reconcile:initial'
+WHERE NOT EXISTS (SELECT 1 FROM storage_usage WHERE reconciled_at IS NOT NULL)
+ON CONFLICT DO NOTHING
+""")
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM jobs WHERE idempotency_key = 'storage_usage_reconcile:initial' AND status = 'queued'")
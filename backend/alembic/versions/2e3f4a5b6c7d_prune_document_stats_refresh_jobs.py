@@ -0,0 +1,32 @@
+"""prune per-run document stats refresh jobs
+
+The scheduler used to enqueue document_stats_refresh under a per-minute
+idempotency key, leaving one jobs row per 5-minute run (288 a day). It now
+reuses a single row (job_queue.enqueue_recurring()); the finished per-run
+rows are deleted here.
+
+Revision ID: 2e3f4a5b6c7d
+Revises: 1d2e3f4a5b6c
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e3f4a5b6c7d'
+down_revision: Union[str, Sequence[str], None] = '1d2e3f4a5b6c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "DELETE FROM jobs WHERE type = 'document_stats_refresh' "
+        "AND idempotency_key LIKE 'document_stats_refresh:%' "
+        "AND status IN ('done', 'failed', 'cancelled')"
+    )
+
+
+def downgrade() -> None:
+    pass  # the deleted rows were finished job history only
@@ -0,0 +1,31 @@
+"""add seq and chunk text to analysis chunk results
+
+document_analysis_chunk_results rows are streamed to the chunk review UI
+while an analysis runs (GET /analysis_job/<id>/chunks). seq is the per-job
+arrival order used as the stream cursor; chunk_text is the source text of
+the chunk, which the run's document_chunks rows only get at the end.
+
+Revision ID: 3f4a5b6c7d8e
+Revises: 2e3f4a5b6c7d
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f4a5b6c7d8e'
+down_revision: Union[str, Sequence[str], None] = '2e3f4a5b6c7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("document_analysis_chunk_results", sa.Column("seq", sa.Integer()))
+    op.add_column("document_analysis_chunk_results", sa.Column("chunk_text", sa.Text()))
+
+
+def downgrade() -> None:
+    op.drop_column("document_analysis_chunk_results", "chunk_text")
+    op.drop_column("document_analysis_chunk_results", "seq")
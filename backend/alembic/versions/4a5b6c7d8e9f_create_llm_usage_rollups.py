@@ -0,0 +1,76 @@
+"""create llm usage rollups
+
+Hourly and daily aggregates of llm_usage_logs with their watermarks, the
+llm_usage_rollup job type and its every-5-minutes scheduled task
+(library/llm_usage/rollup.py). The first job run backfills history a week
+at a time; until then /llm_costs reads raw rows as before.
+
+Revision ID: 4a5b6c7d8e9f
+Revises: 3f4a5b6c7d8e
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a5b6c7d8e9f'
+down_revision: Union[str, Sequence[str], None] = '3f4a5b6c7d8e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_OLD = "type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect','storage_usage_reconcile','document_stats_refresh','document_analysis')"
+_NEW = "type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect','storage_usage_reconcile','document_stats_refresh','document_analysis','llm_usage_rollup')"
+
+_TIMES = json.dumps([f"{h:02d}:{m:02d}" for h in range(24) for m in range(0, 60, 5)])
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_usage_rollups",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("period", sa.String(length=4), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("provider", sa.String(length=50), nullable=False),
+        sa.Column("model", sa.String(length=100), nullable=False),
+        sa.Column("operation", sa.String(length=50), nullable=False),
+        sa.Column("document_id", sa.Integer(), nullable=True),
+        sa.Column("analysis_job_id", sa.String(length=32), nullable=True),
+        sa.Column("cost_currency", sa.String(length=3), nullable=True),
+        sa.Column("calls", sa.Integer(), nullable=False),
+        sa.Column("unknown_calls", sa.Integer(), nullable=False),
+        sa.Column("tokens", sa.BigInteger(), nullable=False),
+        sa.Column("cost_amount", sa.Numeric(18, 10), nullable=True),
+        sa.Column("first_called_at", sa.DateTime(), nullable=False),
+        sa.CheckConstraint("period IN ('hour', 'day')", name="ck_llm_usage_rollups_period"),
+    )
+    op.create_index("idx_llm_usage_rollups_period_bucket", "llm_usage_rollups", ["period", "bucket_start"])
+    op.create_index(
+        "idx_llm_usage_rollups_document", "llm_usage_rollups", ["document_id", "period", "bucket_start"],
+    )
+    op.create_table(
+        "llm_usage_rollup_watermarks",
+        sa.Column("period", sa.String(length=4), primary_key=True),
+        sa.Column("rolled_up_until", sa.DateTime(), nullable=False),
+    )
+    op.drop_constraint("ck_jobs_type", "jobs", type_="check")
+    op.create_check_constraint("ck_jobs_type", "jobs", _NEW)
+    op.execute(
+        sa.text(
+            "INSERT INTO scheduled_tasks (id, enabled, timezone, times) "
+            "VALUES ('llm_usage_rollup', TRUE, 'Europe/Warsaw', CAST(:times AS jsonb))"
+        ).bindparams(times=_TIMES)
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM scheduled_tasks WHERE id = 'llm_usage_rollup'")
+    op.execute("DELETE FROM jobs WHERE type = 'llm_usage_rollup'")
+    op.drop_constraint("ck_jobs_type", "jobs", type_="check")
+    op.create_check_constraint("ck_jobs_type", "jobs", _OLD)
+    op.drop_table("llm_usage_rollup_watermarks")
+    op.drop_index("idx_llm_usage_rollups_document", table_name="llm_usage_rollups")
+    op.drop_index("idx_llm_usage_rollups_period_bucket", table_name="llm_usage_rollups")
+    op.drop_table("llm_usage_rollups")
@@ -0,0 +1,32 @@
+"""add reclean_corpus job type
+
+Batch re-run of article_cleaner over stored webpage documents after a
+portal rule change (library/article_reclean.py).
+
+Revision ID: 5b6c7d8e9f0a
+Revises: 4a5b6c7d8e9f
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b6c7d8e9f0a'
+down_revision: Union[str, Sequence[str], None] = '4a5b6c7d8e9f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_OLD = "type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect','storage_usage_reconcile','document_stats_refresh','document_analysis','llm_usage_rollup')"
+_NEW = "type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect','storage_usage_reconcile','document_stats_refresh','document_analysis','llm_usage_rollup','reclean_corpus')"
+
+
+def upgrade() -> None:
+    op.drop_constraint("ck_jobs_type", "jobs", type_="check")
+    op.create_check_constraint("ck_jobs_type", "jobs", _NEW)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM jobs WHERE type = 'reclean_corpus'")
+    op.drop_constraint("ck_jobs_type", "jobs", type_="check")
+    op.create_check_constraint("ck_jobs_type", "jobs", _OLD)
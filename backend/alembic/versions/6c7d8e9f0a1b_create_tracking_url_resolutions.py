@@ -0,0 +1,33 @@
+"""create tracking_url_resolutions
+
+Persistent cache of resolved newsletter tracking links, so a link repeated
+across newsletters is followed once (library/tracking_urls.py).
+
+Revision ID: 6c7d8e9f0a1b
+Revises: 5b6c7d8e9f0a
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c7d8e9f0a1b'
+down_revision: Union[str, Sequence[str], None] = '5b6c7d8e9f0a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tracking_url_resolutions",
+        sa.Column("url_hash", sa.String(length=64), primary_key=True),
+        sa.Column("url", sa.Text(), nullable=False),
+        sa.Column("destination", sa.Text(), nullable=False),
+        sa.Column("resolved_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("tracking_url_resolutions")
@@ -0,0 +1,32 @@
+"""create email_import_checkpoints
+
+Per-mailbox position of the incremental email import (Gmail historyId,
+IMAP UIDVALIDITY:UID or a local mailbox key) — library/email_import_service.py.
+
+Revision ID: 7d8e9f0a1b2c
+Revises: 6c7d8e9f0a1b
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d8e9f0a1b2c'
+down_revision: Union[str, Sequence[str], None] = '6c7d8e9f0a1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_import_checkpoints",
+        sa.Column("mailbox", sa.String(length=500), primary_key=True),
+        sa.Column("checkpoint", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("email_import_checkpoints")
@@ -0,0 +1,30 @@
+"""add documents.text_md_cleaned_hash
+
+md5 of the clean_article_text() output last written to text_md. The
+reclean_corpus job (library/article_reclean.py) only rewrites documents
+whose text_md still hashes to it. Not backfilled: for documents prepared
+before this revision there is no telling whether text_md was edited, so
+the job leaves them alone until they are prepared again.
+
+Revision ID: 8e9f0a1b2c3d
+Revises: 7d8e9f0a1b2c
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e9f0a1b2c3d'
+down_revision: Union[str, Sequence[str], None] = '7d8e9f0a1b2c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("text_md_cleaned_hash", sa.String(length=32)))
+
+
+def downgrade() -> None:
+    op.drop_column("documents", "text_md_cleaned_hash")
@@ -0,0 +1,48 @@
+"""create storage usage ledger
+
+Per-prefix object count/byte totals maintained by ObjectStorage put/delete
+(library/storage_usage.py), plus the storage_usage_reconcile job type and its
+daily scheduled task that corrects drift with one full listing.
+
+Revision ID: a1c2e3f4b5d6
+Revises: fa12f5be1ae2
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c2e3f4b5d6'
+down_revision: Union[str, Sequence[str], None] = 'fa12f5be1ae2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_OLD = "type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect')"
+_NEW = "type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect','storage_usage_reconcile')"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "storage_usage",
+        sa.Column("prefix", sa.String(length=100), primary_key=True),
+        sa.Column("object_count", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("total_bytes", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("reconciled_at", sa.DateTime(timezone=True)),
+    )
+    op.drop_constraint("ck_jobs_type", "jobs", type_="check")
+    op.create_check_constraint("ck_jobs_type", "jobs", _NEW)
+    op.execute(
+        "INSERT INTO scheduled_tasks (id, enabled, timezone, times) "
+        "VALUES ('storage_usage_reconcile', TRUE, 'Europe/Warsaw', '[\"03:30\"]'::jsonb)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM scheduled_tasks WHERE id = 'storage_usage_reconcile'")
+    op.execute("DELETE FROM jobs WHERE type = 'storage_usage_reconcile'")
+    op.drop_constraint("ck_jobs_type", "jobs", type_="check")
+    op.create_check_constraint("ck_jobs_type", "jobs", _OLD)
+    op.drop_table("storage_usage")
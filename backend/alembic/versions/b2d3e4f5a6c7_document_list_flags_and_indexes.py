@@ -0,0 +1,157 @@
+"""document list flags, keyset and trigram indexes
+
+/website_list (DocumentRepository.get_list) used OFFSET paging, ILIKE
+'%term%' over six text columns and correlated EXISTS subqueries against
+document_embeddings / document_chunks for the "without embedding" and
+"has Obsidian notes" filters. This revision:
+
+- adds documents.has_embedding / documents.has_obsidian_notes, kept in sync
+  by triggers (embeddings and chunk note paths are written from many places:
+  the analysis pipeline, /chunks review routes, imports scripts) and
+  backfilled here;
+- replaces idx_documents_ingested_at with
+  (COALESCE(ingested_at, '0001-01-01') DESC, id DESC), the exact list order
+  (ingested_at is nullable; NULLs sort last, as
+  document_repository.NO_INGESTED_AT), so keyset pages
+  (after_ingested_at/after_id) are an index range scan, plus partial
+  variants for the two flag filters;
+- adds pg_trgm GIN indexes on every column the free-text filter searches,
+  so the OR of ILIKEs becomes a BitmapOr of index scans (terms of 3+ chars).
+
+The indexes are built CONCURRENTLY, outside the migration transaction, so
+documents stays writable while the trigram indexes over text/text_md build.
+
+Revision ID: b2d3e4f5a6c7
+Revises: a1c2e3f4b5d6
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d3e4f5a6c7'
+down_revision: Union[str, Sequence[str], None] = 'a1c2e3f4b5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_SEARCH_COLUMNS = ("url", "text", "text_md", "title", "summary", "chapter_list")
+
+# Must match document_repository._LIST_TIME.
+_LIST_ORDER = "COALESCE(ingested_at, TIMESTAMP '0001-01-01 00:00:00') DESC, id DESC"
+
+# Must match DocumentRepository.get_list(only_has_obsidian_notes=True) as it
+# was before the flag: document-level paths, or any TEMAT chunk with a note.
+_HAS_OBSIDIAN_NOTES = (
+    "(COALESCE(jsonb_array_length({doc}.obsidian_note_paths), 0) > 0 OR EXISTS ("
+    "SELECT 1 FROM document_chunks c WHERE c.document_id = {doc}.id AND c.type = 'TEMAT' "
+    "AND COALESCE(array_length(c.obsidian_note_paths, 1), 0) > 0))"
+)
+
+_FUNCTIONS = f"""
+CREATE OR REPLACE FUNCTION documents_set_has_obsidian_notes() RETURNS trigger AS $$
+BEGIN
+    NEW.has_obsidian_notes := {_HAS_OBSIDIAN_NOTES.format(doc="NEW")};
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION document_chunks_refresh_has_obsidian_notes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE documents d SET has_obsidian_notes = {_HAS_OBSIDIAN_NOTES.format(doc="d")}
+        WHERE d.id = OLD.document_id
+          AND d.has_obsidian_notes IS DISTINCT FROM {_HAS_OBSIDIAN_NOTES.format(doc="d")};
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE documents d SET has_obsidian_notes = {_HAS_OBSIDIAN_NOTES.format(doc="d")}
+        WHERE d.id = NEW.document_id
+          AND d.has_obsidian_notes IS DISTINCT FROM {_HAS_OBSIDIAN_NOTES.format(doc="d")};
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION document_embeddings_refresh_has_embedding() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE documents d
+        SET has_embedding = EXISTS (SELECT 1 FROM document_embeddings e WHERE e.document_id = d.id)
+        WHERE d.id = OLD.document_id AND d.has_embedding
+          AND NOT EXISTS (SELECT 1 FROM document_embeddings e WHERE e.document_id = d.id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE documents SET has_embedding = TRUE WHERE id = NEW.document_id AND NOT has_embedding;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+_TRIGGERS = """
+CREATE TRIGGER trg_documents_has_obsidian_notes
+    BEFORE INSERT OR UPDATE OF obsidian_note_paths ON documents
+    FOR EACH ROW EXECUTE FUNCTION documents_set_has_obsidian_notes();
+
+CREATE TRIGGER trg_document_chunks_has_obsidian_notes
+    AFTER INSERT OR DELETE OR UPDATE OF obsidian_note_paths, type, document_id ON document_chunks
+    FOR EACH ROW EXECUTE FUNCTION document_chunks_refresh_has_obsidian_notes();
+
+CREATE TRIGGER trg_document_embeddings_has_embedding
+    AFTER INSERT OR DELETE OR UPDATE OF document_id ON document_embeddings
+    FOR EACH ROW EXECUTE FUNCTION document_embeddings_refresh_has_embedding();
+"""
+
+
+def upgrade() -> None:
+    # pg_trgm is installed by 02-create-extension.sql; CREATE EXTENSION here
+    # keeps databases created only through alembic working too.
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column("documents", sa.Column("has_embedding", sa.Boolean(), nullable=False, server_default=sa.text("false")))
+    op.add_column("documents", sa.Column("has_obsidian_notes", sa.Boolean(), nullable=False, server_default=sa.text("false")))
+    op.execute(
+        "UPDATE documents d SET has_embedding = TRUE "
+        "WHERE EXISTS (SELECT 1 FROM document_embeddings e WHERE e.document_id = d.id)"
+    )
+    op.execute(f"UPDATE documents d SET has_obsidian_notes = TRUE WHERE {_HAS_OBSIDIAN_NOTES.format(doc='d')}")
+    op.execute(_FUNCTIONS)
+    op.execute(_TRIGGERS)
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_documents_ingested_at")
+        op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_ingested_at_id ON documents ({_LIST_ORDER})")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_without_embedding "
+            f"ON documents ({_LIST_ORDER}) WHERE NOT has_embedding"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_has_obsidian_notes "
+            f"ON documents ({_LIST_ORDER}) WHERE has_obsidian_notes"
+        )
+        for column in _SEARCH_COLUMNS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_{column}_trgm "
+                f"ON documents USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in _SEARCH_COLUMNS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS idx_documents_{column}_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_documents_has_obsidian_notes")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_documents_without_embedding")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_documents_ingested_at_id")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_ingested_at ON documents (ingested_at)")
+
+    op.execute("DROP TRIGGER IF EXISTS trg_document_embeddings_has_embedding ON document_embeddings")
+    op.execute("DROP TRIGGER IF EXISTS trg_document_chunks_has_obsidian_notes ON document_chunks")
+    op.execute("DROP TRIGGER IF EXISTS trg_documents_has_obsidian_notes ON documents")
+    op.execute("DROP FUNCTION IF EXISTS document_embeddings_refresh_has_embedding()")
+    op.execute("DROP FUNCTION IF EXISTS document_chunks_refresh_has_obsidian_notes()")
+    op.execute("DROP FUNCTION IF EXISTS documents_set_has_obsidian_notes()")
+    op.drop_column("documents", "has_obsidian_notes")
+    op.drop_column("documents", "has_embedding")
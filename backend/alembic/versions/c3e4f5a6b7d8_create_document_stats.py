@@ -0,0 +1,54 @@
+"""create document stats snapshot
+
+Cached document counts (by type/status, discovery source and ingestion day)
+served by /stats, /website_count and unfiltered /website_list totals, plus
+the document_stats_refresh job type and its every-5-minutes scheduled task
+(library/document_stats.py).
+
+Revision ID: c3e4f5a6b7d8
+Revises: b2d3e4f5a6c7
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e4f5a6b7d8'
+down_revision: Union[str, Sequence[str], None] = 'b2d3e4f5a6c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_OLD = "type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect','storage_usage_reconcile')"
+_NEW = "type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect','storage_usage_reconcile','document_stats_refresh')"
+
+# Every 5 minutes, same scheduled_tasks "times" mechanism as obsidian_reimport.
+_TIMES = json.dumps([f"{h:02d}:{m:02d}" for h in range(24) for m in range(0, 60, 5)])
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_stats",
+        sa.Column("dimension", sa.String(length=20), primary_key=True),
+        sa.Column("key", sa.Text(), primary_key=True),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.drop_constraint("ck_jobs_type", "jobs", type_="check")
+    op.create_check_constraint("ck_jobs_type", "jobs", _NEW)
+    op.execute(
+        sa.text(
+            "INSERT INTO scheduled_tasks (id, enabled, timezone, times) "
+            "VALUES ('document_stats_refresh', TRUE, 'Europe/Warsaw', CAST(:times AS jsonb))"
+        ).bindparams(times=_TIMES)
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM scheduled_tasks WHERE id = 'document_stats_refresh'")
+    op.execute("DELETE FROM jobs WHERE type = 'document_stats_refresh'")
+    op.drop_constraint("ck_jobs_type", "jobs", type_="check")
+    op.create_check_constraint("ck_jobs_type", "jobs", _OLD)
+    op.drop_table("document_stats")
@@ -0,0 +1,61 @@
+"""create document chapter index
+
+documents.text_hash (md5 of the reader's source text, maintained by a
+trigger) and document_chapter_index, the persisted detect_chapters() result
+per text revision that the reader endpoints serve from
+(library/chapter_index.py). Rows are computed lazily on first read, so
+nothing is backfilled beyond the hash.
+
+Revision ID: d4f5a6b7c8e9
+Revises: c3e4f5a6b7d8
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f5a6b7c8e9'
+down_revision: Union[str, Sequence[str], None] = 'c3e4f5a6b7d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same field order as document_analysis_service._extract_text(prefer_md=True, min_length=0).
+_TEXT_HASH = "md5(COALESCE(NULLIF({row}.text_md, ''), NULLIF({row}.text, ''), NULLIF({row}.text_raw, ''), ''))"
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("text_hash", sa.String(length=32)))
+    op.execute(f"UPDATE documents SET text_hash = {_TEXT_HASH.format(row='documents')}")
+    op.execute(f"""
+CREATE OR REPLACE FUNCTION documents_set_text_hash() RETURNS trigger AS $$
+BEGIN
+    NEW.text_hash := {_TEXT_HASH.format(row='NEW')};
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+""")
+    op.execute(
+        "CREATE TRIGGER trg_documents_text_hash "
+        "BEFORE INSERT OR UPDATE OF text_md, text, text_raw ON documents "
+        "FOR EACH ROW EXECUTE FUNCTION documents_set_text_hash()"
+    )
+    op.create_table(
+        "document_chapter_index",
+        sa.Column("document_id", sa.Integer(), sa.ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("text_hash", sa.String(length=32), nullable=False),
+        sa.Column("source_field", sa.String(length=30), nullable=False),
+        sa.Column("text_length", sa.Integer(), nullable=False),
+        sa.Column("word_count", sa.Integer(), nullable=False),
+        sa.Column("chapters", postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("document_chapter_index")
+    op.execute("DROP TRIGGER IF EXISTS trg_documents_text_hash ON documents")
+    op.execute("DROP FUNCTION IF EXISTS documents_set_text_hash()")
+    op.drop_column("documents", "text_hash")
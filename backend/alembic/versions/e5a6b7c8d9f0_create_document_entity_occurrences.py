@@ -0,0 +1,50 @@
+"""create document entity occurrences
+
+document_entity_occurrences (one row per match of an entity's variants in
+the reader text, with its chapter position) and
+document_entities.occurrences_text_hash, the text revision a row was
+indexed against. Filled by entity_service.refresh_entity_occurrences() on
+the next entity refresh; until then the occurrence endpoints scan the text
+as before, so nothing is backfilled here.
+
+Revision ID: e5a6b7c8d9f0
+Revises: d4f5a6b7c8e9
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a6b7c8d9f0'
+down_revision: Union[str, Sequence[str], None] = 'd4f5a6b7c8e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("document_entities", sa.Column("occurrences_text_hash", sa.String(length=32)))
+    op.create_table(
+        "document_entity_occurrences",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "document_entity_id", sa.Integer(),
+            sa.ForeignKey("document_entities.id", ondelete="CASCADE"), nullable=False,
+        ),
+        sa.Column("document_id", sa.Integer(), sa.ForeignKey("documents.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("chapter_position", sa.Integer()),
+        sa.Column("char_offset", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "idx_entity_occurrences_entity_chapter", "document_entity_occurrences",
+        ["document_entity_id", "chapter_position"],
+    )
+    op.create_index("idx_entity_occurrences_document", "document_entity_occurrences", ["document_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_entity_occurrences_document", table_name="document_entity_occurrences")
+    op.drop_index("idx_entity_occurrences_entity_chapter", table_name="document_entity_occurrences")
+    op.drop_table("document_entity_occurrences")
+    op.drop_column("document_entities", "occurrences_text_hash")
@@ -0,0 +1,58 @@
+"""document analysis job type and chunk checkpoints
+
+Document chunk analysis moves from a thread inside the web process to the
+jobs queue (type document_analysis, executed by worker.py — see
+library/document_analysis_jobs.py). document_analysis_chunk_results holds
+the per-chunk checkpoints that let a re-run resume. Analyses still queued
+or running at upgrade time get their jobs row here, so they are picked up
+by the workers instead of being stranded.
+
+Revision ID: f6b7c8d9e0a1
+Revises: e5a6b7c8d9f0
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b7c8d9e0a1'
+down_revision: Union[str, Sequence[str], None] = 'e5a6b7c8d9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_OLD = "type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect','storage_usage_reconcile','document_stats_refresh')"
+_NEW = "type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect','storage_usage_reconcile','document_stats_refresh','document_analysis')"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_analysis_chunk_results",
+        sa.Column(
+            "analysis_job_id", sa.String(length=32),
+            sa.ForeignKey("document_analysis_jobs.id", ondelete="CASCADE"), primary_key=True,
+        ),
+        sa.Column("position", sa.Integer(), primary_key=True),
+        sa.Column("input_hash", sa.String(length=32), nullable=False),
+        sa.Column("result", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.drop_constraint("ck_jobs_type", "jobs", type_="check")
+    op.create_check_constraint("ck_jobs_type", "jobs", _NEW)
+    op.execute("""
+INSERT INTO jobs (id, type, parameters, idempotency_key)
+SELECT md5('document_analysis:' || id), 'document_analysis',
+       jsonb_build_object('analysis_job_id', id), 'document_analysis:' || id
+FROM document_analysis_jobs
+WHERE status IN ('queued', 'running')
+ON CONFLICT DO NOTHING
+""")
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM jobs WHERE type = 'document_analysis'")
+    op.drop_constraint("ck_jobs_type", "jobs", type_="check")
+    op.create_check_constraint("ck_jobs_type", "jobs", _OLD)
+    op.drop_table("document_analysis_chunk_results")
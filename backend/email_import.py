@@ -11,15 +11,19 @@ Usage:
     python email_import.py --id 19ce7076beeaf054 --source "newsletter:AI Flash" --note "AI news digest"
     python email_import.py --search "from:campus@campusai.pl" --list
     python email_import.py --id 19ce7076beeaf054 --dry-run
+
+Incremental import of every message added since the previous --sync run of
+the same mailbox (library/email_import_service.py):
+    python email_import.py --sync gmail --label Newsletters --source "newsletter"
+    python email_import.py --sync gmail --label Newsletters --checkpoint-only
+    python email_import.py --sync imap --folder Newsletters     # IMAP_HOST/USER/PASSWORD
+    python email_import.py --sync mbox --path export.mbox --processes 4
 """
 
 import argparse
 import base64
-import html
 import json
 import logging
-import re
-import subprocess
 import sys
 import time
 from email.utils import parseaddr
@@ -32,44 +36,17 @@ cfg = load_config()  # noqa: F841 — side effect: populates os.environ for libr
 from library.db.engine import get_session  # noqa: E402
 from library.db.models import Document  # noqa: E402
 from library.email_footer_rules import apply_footer_rule  # noqa: E402
+from library.email_mime import HREF_RE, extract_sender_name, html_to_text, replace_urls  # noqa: E402
+from library.email_sources import run_gws  # noqa: E402
 from library.models.stalker_document_status import StalkerDocumentStatus  # noqa: E402
 from library.models.stalker_document_type import StalkerDocumentType  # noqa: E402
 from library.tracking_urls import is_tracking_url as _is_tracking_url  # noqa: E402
 from library.tracking_urls import resolve_tracking_url as _resolve_tracking_url  # noqa: E402
+from library.tracking_urls import resolve_tracking_urls  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
 
-def _find_gws_binary() -> str:
-    """Find the gws binary, accounting for Windows npm .cmd wrappers."""
-    import shutil
-    gws_path = shutil.which("gws")
-    if gws_path:
-        return gws_path
-    # Windows: npm installs .cmd wrappers
-    gws_cmd = shutil.which("gws.cmd")
-    if gws_cmd:
-        return gws_cmd
-    raise FileNotFoundError("gws CLI not found. Install with: npm install -g @googleworkspace/cli")
-
-
-def run_gws(args: list[str]) -> dict:
-    """Run a gws CLI command and return parsed JSON output."""
-    gws_bin = _find_gws_binary()
-    cmd = [gws_bin] + args
-    logger.debug(f"Running: {' '.join(cmd)}")
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)  # nosec B603 — fixed gws binary, args built locally
-    if result.returncode != 0:
-        raise RuntimeError(f"gws command failed: {result.stderr.strip()}")
-    # gws prints "Using keyring backend: keyring" to stdout before JSON
-    output = result.stdout.strip()
-    # Find the first '{' or '[' to skip any preamble
-    for i, ch in enumerate(output):
-        if ch in ('{', '['):
-            return json.loads(output[i:])
-    raise RuntimeError(f"No JSON in gws output: {output[:200]}")
-
-
 def search_emails(query: str, max_results: int = 10) -> list[dict]:
     """Search Gmail for messages matching a query. Returns list of {id, threadId}."""
     data = run_gws([
@@ -134,78 +111,80 @@ def resolve_tracking_url(url: str, timeout: int = 5) -> str:
     return _resolve_tracking_url(url, timeout=timeout)
 
 
-def resolve_tracking_urls_in_html(html_content: str) -> str:
-    """Find all tracking URLs in <a href="..."> tags and resolve them before text conversion."""
-    urls_to_resolve = {}
+def resolve_tracking_urls_in_html(html_content: str, session=None) -> str:
+    """Find all tracking URLs in <a href="..."> tags and resolve them before text conversion.
 
-    def collect_url(match):
-        url = match.group(1)
-        if is_tracking_url(url) and url not in urls_to_resolve:
-            urls_to_resolve[url] = None  # placeholder
-        return match.group(0)
-
-    re.sub(r"<a\s+[^>]*href\s*=\s*['\"]([^'\"]*)['\"]", collect_url, html_content, flags=re.IGNORECASE)
+    The links are resolved concurrently in one batch; with a ``session``,
+    destinations known from earlier imports are reused.
+    """
+    urls_to_resolve = resolve_tracking_urls(HREF_RE.findall(html_content), session)
 
     if not urls_to_resolve:
         return html_content
 
-    logger.info(f"Resolving {len(urls_to_resolve)} tracking URL(s)...")
-    for url in urls_to_resolve:
-        resolved = resolve_tracking_url(url)
-        urls_to_resolve[url] = resolved
+    for url, resolved in urls_to_resolve.items():
         if resolved != url:
             logger.info(f"  {url[:60]}... → {resolved[:80]}")
 
-    for original, resolved in urls_to_resolve.items():
-        if resolved != original:
-            html_content = html_content.replace(original, resolved)
-
-    return html_content
-
-
-def html_to_text(html_content: str) -> str:
-    """Convert HTML email to readable plain text, preserving links."""
-    text = html_content
-    # Remove <head>, <style>, <script> blocks entirely
-    text = re.sub(r"<head\b[^>]*>.*?</head\b[^>]*>", "", text, flags=re.IGNORECASE | re.DOTALL)
-    text = re.sub(r"<style\b[^>]*>.*?</style\b[^>]*>", "", text, flags=re.IGNORECASE | re.DOTALL)
-    text = re.sub(r"<script\b[^>]*>.*?</script\b[^>]*>", "", text, flags=re.IGNORECASE | re.DOTALL)
-    # Remove HTML comments
-    text = re.sub(r"<!--.*?-->", "", text, flags=re.DOTALL)
-    # <br> -> newline
-    text = re.sub(r"<br\s*/?>", "\n", text, flags=re.IGNORECASE)
-    # Block elements -> newlines
-    text = re.sub(r"</?(?:p|div|tr|table|section|article|header|footer)\s*[^>]*>", "\n", text, flags=re.IGNORECASE)
-    # <h1-h6> -> newline + ## prefix
-    text = re.sub(r"<h([1-6])\s*[^>]*>", lambda m: "\n" + "#" * int(m.group(1)) + " ", text, flags=re.IGNORECASE)
-    text = re.sub(r"</h[1-6]\s*>", "\n", text, flags=re.IGNORECASE)
-    # <li> -> bullet
-    text = re.sub(r"<li\s*[^>]*>", "\n- ", text, flags=re.IGNORECASE)
-    text = re.sub(r"</li\s*>", "", text, flags=re.IGNORECASE)
-    text = re.sub(r"</?[uo]l\s*[^>]*>", "\n", text, flags=re.IGNORECASE)
-    # <a href="...">text</a> -> text (URL)
-    text = re.sub(r'<a\s+[^>]*href="([^"]*)"[^>]*>(.*?)</a>', r"\2 (\1)", text, flags=re.IGNORECASE | re.DOTALL)
-    # <strong>/<b> -> **text**
-    text = re.sub(r"<(?:strong|b)\s*>(.*?)</(?:strong|b)\s*>", r"**\1**", text, flags=re.IGNORECASE | re.DOTALL)
-    # <em>/<i> -> *text*
-    text = re.sub(r"<(?:em|i)\s*>(.*?)</(?:em|i)\s*>", r"*\1*", text, flags=re.IGNORECASE | re.DOTALL)
-    # Strip remaining tags
-    text = re.sub(r"<[^>]+>", "", text)
-    # Decode HTML entities
-    text = html.unescape(text)
-    # Strip trailing whitespace per line
-    text = re.sub(r"[ \t]+$", "", text, flags=re.MULTILINE)
-    # Collapse excessive blank lines (3+ -> 2)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    return text.strip()
-
-
-def extract_sender_name(from_header: str) -> str:
-    """Extract display name from 'From' header. 'John Doe <john@example.com>' -> 'John Doe'."""
-    match = re.match(r'^"?([^"<]+)"?\s*<', from_header)
-    if match:
-        return match.group(1).strip()
-    return from_header
+    return replace_urls(html_content, urls_to_resolve)
+
+
+def _mailbox_source(args):
+    from library.email_sources import GmailSource, ImapSource, LocalMailboxSource
+
+    if args.sync == "gmail":
+        return GmailSource(args.label)
+    if args.sync == "imap":
+        missing = [name for name in ("IMAP_HOST", "IMAP_USER", "IMAP_PASSWORD") if not cfg.get(name)]
+        if missing:
+            raise SystemExit(f"Error: --sync imap needs {', '.join(missing)} in the configuration.")
+        return ImapSource(
+            cfg.get("IMAP_HOST"), cfg.get("IMAP_USER"), cfg.get("IMAP_PASSWORD"),
+            folder=args.folder, port=int(cfg.get("IMAP_PORT") or 993),
+        )
+    if not args.path:
+        raise SystemExit(f"Error: --sync {args.sync} needs --path.")
+    return LocalMailboxSource(args.path, args.sync)
+
+
+def sync_mailbox(args) -> int:
+    """--sync: incremental, batched import of one mailbox."""
+    import multiprocessing
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    from library.email_import_service import EmailImportService
+    from library.import_log_tracker import ImportLogTracker
+
+    source = _mailbox_source(args)
+    processes = args.processes or os.cpu_count() or 1
+    executor = None
+    if processes > 1:
+        executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+    session = None if args.dry_run else get_session()
+    service = EmailImportService(
+        session, source, executor=executor, batch_size=args.batch_size, dry_run=args.dry_run,
+        discovery_source=args.source, note=args.note, language=args.language,
+    )
+    parameters = {"mailbox": source.mailbox, "checkpoint_only": args.checkpoint_only}
+    try:
+        if args.dry_run:
+            result = service.run()
+        else:
+            with ImportLogTracker("email_import", parameters) as tracker:
+                result = service.run(checkpoint_only=args.checkpoint_only)
+                tracker.set_counts(
+                    found=result["found"], added=result["imported"],
+                    skipped=result["skipped_existing"], error=result["errors"],
+                )
+    finally:
+        source.close()
+        if executor is not None:
+            executor.shutdown()
+        if session is not None:
+            session.close()
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
 
 
 def main():
@@ -215,6 +194,8 @@ def main():
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--id", help="Gmail message ID to import")
     group.add_argument("--search", help="Gmail search query (e.g. 'subject:AI Flash')")
+    group.add_argument("--sync", choices=["gmail", "imap", "mbox", "maildir"],
+                       help="Import the messages added to a mailbox since its last --sync run")
 
     parser.add_argument("--list", action="store_true", help="With --search: list matching emails without importing")
     parser.add_argument("--max-results", type=int, default=10, help="Max search results (default: 10)")
@@ -223,12 +204,24 @@ def main():
     parser.add_argument("--language", help="Language code (e.g. pl, en)")
     parser.add_argument("--dry-run", action="store_true", help="Preview without DB writes")
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable debug logging")
+    sync = parser.add_argument_group("--sync options")
+    sync.add_argument("--label", default="INBOX", help="Gmail label name or id (default: INBOX)")
+    sync.add_argument("--folder", default="INBOX", help="IMAP folder (default: INBOX)")
+    sync.add_argument("--path", help="mbox file or Maildir directory")
+    sync.add_argument("--batch-size", type=int, default=50, help="Messages fetched and committed together (default: 50)")
+    sync.add_argument("--processes", type=int, default=0,
+                      help="Processes parsing MIME and HTML (default: CPU count; 1 = in this process)")
+    sync.add_argument("--checkpoint-only", action="store_true",
+                      help="Mark the current mailbox contents as seen without importing them")
 
     args = parser.parse_args()
 
     log_level = logging.DEBUG if args.verbose else logging.INFO
     logging.basicConfig(level=log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
+    if args.sync:
+        sys.exit(sync_mailbox(args))
+
     t_start = time.time()
 
     # Search mode
@@ -274,8 +267,13 @@ def main():
     html_body = find_body_part(msg["payload"], "text/html")
     plain_body = find_body_part(msg["payload"], "text/plain")
 
+    # The dry run stays offline from the database; an import reuses and
+    # records resolved tracking links.
+    session = None if args.dry_run else get_session()
     if html_body:
-        html_body = resolve_tracking_urls_in_html(html_body)
+        html_body = resolve_tracking_urls_in_html(html_body, session)
+        if session is not None:
+            session.commit()
         text = html_to_text(html_body)
         text_raw = html_body
     elif plain_body:
@@ -316,7 +314,6 @@ def main():
         sys.exit(0)
 
     # Import to database
-    session = get_session()
     try:
         # Check for duplicates
         existing = Document.get_by_url(session, url)
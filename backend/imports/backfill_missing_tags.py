@@ -9,8 +9,9 @@ group). The fix (same commit) skips _merge_topics for single-chunk runs and
 adds a fallback straight to the chunk's own summary, but documents analyzed
 before the fix are stuck with tags=NULL and are invisible to anything gated on
 tags (e.g. the /lenie-obsidian-note control-questions step). This script re-tags
-them using the same _apply_tags() pipeline, from the chunk summary already on
-file — no LLM re-analysis of the article itself needed.
+them using the same tagging pipeline (_apply_tags_batch(), several summaries per
+LLM call), from the chunk summary already on file — no LLM re-analysis of the
+article itself needed.
 
 Usage:
     cd backend
@@ -28,7 +29,7 @@ cfg = load_config()  # noqa: F841 — side effect: populates os.environ for libr
 
 from library.db.engine import get_session  # noqa: E402
 from library.db.models import Document, DocumentAnalysisRun  # noqa: E402
-from library.document_analysis_service import _apply_tags  # noqa: E402
+from library.document_analysis_service import _apply_tags_batch  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
@@ -88,8 +89,9 @@ def main():
         logging.info("Found %d candidate documents with a single-chunk run and no tags", len(candidates))
 
         tagged = 0
-        for doc, summary in candidates:
-            _apply_tags(doc, summary)
+        # Several summaries per LLM call; the summaries are short.
+        _apply_tags_batch(candidates)
+        for doc, _summary in candidates:
             if not doc.tags:
                 logging.info("doc #%s: LLM found no applicable tags", doc.id)
                 continue
@@ -34,9 +34,9 @@ from library.book_pdf_import import (
     build_book_markdown,
     detect_heading_texts,
     detect_named_sections,
-    extract_page_images,
     extract_pages,
     import_pdf_book,
+    iter_page_images,
     insert_page_tables,
 )
 from library.db.engine import get_session
@@ -125,10 +125,12 @@ def main() -> None:
         heading_texts = detect_heading_texts(
             pdf_bytes, font_prefix=args.heading_font_prefix, min_size=args.heading_min_size,
         )
-        images = extract_page_images(pdf_bytes) if extract_images else []
         images_by_page: dict[int, list[int]] = {}
-        for position, image in enumerate(images):
+        image_count = image_bytes = 0
+        for position, image in enumerate(iter_page_images(pdf_bytes) if extract_images else []):
             images_by_page.setdefault(image.page_index, []).append(position)
+            image_count += 1
+            image_bytes += len(image.data)
         extra_sections = detect_named_sections(pdf_bytes, extra_eyebrows, extra_titles)
         result = build_book_markdown(
             pages, chapter_regex=args.chapter_regex, heading_texts=heading_texts, images_by_page=images_by_page,
@@ -142,8 +144,8 @@ def main() -> None:
         print(f"Ramki info/ostrzezenie: {result.markdown.count('[!INFO]')} / {result.markdown.count('[!WARN]')}")
         print(f"Tabele (markdown): {result.markdown.count(chr(10) + '| ---')}")
         if extract_images:
-            total_mb = sum(len(img.data) for img in images) / (1024 * 1024)
-            print(f"Obrazy: {len(images)} wykrytych po filtrze, {total_mb:.1f} MB")
+            total_mb = image_bytes / (1024 * 1024)
+            print(f"Obrazy: {image_count} wykrytych po filtrze, {total_mb:.1f} MB")
         print()
         for ch in result.chapters[: args.show]:
             print(f"  {ch.position:>3}. {ch.title} ({ch.length} zn.)")
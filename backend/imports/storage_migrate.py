@@ -59,7 +59,8 @@ def main() -> None:
         size = path.stat().st_size
         print(f"{'DRY-RUN ' if args.dry_run else ''}{path} -> {key} ({human_size(size)})")
         if not args.dry_run:
-            store.put_bytes(key, path.read_bytes(), mimetypes.guess_type(path.name)[0])
+            with path.open("rb") as handle:
+                store.put_stream(key, handle, mimetypes.guess_type(path.name)[0])
         copied += 1
         bytes_copied += size
     print(f"Copied: {copied} ({human_size(bytes_copied)}), skipped: {skipped}")
@@ -10,11 +10,15 @@ anywhere else on the response object.
 A ``system_prompt`` is passed as a real system-role message to providers
 that support it (CloudFerro Sherlock, ARK Labs) and is NEVER concatenated
 with the user text; for other providers passing one raises ValueError.
+
+Concurrent calls to one provider/model are gated by an adaptive limit
+(library/llm_concurrency.py) that backs off on throttling and latency spikes.
 """
 
 import logging
 import time
 
+from library.llm_concurrency import acquire_slot
 from library.models.ai_response import AiResponse
 
 logger = logging.getLogger(__name__)
@@ -23,12 +27,19 @@ OPENAI_MODELS = ("gpt-3.5-turbo", "gpt-3.5-turbo-16k", "gpt-4", "gpt-4o", "gpt-4
 BEDROCK_MODELS = ("amazon.titan-tg1-large", "amazon.nova-micro", "amazon.nova-pro", "aws")
 SHERLOCK_MODELS = ("Bielik-11B-v2.3-Instruct", "Bielik-11B-v3.0-Instruct")
 GOOGLE_MODELS = ("gemini-2.0-flash-lite-001",)
+# Local deterministic provider for load tests (library/api/fake/).
+FAKE_MODEL_PREFIX = "fake/"
 
 # Providers whose API accepts a separate system-role message.
-_SYSTEM_PROMPT_PROVIDERS = ("cloudferro", "arklabs")
+_SYSTEM_PROMPT_PROVIDERS = ("cloudferro", "arklabs", "fake")
 # Providers accepting response_format; Sherlock enforces json_schema
 # (verified live 2026-07-18) but rejects json_object with HTTP 400.
-_RESPONSE_FORMAT_PROVIDERS = ("cloudferro",)
+_RESPONSE_FORMAT_PROVIDERS = ("cloudferro", "fake")
+
+
+def supports_response_format(model: str) -> bool:
+    """Whether ``ai_ask(..., response_format=...)`` is accepted for ``model``."""
+    return model in SHERLOCK_MODELS or model.startswith(FAKE_MODEL_PREFIX)
 
 
 def _unified_tokens(response) -> tuple[int | None, int | None, int | None]:
@@ -113,6 +124,15 @@ def ai_ask(query: str, model: str, temperature: float = 0.7, max_token_count: in
                                           max_tokens=max_token_count, system_prompt=system_prompt,
                                           stateful=arklabs_stateful)
 
+    elif model.startswith(FAKE_MODEL_PREFIX):
+        provider = "fake"
+
+        def call():
+            from library.api.fake.fake_completion import fake_get_completion
+
+            return fake_get_completion(query, model=model, max_tokens=max_token_count,
+                                       system_prompt=system_prompt, response_format=response_format)
+
     elif model in GOOGLE_MODELS:
         provider = "google-vertexai"
 
@@ -132,10 +152,16 @@ def ai_ask(query: str, model: str, temperature: float = 0.7, max_token_count: in
     if response_format is not None and provider not in _RESPONSE_FORMAT_PROVIDERS:
         raise ValueError(f"response_format is not supported for model {model}")
 
+    # Waiting for a slot is not provider latency: the clock starts once the
+    # adaptive limiter (library/llm_concurrency.py) lets the call through.
+    slot = acquire_slot(provider, model, operation)
     started = time.monotonic()
     try:
         ai_response = call()
-    except Exception as exc:
+    except BaseException as exc:
+        slot.release(error=exc)
+        if not isinstance(exc, Exception):
+            raise
         _record_usage(
             operation=operation,
             provider=provider,
@@ -148,6 +174,7 @@ def ai_ask(query: str, model: str, temperature: float = 0.7, max_token_count: in
         )
         raise
 
+    slot.release()
     latency_ms = int((time.monotonic() - started) * 1000)
     prompt_tokens, completion_tokens, total_tokens = _unified_tokens(ai_response)
     ai_response.usage = _record_usage(
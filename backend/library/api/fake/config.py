@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class FakeProviderConfig:
+    latency_ms: float = 0.0
+    ms_per_1k_tokens: float = 0.0
+    error_rate: float = 0.0
+    completion_tokens: int = 64
+    embedding_dimensions: int = 1024
+    embedding_latency_ms: float = 0.0
+    embedding_error_rate: float = 0.0
+
+
+def get_fake_config() -> FakeProviderConfig:
+    """Pobierz ustawienia lokalnego dostawcy fake/ z konfiguracji (domyślnie: bez opóźnień i błędów)."""
+    from library.config_loader import load_config
+    cfg = load_config()
+    default = FakeProviderConfig()
+    return FakeProviderConfig(
+        latency_ms=float(cfg.get("FAKE_LLM_LATENCY_MS") or default.latency_ms),
+        ms_per_1k_tokens=float(cfg.get("FAKE_LLM_MS_PER_1K_TOKENS") or default.ms_per_1k_tokens),
+        error_rate=float(cfg.get("FAKE_LLM_ERROR_RATE") or default.error_rate),
+        completion_tokens=int(cfg.get("FAKE_LLM_COMPLETION_TOKENS") or default.completion_tokens),
+        embedding_dimensions=int(cfg.get("FAKE_EMBEDDING_DIMENSIONS") or default.embedding_dimensions),
+        embedding_latency_ms=float(cfg.get("FAKE_EMBEDDING_LATENCY_MS") or default.embedding_latency_ms),
+        embedding_error_rate=float(cfg.get("FAKE_EMBEDDING_ERROR_RATE") or default.embedding_error_rate),
+    )
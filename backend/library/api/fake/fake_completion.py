@@ -0,0 +1,196 @@
+"""Deterministic local stand-in for an LLM provider (``fake/<name>`` models).
+
+Nothing leaves the process: the answer is derived from a SHA-256 of the
+request, so the same prompt always gets the same answer, and a request with
+``response_format`` gets an instance of its JSON Schema. Latency, the
+injected error rate and the length of free-text answers come from
+library/api/fake/config.py. Injected errors carry ``status_code = 503`` so
+library/llm_concurrency.py treats them like a throttling provider.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+from library.models.ai_response import AiResponse
+from library.api.fake.config import get_fake_config
+
+# Token estimate used for usage records and simulated latency.
+CHARS_PER_TOKEN = 4
+# Upper bound on generated array lengths (unless minItems asks for more).
+MAX_ARRAY_ITEMS = 3
+
+_WORD_RE = re.compile(r"\w+")
+_ID_RE = re.compile(r'"id"\s*:\s*(-?\d+)')
+# "Dostępne kategorie: wojsko, gospodarka, ..." — options a prompt offers.
+_OPTIONS_RE = re.compile(r"^[^:\n]{1,60}:[ \t]*([^\n]+)$", re.MULTILINE)
+_OPTION_RE = re.compile(r"\w[\w '-]*")
+_FALLBACK_WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit"]
+
+# Error injection is independent of the request (a retry of the same prompt
+# may succeed) but reproducible for a single-threaded run.
+_error_random = random.Random(0)
+_error_lock = threading.Lock()
+
+
+class FakeProviderError(RuntimeError):
+    """Injected provider failure, shaped like an HTTP 503 from the SDKs."""
+
+    def __init__(self, message: str = "fake provider: injected HTTP 503", status_code: int = 503):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def should_fail(error_rate: float) -> bool:
+    if error_rate <= 0:
+        return False
+    with _error_lock:
+        return _error_random.random() < error_rate
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def request_random(*parts) -> random.Random:
+    """Random generator seeded by the request, so answers are deterministic."""
+    digest = hashlib.sha256(json.dumps(parts, ensure_ascii=False, sort_keys=True).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _words(rnd: random.Random, vocabulary: list[str], count: int) -> str:
+    return " ".join(rnd.choice(vocabulary) for _ in range(count))
+
+
+def prompt_options(prompt: str) -> list[str]:
+    """Items of the comma-separated lists (three or more items) in ``prompt``."""
+    options = []
+    for line in _OPTIONS_RE.findall(prompt):
+        parts = [part.strip() for part in line.split(",")]
+        if len(parts) >= 3 and all(len(part) <= 40 and _OPTION_RE.fullmatch(part) for part in parts):
+            options.extend(parts)
+    return list(dict.fromkeys(options))
+
+
+def _resolve(schema: dict, definitions: dict) -> dict:
+    while "$ref" in schema:
+        schema = definitions[schema["$ref"].rsplit("/", 1)[-1]]
+    return schema
+
+
+def schema_instance(schema: dict, rnd: random.Random, vocabulary: list[str], *,
+                    definitions: dict | None = None, ids: list[int] | None = None,
+                    options: list[str] | None = None):
+    """Generate a value valid against ``schema`` (the subset structured outputs use).
+
+    Arrays of objects with an integer ``id`` property get one element per id
+    in ``ids`` — the ``{"results": [{"id": ...}]}`` batch answers expect one
+    result for each element the prompt sent. Arrays of free strings pick from
+    ``options`` (prompt_options()), as a model choosing offered tags would.
+    """
+    definitions = definitions if definitions is not None else {**schema.get("definitions", {}), **schema.get("$defs", {})}
+    schema = _resolve(schema, definitions)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return rnd.choice(schema["enum"])
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            return schema_instance(schema[key][0], rnd, vocabulary, definitions=definitions, ids=ids,
+                                   options=options)
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((option for option in kind if option != "null"), "null")
+    if kind is None:
+        kind = "object" if "properties" in schema else "array" if "items" in schema else "string"
+
+    if kind == "object":
+        return {
+            name: schema_instance(sub, rnd, vocabulary, definitions=definitions, ids=ids, options=options)
+            for name, sub in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        items = _resolve(schema.get("items", {}), definitions)
+        id_schema = items.get("properties", {}).get("id", {})
+        if ids and id_schema.get("type") == "integer":
+            return [
+                {**schema_instance(items, rnd, vocabulary, definitions=definitions, options=options), "id": item_id}
+                for item_id in ids
+            ]
+        low = schema.get("minItems", 0)
+        high = max(low, min(schema.get("maxItems", MAX_ARRAY_ITEMS), MAX_ARRAY_ITEMS))
+        count = rnd.randint(low, high)
+        if schema.get("uniqueItems") and "enum" in items:
+            return rnd.sample(items["enum"], min(count, len(items["enum"])))
+        if options and items.get("type") == "string" and not items.keys() & {"enum", "const", "format"}:
+            return rnd.sample(options, min(count, len(options)))
+        return [schema_instance(items, rnd, vocabulary, definitions=definitions, options=options)
+                for _ in range(count)]
+    if kind == "integer":
+        low = schema.get("minimum", schema.get("exclusiveMinimum", -1) + 1)
+        high = schema.get("maximum", schema.get("exclusiveMaximum", low + 101) - 1)
+        return rnd.randint(low, high)
+    if kind == "number":
+        low = schema.get("minimum", schema.get("exclusiveMinimum", 0))
+        high = schema.get("maximum", schema.get("exclusiveMaximum", low + 1))
+        return round(rnd.uniform(low, high), 3)
+    if kind == "boolean":
+        return rnd.random() < 0.5
+    if kind == "null":
+        return None
+
+    string_format = schema.get("format")
+    if string_format == "date":
+        return f"20{rnd.randint(10, 29)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+    if string_format == "date-time":
+        return f"20{rnd.randint(10, 29)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T12:00:00Z"
+    if string_format in ("uri", "url"):
+        return f"https://example.com/{rnd.choice(vocabulary)}"
+    if string_format == "email":
+        return f"{rnd.choice(vocabulary)}@example.com"
+    text = _words(rnd, vocabulary, rnd.randint(3, 8))
+    min_length = schema.get("minLength", 0)
+    while len(text) < min_length:
+        text += " " + rnd.choice(vocabulary)
+    return text[:schema.get("maxLength", len(text))]
+
+
+def _answer(prompt: str, system_prompt: str | None, response_format: dict | None,
+            model: str, max_tokens: int, completion_tokens: int) -> str:
+    rnd = request_random(model, system_prompt, prompt, response_format)
+    # Answers reuse the prompt's own words, so tag lists and candidate names
+    # sometimes match what the caller offered, as with a real model.
+    vocabulary = _WORD_RE.findall(prompt) or _FALLBACK_WORDS
+    if response_format is None:
+        return _words(rnd, vocabulary, max(1, min(completion_tokens, max_tokens)))
+    if response_format.get("type") == "json_schema":
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        ids = [int(value) for value in dict.fromkeys(_ID_RE.findall(prompt))]
+        instance = schema_instance(schema, rnd, vocabulary, ids=ids, options=prompt_options(prompt))
+        return json.dumps(instance, ensure_ascii=False)
+    return json.dumps({"answer": _words(rnd, vocabulary, min(completion_tokens, max_tokens))}, ensure_ascii=False)
+
+
+def fake_get_completion(prompt: str, model: str = "fake/default", max_tokens: int = 1000,
+                        system_prompt: str | None = None,
+                        response_format: dict | None = None) -> AiResponse:
+    config = get_fake_config()
+    ai_response = AiResponse(query=prompt, model=model)
+
+    answer = _answer(prompt, system_prompt, response_format, model, max_tokens, config.completion_tokens)
+    prompt_tokens = estimate_tokens((system_prompt or "") + prompt)
+    completion_tokens = estimate_tokens(answer)
+    time.sleep((config.latency_ms + (prompt_tokens + completion_tokens) * config.ms_per_1k_tokens / 1000) / 1000)
+    if should_fail(config.error_rate):
+        raise FakeProviderError()
+
+    ai_response.id = "fake-" + hashlib.sha256(answer.encode("utf-8")).hexdigest()[:24]
+    ai_response.response_text = answer
+    ai_response.prompt_tokens = prompt_tokens
+    ai_response.completion_tokens = completion_tokens
+    ai_response.total_tokens = prompt_tokens + completion_tokens
+    return ai_response
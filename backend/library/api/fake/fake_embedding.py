@@ -0,0 +1,51 @@
+"""Hash-based embeddings for ``fake/<name>`` embedding models.
+
+Each word of the lower-cased text is hashed into one of
+``FAKE_EMBEDDING_DIMENSIONS`` buckets with a hash-derived sign (the hashing
+trick), and the vector is L2-normalised. Identical texts get identical
+vectors and texts sharing words get a positive cosine similarity, so
+pgvector ranking behaves plausibly without a model.
+"""
+
+import hashlib
+import math
+import re
+import time
+
+from library.models.embedding_result import EmbeddingResult
+from library.api.fake.config import get_fake_config
+from library.api.fake.fake_completion import estimate_tokens, should_fail
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def hash_embedding(text: str, dimensions: int) -> list[float]:
+    vector = [0.0] * dimensions
+    # An empty text still needs a unit vector (cosine distance of a zero vector is undefined).
+    for word in _WORD_RE.findall(text.lower()) or [""]:
+        digest = int.from_bytes(hashlib.sha256(word.encode("utf-8")).digest()[:8], "big")
+        vector[(digest >> 1) % dimensions] += -1.0 if digest & 1 else 1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def get_embeddings(texts: list[str], model: str = "fake/embedding") -> list[EmbeddingResult]:
+    """One simulated batch request: a single latency sleep and error draw for all texts."""
+    config = get_fake_config()
+    time.sleep(config.embedding_latency_ms / 1000)
+    if should_fail(config.embedding_error_rate):
+        results = []
+        for text in texts:
+            result = EmbeddingResult(text=text, model_id=model, status="error",
+                                     error_message="fake provider: injected HTTP 503")
+            result.status_code = 503
+            results.append(result)
+        return results
+
+    results = []
+    for text in texts:
+        result = EmbeddingResult(text=text, model_id=model, embedding=hash_embedding(text, config.embedding_dimensions),
+                                 status="success", input_text_token_count=estimate_tokens(text))
+        result.status_code = 200
+        results.append(result)
+    return results
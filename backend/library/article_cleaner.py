@@ -18,13 +18,49 @@ from library.lenie_markdown import links_correct, md_square_brackets_in_one_line
 _IMG_MARKER_RE = re.compile(r'^\[img(\d+)(?::\s*[^\]]*)?\]\s*$')
 
 
+class _LineRules:
+    """Bezstanowe reguły usuwania linii jednego czyszczenia, skompilowane raz.
+
+    Linia (już po strip()) odpada, gdy jest w ``exact``, zaczyna się od
+    któregoś z ``prefixes`` albo pasuje (re.match) do któregoś z ``patterns``
+    — wzorce są sklejone w jeden regex, więc linia przechodzi przez jedno
+    wywołanie silnika zamiast kilkunastu. Flagi pojedynczego wzorca podaje
+    się inline, np. ``(?i:...)``.
+    """
+
+    def __init__(self, exact=(), prefixes=(), patterns=()):
+        self.exact = frozenset(exact)
+        self.prefixes = tuple(prefixes)
+        self.pattern = re.compile("|".join(f"(?:{p})" for p in patterns)) if patterns else None
+
+    def drops(self, stripped: str) -> bool:
+        return (stripped in self.exact
+                or stripped.startswith(self.prefixes)
+                or (self.pattern is not None and self.pattern.match(stripped) is not None))
+
+
+def _keep_all(*filters):
+    """Złóż filtry linii w jeden: kolejny filtr widzi tylko linie przepuszczone
+    przez poprzednie — tak jak kolejne przebiegi po liście, ale w jednym."""
+    def keep(line: str) -> bool:
+        return all(line_filter(line) for line_filter in filters)
+    return keep
+
+
+_VIDEO_PLAYER_MARKERS = frozenset({"Przewiń wstecz", "Odtwórz/Pauza", "Przewiń naprzód", "Wycisz"})
+
+
 def _detect_h2_ads(text: str) -> set:
     """Wykryj nagłówki H2 z obrazkiem/video/playerem zaraz po nich (wstawki).
     Musi być wywołane PRZED usuwaniem obrazków."""
-    lines = text.splitlines()
+    return _h2_ad_titles(text.splitlines())
+
+
+def _h2_ad_titles(lines: list[str]) -> set:
     h2_ad_titles = set()
-    video_player_markers = {"Przewiń wstecz", "Odtwórz/Pauza", "Przewiń naprzód", "Wycisz"}
     for i, line in enumerate(lines):
+        if "##" not in line:
+            continue
         stripped = line.strip().replace('\xa0', ' ')
         if stripped.startswith("## "):
             next_nonempty = [lines[j].strip() for j in range(i + 1, min(i + 10, len(lines)))
@@ -39,7 +75,7 @@ def _detect_h2_ads(text: str) -> set:
                     or next_nonempty[0].startswith("[](blob:")):
                 h2_ad_titles.add(stripped)
             # H2 + kontrolki video playera w kolejnych liniach
-            elif any(m in set(next_nonempty) for m in video_player_markers):
+            elif not _VIDEO_PLAYER_MARKERS.isdisjoint(next_nonempty):
                 h2_ad_titles.add(stripped)
     return h2_ad_titles
 
@@ -58,174 +94,190 @@ _PORTAL_INTERNAL_LINK_PATTERNS = [
 ]
 
 
+_PORTAL_INTERNAL_LINK_RE = re.compile("|".join(f"(?:{p})" for p in _PORTAL_INTERNAL_LINK_PATTERNS))
+_MD_LINK_RE = re.compile(r'\[[^\]\n]+\]\(([^)\n]+)\)')
+
+
 def _is_portal_internal_link(url: str) -> bool:
     """Czy link jest wewnętrznym linkiem portalu (tag, kategoria, autor)?"""
-    return any(re.search(p, url) for p in _PORTAL_INTERNAL_LINK_PATTERNS)
+    return _PORTAL_INTERNAL_LINK_RE.search(url) is not None
 
 
 def _is_adjacent_tag_links_line(line: str) -> bool:
     """Czy linia składa się wyłącznie z co najmniej dwóch linków tagowych portalu."""
-    link_re = re.compile(r'\[[^\]\n]+\]\(([^)\n]+)\)')
-    matches = link_re.findall(line)
-    if len(matches) < 2 or link_re.sub('', line).strip():
+    if "](" not in line:
+        return False
+    matches = _MD_LINK_RE.findall(line)
+    if len(matches) < 2 or _MD_LINK_RE.sub('', line).strip():
         return False
     urls = [match.split('"')[0].strip() for match in matches]
     return all(_is_portal_internal_link(url) for url in urls)
 
 
-def _clean_lines_generic(lines: list[str], h2_ad_titles: set) -> list[str]:
-    """Generyczne czyszczenie linia po linii — wspólne dla wszystkich portali."""
-    cleaned = []
+_SKIP_SECTION_MARKERS = frozenset({
+    "### Więcej pogłębionych treści", "### Więcej treści premium dla Ciebie",
+    "## Top 5 treści Premium", "## Najlepsze w premium",
+    "## Czytaj także w BUSINESS INSIDER",
+})
+_LINK_MARKER_RE = re.compile(r'\s*\[link\d+\]')
+_TRAILING_LINK_MARKER_RE = re.compile(r'\[link\d+\]$')
+_NUMBERED_BOLD_RE = re.compile(r'^\*\*\d+\*\*')
+
+_GENERIC_RULES = _LineRules(
+    exact=(
+        # Frazy portalowe wspólne
+        "Dalszy ciąg materiału pod wideo", "REKLAMAKONIEC REKLAMY",
+        "REKLAMA", "KONIEC REKLAMY", "Lubię to", "[ ]", "Rozwiń", "Zwiń",
+        "Treść zewnętrzna",
+        # Kontrolki video playera
+        "Przewiń wstecz", "Odtwórz/Pauza", "Przewiń naprzód", "Wycisz",
+        "Ustawienia", "NA ŻYWO", "Oglądaj z dźwiękiem", "Zamknij",
+        "Włącz / wyłącz pełny ekran",
+        # Samotny separator kolumny tabeli
+        "|",
+    ),
+    prefixes=(
+        # Etykieta audio wygenerowanego AI (ElevenLabs) — potwierdzone na onet.pl i interia.pl
+        "Audio generowane przez AI",
+        # "Czytaj także:" + link na tej samej lub następnej linii
+        "**Czytaj także:**", "**Czytaj również:**", "**Zobacz także:**", "* **Czytaj więcej:**",
+        # "Zobacz też" z obrazkiem: [[imgN...] tytuł](url) lub [[imgN...] tytuł [linkN]
+        "[[img",
+    ),
+    patterns=(
+        r'(?:picture|link)\[\d+\]:',
+        # Markdown horizontal rules (---, ***, ___) — artefakty z konwersji HTML
+        r'[-*_]{3,}\s*$',
+        # Puste nagłówki markdown (np. "####" po usunięciu obrazka z pustym URL)
+        r'#{1,6}\s*$',
+        # Timestamp video: "00:09 / 00:16" lub samodzielne "Oglądaj" + czas
+        r'\d{2}:\d{2}(?:\s*/\s*\d{2}:\d{2})?$',
+        r'Ogl[aą]daj\s*$',
+    ),
+)
+# Warianty "Dalsza część artykułu pod wideo" (z kursywą, dwukropkiem) — w lower()
+_GENERIC_SKIP_PHRASES = (
+    "dalsza część artykułu pod wideo", "dalszy ciąg materiału pod wideo",
+    "dalszy ciąg artykułu pod materiałem wideo", "dalsza część artykulu pod video",
+)
+
+
+def _generic_line_filter(h2_ad_titles: set):
+    """Generyczne czyszczenie linia po linii — wspólne dla wszystkich portali.
+    Zwraca keep(line): stan sekcji do pominięcia żyje między wywołaniami."""
     skip_section = False
-    skip_section_markers = {
-        "### Więcej pogłębionych treści", "### Więcej treści premium dla Ciebie",
-        "## Top 5 treści Premium", "## Najlepsze w premium",
-        "## Czytaj także w BUSINESS INSIDER",
-    }
 
-    for line in lines:
+    def keep(line: str) -> bool:
+        nonlocal skip_section
         stripped = line.strip()
 
         # Sekcje do pominięcia (premium, wstawki H2+img)
         # Po replace_link linia może mieć [linkN] na końcu — usuń przed porównaniem
-        stripped_no_links = re.sub(r'\s*\[link\d+\]', '', stripped).strip()
-        if stripped in skip_section_markers or stripped_no_links in skip_section_markers \
+        stripped_no_links = _LINK_MARKER_RE.sub('', stripped).strip() if "[link" in stripped else stripped
+        if stripped in _SKIP_SECTION_MARKERS or stripped_no_links in _SKIP_SECTION_MARKERS \
                 or stripped in h2_ad_titles or stripped_no_links in h2_ad_titles:
             skip_section = True
-            continue
+            return False
         # H2 z [linkN] = "Zobacz też" link, nie treść artykułu
-        if stripped.startswith("## ") and re.search(r'\[link\d+\]$', stripped):
-            continue
+        if stripped.startswith("## ") and _TRAILING_LINK_MARKER_RE.search(stripped):
+            return False
         if skip_section:
             # "Więcej w Strefie Premium" — koniec sekcji, ale też pomiń tę linię
             if "Więcej w Strefie Premium" in stripped:
                 skip_section = False
-                continue
+                return False
             # Koniec sekcji: pytanie dziennikarza (**Tekst**) lub długi akapit
             # Ale nie **1**, **2** itp. (numeracja w sekcji premium)
-            if stripped and stripped.startswith("**") and not re.match(r'^\*\*\d+\*\*', stripped):
+            if stripped and stripped.startswith("**") and not _NUMBERED_BOLD_RE.match(stripped):
                 skip_section = False
             elif stripped and len(stripped) > 80 and not stripped.startswith("[") and not stripped.startswith("!"):
                 skip_section = False
             else:
-                continue
-
-        # picture[N]:, link[N]:
-        if re.match(r'^(picture|link)\[\d+\]:', stripped):
-            continue
-
-        # Markdown horizontal rules (---, ***, ___) — artefakty z konwersji HTML
-        if re.match(r'^[-*_]{3,}\s*$', stripped) or stripped == "|":
-            continue
-
-        # Puste nagłówki markdown (np. "####" po usunięciu obrazka z pustym URL)
-        if re.match(r'^#{1,6}\s*$', stripped):
-            continue
+                return False
 
         # Puste linie z samą liczbą (reakcje)
-        if stripped.isdigit():
-            continue
+        if stripped.isdigit() or _GENERIC_RULES.drops(stripped):
+            return False
+        lowered = stripped.lower()
+        return not any(phrase in lowered for phrase in _GENERIC_SKIP_PHRASES)
 
-        # Frazy portalowe wspólne
-        if stripped in ("Dalszy ciąg materiału pod wideo", "REKLAMAKONIEC REKLAMY",
-                        "REKLAMA", "KONIEC REKLAMY", "Lubię to", "[ ]", "Rozwiń", "Zwiń",
-                        "Treść zewnętrzna"):
-            continue
-        # Etykieta audio wygenerowanego AI (ElevenLabs) — potwierdzone na onet.pl i interia.pl
-        if stripped.startswith("Audio generowane przez AI"):
-            continue
+    return keep
 
-        # Kontrolki video playera
-        if stripped in ("Przewiń wstecz", "Odtwórz/Pauza", "Przewiń naprzód", "Wycisz",
-                        "Ustawienia", "NA ŻYWO", "Oglądaj z dźwiękiem", "Zamknij",
-                        "Włącz / wyłącz pełny ekran"):
-            continue
-        # Timestamp video: "00:09 / 00:16" lub samodzielne "Oglądaj" + czas
-        if re.match(r'^\d{2}:\d{2}\s*/\s*\d{2}:\d{2}$', stripped):
-            continue
-        if re.match(r'^Ogl[aą]daj\s*$', stripped) or re.match(r'^\d{2}:\d{2}$', stripped):
-            continue
-        # Warianty "Dalsza część artykułu pod wideo" (z kursywą, dwukropkiem)
-        if "dalsza część artykułu pod wideo" in stripped.lower() or \
-           "dalszy ciąg materiału pod wideo" in stripped.lower() or \
-           "dalszy ciąg artykułu pod materiałem wideo" in stripped.lower() or \
-           "dalsza część artykulu pod video" in stripped.lower():
-            continue
-        # "Czytaj także:" + link na tej samej lub następnej linii
-        if stripped.startswith("**Czytaj także:**") or stripped.startswith("**Czytaj również:**"):
-            continue
-        if stripped.startswith("**Zobacz także:**") or stripped.startswith("* **Czytaj więcej:**"):
-            continue
-
-        # "Zobacz też" z obrazkiem: [[imgN...] tytuł](url) lub [[imgN...] tytuł [linkN]
-        if stripped.startswith("[[img"):
-            continue
-
-        cleaned.append(line)
 
-    return cleaned
+def _clean_lines_generic(lines: list[str], h2_ad_titles: set) -> list[str]:
+    """Generyczne czyszczenie linia po linii — wspólne dla wszystkich portali."""
+    return list(filter(_generic_line_filter(h2_ad_titles), lines))
+
+
+# Data publikacji: "17 marca 2026, 12:31" (onet, money, wp)
+_PUBLISHED_AT_LINE = r'\d{1,2}\s+\w+\s+\d{4},?\s+\d{1,2}:\d{2}$'
+_HEADING_PREFIX_RE = re.compile(r'^#{1,6}\s+')
+_TOP_PREMIUM_ITEM_RE = re.compile(r'^\d+\s+\S')
+_TRAILING_LINK_MARKER_SPACE_RE = re.compile(r'\[link\d+\]\s*$')
+
+# Porównywane z treścią linii bez prefiksów nagłówkowych (#### Posłuchaj artykułu → Posłuchaj artykułu)
+_ONET_SKIP_CONTENT = frozenset({
+    "Posłuchaj artykułu", "Skróć artykuł", "- x1 +", "x1", "Obserwuj",
+    "Więcej pogłębionych treści", "Więcej treści premium dla Ciebie",
+    "Więcej takich artykułów znajdziesz na stronie głównej Onetu",
+    "Top 5 treści Premium", "CZYTAJ TAKŻE", "ZOBACZ RÓWNIEŻ",
+    "Dodaj w Google", "Wróć na", "Jesteś w strefie",
+})
+_ONET_RULES = _LineRules(
+    prefixes=(
+        "Zapytaj o więcej Onet Czat z AI",
+        # "Powiązane tematy: Karol Nawrocki Wołodymyr Zełenski ..."
+        "Powiązane tematy:",
+    ),
+    patterns=(
+        # Przyciski prędkości audio playera: x2, x1.75, x1.5, x1.25, x0.75
+        r'x[\d.]+$',
+        # Wstawki premium: "**1** ### Tytuł [linkN]**2** ### ..."
+        r'\*\*\d+\*\*\s+###\s+',
+        _PUBLISHED_AT_LINE,
+        # Czas czytania: "1 min czytania", "5 min czytania"
+        r'\d+\s+min\s+czytania$',
+        # Reakcje: "[img1][img2]1,6 tys." lub "[img0][img1]385"
+        r'(?:\[img\d+\])+[\d,]+(?:\s*tys\.)?$',
+        # Byline redakcyjny: "Opracowanie: Mateusz Bałuka"
+        r'Opracowanie:\s+\S',
+        # CTA rekomendacji: "**PRZECZYTAJ CAŁY TEKST** [linkN]", "**PRZECZYTAJ CAŁY WYWIAD**"
+        r'\*\*PRZECZYTAJ CAŁY [^*]+\*\*(?:\s+\[link\d+\])?$',
+    ),
+)
 
 
-def _clean_lines_onet(lines: list[str]) -> list[str]:
+def _onet_line_filter():
     """Czyszczenie specyficzne dla onet.pl/fakt.pl."""
-    skip = {
-        "Posłuchaj artykułu", "Skróć artykuł", "- x1 +", "x1", "Obserwuj",
-        "Więcej pogłębionych treści", "Więcej treści premium dla Ciebie",
-        "Więcej takich artykułów znajdziesz na stronie głównej Onetu",
-        "Top 5 treści Premium", "CZYTAJ TAKŻE", "ZOBACZ RÓWNIEŻ",
-        "Dodaj w Google", "Wróć na", "Jesteś w strefie",
-    }
-    cleaned = []
     in_top_premium = False
-    for line in lines:
+
+    def keep(line: str) -> bool:
+        nonlocal in_top_premium
         stripped = line.strip()
 
         # Sekcja "Top treści w Premium": nagłówek + ponumerowane linki (1 Tytuł [linkN])
         if stripped == "Top treści w Premium":
             in_top_premium = True
-            continue
+            return False
         if in_top_premium:
             if not stripped:
-                continue
-            if re.match(r'^\d+\s+\S', stripped) and re.search(r'\[link\d+\]\s*$', stripped):
-                continue
+                return False
+            if _TOP_PREMIUM_ITEM_RE.match(stripped) and _TRAILING_LINK_MARKER_SPACE_RE.search(stripped):
+                return False
             in_top_premium = False  # koniec sekcji — przetwórz tę linię normalnie
 
-        # Porównuj treść linii bez prefiksów nagłówkowych (#### Posłuchaj artykułu → Posłuchaj artykułu)
-        stripped_content = re.sub(r'^#{1,6}\s+', '', stripped)
-        if stripped_content in skip:
-            continue
-        if stripped.startswith("Zapytaj o więcej Onet Czat z AI"):
-            continue
-        # Przyciski prędkości audio playera: x2, x1.75, x1.5, x1.25, x0.75
-        if re.match(r'^x[\d.]+$', stripped):
-            continue
-        # Wstawki premium: "**1** ### Tytuł [linkN]**2** ### ..."
-        if re.match(r'^\*\*\d+\*\*\s+###\s+', stripped):
-            continue
+        content = _HEADING_PREFIX_RE.sub('', stripped) if stripped.startswith("#") else stripped
+        if content in _ONET_SKIP_CONTENT or _ONET_RULES.drops(stripped):
+            return False
         # "Więcej w Strefie Premium [linkN]"
-        if "Więcej w Strefie Premium" in stripped:
-            continue
-        # Data publikacji: "17 marca 2026, 12:31"
-        if re.match(r'^\d{1,2}\s+\w+\s+\d{4},?\s+\d{1,2}:\d{2}$', stripped):
-            continue
-        # Czas czytania: "1 min czytania", "5 min czytania"
-        if re.match(r'^\d+\s+min\s+czytania$', stripped):
-            continue
-        # Reakcje: "[img1][img2]1,6 tys." lub "[img0][img1]385"
-        if re.match(r'^(\[img\d+\])+[\d,]+(\s*tys\.)?$', stripped):
-            continue
-        # "Powiązane tematy: Karol Nawrocki Wołodymyr Zełenski ..."
-        if stripped.startswith("Powiązane tematy:"):
-            continue
-        # Byline redakcyjny: "Opracowanie: Mateusz Bałuka"
-        if re.match(r'^Opracowanie:\s+\S', stripped):
-            continue
-        # CTA rekomendacji: "**PRZECZYTAJ CAŁY TEKST** [linkN]", "**PRZECZYTAJ CAŁY WYWIAD**"
-        if re.match(r'^\*\*PRZECZYTAJ CAŁY [^*]+\*\*(?:\s+\[link\d+\])?$', stripped):
-            continue
-        cleaned.append(line)
-    return cleaned
+        return "Więcej w Strefie Premium" not in stripped
+
+    return keep
+
+
+def _clean_lines_onet(lines: list[str]) -> list[str]:
+    """Czyszczenie specyficzne dla onet.pl/fakt.pl."""
+    return list(filter(_onet_line_filter(), lines))
 
 
 # "o autorze" widget (wp.pl/o2.pl/money.pl — jedna CMS Grupy WP): zdjęcie,
@@ -242,7 +294,7 @@ _AUTHOR_EMAIL_RE = re.compile(r'^[\w.+-]+@grupawp\.pl\s*o autorze$', re.IGNORECA
 def _remove_author_bio_paragraph(lines: list[str]) -> list[str]:
     drop: set[int] = set()
     for i, line in enumerate(lines):
-        if not _AUTHOR_EMAIL_RE.match(line.strip()):
+        if "@" not in line or not _AUTHOR_EMAIL_RE.match(line.strip()):
             continue
         j = i - 1
         while j >= 0 and not lines[j].strip():
@@ -254,63 +306,71 @@ def _remove_author_bio_paragraph(lines: list[str]) -> list[str]:
     return [line for k, line in enumerate(lines) if k not in drop]
 
 
-def _clean_lines_money(lines: list[str]) -> list[str]:
-    """Czyszczenie specyficzne dla money.pl."""
-    lines = _remove_author_bio_paragraph(lines)
-    skip_exact = {"Skomentuj", "Notowania", "Udostępnij", "Słuchaj", "Kopiuj link"}
-    skip_startswith = ("Udostępnij na ", "Źródło zdjęć:", "Źródło artykułu:",
-                       "oprac.", "Dźwięk został wygenerowany")
-    cleaned = []
+# Tagi: "gospodarka elektrownia atomowa rosja +1" lub z markerami "iran [link3] rakiety +3"
+_TAG_COUNTER_LINE_RE = re.compile(r'^[\w\sąćęłńóśźżĄĆĘŁŃÓŚŹŻ]+\+\d+$')
+_LINK_NUMBER_RE = re.compile(r'\[link\d+\]')
+
+
+def _is_tag_counter_line(stripped: str) -> bool:
+    return "+" in stripped and _TAG_COUNTER_LINE_RE.match(_LINK_NUMBER_RE.sub('', stripped).strip()) is not None
+
+
+# Reguły wspólne dla CMS Grupy WP (money.pl, wp.pl, o2.pl)
+_GRUPA_WP_PATTERNS = (
+    r'(?i:[\w.+-]+@grupawp\.pl\s*o autorze$)',
+    # Samodzielna data: "24 marca 2026, 12:26"
+    _PUBLISHED_AT_LINE,
+    r'\d+\s+komentarz',
+)
+_MONEY_RULES = _LineRules(
+    exact=("Skomentuj", "Notowania", "Udostępnij", "Słuchaj", "Kopiuj link"),
+    prefixes=("Udostępnij na ", "Źródło zdjęć:", "Źródło artykułu:",
+              "oprac.", "Dźwięk został wygenerowany"),
+    patterns=(
+        *_GRUPA_WP_PATTERNS,
+        # "Zobacz też" — linia z [imgN: tytuł] i link do innego artykułu money.pl
+        r'\[?\[img\d+:.*\].*money\.pl/',
+    ),
+)
+_SOURCE_LOGO_RE = re.compile(r'^[A-Z]$')
+
+
+def _money_line_filter():
+    """Czyszczenie specyficzne dla money.pl (po _remove_author_bio_paragraph)."""
     skip_source_logo = False
-    for line in lines:
+
+    def keep(line: str) -> bool:
+        nonlocal skip_source_logo
         stripped = line.strip()
         if stripped.startswith("Źródło artykułu:"):
             skip_source_logo = True
-            continue
+            return False
         if skip_source_logo:
             if not stripped:
-                continue
+                return False
             skip_source_logo = False
-            if re.match(r'^[A-Z]$', stripped):
-                continue
-        if stripped in skip_exact:
-            continue
-        if any(stripped.startswith(s) for s in skip_startswith):
-            continue
-        if re.match(r'^[\w.+-]+@grupawp\.pl\s*o autorze$', stripped, re.IGNORECASE):
-            continue
-        # Samodzielna data: "24 marca 2026, 12:26"
-        if re.match(r'^\d{1,2}\s+\w+\s+\d{4},?\s+\d{1,2}:\d{2}$', stripped):
-            continue
-        if re.match(r'^\d+\s+komentarz', stripped):
-            continue
-        # Tagi: "gospodarka elektrownia atomowa rosja +1" lub z markerami [linkN]
-        tag_line = re.sub(r'\[link\d+\]', '', stripped).strip()
-        if re.match(r'^[\w\sąćęłńóśźżĄĆĘŁŃÓŚŹŻ]+\+\d+$', tag_line):
-            continue
-        # "Zobacz też" — linia z [imgN: tytuł] i link do innego artykułu money.pl
-        if re.match(r'^\[?\[img\d+:.*\].*money\.pl/', stripped):
-            continue
-        cleaned.append(line)
-    return cleaned
+            if _SOURCE_LOGO_RE.match(stripped):
+                return False
+        return not (_MONEY_RULES.drops(stripped) or _is_tag_counter_line(stripped))
 
+    return keep
 
-def _clean_lines_wp(lines: list[str]) -> list[str]:
-    """Czyszczenie specyficzne dla wp.pl/o2.pl/tech.wp.pl."""
-    lines = _remove_author_bio_paragraph(lines)
-    skip_exact = {"Skomentuj", "Słuchaj", "Udostępnij", "Kopiuj link",
-                  "Zaloguj", "Obserwuj nas na:", "Wyłączono komentarze"}
-    skip_startswith = ("Udostępnij na ", "Dźwięk został wygenerowany",
-                       "Źródło zdjęć:", "Źródło artykułu:", "oprac.",
-                       "Jako redakcja Wirtualnej Polski", "Redakcja serwisu o2")
-
-    # Tagi rozbite na osobne linie (o2.pl): "sztuczna inteligencja" / "polska" / "+3"
-    # — usuń samodzielny licznik "+N" i bezpośrednio poprzedzające go linie tagów
-    tag_counter_re = re.compile(r'^\+\d+$')
-    tag_word_re = re.compile(r'^[a-ząćęłńóśźż][a-ząćęłńóśźż ]{0,40}$')
+
+def _clean_lines_money(lines: list[str]) -> list[str]:
+    """Czyszczenie specyficzne dla money.pl."""
+    return list(filter(_money_line_filter(), _remove_author_bio_paragraph(lines)))
+
+
+_TAG_COUNTER_RE = re.compile(r'^\+\d+$')
+_TAG_WORD_RE = re.compile(r'^[a-ząćęłńóśźż][a-ząćęłńóśźż ]{0,40}$')
+
+
+def _remove_split_tag_lines(lines: list[str]) -> list[str]:
+    """Tagi rozbite na osobne linie (o2.pl): "sztuczna inteligencja" / "polska" / "+3"
+    — usuń samodzielny licznik "+N" i bezpośrednio poprzedzające go linie tagów."""
     drop: set[int] = set()
     for i, line in enumerate(lines):
-        if tag_counter_re.match(line.strip()):
+        if "+" in line and _TAG_COUNTER_RE.match(line.strip()):
             drop.add(i)
             j = i - 1
             while j >= 0:
@@ -318,60 +378,82 @@ def _clean_lines_wp(lines: list[str]) -> list[str]:
                 if not s:
                     j -= 1
                     continue
-                if tag_word_re.match(s):
+                if _TAG_WORD_RE.match(s):
                     drop.add(j)
                     j -= 1
                 else:
                     break
-    lines = [line for k, line in enumerate(lines) if k not in drop]
+    if not drop:
+        return lines
+    return [line for k, line in enumerate(lines) if k not in drop]
+
 
-    cleaned = []
+def _wp_lookback(lines: list[str]) -> list[str]:
+    """Przebiegi wp.pl, które usuwają linie POPRZEDZAJĄCE znacznik — nie da się
+    ich zrobić w jednym przebiegu strumieniowym, idą więc przed _wp_line_filter."""
+    return _remove_split_tag_lines(_remove_author_bio_paragraph(lines))
+
+
+_WP_RULES = _LineRules(
+    exact=("Skomentuj", "Słuchaj", "Udostępnij", "Kopiuj link",
+           "Zaloguj", "Obserwuj nas na:", "Wyłączono komentarze"),
+    prefixes=("Udostępnij na ", "Dźwięk został wygenerowany",
+              "Źródło zdjęć:", "Źródło artykułu:", "oprac.",
+              "Jako redakcja Wirtualnej Polski", "Redakcja serwisu o2",
+              # Banner "Misja AI" itp.
+              "Misja AI"),
+    patterns=_GRUPA_WP_PATTERNS,
+)
+_WP_NEWSLETTER_LINES = frozenset({
+    "Newsy, wywiady, śledztwa i reportaże w Twojej skrzynce co tydzień - zawsze za darmo.",
+    "Zapisz mnie",
+})
+
+
+def _wp_line_filter():
+    """Czyszczenie specyficzne dla wp.pl/o2.pl/tech.wp.pl (po _wp_lookback)."""
     in_newsletter = False
-    for line in lines:
+
+    def keep(line: str) -> bool:
+        nonlocal in_newsletter
         stripped = line.strip()
         if stripped == "PREMIUM Zapisz się na newsletter!":
             in_newsletter = True
-            continue
+            return False
         if in_newsletter:
-            if stripped in {
-                "Newsy, wywiady, śledztwa i reportaże w Twojej skrzynce co tydzień - zawsze za darmo.",
-                "Zapisz mnie",
-            }:
+            if stripped in _WP_NEWSLETTER_LINES:
                 if stripped == "Zapisz mnie":
                     in_newsletter = False
-                continue
+                return False
             in_newsletter = False
-        if stripped in skip_exact:
-            continue
-        if any(stripped.startswith(s) for s in skip_startswith):
-            continue
-        if re.match(r'^[\w.+-]+@grupawp\.pl\s*o autorze$', stripped, re.IGNORECASE):
-            continue
-        if re.match(r'^\d+\s+komentarz', stripped):
-            continue
-        # Samodzielna data: "23 marca 2026, 06:15"
-        if re.match(r'^\d{1,2}\s+\w+\s+\d{4},?\s+\d{1,2}:\d{2}$', stripped):
-            continue
-        # Tagi: "iran rakiety balistyczne europa +3" lub z markerami "iran [link3] rakiety +3"
-        tag_line = re.sub(r'\[link\d+\]', '', stripped).strip()
-        if re.match(r'^[\w\sąćęłńóśźżĄĆĘŁŃÓŚŹŻ]+\+\d+$', tag_line):
-            continue
+        if _WP_RULES.drops(stripped) or _is_tag_counter_line(stripped):
+            return False
         # Autor wp.pl: "Imię Nazwisko, dziennikarz/ka Wirtualnej Polski"
-        if "dziennikarz" in stripped.lower() and "wirtualnej polski" in stripped.lower():
-            continue
-        # Banner "Misja AI" itp.
-        if stripped.startswith("Misja AI"):
-            continue
+        lowered = stripped.lower()
+        if "dziennikarz" in lowered and "wirtualnej polski" in lowered:
+            return False
         # Reklamy z gigantycznym tracking URL (>300 znaków)
-        if stripped.startswith("[") and stripped.endswith(")") and len(stripped) > 300:
-            continue
-        cleaned.append(line)
-    return cleaned
+        return not (stripped.startswith("[") and stripped.endswith(")") and len(stripped) > 300)
+
+    return keep
+
+
+def _clean_lines_wp(lines: list[str]) -> list[str]:
+    """Czyszczenie specyficzne dla wp.pl/o2.pl/tech.wp.pl."""
+    return list(filter(_wp_line_filter(), _wp_lookback(lines)))
+
+
+_ITHARDWARE_PLAYER_LINES = frozenset({"Play", "ad"})
+
+
+def _ithardware_line_filter():
+    """Usuń kontrolki osadzonego playera ITHardware bez globalnych reguł Play/ad."""
+    return lambda line: line.strip() not in _ITHARDWARE_PLAYER_LINES
 
 
 def _clean_lines_ithardware(lines: list[str]) -> list[str]:
     """Usuń kontrolki osadzonego playera ITHardware bez globalnych reguł Play/ad."""
-    return [line for line in lines if line.strip() not in {"Play", "ad"}]
+    return list(filter(_ithardware_line_filter(), lines))
 
 
 # Menu sekcji nagłówka strony interia.pl — ten sam blok na każdej stronie
@@ -453,22 +535,25 @@ _RELATIVE_YESTERDAY_RE = re.compile(r'^wczoraj,\s*(\d{1,2}):(\d{2})$', re.IGNORE
 _RELATIVE_TODAY_RE = re.compile(r'^dzi(?:s|ś|siaj),\s*(\d{1,2}):(\d{2})$', re.IGNORECASE)
 
 
+_INTERIA_RULES = _LineRules(
+    exact=("Udostępnij", "Odsłuchaj artykuł", "W skrócie", "Zobacz również:"),
+    # Względny znacznik czasu: "11 minut temu", "2 godziny temu",
+    # "Wczoraj, 22:30", "Dziś, 09:15"
+    patterns=tuple(
+        f"(?i:{pattern.pattern})"
+        for pattern in (_RELATIVE_MINUTES_HOURS_AGO_RE, _RELATIVE_YESTERDAY_RE, _RELATIVE_TODAY_RE)
+    ),
+)
+
+
+def _interia_line_filter():
+    """Czyszczenie specyficzne dla interia.pl (wydarzenia/biznes/motoryzacja/...)."""
+    return lambda line: not _INTERIA_RULES.drops(line.strip())
+
+
 def _clean_lines_interia(lines: list[str]) -> list[str]:
     """Czyszczenie specyficzne dla interia.pl (wydarzenia/biznes/motoryzacja/...)."""
-    skip_exact = {"Udostępnij", "Odsłuchaj artykuł", "W skrócie", "Zobacz również:"}
-    cleaned = []
-    for line in lines:
-        stripped = line.strip()
-        if stripped in skip_exact:
-            continue
-        # Względny znacznik czasu: "11 minut temu", "2 godziny temu",
-        # "Wczoraj, 22:30", "Dziś, 09:15"
-        if (_RELATIVE_MINUTES_HOURS_AGO_RE.match(stripped)
-                or _RELATIVE_YESTERDAY_RE.match(stripped)
-                or _RELATIVE_TODAY_RE.match(stripped)):
-            continue
-        cleaned.append(line)
-    return cleaned
+    return list(filter(_interia_line_filter(), lines))
 
 
 def resolve_relative_publication_date(
@@ -502,7 +587,15 @@ def resolve_relative_publication_date(
     return None
 
 
-def _clean_lines_bankier(lines: list[str]) -> list[str]:
+_BANKIER_SUBNAV_KEYWORDS = ("Notowania", "Kalendarium", "Dywidendy", "Narzędzia", "Portfel", "Forum")
+_BANKIER_RULES = _LineRules(
+    exact=("publikacja", "ad"),
+    # Samodzielna data publikacji: "2026-02-25 08:10"
+    patterns=(r'\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}$',),
+)
+
+
+def _bankier_line_filter():
     """Czyszczenie specyficzne dla bankier.pl.
 
     Breadcrumb i podmenu sekcji różnią się treścią per kategoria artykułu
@@ -511,78 +604,99 @@ def _clean_lines_bankier(lines: list[str]) -> list[str]:
     "Bankier.pl" (breadcrumb sklejony bez spacji) albo wiersz zawierający
     kilka charakterystycznych nazw sekcji podmenu naraz.
     """
-    subnav_keywords = ("Notowania", "Kalendarium", "Dywidendy", "Narzędzia", "Portfel", "Forum")
-    cleaned = []
     skip_source_value = False
     in_tags = False
-    for line in lines:
+
+    def keep(line: str) -> bool:
+        nonlocal skip_source_value, in_tags
         stripped = line.strip()
 
         if stripped == "Źródło:":
             skip_source_value = True
-            continue
+            return False
         if skip_source_value:
-            if not stripped:
-                continue
-            skip_source_value = False
-            continue
+            if stripped:
+                skip_source_value = False
+            return False
 
         if stripped == "tematy":
             in_tags = True
-            continue
+            return False
         if in_tags:
             if not stripped:
                 in_tags = False
-                continue
+                return False
             if len(stripped) < 60:
-                continue
+                return False
             in_tags = False
 
-        if stripped in ("publikacja", "ad"):
-            continue
+        if _BANKIER_RULES.drops(stripped):
+            return False
         if stripped.startswith("Bankier.pl") and len(stripped) < 80:
-            continue
-        if sum(kw in stripped for kw in subnav_keywords) >= 3:
-            continue
-        # Samodzielna data publikacji: "2026-02-25 08:10"
-        if re.match(r'^\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}$', stripped):
-            continue
+            return False
+        return sum(kw in stripped for kw in _BANKIER_SUBNAV_KEYWORDS) < 3
 
-        cleaned.append(line)
-    return cleaned
+    return keep
 
 
-def _clean_lines_gazeta(lines: list[str]) -> list[str]:
+def _clean_lines_bankier(lines: list[str]) -> list[str]:
+    """Czyszczenie specyficzne dla bankier.pl (zob. _bankier_line_filter)."""
+    return list(filter(_bankier_line_filter(), lines))
+
+
+_GALLERY_LINK_RE = re.compile(r'^Otwórz galerię \(\d+\)$', re.IGNORECASE)
+_GO_TO_LINK_RE = re.compile(r'^przejdź na(?: \[link\d+\])?$', re.IGNORECASE)
+
+
+def _gazeta_line_filter():
     """Usuń śródtekstowe karty rekomendacji Gazeta.pl, zachowując dalszy artykuł."""
-    cleaned = []
     in_recommendation = False
 
-    for line in lines:
+    def keep(line: str) -> bool:
+        nonlocal in_recommendation
         stripped = line.strip()
-        stripped_no_links = re.sub(r'\s*\[link\d+\]', '', stripped).strip()
+        stripped_no_links = _LINK_MARKER_RE.sub('', stripped).strip() if "[link" in stripped else stripped
 
-        if re.match(r'^Otwórz galerię \(\d+\)$', stripped, re.IGNORECASE):
-            continue
-        if re.match(r'^przejdź na(?: \[link\d+\])?$', stripped, re.IGNORECASE):
-            continue
+        if _GALLERY_LINK_RE.match(stripped) or _GO_TO_LINK_RE.match(stripped):
+            return False
 
         if stripped_no_links in ("Czytaj także:", "Czytaj również:"):
             in_recommendation = True
-            continue
+            return False
 
         if in_recommendation:
             if not stripped or stripped in ("SUBSKRYPCJA", "REKLAMA"):
-                continue
+                return False
             # Po karcie rekomendacji właściwy artykuł wraca jako zwykły,
             # odpowiednio długi akapit. Przetwórz go już normalnie.
             if len(stripped_no_links) >= 100 and not stripped.startswith(("[", "!")):
                 in_recommendation = False
             else:
-                continue
+                return False
+        return True
 
-        cleaned.append(line)
+    return keep
 
-    return cleaned
+
+def _clean_lines_gazeta(lines: list[str]) -> list[str]:
+    """Usuń śródtekstowe karty rekomendacji Gazeta.pl, zachowując dalszy artykuł."""
+    return list(filter(_gazeta_line_filter(), lines))
+
+
+# Filtry linii per portal (fabryki — każdy artykuł dostaje świeży stan) i
+# przebiegi wymagające spojrzenia wstecz, które muszą pójść przed filtrem.
+_PORTAL_LINE_FILTERS = {
+    "onet": _onet_line_filter,
+    "money": _money_line_filter,
+    "wp": _wp_line_filter,
+    "gazeta": _gazeta_line_filter,
+    "bankier": _bankier_line_filter,
+    "interia": _interia_line_filter,
+}
+_PORTAL_LOOKBACK = {
+    "money": _remove_author_bio_paragraph,
+    "wp": _wp_lookback,
+}
 
 
 # Kategorie photo_caption_candidates rozpoznane po jednoznacznym słowie-kluczu
@@ -599,7 +713,7 @@ _STRICT_CAPTION_CATEGORIES = {
 _IMG_MARKER_ALT_RE = re.compile(r'^\[img\d+(?::\s*([^\]]*))?\]\s*$')
 
 
-def _strip_photo_caption_lines(text: str, url: str) -> str:
+def _strip_photo_caption_lines(text: str, url: str, candidates: list[dict] | None = None) -> str:
     """Usuń z treści linie-podpisy/credity zdjęć, których dane trafiły już
     strukturalnie do document_images (_attach_image_captions) — zostawienie
     ich w tekście artykułu jest tylko duplikacją. Marker [imgN] zostaje.
@@ -611,10 +725,14 @@ def _strip_photo_caption_lines(text: str, url: str) -> str:
        (np. "Panthalassa/x / Wodne Sprawy"), ale jednoznaczne potwierdzenie
        daje kolejna linia będąca dosłownym powtórzeniem alt-textu — realna
        treść artykułu praktycznie nigdy nie powtarza dosłownie alt obrazka.
+
+    candidates: wynik photo_caption_candidates(text, url), jeśli już policzony.
     """
     lines = text.splitlines()
+    if candidates is None:
+        candidates = photo_caption_candidates(text, url)
     remove_idx = {
-        item["line_index"] for item in photo_caption_candidates(text, url)
+        item["line_index"] for item in candidates
         if item["category"] in _STRICT_CAPTION_CATEGORIES
     }
 
@@ -655,13 +773,16 @@ def _strip_photo_caption_lines(text: str, url: str) -> str:
     return "\n".join(line for index, line in enumerate(lines) if index not in remove_idx)
 
 
-def _attach_image_captions(text: str, extracted_images: list[dict], url: str) -> None:
+def _attach_image_captions(
+    text: str, extracted_images: list[dict], url: str, candidates: list[dict] | None = None,
+) -> None:
     """Dopisz caption_text/caption_category do extracted_images na podstawie linii
     sąsiadujących z markerem [imgN] w tekście — MUSI być wywołane zaraz po
     podstawieniu markerów (krok 3), zanim dalsze czyszczenie (portal/generyczne)
     zdąży usunąć linię podpisu z tekstu. Reużywa article_quality.photo_caption_candidates
     (ta sama klasyfikacja, co przy liczeniu kary za pochodzenie zdjęcia)."""
-    candidates = photo_caption_candidates(text, url)
+    if candidates is None:
+        candidates = photo_caption_candidates(text, url)
     pending_idx: int | None = None
     for item in candidates:
         if item["category"] == "image_marker":
@@ -729,21 +850,18 @@ def clean_article_text(text: str, url: str = "") -> dict:
     # zwrócić kilka kart bez separatora; md_square_brackets_in_one_line najpierw
     # odtwarza ich granice. Usuwamy teraz każdą kartę jako osobną linię, zanim
     # prosty parser obrazków natrafi na zagnieżdżone nawiasy, np. "[ANALIZA]".
-    text = "\n".join(
-        line for line in text.splitlines()
-        if not (line.strip().startswith("[![") and "#### " in line)
-    )
-
-    # Konwertery HTML -> Markdown potrafią zwrócić blok tagów bez separatorów:
+    # Konwertery HTML -> Markdown potrafią też zwrócić blok tagów bez separatorów:
     # [tag 1](/tag/1)[tag 2](/tag/2). Usuń wyłącznie linie złożone w całości
     # z co najmniej dwóch linków rozpoznanych jako tagi/kategorie portalu.
-    text = "\n".join(
+    lines = [
         line for line in text.splitlines()
-        if not _is_adjacent_tag_links_line(line.strip())
-    )
+        if not (line.strip().startswith("[![") and "#### " in line)
+        and not _is_adjacent_tag_links_line(line.strip())
+    ]
 
     # 2. Wykryj H2+obrazek wstawki PRZED usuwaniem obrazków
-    h2_ad_titles = _detect_h2_ads(text)
+    h2_ad_titles = _h2_ad_titles(lines)
+    text = "\n".join(lines)
 
     # 3. Wyodrębnij obrazki → markery [imgN]
     # Pomijaj emotki, ikony, tracking pixele, duplikaty
@@ -781,12 +899,13 @@ def clean_article_text(text: str, url: str = "") -> dict:
 
     # 3b. Skojarz podpisy/credity z markerami, zanim dalsze czyszczenie
     # zdąży usunąć linię podpisu z tekstu.
-    _attach_image_captions(text, extracted_images, url)
+    caption_candidates = photo_caption_candidates(text, url)
+    _attach_image_captions(text, extracted_images, url, caption_candidates)
 
     # 3c. Usuń z treści jednoznacznie rozpoznane linie-podpisy/credity zdjęć —
     # dane trafiły już do extracted_images (document_images), zostawienie ich
     # w tekście artykułu jest tylko duplikacją.
-    text = _strip_photo_caption_lines(text, url)
+    text = _strip_photo_caption_lines(text, url, caption_candidates)
 
     # 4. Odetnij od footer markera portalu
     footer_line = _find_footer_line(text, portal)
@@ -846,30 +965,27 @@ def clean_article_text(text: str, url: str = "") -> dict:
         return ""  # usuń osierocony
     text = re.sub(r'\[img\d+(?::[^\]]*)?\]', _clean_orphan_img, text)
 
-    # 7. Normalizacja
+    # 7. Normalizacja: nbsp → spacja, ciągi spacji → jedna. str.replace w pętli
+    # zamiast re.sub(' +', ...), który dopasowywał każdą pojedynczą spację.
     text = text.replace('\xa0', ' ')
-    text = re.sub(' +', ' ', text)
-
-    # 8. Czyszczenie linia po linii: generyczne + per-portal
+    while '  ' in text:
+        text = text.replace('  ', ' ')
+
+    # 8. Czyszczenie linia po linii: generyczne + per-portal w jednym przebiegu
+    # — filtr portalu widzi tylko linie, które przepuścił generyczny.
+    keep = _generic_line_filter(h2_ad_titles)
+    portal_filter = _PORTAL_LINE_FILTERS.get(portal)
+    if portal_filter is None and "ithardware.pl" in url.lower():
+        portal_filter = _ithardware_line_filter
     lines = text.splitlines()
-    lines = _clean_lines_generic(lines, h2_ad_titles)
-
-    if portal == "onet":
-        lines = _clean_lines_onet(lines)
-    elif portal == "money":
-        lines = _clean_lines_money(lines)
-    elif portal == "wp":
-        lines = _clean_lines_wp(lines)
-    elif portal == "gazeta":
-        lines = _clean_lines_gazeta(lines)
-    elif portal == "bankier":
-        lines = _clean_lines_bankier(lines)
-    elif portal == "interia":
-        lines = _clean_lines_interia(lines)
-    elif "ithardware.pl" in url.lower():
-        lines = _clean_lines_ithardware(lines)
-
-    text = "\n".join(lines)
+    lookback = _PORTAL_LOOKBACK.get(portal)
+    if lookback is not None:
+        lines = lookback([line for line in lines if keep(line)])
+        keep = portal_filter()
+    elif portal_filter is not None:
+        keep = _keep_all(keep, portal_filter())
+
+    text = "\n".join(line for line in lines if keep(line))
     text = re.sub(r'\n{3,}', '\n\n', text)
 
     return {
@@ -69,27 +69,28 @@ def _trim_markdown_navigation(markdown_text: str) -> str:
     return "\n".join(lines[start:])
 
 
+# Portal -> URL fragments, checked in order (first match wins). Also used by
+# library/article_reclean.py to preselect a portal's documents in SQL.
+PORTAL_URL_FRAGMENTS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("onet", ("onet.pl", "fakt.pl")),
+    ("money", ("money.pl",)),
+    ("wp", ("wp.pl", "o2.pl")),
+    ("interia", ("interia.pl",)),
+    ("businessinsider", ("businessinsider.com.pl",)),
+    ("natgeo", ("national-geographic.pl",)),
+    ("gazeta", ("gazeta.pl",)),
+    ("bankier", ("bankier.pl",)),
+)
+
+
 def _detect_portal(url: str) -> str | None:
     """Rozpoznaj portal na podstawie URL."""
     if not url:
         return None
     url_lower = url.lower()
-    if "onet.pl" in url_lower or "fakt.pl" in url_lower:
-        return "onet"
-    if "money.pl" in url_lower:
-        return "money"
-    if "wp.pl" in url_lower or "o2.pl" in url_lower:
-        return "wp"
-    if "interia.pl" in url_lower:
-        return "interia"
-    if "businessinsider.com.pl" in url_lower:
-        return "businessinsider"
-    if "national-geographic.pl" in url_lower:
-        return "natgeo"
-    if "gazeta.pl" in url_lower:
-        return "gazeta"
-    if "bankier.pl" in url_lower:
-        return "bankier"
+    for portal, fragments in PORTAL_URL_FRAGMENTS:
+        if any(fragment in url_lower for fragment in fragments):
+            return portal
     return None
 
 
@@ -231,12 +232,10 @@ def _find_footer_line(text: str, portal: str | None) -> int | None:
         markers = PORTAL_FOOTER_MARKERS[portal][:]
     markers.extend(universal_markers)
 
-    lines = text.splitlines()
-    for i, line in enumerate(lines):
-        stripped = line.strip().replace('\xa0', ' ')
-        for marker in markers:
-            if stripped.startswith(marker):
-                return i
+    markers = tuple(markers)
+    for i, line in enumerate(text.splitlines()):
+        if line.strip().replace('\xa0', ' ').startswith(markers):
+            return i
 
     return None
 
@@ -0,0 +1,204 @@
+"""Re-run article_cleaner over stored articles after a portal rule change.
+
+``clean_article_text()`` is a pure function of (text, url), and
+``documents.text_extracted`` keeps its input: the LLM article extraction
+before cleanup. The reclean_corpus job feeds those texts back through the
+current rules:
+
+- webpage documents are read in id order, ``BATCH_SIZE`` at a time, limited
+  to the requested portals (``_detect_portal``; ``generic`` stands for URLs
+  of no known portal);
+- each batch is cleaned in a process pool — the rules are CPU-bound
+  regex and line work, so threads would serialise on the GIL;
+- only documents whose cleaned text differs from the stored ``text_md`` are
+  written, as one bulk UPDATE per batch, together with their images and
+  rule-based information sources, the same fields the reclean preview's
+  "save" sets. Documents that already have embeddings are counted and left
+  alone: like the preview, a batch run must not make them inconsistent.
+- ``text_md`` is edited after cleaning (saves in DocumentService, author-bio
+  stripping, footnote extraction, the preview's own re-clean), so a document
+  is only rewritten while its ``text_md`` is still exactly the cleaner output
+  stored by preparation or by an earlier run: ``text_md_cleaned_hash`` is
+  the md5 of that output. Any other document — edited since, or prepared
+  before the hash existed — is counted as ``skipped_edited`` and kept.
+
+The result reports documents, changes and cleaning time per portal, so a
+``dry_run`` shows the effect of a rule fix before it is applied.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from sqlalchemy import or_, select, update
+
+from library.article_cleaner import clean_article_text
+from library.article_extractor import PORTAL_URL_FRAGMENTS, _detect_portal
+from library.config_loader import load_config
+from library.db.models import Document, DocumentEmbedding
+from library.job_queue import enqueue, heartbeat
+
+RECLEAN_CORPUS = "reclean_corpus"
+GENERIC = "generic"
+PORTALS = frozenset({portal for portal, _ in PORTAL_URL_FRAGMENTS} | {GENERIC})
+BATCH_SIZE = 500
+# Documents per task sent to a pool process; amortises pickling overhead.
+CHUNK_SIZE = 20
+
+
+def cleaned_text_hash(text: str | None) -> str:
+    """md5 of a cleaner output, stored in documents.text_md_cleaned_hash."""
+    return hashlib.md5((text or "").encode("utf-8")).hexdigest()
+
+
+def enqueue_reclean_corpus(
+    session, portals: list[str] | None = None, *, dry_run: bool = False,
+    processes: int | None = None, user_id: int | None = None,
+):
+    unknown = set(portals or ()) - PORTALS
+    if unknown:
+        raise ValueError(f"unknown portals: {', '.join(sorted(unknown))}")
+    parameters = {"portals": sorted(portals) if portals else None, "dry_run": dry_run}
+    if processes:
+        parameters["processes"] = processes
+    return enqueue(session, RECLEAN_CORPUS, parameters, user_id=user_id)
+
+
+def _clean_one(item: tuple[int, str, str]) -> tuple[int, dict, float]:
+    """Pool task: clean one document and time it (runs in a child process)."""
+    document_id, text, url = item
+    started = time.perf_counter()
+    cleaned = clean_article_text(text, url)
+    return document_id, cleaned, time.perf_counter() - started
+
+
+def _portal_filter(portals: list[str] | None):
+    if not portals or GENERIC in portals:
+        return None  # "no known portal" cannot be expressed as a URL match
+    fragments = [fragment for portal, items in PORTAL_URL_FRAGMENTS if portal in portals for fragment in items]
+    return or_(*(Document.url.ilike(f"%{fragment}%") for fragment in fragments))
+
+
+def _batches(session, portals: list[str] | None, batch_size: int):
+    url_filter = _portal_filter(portals)
+    last_id = 0
+    while True:
+        stmt = (
+            select(Document.id, Document.url, Document.text_extracted, Document.text_md,
+                   Document.text_md_cleaned_hash)
+            .where(Document.document_type == "webpage", Document.text_extracted.is_not(None), Document.id > last_id)
+            .order_by(Document.id)
+            .limit(batch_size)
+        )
+        if url_filter is not None:
+            stmt = stmt.where(url_filter)
+        rows = session.execute(stmt).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield [row for row in rows if not portals or (_detect_portal(row.url or "") or GENERIC) in portals]
+
+
+def _write(session, changed: list[tuple[int, dict]]) -> None:
+    from library.document_images import replace_document_images
+    from library.information_provenance import refresh_rule_based_sources
+    from library.lenie_markdown import md_remove_markdown
+
+    session.execute(update(Document), [
+        {
+            "id": document_id,
+            "text_md": cleaned["text"],
+            "text_md_cleaned_hash": cleaned_text_hash(cleaned["text"]),
+            "text": md_remove_markdown(cleaned["text"]),
+            "document_length": len(cleaned["text"]),
+            "quality": None,
+            "entities_checked_at": None,
+            "ner_unavailable_at": None,
+        }
+        for document_id, cleaned in changed
+    ])
+    for document_id, cleaned in changed:
+        replace_document_images(session, document_id, cleaned["images"])
+        if cleaned.get("info_sources"):
+            refresh_rule_based_sources(session, session.get(Document, document_id), cleaned["info_sources"])
+
+
+def reclean_corpus(
+    session, portals: list[str] | None = None, *, dry_run: bool = False,
+    executor: Executor | None = None, batch_size: int = BATCH_SIZE, progress=None,
+) -> dict:
+    """Clean every matching document with the current rules; write the changed ones.
+
+    Without ``executor`` the documents are cleaned in this process.
+    """
+    started = time.monotonic()
+    stats: dict[str, dict] = defaultdict(lambda: {"documents": 0, "changed": 0, "clean_seconds": 0.0})
+    totals = {"scanned": 0, "changed": 0, "written": 0, "skipped_edited": 0, "skipped_embedded": 0}
+    for rows in _batches(session, portals, batch_size):
+        if not rows:
+            continue
+        by_id = {row.id: row for row in rows}
+        items = [(row.id, row.text_extracted, row.url or "") for row in rows]
+        changed = []
+        differing = 0
+        results = executor.map(_clean_one, items, chunksize=CHUNK_SIZE) if executor else map(_clean_one, items)
+        for document_id, cleaned, seconds in results:
+            portal = stats[cleaned["portal"] or GENERIC]
+            portal["documents"] += 1
+            portal["clean_seconds"] += seconds
+            row = by_id[document_id]
+            if cleaned["text"] != (row.text_md or ""):
+                portal["changed"] += 1
+                differing += 1
+                if row.text_md_cleaned_hash != cleaned_text_hash(row.text_md):
+                    totals["skipped_edited"] += 1
+                else:
+                    changed.append((document_id, cleaned))
+        totals["scanned"] += len(rows)
+        totals["changed"] += differing
+        if changed and not dry_run:
+            embedded = set(session.scalars(
+                select(DocumentEmbedding.document_id)
+                .where(DocumentEmbedding.document_id.in_([document_id for document_id, _ in changed]))
+                .distinct()
+            ))
+            writable = [(document_id, cleaned) for document_id, cleaned in changed if document_id not in embedded]
+            if writable:
+                _write(session, writable)
+            session.commit()
+            totals["written"] += len(writable)
+            totals["skipped_embedded"] += len(changed) - len(writable)
+        if progress is not None:
+            progress({**totals, "last_document_id": rows[-1].id})
+    return {
+        **totals,
+        "dry_run": dry_run,
+        "portals": {
+            name: {**values, "clean_seconds": round(values["clean_seconds"], 3)}
+            for name, values in sorted(stats.items())
+        },
+        "elapsed_seconds": round(time.monotonic() - started, 3),
+    }
+
+
+def execute_reclean_corpus(session, job) -> dict:
+    """worker.py entry point for the reclean_corpus job type."""
+    parameters = job.parameters or {}
+    # os.cpu_count() sees the host's CPUs, not a container's cpus: limit.
+    processes = int(parameters.get("processes") or load_config().get("RECLEAN_CORPUS_PROCESSES")
+                    or os.cpu_count() or 1)
+    # spawn, not fork: the worker has a usage-writer thread and pooled
+    # connections that must not be duplicated into the children.
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return reclean_corpus(
+            session,
+            parameters.get("portals"),
+            dry_run=bool(parameters.get("dry_run")),
+            executor=executor,
+            progress=lambda counts: heartbeat(session, job.id, counts),
+        )
@@ -30,18 +30,22 @@ layouts. The output markdown must satisfy library.text_functions.detect_chapters
 from __future__ import annotations
 
 import difflib
+import hashlib
 import logging
 import re
+import threading
 import uuid
 from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 
 from sqlalchemy.orm import Session
 
 from library.config_loader import load_config
 from library.db.models import Document
-from library.document_service import DocumentService
-from library.storage import storage_from_config
+from library.document_service import DocumentService, ExistingDocumentError
+from library.storage import ObjectStorage, storage_from_config
 
 logger = logging.getLogger(__name__)
 
@@ -86,6 +90,9 @@ _HEADING_MIN_SIZE = 12.0
 # a different book.
 _IMAGE_MIN_PIXELS = 100  # applies to each dimension
 _IMAGE_MIN_BYTES = 5 * 1024
+# Page images uploaded concurrently by import_pdf_book() — also the most image
+# payloads held in memory at once (see _submit_page_image_uploads()).
+IMAGE_UPLOAD_MAX_WORKERS = 4
 _CAPTION_RE = re.compile(r"(?m)^\s*((?:Rysunek|Rys\.|Ilustracja|Tabela|Zdj\.)\s*\d+[.:].*)$")
 _TABLE_CAPTION_RE = re.compile(r"(?m)^Tabela\s+(\d+)\.\s")
 CONTENT_TYPE_BY_EXT = {"png": "image/png", "jpeg": "image/jpeg", "jpg": "image/jpeg"}
@@ -687,21 +694,27 @@ class PageImage:
     ext: str
     width: int
     height: int
+    sha256: str = ""
 
 
-def extract_page_images(pdf_bytes: bytes) -> list[PageImage]:
-    """Extract real illustrations embedded in the PDF, in page order.
+def iter_page_images(pdf_bytes: bytes) -> Iterator[PageImage]:
+    """Yield real illustrations embedded in the PDF, one at a time, in page order.
 
     A running-head logo or bullet icon reuses the same PDF xref across dozens
     of pages, so images are deduplicated by xref first (keeping the earliest
     occurrence), then filtered by pixel dimensions and byte size to drop
-    decorative furniture that isn't a genuine figure.
+    decorative furniture that isn't a genuine figure. Some PDFs embed the
+    same logo/icon bitmap under several distinct xrefs, so survivors are also
+    deduplicated by content (SHA-256 of the image bytes).
+
+    A generator rather than a list so a scan-heavy book never holds every
+    image's bytes at once — see _submit_page_image_uploads().
     """
     import fitz
 
     doc = fitz.open(stream=pdf_bytes, filetype="pdf")
     seen_xrefs: set[int] = set()
-    images: list[PageImage] = []
+    seen_digests: set[str] = set()
     for page_index, page in enumerate(doc):
         for img in page.get_images(full=True):
             xref = img[0]
@@ -716,11 +729,85 @@ def extract_page_images(pdf_bytes: bytes) -> list[PageImage]:
             data = info["image"]
             if len(data) < _IMAGE_MIN_BYTES:
                 continue
-            images.append(PageImage(
+            digest = hashlib.sha256(data).hexdigest()
+            if digest in seen_digests:
+                continue
+            seen_digests.add(digest)
+            yield PageImage(
                 page_index=page_index, xref=xref, data=data,
-                ext=info.get("ext", "png"), width=width, height=height,
-            ))
-    return images
+                ext=info.get("ext", "png"), width=width, height=height, sha256=digest,
+            )
+
+
+def extract_page_images(pdf_bytes: bytes) -> list[PageImage]:
+    """All of iter_page_images() as a list — for callers that need a count or
+    total size up front (imports/book_extract_images.py's dry-run report)."""
+    return list(iter_page_images(pdf_bytes))
+
+
+@dataclass
+class StoredPageImage:
+    """A PageImage already handed to storage — same position/page metadata,
+    but without the image bytes, so the caller can keep one per image for
+    the whole import without keeping the images themselves alive."""
+    position: int
+    page_index: int
+    storage_key: str
+    sha256: str
+
+
+def _submit_page_image_uploads(
+    executor: ThreadPoolExecutor,
+    storage: ObjectStorage,
+    images: Iterable[PageImage],
+    key_prefix: str,
+    max_in_flight: int,
+) -> list[tuple[StoredPageImage, Future]]:
+    """Upload images to `key_prefix/<position>.<ext>` as they're extracted.
+
+    At most max_in_flight images are pending at once: pulling the next image
+    off the generator blocks until an earlier upload finishes, so memory
+    stays bounded by max_in_flight images regardless of book size. Returns
+    immediately after the last submit — the executor's own shutdown (the
+    caller's `with` block) waits for the tail, and each Future's result()
+    re-raises that upload's storage error.
+    """
+    slots = threading.BoundedSemaphore(max_in_flight)
+    submitted: list[tuple[StoredPageImage, Future]] = []
+    for position, page_image in enumerate(images):
+        storage_key = f"{key_prefix}/{position}.{page_image.ext}"
+        content_type = CONTENT_TYPE_BY_EXT.get(page_image.ext, "application/octet-stream")
+        slots.acquire()
+        try:
+            future = executor.submit(storage.put_bytes, storage_key, page_image.data, content_type)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _f: slots.release())
+        submitted.append((
+            StoredPageImage(
+                position=position, page_index=page_image.page_index,
+                storage_key=storage_key, sha256=page_image.sha256,
+            ),
+            future,
+        ))
+    return submitted
+
+
+def _delete_uploaded(storage: ObjectStorage, prefix: str, pdf_key: str) -> None:
+    """Best-effort removal of what a failed import_pdf_book() already stored.
+
+    The prefix is the import's fresh documents/<uuid>/, so everything under
+    it was written by that import alone.
+    """
+    try:
+        keys = [obj.key for obj in storage.iter_objects(prefix)]
+        if storage.exists(pdf_key):
+            keys.append(pdf_key)
+        for key in keys:
+            storage.delete(key)
+    except Exception:
+        logger.warning("Could not clean up %s after a failed book import", prefix, exc_info=True)
 
 
 def caption_for_page(page_text: str) -> str | None:
@@ -1096,9 +1183,11 @@ def fetch_chapter_footnotes(url: str, timeout: float = 20.0, proxies: dict[str,
     import requests
     from bs4 import BeautifulSoup
 
+    from library import http
+
     try:
-        resp = requests.get(
-            url, timeout=timeout, proxies=proxies,
+        resp = http.get(
+            url, upstream="book_footnotes", timeout=timeout, proxies=proxies,
             headers={"User-Agent": "Mozilla/5.0 (compatible; LenieBot/1.0)"},
         )
         resp.raise_for_status()
@@ -1149,6 +1238,7 @@ def import_pdf_book(
     promote_subheadings: dict[str, str] | None = None,
     detect_tables: bool = True,
     apply_styles: bool = True,
+    image_upload_workers: int = IMAGE_UPLOAD_MAX_WORKERS,
 ) -> tuple[Document, BookMarkdownResult]:
     """Create a Document for a book PDF with chapter-aware text_md. Commits.
 
@@ -1163,70 +1253,99 @@ def import_pdf_book(
     to turn this book's front/back-matter "part" sections into real, clickable
     chapters alongside the numbered ones — see their docstrings.
 
+    The URL's duplicate check runs before anything is uploaded, and the text
+    steps run first. Page images are then streamed from iter_page_images()
+    into storage: the next image is extracted on this thread while up to
+    image_upload_workers threads upload earlier ones, and only the storage
+    keys are kept, never the whole set of image bytes. All PyMuPDF work
+    stays on the calling thread (fitz isn't thread-safe). The document's uuid
+    is picked up front so image keys are known before the Document row
+    exists; if anything fails after the first upload (no chapters detected,
+    a storage error, the insert), the uploaded objects are deleted again, so
+    a failed import leaves neither a document pointing at missing images nor
+    orphaned images.
+
     Returns (document, markdown_result) so callers can report chapter stats.
     """
+    doc_url = url or f"file:///ksiazki/{slugify(title)}.pdf"
+    existing = Document.get_by_url(session, doc_url)
+    if existing is not None:
+        raise ExistingDocumentError(existing)
+
+    cfg = load_config()
+    storage = storage_from_config(cfg)
+    pdf_uid = str(uuid.uuid4())
+
     pages = extract_pages(pdf_bytes)
     if detect_tables:
         pages = insert_page_tables(pdf_bytes, pages)
     if apply_styles:
         pages = apply_inline_styles(pdf_bytes, pages)
     heading_texts = detect_heading_texts(pdf_bytes, font_prefix=heading_font_prefix, min_size=heading_min_size)
-    page_images = extract_page_images(pdf_bytes) if extract_images else []
-    images_by_page: dict[int, list[int]] = {}
-    for position, page_image in enumerate(page_images):
-        images_by_page.setdefault(page_image.page_index, []).append(position)
     extra_sections = detect_named_sections(
         pdf_bytes, extra_section_eyebrows or {}, extra_section_titles or {},
     ) if (extra_section_eyebrows or extra_section_titles) else {}
 
-    result = build_book_markdown(
-        pages, chapter_regex=chapter_regex, heading_texts=heading_texts, images_by_page=images_by_page,
-        extra_sections=extra_sections, promote_subheadings=promote_subheadings,
-    )
-    if not result.chapters:
-        raise ValueError(
-            "No chapters detected with the given --chapter-regex — adjust the pattern "
-            "(preview with imports/check_pdf_text_layer.py --show-sample first)"
+    uploads: list[tuple[StoredPageImage, Future]] = []
+    try:
+        if extract_images:
+            with ThreadPoolExecutor(max_workers=image_upload_workers, thread_name_prefix="book-images") as executor:
+                uploads = _submit_page_image_uploads(
+                    executor, storage, iter_page_images(pdf_bytes), f"documents/{pdf_uid}/images",
+                    image_upload_workers,
+                )
+        images_by_page: dict[int, list[int]] = {}
+        for stored, _future in uploads:
+            images_by_page.setdefault(stored.page_index, []).append(stored.position)
+
+        result = build_book_markdown(
+            pages, chapter_regex=chapter_regex, heading_texts=heading_texts, images_by_page=images_by_page,
+            extra_sections=extra_sections, promote_subheadings=promote_subheadings,
         )
-
-    doc_url = url or f"file:///ksiazki/{slugify(title)}.pdf"
-
-    service = DocumentService(session)
-    doc = service.create_document(
-        url=doc_url,
-        url_type="text",
-        title=title,
-        note=note,
-        source=source,
-    )
-    doc.byline = byline
-    doc.text_md = result.markdown
-
-    cfg = load_config()
-    storage = storage_from_config(cfg)
-    pdf_uid = doc.uuid or str(uuid.uuid4())
-    storage.put_bytes(f"{pdf_uid}.pdf", pdf_bytes, "application/pdf")
-
-    if page_images:
-        from library.document_images import replace_storage_images
-
-        image_rows = []
-        for position, page_image in enumerate(page_images):
-            storage_key = f"documents/{pdf_uid}/images/{position}.{page_image.ext}"
-            content_type = CONTENT_TYPE_BY_EXT.get(page_image.ext, "application/octet-stream")
-            storage.put_bytes(storage_key, page_image.data, content_type)
-            chapter_position = (
-                result.page_chapter_positions[page_image.page_index]
-                if page_image.page_index < len(result.page_chapter_positions) else 0
+        if not result.chapters:
+            raise ValueError(
+                "No chapters detected with the given --chapter-regex — adjust the pattern "
+                "(preview with imports/check_pdf_text_layer.py --show-sample first)"
             )
-            image_rows.append({
-                "storage_key": storage_key,
-                "position": position,
-                "page_number": page_image.page_index + 1,
-                "chapter_position": chapter_position,
-                "caption_text": caption_for_page(pages[page_image.page_index]),
-            })
-        replace_storage_images(session, doc.id, image_rows)
-
-    session.commit()
+        for _stored, future in uploads:
+            future.result()
+        logger.info("Uploaded %d page images for %s", len(uploads), pdf_uid)
+
+        service = DocumentService(session)
+        doc = service.create_document(
+            url=doc_url,
+            url_type="text",
+            title=title,
+            note=note,
+            source=source,
+            external_uuid=pdf_uid,
+        )
+        doc.byline = byline
+        doc.text_md = result.markdown
+
+        storage.put_bytes(f"{pdf_uid}.pdf", pdf_bytes, "application/pdf")
+
+        if uploads:
+            from library.document_images import replace_storage_images
+
+            image_rows = []
+            for stored, _future in uploads:
+                chapter_position = (
+                    result.page_chapter_positions[stored.page_index]
+                    if stored.page_index < len(result.page_chapter_positions) else 0
+                )
+                image_rows.append({
+                    "storage_key": stored.storage_key,
+                    "position": stored.position,
+                    "page_number": stored.page_index + 1,
+                    "chapter_position": chapter_position,
+                    "caption_text": caption_for_page(pages[stored.page_index]),
+                })
+            replace_storage_images(session, doc.id, image_rows)
+
+        session.commit()
+    except BaseException:
+        session.rollback()
+        _delete_uploaded(storage, f"documents/{pdf_uid}/", f"{pdf_uid}.pdf")
+        raise
     return doc, result
@@ -0,0 +1,149 @@
+"""Persisted reader chapter index, one row per document text revision.
+
+The reader endpoints (GET /document/<id>/chapters, .../chapter/<pos>,
+.../chapter/<pos>/entities, .../anchor/<id>) used to load the whole text_md
+— several MB for a book — and re-run text_functions.detect_chapters() on
+every click. reader_text() instead reads the document with its large text
+columns deferred and looks up document_chapter_index: the detect_chapters()
+output plus the text's length and word count, stored against
+documents.text_hash (an md5 of the reader's source text, kept current by a
+trigger — see alembic d4f5a6b7c8e9). A missing or stale row is recomputed
+once and written back best-effort; a chapter's text is then cut out with
+SQL substr(), so only that chapter crosses the wire.
+
+Objects that are not ORM-loaded documents (ad hoc or test doubles) have no
+row to index against; they are handled in memory exactly as before.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+
+from sqlalchemy import func, inspect as sa_inspect, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import InstanceState, defer
+
+from library.db.engine import get_session
+from library.db.models import Document, DocumentChapterIndex
+
+logger = logging.getLogger(__name__)
+
+# Columns reader endpoints never need in full; ReaderText loads them lazily.
+LARGE_TEXT_COLUMNS = ("text", "text_md", "text_raw", "text_extracted")
+# _extract_text() source fields whose character offsets map 1:1 onto the
+# column, so a chapter can be sliced in SQL (text_raw is JSON → plain text).
+_SQL_SLICEABLE_FIELDS = ("text_md", "text")
+
+
+def reader_load_options() -> list:
+    """session.get() options that leave the large text columns unloaded."""
+    return [defer(getattr(Document, column)) for column in LARGE_TEXT_COLUMNS]
+
+
+class ReaderText:
+    """The reader's view of a document's text: chapters, size, lazy slices."""
+
+    def __init__(self, session, doc, *, source_field: str, length: int, word_count: int,
+                 chapters: list[dict], text: str | None = None):
+        self.session = session
+        self.doc = doc
+        self.source_field = source_field
+        self.length = length
+        self.word_count = word_count
+        self.chapters = chapters
+        self._text = text
+
+    def full_text(self) -> str:
+        if self._text is None:
+            from library.document_analysis_service import _extract_text
+
+            self._text, _field = _extract_text(self.doc, prefer_md=True, min_length=0)
+        return self._text
+
+    def slice(self, start: int, end: int) -> str:
+        """text[start:end] — via SQL substr() unless the text is already in memory."""
+        if self._text is not None or self.source_field not in _SQL_SLICEABLE_FIELDS:
+            return self.full_text()[start:end]
+        column = getattr(Document, self.source_field)
+        value = self.session.scalar(
+            select(func.substr(column, start + 1, max(end - start, 0))).where(Document.id == self.doc.id)
+        )
+        return value or ""
+
+    def find(self, needle: str) -> int:
+        """str.find() over the full text — via SQL strpos() when possible."""
+        if self._text is not None or self.source_field not in _SQL_SLICEABLE_FIELDS:
+            return self.full_text().find(needle)
+        column = getattr(Document, self.source_field)
+        position = self.session.scalar(select(func.strpos(column, needle)).where(Document.id == self.doc.id))
+        return (position or 0) - 1
+
+
+def source_text_hash(doc) -> str:
+    """documents.text_hash computed client-side, for a row not yet flushed.
+
+    Same formula as the trigger (alembic d4f5a6b7c8e9): md5 of the first
+    non-empty of text_md, text, text_raw.
+    """
+    source = doc.text_md or doc.text or doc.text_raw or ""
+    return hashlib.md5(source.encode("utf-8")).hexdigest()
+
+
+def _indexable(doc) -> bool:
+    return isinstance(sa_inspect(doc, raiseerr=False), InstanceState) and doc.text_hash is not None
+
+
+def reader_text(session, doc, session_factory=get_session) -> ReaderText:
+    """ReaderText for ``doc``, from document_chapter_index when it is current."""
+    indexable = _indexable(doc)
+    if indexable:
+        row = session.get(DocumentChapterIndex, doc.id)
+        if row is not None and row.text_hash == doc.text_hash:
+            return ReaderText(
+                session, doc, source_field=row.source_field, length=row.text_length,
+                word_count=row.word_count, chapters=row.chapters,
+            )
+
+    from library.document_analysis_service import _extract_text
+    from library.text_functions import detect_chapters
+
+    # min_length=0: a short-but-real note (one-line Obsidian stub) still gets
+    # the reader's whole-document chapter instead of reading as "no text".
+    text, field = _extract_text(doc, prefer_md=True, min_length=0)
+    result = ReaderText(
+        session, doc, source_field=field, length=len(text), word_count=len(text.split()),
+        chapters=detect_chapters(text) if text else [], text=text,
+    )
+    if indexable:
+        store_chapter_index(doc.id, doc.text_hash, result, session_factory)
+    return result
+
+
+def store_chapter_index(document_id: int, text_hash: str, result: ReaderText, session_factory=get_session) -> None:
+    """Upsert one document's index row, best-effort in its own session.
+
+    A reader GET must not commit the request's scoped session, and a failed
+    write only means the next request recomputes.
+    """
+    session = None
+    try:
+        session = session_factory()
+        values = {
+            "text_hash": text_hash,
+            "source_field": result.source_field,
+            "text_length": result.length,
+            "word_count": result.word_count,
+            "chapters": result.chapters,
+            "computed_at": func.now(),
+        }
+        stmt = insert(DocumentChapterIndex).values(document_id=document_id, **values)
+        session.execute(stmt.on_conflict_do_update(index_elements=[DocumentChapterIndex.document_id], set_=values))
+        session.commit()
+    except (SystemExit, Exception):
+        logger.exception("Could not store chapter index for document %s", document_id)
+        if session is not None:
+            session.rollback()
+    finally:
+        if session is not None:
+            session.close()
@@ -9,7 +9,7 @@ Endpoints:
   GET  /analysis_runs?doc_id=<id>            — list runs for a document
   GET  /document/<doc_id>/chapters           — table of contents (H1/H2 headers, or TEMAT chunk topics as fallback)
   GET  /document/<doc_id>/chapter/<position> — one chapter's text (reader view)
-  POST /document/<doc_id>/analyze_chunks     — create a new analysis run
+  POST /document/<doc_id>/analyze_chunks     — queue a new analysis run (document_analysis job)
   GET  /analysis_run/<run_id>/chunks         — run data (chunks + segments;
                                                lite/section_id/positions/offset/limit for books)
   POST /analysis_run/<run_id>/extract_speakers
@@ -28,14 +28,16 @@ import json
 import logging
 import re
 import threading
+import time
 import uuid
 from collections import Counter
 from datetime import date, datetime
 
 from flask import Blueprint, jsonify, request, abort
-from sqlalchemy import func, or_, select, text as sa_text, update as sa_update
+from sqlalchemy import func, or_, select, update as sa_update
 
 from library.db.engine import get_scoped_session
+from library.document_analysis_jobs import chunk_results_after, enqueue_document_analysis
 from library.db.models import (
     CitedPublication, DocumentAnalysisJob, DocumentAnalysisRun, DocumentChunk, DocumentCitedPublication,
     DocumentRemovedLine, DocumentTopicSection,
@@ -46,10 +48,6 @@ logger = logging.getLogger(__name__)
 
 bp = Blueprint("chunk_review", __name__)
 
-_analysis_worker_lock = threading.Lock()
-_analysis_worker_started = False
-_analysis_worker_wakeup = threading.Event()
-
 # In-memory job registry for async embedding-generation runs (separate from
 # _analysis_jobs — different job shape, polled via /embedding_job/<job_id>).
 _embedding_jobs: dict[str, dict] = {}
@@ -57,6 +55,10 @@ _embedding_jobs: dict[str, dict] = {}
 ALLOWED_STATUSES = {"pending", "approved", "needs_reanalysis", "split_requested", "split", "skipped"}
 ALLOWED_TYPES = {"TEMAT", "ZRODLA", "REKLAMA", "SZUM"}
 ALLOWED_RUN_STATUSES = {"created", "in_review", "reviewed", "superseded"}
+# GET /analysis_job/<id>/chunks long-poll: longest hold of one request, and
+# how often the held request re-checks the checkpoint table.
+CHUNK_STREAM_MAX_WAIT_S = 25.0
+CHUNK_STREAM_POLL_S = 1.0
 
 
 def _analysis_job_dict(job: DocumentAnalysisJob) -> dict:
@@ -73,184 +75,6 @@ def _analysis_job_dict(job: DocumentAnalysisJob) -> dict:
     }
 
 
-def _update_analysis_job(job_id: str, **values) -> None:
-    """Commit a small progress/status update from the worker."""
-    from library.db.engine import get_session
-
-    session = get_session()
-    try:
-        job = session.get(DocumentAnalysisJob, job_id)
-        if job is not None:
-            for key, value in values.items():
-                setattr(job, key, value)
-            session.commit()
-    except Exception:
-        session.rollback()
-        logger.exception("failed to update persistent analysis job %s", job_id)
-    finally:
-        session.close()
-
-
-def _analysis_worker() -> None:
-    """Process persistent analysis jobs sequentially."""
-    from library.db.engine import get_session
-    from library.document_analysis_service import DocumentAnalysisService
-
-    # Flask's debug reloader (and a future multi-worker WSGI deployment) may
-    # import this module in more than one process. A session-level PostgreSQL
-    # advisory lock elects exactly one queue coordinator across all of them.
-    coordinator = get_session()
-    try:
-        is_owner = coordinator.scalar(sa_text("SELECT pg_try_advisory_lock(92440017)"))
-    except Exception:
-        coordinator.close()
-        logger.exception("analysis queue coordinator election failed")
-        return
-    if not is_owner:
-        coordinator.close()
-        logger.info("analysis queue worker inactive; another process owns the coordinator lock")
-        return
-    logger.info("analysis queue coordinator lock acquired")
-
-    # A process restart interrupts Python work. Put such rows back in the queue;
-    # create_run owns its transaction and supersedes any partial predecessor.
-    recovery = get_session()
-    try:
-        recovery.query(DocumentAnalysisJob).filter(
-            DocumentAnalysisJob.status == "running"
-        ).update({
-            DocumentAnalysisJob.status: "queued",
-            DocumentAnalysisJob.progress: "Wznowiono po restarcie backendu",
-            DocumentAnalysisJob.started_at: None,
-        })
-        recovery.commit()
-    except Exception:
-        recovery.rollback()
-        logger.exception("analysis queue recovery failed")
-    finally:
-        recovery.close()
-
-    while True:
-        claim = get_session()
-        job_id = None
-        params: dict = {}
-        doc_id = None
-        try:
-            job = claim.scalars(
-                select(DocumentAnalysisJob)
-                .where(DocumentAnalysisJob.status == "queued")
-                .order_by(DocumentAnalysisJob.created_at)
-                .with_for_update(skip_locked=True)
-                .limit(1)
-            ).first()
-            if job is not None:
-                job.status = "running"
-                job.started_at = datetime.utcnow()
-                job.progress = "Startowanie..."
-                job.error = None
-                job_id, doc_id, params = job.id, job.document_id, dict(job.parameters or {})
-                claim.commit()
-        except Exception:
-            claim.rollback()
-            logger.exception("analysis queue claim failed")
-        finally:
-            claim.close()
-
-        if job_id is None:
-            _analysis_worker_wakeup.wait(5)
-            _analysis_worker_wakeup.clear()
-            continue
-
-        work = get_session()
-        try:
-            from library.llm_usage.context import llm_usage_context
-            service = DocumentAnalysisService(work)
-            with llm_usage_context(document_id=doc_id, analysis_job_id=job_id):
-                document_enriched = False
-                reuse_existing_entities = bool(params.get("reuse_existing_entities"))
-                if params.get("enrich_document"):
-                    from library.document_enrichment import refresh_document_enrichment
-
-                    document = work.get(Document, doc_id)
-                    refresh_document_enrichment(
-                        work, document, params["model"],
-                        progress_fn=lambda msg: _update_analysis_job(job_id, progress=msg),
-                        reuse_existing_entities=reuse_existing_entities,
-                    )
-                    document_enriched = True
-                run = service.create_run(
-                    doc_id=doc_id,
-                    model=params["model"], chunk_size=params["chunk_size"],
-                    no_synthesis=params["no_synthesis"],
-                    progress_fn=lambda msg: _update_analysis_job(job_id, progress=msg),
-                    mode=params["mode"], split_only=params["split_only"],
-                    reclean=params["reclean"],
-                    scope_chapter=params.get("scope_chapter"),
-                    document_enriched=document_enriched,
-                    reuse_existing_entities=reuse_existing_entities,
-                )
-            auto_finalized = False
-            if params.get("auto_finalize_single"):
-                chunks = work.scalars(
-                    select(DocumentChunk)
-                    .where(DocumentChunk.run_id == run.id)
-                    .order_by(DocumentChunk.position)
-                ).all()
-                document = work.get(Document, doc_id)
-                if (
-                    document is not None
-                    and document.processing_status == "MD_SIMPLIFIED"
-                    and run.mode == "article"
-                    and run.scope is None
-                    and len(chunks) == 1
-                    and chunks[0].type == "TEMAT"
-                ):
-                    chunks[0].status = "approved"
-                    run.status = "reviewed"
-                    work.commit()
-                    from library.document_analysis_service import generate_embeddings_from_run
-
-                    generate_embeddings_from_run(
-                        work, run.id,
-                        progress_fn=lambda msg: _update_analysis_job(
-                            job_id, progress=f"Automatyczny embedding: {msg}",
-                        ),
-                    )
-                    auto_finalized = True
-            ad_count = sum(1 for chunk in run.chunks if chunk.type == "REKLAMA")
-            _update_analysis_job(
-                job_id, status="done", run_id=run.id,
-                chunk_count=len(run.chunks), ad_count=ad_count,
-                topic_section_count=len(run.topic_sections),
-                progress=(
-                    "Gotowe automatycznie: 1 zatwierdzony chunk i embedding"
-                    if auto_finalized
-                    else f"Gotowe: {len(run.chunks)} chunków, {len(run.topic_sections)} sekcji"
-                ),
-                finished_at=datetime.utcnow(),
-            )
-        except Exception as exc:
-            logger.exception("background analysis failed for doc %s", doc_id)
-            _update_analysis_job(
-                job_id, status="failed", error=str(exc),
-                progress="Analiza nie powiodła się", finished_at=datetime.utcnow(),
-            )
-        finally:
-            work.close()
-
-
-def start_analysis_worker() -> None:
-    """Start the process-local queue worker once (safe to call repeatedly)."""
-    global _analysis_worker_started
-    with _analysis_worker_lock:
-        if _analysis_worker_started:
-            return
-        _analysis_worker_started = True
-        threading.Thread(
-            target=_analysis_worker, daemon=True, name="document-analysis-worker",
-        ).start()
-
-
 def _start_embedding_job(run_id: int) -> str:
     """Start background indexing for a reviewed run and return its job id."""
     job_id = uuid.uuid4().hex[:8]
@@ -505,7 +329,9 @@ def analyze_document_chunks(doc_id: int):
         scope_chapter — 1-based chapter position (see GET /document/<id>/chapters);
                        analyze only that chapter (article mode only)
 
-    Returns immediately with {job_id}. Poll GET /analysis_job/<job_id> for status.
+    Returns immediately with {job_id}; the analysis itself runs in a worker.py
+    process handling document_analysis jobs. Poll GET /analysis_job/<job_id>
+    for status.
     """
     from library.document_analysis_service import ANALYSIS_MODES
 
@@ -576,9 +402,7 @@ def analyze_document_chunks(doc_id: int):
         },
         progress="Oczekuje w kolejce",
     ))
-    session.commit()
-    start_analysis_worker()
-    _analysis_worker_wakeup.set()
+    enqueue_document_analysis(session, job_id)
     return jsonify({"status": "queued", "job_id": job_id, "doc_id": doc_id})
 
 
@@ -758,9 +582,9 @@ def _site_rules_file_status() -> dict:
     article_cleaner.py/article_extractor.py, which reclean_preview's
     ``portal`` field already covers.
 
-    site_rules.json is read fresh on every webpage_text_clean() call (no
-    cache), so a missing/empty file at download time silently produces no
-    cleanup — the rules exist in the repo/image but a runtime volume mount
+    webpage_text_clean() takes the rules from this file (cached per process
+    and reloaded when it changes), so a missing/empty file at download time
+    silently produces no cleanup — the rules exist in the repo/image but a runtime volume mount
     can shadow data/ and hide them (this happened on the NAS deployment:
     the named volume on /app/data pre-dated the file and was never
     refreshed with it). Surfacing this here turns a silent "cleaning did
@@ -769,12 +593,12 @@ def _site_rules_file_status() -> dict:
     import os
 
     from library.config_loader import load_config
-    from library.website.website_download_context import load_site_rules
+    from library.website.site_rules import get_site_rules
 
     path = load_config().get("SITE_RULES_PATH", "data/site_rules.json")
     if not os.path.isfile(path):
         return {"ok": False, "path": path, "reason": "missing"}
-    if not load_site_rules(path):
+    if not get_site_rules(path):
         return {"ok": False, "path": path, "reason": "empty_or_invalid"}
     return {"ok": True, "path": path, "reason": None}
 
@@ -1116,8 +940,8 @@ def _chunk_based_chapters(run: DocumentAnalysisRun) -> list[dict]:
 _WHOLE_DOCUMENT_CHAPTER_TYPES = {"obsidian_note"}
 
 
-def _whole_document_chapter(text: str) -> list[dict]:
-    """Single reader chapter spanning the whole text.
+def _whole_document_chapter(text_length: int) -> list[dict]:
+    """Single reader chapter spanning the whole text (``text_length`` chars).
 
     Fallback for _WHOLE_DOCUMENT_CHAPTER_TYPES documents with real text but
     neither markdown H1/H2 headers nor a chunk-analysis run. Without this,
@@ -1125,7 +949,7 @@ def _whole_document_chapter(text: str) -> list[dict]:
     "Document has no detectable chapters", even though the document plainly
     has text (e.g. a short Obsidian note with no headers — see /read/9766).
     """
-    return [{"position": 1, "level": 1, "title": "(całość)", "char_start": 0, "char_end": len(text), "length": len(text)}]
+    return [{"position": 1, "level": 1, "title": "(całość)", "char_start": 0, "char_end": text_length, "length": text_length}]
 
 
 # Short articles read more naturally as one continuous page. Keep their
@@ -1135,12 +959,12 @@ READER_COMPACT_MAX_WORDS = 1_000
 READER_COMPACT_MAX_CHARS = 10_000
 
 
-def _compact_reader_chapters(text: str, chapters: list[dict]) -> tuple[list[dict], bool]:
+def _compact_reader_chapters(text_length: int, word_count: int, chapters: list[dict]) -> tuple[list[dict], bool]:
     """Return a single reader chapter for a short, multi-chapter article."""
     compact = (
         len(chapters) > 1
-        and len(text) <= READER_COMPACT_MAX_CHARS
-        and len(text.split()) <= READER_COMPACT_MAX_WORDS
+        and text_length <= READER_COMPACT_MAX_CHARS
+        and word_count <= READER_COMPACT_MAX_WORDS
     )
     if not compact:
         return chapters, False
@@ -1149,8 +973,8 @@ def _compact_reader_chapters(text: str, chapters: list[dict]) -> tuple[list[dict
         "level": chapters[0]["level"],
         "title": "(całość)",
         "char_start": 0,
-        "char_end": len(text),
-        "length": len(text),
+        "char_end": text_length,
+        "length": text_length,
     }], True
 
 
@@ -1164,24 +988,24 @@ def document_chapters(doc_id: int):
     movie) have. Chapter positions can be passed as scope_chapter to
     POST /analyze_chunks or GET /split_preview to analyze a single chapter
     (markdown chapters only — chunk-based chapters aren't a valid scope there).
+
+    Served from the persisted chapter index (library/chapter_index.py) —
+    the document's text itself is never loaded here.
     """
-    from library.document_analysis_service import _extract_text
-    from library.text_functions import detect_chapters
+    from library.chapter_index import reader_load_options, reader_text
 
     session = get_scoped_session()
-    doc = session.get(Document, doc_id)
+    doc = session.get(Document, doc_id, options=reader_load_options())
     if doc is None:
         abort(404, f"Document {doc_id} not found")
 
-    # min_length=0: the reader's own _whole_document_chapter fallback below
-    # is built for short-but-real text (e.g. a one-line Obsidian stub) —
-    # the default >100-char floor would otherwise report it as "no text".
-    text, field = _extract_text(doc, prefer_md=True, min_length=0)
-    chapters = detect_chapters(text) if text else []
+    reader = reader_text(session, doc)
+    field = reader.source_field
+    chapters = reader.chapters
     source = "markdown" if chapters else "none"
     reader_compact = False
     if request.args.get("reader") == "1" and chapters:
-        chapters, reader_compact = _compact_reader_chapters(text, chapters)
+        chapters, reader_compact = _compact_reader_chapters(reader.length, reader.word_count, chapters)
 
     run = _latest_run_for_document(session, doc_id)
     if not chapters and run:
@@ -1189,11 +1013,11 @@ def document_chapters(doc_id: int):
         if chapters:
             source = "chunks"
 
-    if not chapters and text and doc.document_type in _WHOLE_DOCUMENT_CHAPTER_TYPES:
-        chapters = _whole_document_chapter(text)
+    if not chapters and reader.length and doc.document_type in _WHOLE_DOCUMENT_CHAPTER_TYPES:
+        chapters = _whole_document_chapter(reader.length)
         source = "whole_document"
 
-    if not text and source == "none":
+    if not reader.length and source == "none":
         return jsonify({"status": "error", "message": "Document has no usable text"}), 400
 
     from library.country_gazetteer import slug_to_name
@@ -1223,7 +1047,7 @@ def document_chapters(doc_id: int):
         "title": doc.title,
         "url": doc.url,
         "source_field": field,
-        "text_length": len(text),
+        "text_length": reader.length,
         "chapters": chapters,
         "chapter_source": source,
         "reader_compact": reader_compact,
@@ -1309,27 +1133,29 @@ def _resolve_chapter_text(
     headers). Markdown-chapter documents with their own chapter-scoped
     analysis run get their chapter-level notes aggregated separately by the
     caller (document_chapter()), from that run's chunks.
+
+    Chapter boundaries come from the persisted chapter index and the
+    chapter's text is sliced in SQL (library/chapter_index.py), so ``doc``
+    should be loaded with reader_load_options().
     """
-    from library.document_analysis_service import _extract_text
-    from library.text_functions import detect_chapters
+    from library.chapter_index import reader_text
 
-    # min_length=0: see the matching comment in document_chapters() above.
-    text, _field = _extract_text(doc, prefer_md=True, min_length=0)
-    md_chapters = detect_chapters(text) if text else []
+    reader = reader_text(session, doc)
+    md_chapters = reader.chapters
 
     if md_chapters:
         if compact_reader:
-            md_chapters, _reader_compact = _compact_reader_chapters(text, md_chapters)
+            md_chapters, _reader_compact = _compact_reader_chapters(reader.length, reader.word_count, md_chapters)
         chapter_total = len(md_chapters)
         match = next((c for c in md_chapters if c["position"] == position), None)
         if match is None:
             return None, f"position {position} out of range (1..{chapter_total})"
-        return (text[match["char_start"]:match["char_end"]].strip(), match["title"], chapter_total), None
+        return (reader.slice(match["char_start"], match["char_end"]).strip(), match["title"], chapter_total), None
 
     run = _latest_run_for_document(session, doc.id)
     chunk_chapters = _chunk_based_chapters(run) if run else []
-    if not chunk_chapters and text and doc.document_type in _WHOLE_DOCUMENT_CHAPTER_TYPES:
-        chunk_chapters = _whole_document_chapter(text)
+    if not chunk_chapters and reader.length and doc.document_type in _WHOLE_DOCUMENT_CHAPTER_TYPES:
+        chunk_chapters = _whole_document_chapter(reader.length)
     if not chunk_chapters:
         return None, "Document has no detectable chapters (no H1/H2 headers, no chunk analysis run)"
 
@@ -1338,7 +1164,7 @@ def _resolve_chapter_text(
         match = chunk_chapters[0]
         if match["position"] != position:
             return None, f"position {position} out of range (1..1)"
-        return (text[match["char_start"]:match["char_end"]].strip(), match["title"], 1), None
+        return (reader.slice(match["char_start"], match["char_end"]).strip(), match["title"], 1), None
 
     chapter_total = len(chunk_chapters)
     match = next((c for c in chunk_chapters if c["position"] == position), None)
@@ -1359,8 +1185,10 @@ def document_chapter(doc_id: int, position: int):
     markdown-header chapters or, as a fallback, TEMAT-chunk chapters (see
     _chunk_based_chapters).
     """
+    from library.chapter_index import reader_load_options
+
     session = get_scoped_session()
-    doc = session.get(Document, doc_id)
+    doc = session.get(Document, doc_id, options=reader_load_options())
     if doc is None:
         abort(404, f"Document {doc_id} not found")
 
@@ -1630,11 +1458,12 @@ def document_chapter_entities(doc_id: int, position: int):
     map/persons/places reflect the chapter being read instead of the whole
     material.
     """
+    from library.chapter_index import reader_load_options
     from library.country_gazetteer import detect_countries
     from library.entity_service import filter_entities_to_text, get_document_entities
 
     session = get_scoped_session()
-    doc = session.get(Document, doc_id)
+    doc = session.get(Document, doc_id, options=reader_load_options())
     if doc is None:
         abort(404, f"Document {doc_id} not found")
 
@@ -1969,23 +1798,22 @@ def document_anchor(doc_id: int, anchor_id: str):
     shows for short multi-chapter articles (irrelevant for books, included
     for consistency with GET /document/<id>/chapters).
     """
-    from library.document_analysis_service import _extract_text
-    from library.text_functions import detect_chapters
+    from library.chapter_index import reader_load_options, reader_text
 
     session = get_scoped_session()
-    doc = session.get(Document, doc_id)
+    doc = session.get(Document, doc_id, options=reader_load_options())
     if doc is None:
         abort(404, f"Document {doc_id} not found")
 
-    text, _field = _extract_text(doc, prefer_md=True)
+    reader = reader_text(session, doc)
     marker = f"[#{anchor_id}]"
-    marker_pos = text.find(marker) if text else -1
+    marker_pos = reader.find(marker) if reader.length else -1
     if marker_pos == -1:
         return jsonify({"status": "error", "message": f"Anchor {anchor_id!r} not found"}), 404
 
-    chapters = detect_chapters(text)
+    chapters = reader.chapters
     if request.args.get("reader") == "1" and chapters:
-        chapters, _reader_compact = _compact_reader_chapters(text, chapters)
+        chapters, _reader_compact = _compact_reader_chapters(reader.length, reader.word_count, chapters)
     match = next((c for c in chapters if c["char_start"] <= marker_pos < c["char_end"]), None)
     if match is None:
         return jsonify({"status": "error", "message": "Anchor found but not inside any chapter"}), 404
@@ -2010,23 +1838,26 @@ def document_entity_occurrences(doc_id: int):
     no such entity, the raw text is matched directly. Chapter positions match
     GET /document/<id>/chapters: markdown H1/H2 chapters when the text has
     them, otherwise the TEMAT-chunk fallback (YouTube/movie transcripts).
+    Markdown-chaptered documents whose entity occurrences were indexed for
+    the current text (entity_service.refresh_entity_occurrences) are answered
+    from document_entity_occurrences without loading the text at all.
     """
     import re
 
-    from library.document_analysis_service import _extract_text
-    from library.text_functions import detect_chapters
+    from library.chapter_index import reader_load_options, reader_text
+    from library.entity_service import chapter_occurrence_counts, occurrences_indexed
 
     entity_text = (request.args.get("text") or "").strip()
     if not entity_text:
         return jsonify({"status": "error", "message": "text parameter required"}), 400
 
     session = get_scoped_session()
-    doc = session.get(Document, doc_id)
+    doc = session.get(Document, doc_id, options=reader_load_options())
     if doc is None:
         abort(404, f"Document {doc_id} not found")
 
-    doc_text, _field = _extract_text(doc, prefer_md=True)
-    if not doc_text:
+    reader = reader_text(session, doc)
+    if reader.length <= 100:
         return jsonify({"status": "error", "message": "Document has no usable text"}), 400
 
     from library.db.models import DocumentEntity
@@ -2036,12 +1867,27 @@ def document_entity_occurrences(doc_id: int):
         .filter(DocumentEntity.document_id == doc_id, DocumentEntity.entity_text == entity_text)
         .all()
     )
+    md_chapters = reader.chapters
+    if md_chapters and occurrences_indexed(doc, rows):
+        counts = chapter_occurrence_counts(session, [row.id for row in rows]).get(doc_id, {})
+        titles = {ch["position"]: ch["title"] for ch in md_chapters}
+        return jsonify({
+            "status": "success",
+            "doc_id": doc_id,
+            "text": entity_text,
+            "total": sum(counts.values()),
+            "occurrences": [
+                {"position": position, "title": titles.get(position, ""), "count": count}
+                for position, count in sorted(item for item in counts.items() if item[0] is not None)
+            ],
+        })
+
+    doc_text = reader.full_text()
     needles = {v for row in rows for v in (row.variants or [])} or {entity_text}
     pattern = re.compile(
         r"(?<!\w)(?:" + "|".join(re.escape(n) for n in sorted(needles)) + ")", re.IGNORECASE,
     )
 
-    md_chapters = detect_chapters(doc_text)
     if md_chapters:
         occurrences = [
             {"position": ch["position"], "title": ch["title"], "count": count}
@@ -2075,10 +1921,47 @@ def get_analysis_job(job_id: str):
     job = session.get(DocumentAnalysisJob, job_id)
     if job is None:
         return jsonify({"status": "error", "message": "Job not found"}), 404
-    start_analysis_worker()
     return jsonify({"status": "success", "job": _analysis_job_dict(job)})
 
 
+@bp.route("/analysis_job/<job_id>/chunks", methods=["GET"])
+def stream_analysis_job_chunks(job_id: str):
+    """Long-poll the chunks of a running analysis as each one is analyzed.
+
+    ?after= is the cursor from the previous response (0 at first), ?wait=
+    how long to hold the request when nothing new has arrived (at most
+    CHUNK_STREAM_MAX_WAIT_S). Answers at once when there are newer chunks or
+    the job has finished, so one open request replaces the 5-second polling
+    of /analysis_job/<id> and chunks show up as they are committed.
+    """
+    try:
+        after = max(int(request.args.get("after", 0)), 0)
+        wait = min(max(float(request.args.get("wait", CHUNK_STREAM_MAX_WAIT_S)), 0.0), CHUNK_STREAM_MAX_WAIT_S)
+    except ValueError:
+        return jsonify({"status": "error", "message": "after and wait must be numbers"}), 400
+    session = get_scoped_session()
+    deadline = time.monotonic() + wait
+    while True:
+        job = session.get(DocumentAnalysisJob, job_id, populate_existing=True)
+        if job is None:
+            return jsonify({"status": "error", "message": "Job not found"}), 404
+        chunks = chunk_results_after(session, job_id, after)
+        finished = job.status in ("done", "failed")
+        if chunks or finished or time.monotonic() >= deadline:
+            break
+        # Give the connection back while waiting; the next check starts a
+        # fresh transaction and sees whatever the worker committed meanwhile.
+        session.rollback()
+        time.sleep(CHUNK_STREAM_POLL_S)
+    return jsonify({
+        "status": "success",
+        "job": _analysis_job_dict(job),
+        "chunks": chunks,
+        "cursor": chunks[-1]["seq"] if chunks else after,
+        "finished": finished,
+    })
+
+
 @bp.route("/document/<int:doc_id>/analysis_job", methods=["GET"])
 def get_document_analysis_job(doc_id: int):
     """Latest active job for a document, used to resume UI monitoring."""
@@ -2091,9 +1974,6 @@ def get_document_analysis_job(doc_id: int):
             DocumentAnalysisJob.status.in_(("queued", "running")),
         ).order_by(DocumentAnalysisJob.created_at.desc()).limit(1)
     ).first()
-    start_analysis_worker()
-    if job is not None:
-        _analysis_worker_wakeup.set()
     return jsonify({
         "status": "success", "doc_id": doc_id,
         "job": _analysis_job_dict(job) if job else None,
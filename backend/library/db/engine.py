@@ -5,13 +5,53 @@ Provides:
 - ``get_engine()`` — singleton Engine built from config_loader (Vault/env/AWS SSM)
 - ``get_session()`` — plain Session for scripts (caller manages lifecycle)
 - ``get_scoped_session()`` — thread-local scoped_session for Flask requests
-- ``dispose_engine()`` — tear down engine and reset all singletons
+- ``get_read_session()`` — scoped_session for read-only routes, on the
+  replica when ``POSTGRESQL_READ_HOST`` is configured
+- ``set_process_role()`` — pick the pool and timeout defaults for this process
+- ``dispose_engine()`` — tear down engines and reset all singletons
+
+Pool and session settings come from config, per process role. The API
+server (``web``) serves many short requests from a few gunicorn/Flask
+threads; the worker runs a handful of long jobs; scripts keep SQLAlchemy's
+defaults. Each setting can be overridden for one role
+(``POSTGRESQL_WEB_POOL_SIZE``) or for all of them (``POSTGRESQL_POOL_SIZE``):
+
+==========================  =====  ======  ======
+setting                     web    worker  script
+==========================  =====  ======  ======
+POOL_SIZE                   10     4       5
+MAX_OVERFLOW                10     16      10
+POOL_TIMEOUT (s)            10     30      30
+POOL_RECYCLE (s)            1800   1800    -1
+STATEMENT_TIMEOUT_MS        30000  600000  0 (off)
+==========================  =====  ======  ======
+
+The statement timeout and ``application_name=lenie-<role>`` are sent as
+libpq connection options, so they hold for every statement on the
+connection and show up in ``pg_stat_activity``.
+
+Worker sizing: the four pooled connections cover the job's own session,
+the heartbeat, the LLM limiter's keeper thread and /metrics. A document
+analysis job adds up to ``CHUNK_ANALYSIS_MAX_WORKERS`` (16) chunk threads,
+and each of them briefly holds one session at a time: a slot acquire in
+library/llm_concurrency.py, a usage-id reservation, a checkpoint save.
+MAX_OVERFLOW matches that thread count, so those short checkouts do not
+queue behind each other for POOL_TIMEOUT. Overflow connections close when
+they are returned, so an idle worker keeps four. Raise both if
+CHUNK_ANALYSIS_MAX_WORKERS grows (tests/unit/test_db_engine.py checks it).
+
+``POSTGRESQL_DRIVER=psycopg`` switches to psycopg 3 (``pip install
+.[psycopg]``), which prepares statements server-side after
+``POSTGRESQL_PREPARE_THRESHOLD`` executions (default 5; ``off`` disables
+it, e.g. behind PgBouncer in transaction mode).
 """
 
 import threading
+import time
 
 from sqlalchemy import create_engine, Engine
 from sqlalchemy.engine import URL
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import (
     DeclarativeBase,
     Session,
@@ -20,6 +60,68 @@ from sqlalchemy.orm import (
 )
 
 from library.config_loader import load_config
+from library.metrics import instrument_engine, observe_pool_wait
+
+# ---------------------------------------------------------------------------
+# Process roles and pool settings
+# ---------------------------------------------------------------------------
+
+ROLE_DEFAULTS: dict[str, dict[str, int]] = {
+    "web": {"POOL_SIZE": 10, "MAX_OVERFLOW": 10, "POOL_TIMEOUT": 10, "POOL_RECYCLE": 1800,
+            "STATEMENT_TIMEOUT_MS": 30_000},
+    "worker": {"POOL_SIZE": 4, "MAX_OVERFLOW": 16, "POOL_TIMEOUT": 30, "POOL_RECYCLE": 1800,
+               "STATEMENT_TIMEOUT_MS": 600_000},
+    "script": {"POOL_SIZE": 5, "MAX_OVERFLOW": 10, "POOL_TIMEOUT": 30, "POOL_RECYCLE": -1,
+               "STATEMENT_TIMEOUT_MS": 0},
+}
+DRIVERS = {"psycopg2": "postgresql+psycopg2", "psycopg": "postgresql+psycopg"}
+DEFAULT_PREPARE_THRESHOLD = 5
+
+_role = "script"
+
+
+def set_process_role(role: str) -> None:
+    """Select the pool and statement-timeout defaults for this process.
+
+    Call before the first ``get_engine()`` — server.py and worker.py do it
+    first thing in ``__main__``/``main()``.
+    """
+    global _role
+    if role not in ROLE_DEFAULTS:
+        raise ValueError(f"Unknown process role {role!r}; expected one of {sorted(ROLE_DEFAULTS)}")
+    _role = role
+
+
+def _int_setting(cfg, name: str) -> int:
+    for key in (f"POSTGRESQL_{_role.upper()}_{name}", f"POSTGRESQL_{name}"):
+        raw = cfg.get(key)
+        if raw is not None and raw != "":
+            try:
+                return int(raw)
+            except (ValueError, TypeError):
+                raise ValueError(f"{key} must be numeric, got: {raw!r}")
+    return ROLE_DEFAULTS[_role][name]
+
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection.
+
+    The pool label is a class attribute so it survives ``Pool.recreate()``.
+    """
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            observe_pool_wait(self.metrics_name, time.perf_counter() - started)
+
+
+class _ReplicaQueuePool(_TimedQueuePool):
+    metrics_name = "replica"
+
 
 # ---------------------------------------------------------------------------
 # Declarative Base
@@ -38,6 +140,69 @@ _lock = threading.Lock()
 _engine: Engine | None = None
 _session_factory: sessionmaker | None = None
 _scoped_session_factory: scoped_session | None = None
+_read_engine: Engine | None = None
+_read_engine_checked = False
+_scoped_read_session_factory: scoped_session | None = None
+
+
+def _port(cfg, key: str) -> int | None:
+    port_raw = cfg.get(key)
+    if port_raw is None:
+        return None
+    try:
+        return int(port_raw)
+    except (ValueError, TypeError):
+        raise ValueError(f"{key} must be numeric, got: {port_raw!r}")
+
+
+def _prepare_threshold(cfg) -> int | None:
+    raw = cfg.get("POSTGRESQL_PREPARE_THRESHOLD")
+    if raw is None or raw == "":
+        return DEFAULT_PREPARE_THRESHOLD
+    if str(raw).lower() == "off":
+        return None
+    try:
+        return int(raw)
+    except (ValueError, TypeError):
+        raise ValueError(f"POSTGRESQL_PREPARE_THRESHOLD must be numeric or 'off', got: {raw!r}")
+
+
+def _create_engine(cfg, host: str, port: int | None, poolclass: type[_TimedQueuePool]) -> Engine:
+    driver = cfg.get("POSTGRESQL_DRIVER") or "psycopg2"
+    if driver not in DRIVERS:
+        raise ValueError(f"POSTGRESQL_DRIVER must be one of {sorted(DRIVERS)}, got: {driver!r}")
+
+    url = URL.create(
+        drivername=DRIVERS[driver],
+        username=cfg.require("POSTGRESQL_USER"),
+        password=cfg.require("POSTGRESQL_PASSWORD"),
+        host=host,
+        port=port,
+        database=cfg.require("POSTGRESQL_DATABASE"),
+    )
+
+    connect_args: dict[str, object] = {"application_name": f"lenie-{_role}"}
+    sslmode = cfg.get("POSTGRESQL_SSLMODE")
+    if sslmode:
+        connect_args["sslmode"] = sslmode
+    statement_timeout = _int_setting(cfg, "STATEMENT_TIMEOUT_MS")
+    if statement_timeout > 0:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+    if driver == "psycopg":
+        connect_args["prepare_threshold"] = _prepare_threshold(cfg)
+
+    engine = create_engine(
+        url,
+        poolclass=poolclass,
+        pool_pre_ping=True,
+        pool_size=_int_setting(cfg, "POOL_SIZE"),
+        max_overflow=_int_setting(cfg, "MAX_OVERFLOW"),
+        pool_timeout=_int_setting(cfg, "POOL_TIMEOUT"),
+        pool_recycle=_int_setting(cfg, "POOL_RECYCLE"),
+        connect_args=connect_args,
+    )
+    instrument_engine(engine, poolclass.metrics_name)
+    return engine
 
 
 # ---------------------------------------------------------------------------
@@ -52,7 +217,8 @@ def get_engine() -> Engine:
     AWS SSM backends). Required keys: ``POSTGRESQL_HOST``,
     ``POSTGRESQL_DATABASE``, ``POSTGRESQL_USER``, ``POSTGRESQL_PASSWORD``.
 
-    Optional: ``POSTGRESQL_PORT`` (default 5432), ``POSTGRESQL_SSLMODE``.
+    Optional: ``POSTGRESQL_PORT`` (default 5432), ``POSTGRESQL_SSLMODE``,
+    ``POSTGRESQL_DRIVER`` and the pool settings in the module docstring.
 
     Exits the process if required config keys are missing
     (via ``Config.require()`` convention — logs error and calls ``sys.exit(1)``).
@@ -66,36 +232,9 @@ def get_engine() -> Engine:
             return _engine
 
         cfg = load_config()
-
-        host = cfg.require("POSTGRESQL_HOST")
-        database = cfg.require("POSTGRESQL_DATABASE")
-        user = cfg.require("POSTGRESQL_USER")
-        password = cfg.require("POSTGRESQL_PASSWORD")
-
-        port_raw = cfg.get("POSTGRESQL_PORT")
-        if port_raw is not None:
-            try:
-                port = int(port_raw)
-            except (ValueError, TypeError):
-                raise ValueError(f"POSTGRESQL_PORT must be numeric, got: {port_raw!r}")
-        else:
-            port = None
-
-        url = URL.create(
-            drivername="postgresql+psycopg2",
-            username=user,
-            password=password,
-            host=host,
-            port=port,
-            database=database,
+        _engine = _create_engine(
+            cfg, cfg.require("POSTGRESQL_HOST"), _port(cfg, "POSTGRESQL_PORT"), _TimedQueuePool,
         )
-
-        connect_args: dict[str, str] = {}
-        sslmode = cfg.get("POSTGRESQL_SSLMODE")
-        if sslmode:
-            connect_args["sslmode"] = sslmode
-
-        _engine = create_engine(url, pool_pre_ping=True, connect_args=connect_args)
         return _engine
 
 
@@ -123,17 +262,74 @@ def get_scoped_session() -> scoped_session:
     return _scoped_session_factory
 
 
+def get_read_engine() -> Engine | None:
+    """Return the replica engine, or None when no replica is configured.
+
+    ``POSTGRESQL_READ_HOST`` enables it; ``POSTGRESQL_READ_PORT`` defaults
+    to ``POSTGRESQL_PORT``. Database, credentials and pool settings are the
+    primary's.
+    """
+    global _read_engine, _read_engine_checked
+    if _read_engine_checked:
+        return _read_engine
+
+    with _lock:
+        if _read_engine_checked:
+            return _read_engine
+        cfg = load_config()
+        host = cfg.get("POSTGRESQL_READ_HOST")
+        if host:
+            port = _port(cfg, "POSTGRESQL_READ_PORT") or _port(cfg, "POSTGRESQL_PORT")
+            _read_engine = _create_engine(cfg, host, port, _ReplicaQueuePool)
+        _read_engine_checked = True
+        return _read_engine
+
+
+def get_read_session() -> scoped_session:
+    """Return the thread-local scoped_session for read-only request handlers.
+
+    Used by the list, search and stats routes. On a replica the results
+    may lag the primary by the replication delay, so handlers that read
+    back what they just wrote must keep using ``get_scoped_session()``.
+    Without a replica this is the same scoped_session as
+    ``get_scoped_session()``.
+    """
+    global _scoped_read_session_factory
+    read_engine = get_read_engine()
+    if read_engine is None:
+        return get_scoped_session()
+    if _scoped_read_session_factory is None:
+        _scoped_read_session_factory = scoped_session(sessionmaker(bind=read_engine))
+    return _scoped_read_session_factory
+
+
+def remove_read_session() -> None:
+    """Release this thread's replica session, if one was opened.
+
+    Called from the Flask teardown next to ``get_scoped_session().remove()``;
+    never creates an engine.
+    """
+    if _scoped_read_session_factory is not None:
+        _scoped_read_session_factory.remove()
+
+
 def dispose_engine() -> None:
-    """Dispose the engine and reset all singletons.
+    """Dispose the engines and reset all singletons.
 
-    Call on application shutdown or in tests to release the connection pool.
+    Call on application shutdown or in tests to release the connection pools.
     """
     global _engine, _session_factory, _scoped_session_factory
+    global _read_engine, _read_engine_checked, _scoped_read_session_factory
     with _lock:
-        if _scoped_session_factory is not None:
-            _scoped_session_factory.remove()
-        if _engine is not None:
-            _engine.dispose()
+        for factory in (_scoped_session_factory, _scoped_read_session_factory):
+            if factory is not None:
+                factory.remove()
+        for engine in (_engine, _read_engine):
+            if engine is not None:
+                engine.dispose()
         _engine = None
         _session_factory = None
         _scoped_session_factory = None
+        _read_engine = None
+        _read_engine_checked = False
+        _scoped_read_session_factory = None
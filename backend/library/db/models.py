@@ -18,6 +18,7 @@ from sqlalchemy import (
     CheckConstraint,
     Date,
     DateTime,
+    Float,
     ForeignKey,
     Integer,
     Index,
@@ -378,7 +379,7 @@ class Job(Base):
     initiated_by_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
     idempotency_key: Mapped[str | None] = mapped_column(String(255), unique=True)
     __table_args__ = (
-        CheckConstraint("type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect')", name="ck_jobs_type"),
+        CheckConstraint("type IN ('feed_check','feed_check_all','feed_auto_import','feed_daily','content_group_suggest','document_prepare','entity_enrichment','legacy_aws_pull','obsidian_reimport','tool_candidate_detect','storage_usage_reconcile','document_stats_refresh','document_analysis','llm_usage_rollup','reclean_corpus')", name="ck_jobs_type"),
     )
 
 
@@ -692,6 +693,10 @@ class Document(Base):
     # Raw LLM article extraction output (pre clean_article_text) — diagnostic only,
     # intentionally NOT exposed via dict()/API (used for article_cleaner regression checks).
     text_extracted: Mapped[str | None] = mapped_column(Text)
+    # md5 of the clean_article_text() output last written to text_md (document
+    # preparation, reclean_corpus). text_md no longer hashing to it means the
+    # text was edited since, and the reclean_corpus job must leave it alone.
+    text_md_cleaned_hash: Mapped[str | None] = mapped_column(String(32))
     transcript_needed: Mapped[bool | None] = mapped_column(Boolean, server_default=sa_text("false"))
 
     # Review & Obsidian tracking (Story 33.4, ADR-014)
@@ -721,6 +726,19 @@ class Document(Base):
     # analysis run, or on demand via POST /document/<id>/quality.
     quality: Mapped[dict | None] = mapped_column(JSONB)
 
+    # Materialized list filters for /website_list — "has any document_embeddings
+    # row" and "obsidian_note_paths non-empty, or a TEMAT chunk with a note".
+    # Maintained by database triggers (alembic b2d3e4f5a6c7), not by the ORM:
+    # embeddings and chunk note paths are written from too many places to keep
+    # in sync by hand. Read-only from Python.
+    has_embedding: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=sa_text("false"))
+    has_obsidian_notes: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default=sa_text("false"))
+    # md5 of the reader's source text (text_md, else text, else text_raw — the
+    # _extract_text(prefer_md=True) order), set by a trigger on every write of
+    # those columns. Keys document_chapter_index (library/chapter_index.py)
+    # without loading the text itself. Read-only from Python.
+    text_hash: Mapped[str | None] = mapped_column(String(32))
+
     # Lookup-table relationships (many-to-one)
     document_type_ref: Mapped["DocumentType"] = relationship(
         foreign_keys=[document_type],
@@ -1344,6 +1362,25 @@ class EmailFooterRule(Base):
     )
 
 
+class EmailImportCheckpoint(Base):
+    """How far the incremental email import has read one mailbox.
+
+    ``mailbox`` is the source's key (``gmail:me/<label id>``,
+    ``imap://user@host/folder``, ``mbox:<path>``); ``checkpoint`` is opaque to
+    the importer — a Gmail historyId, ``<UIDVALIDITY>:<UID>`` or a local
+    mailbox key (library/email_sources.py). Advanced in the same transaction
+    as the documents it covers.
+    """
+
+    __tablename__ = "email_import_checkpoints"
+
+    mailbox: Mapped[str] = mapped_column(String(500), primary_key=True)
+    checkpoint: Mapped[str] = mapped_column(Text, nullable=False)
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now(),
+    )
+
+
 class GeocodeCache(Base):
     """Cached geocoder response for one query string (NER stage 3).
 
@@ -1376,6 +1413,24 @@ class GeocodeCache(Base):
         return f"GeocodeCache(id={self.id!r}, query={self.query!r}, resolved={self.resolved!r})"
 
 
+class TrackingUrlResolution(Base):
+    """Resolved destination of one newsletter tracking link (library/tracking_urls.py).
+
+    Keyed by the SHA-256 of the link: tracking URLs carry long tokens and can
+    exceed the btree index row limit. Only successful resolutions are stored,
+    so a link that failed once is tried again by the next import.
+    """
+
+    __tablename__ = "tracking_url_resolutions"
+
+    url_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    url: Mapped[str] = mapped_column(Text, nullable=False)
+    destination: Mapped[str] = mapped_column(Text, nullable=False)
+    resolved_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(),
+    )
+
+
 class DocumentReference(Base):
     """Footnote/reference extracted out of a book's text_md (library/references.py).
 
@@ -1703,10 +1758,12 @@ class DocumentControlAnswer(Base):
 
 
 class DocumentAnalysisJob(Base):
-    """Persistent queue entry for document chunk analysis.
+    """User-facing record of one document chunk analysis.
 
-    The job outlives browser navigation and backend restarts. A single backend
-    worker claims queued rows and writes progress/result back to PostgreSQL.
+    The job outlives browser navigation and backend restarts. Execution goes
+    through the generic jobs queue (type document_analysis, one jobs row per
+    analysis job — library/document_analysis_jobs.py); worker.py processes
+    write progress/result back here for the UI to poll.
     """
 
     __tablename__ = "document_analysis_jobs"
@@ -1743,6 +1800,34 @@ class DocumentAnalysisJob(Base):
     run: Mapped["DocumentAnalysisRun | None"] = relationship(foreign_keys=[run_id])
 
 
+class DocumentAnalysisChunkResult(Base):
+    """Checkpoint of one analyzed chunk of a DocumentAnalysisJob.
+
+    Written as each chunk's LLM analysis finishes, so a job re-run after a
+    worker restart or a failed attempt only calls the LLM for chunks that
+    have no row yet. input_hash guards against a different split (md5 of the
+    chunk text); a mismatching row is recomputed and overwritten.
+
+    The rows are also what GET /analysis_job/<id>/chunks streams to the UI
+    while the run is in progress: seq numbers them per job in commit order
+    (the cursor) and chunk_text carries the source text the result is for.
+    """
+
+    __tablename__ = "document_analysis_chunk_results"
+
+    analysis_job_id: Mapped[str] = mapped_column(
+        ForeignKey("document_analysis_jobs.id", ondelete="CASCADE"), primary_key=True,
+    )
+    position: Mapped[int] = mapped_column(Integer, primary_key=True)
+    input_hash: Mapped[str] = mapped_column(String(32), nullable=False)
+    result: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    seq: Mapped[int | None] = mapped_column(Integer)
+    chunk_text: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(),
+    )
+
+
 class InfraGeometry(Base):
     """Cached Overpass API lookup for linear infrastructure (pipelines) by name.
 
@@ -1875,6 +1960,10 @@ class DocumentEntity(Base):
     # source: 'ner' (default, refresh_document_entities() may replace) | 'manual'
     # (survives refresh — set by merge_document_entities())
     source: Mapped[str] = mapped_column(String(20), nullable=False, server_default=sa_text("'ner'"))
+    # occurrences_text_hash: documents.text_hash the row's
+    # document_entity_occurrences were computed against; NULL or a different
+    # hash = not indexed for the current text (readers fall back to a scan).
+    occurrences_text_hash: Mapped[str | None] = mapped_column(String(32))
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime, nullable=False, server_default=func.now(),
     )
@@ -2756,6 +2845,48 @@ class LlmUsageLog(Base):
         )
 
 
+class LlmUsageRollup(Base):
+    """llm_usage_logs aggregated per hour or day (library/llm_usage/rollup.py).
+
+    One row per bucket and (provider, model, operation, document, analysis
+    job, currency). Buckets are recomputed from raw rows only once closed,
+    so the rows are never updated afterwards; cost reports read them up to
+    the watermark in llm_usage_rollup_watermarks and raw rows after it.
+    """
+
+    __tablename__ = "llm_usage_rollups"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    period: Mapped[str] = mapped_column(String(4), nullable=False)
+    bucket_start: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
+    provider: Mapped[str] = mapped_column(String(50), nullable=False)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    operation: Mapped[str] = mapped_column(String(50), nullable=False)
+    document_id: Mapped[int | None] = mapped_column(Integer)
+    analysis_job_id: Mapped[str | None] = mapped_column(String(32))
+    cost_currency: Mapped[str | None] = mapped_column(String(3))
+    calls: Mapped[int] = mapped_column(Integer, nullable=False)
+    unknown_calls: Mapped[int] = mapped_column(Integer, nullable=False)
+    tokens: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    cost_amount: Mapped[decimal.Decimal | None] = mapped_column(Numeric(18, 10))
+    first_called_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("period IN ('hour', 'day')", name="ck_llm_usage_rollups_period"),
+        Index("idx_llm_usage_rollups_period_bucket", "period", "bucket_start"),
+        Index("idx_llm_usage_rollups_document", "document_id", "period", "bucket_start"),
+    )
+
+
+class LlmUsageRollupWatermark(Base):
+    """Raw llm_usage_logs before ``rolled_up_until`` are in the ``period`` rollups."""
+
+    __tablename__ = "llm_usage_rollup_watermarks"
+
+    period: Mapped[str] = mapped_column(String(4), primary_key=True)
+    rolled_up_until: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
+
+
 class ExternalServiceEvent(Base):
     """Outcome of one real request to a non-LLM external dependency."""
 
@@ -2855,3 +2986,133 @@ class ObsidianNoteVersion(Base):
 # Document.source strings is gone: discovery-source resolution is explicit
 # now — every writer goes through Document.set_discovery_source(), which
 # auto-creates unknown names via DiscoverySource.ensure().
+
+
+class StorageUsage(Base):
+    """Running object count/byte totals per top-level storage prefix.
+
+    Kept current by ObjectStorage put/delete (library.storage_usage.PostgresUsageLedger)
+    and corrected by the storage_usage_reconcile job, so usage totals never
+    need a full bucket walk. prefix "" holds root-level document sources.
+    """
+
+    __tablename__ = "storage_usage"
+
+    prefix: Mapped[str] = mapped_column(String(100), primary_key=True)
+    object_count: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=sa_text("0"))
+    total_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=sa_text("0"))
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(),
+    )
+    reconciled_at: Mapped[datetime.datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+class DocumentStat(Base):
+    """One cached document count from the last document_stats_refresh run.
+
+    dimension "type_state" is keyed "<document_type>|<processing_status>" (so
+    any type/status filter combination sums from it), "source" by discovery
+    source name, "day" by ISO ingestion date. The whole table is replaced in
+    one transaction per refresh; see library/document_stats.py.
+    """
+
+    __tablename__ = "document_stats"
+
+    dimension: Mapped[str] = mapped_column(String(20), primary_key=True)
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    refreshed_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class DocumentChapterIndex(Base):
+    """Cached detect_chapters() result for one document text revision.
+
+    Valid while text_hash equals documents.text_hash; recomputed lazily by
+    library.chapter_index.reader_text() otherwise. chapters holds
+    detect_chapters()'s dicts (position, level, title, char_start, char_end,
+    length) with offsets into the text named by source_field.
+    """
+
+    __tablename__ = "document_chapter_index"
+
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    text_hash: Mapped[str] = mapped_column(String(32), nullable=False)
+    source_field: Mapped[str] = mapped_column(String(30), nullable=False)
+    text_length: Mapped[int] = mapped_column(Integer, nullable=False)
+    word_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    chapters: Mapped[list] = mapped_column(JSONB, nullable=False, server_default=sa_text("'[]'::jsonb"))
+    computed_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(),
+    )
+
+
+class DocumentEntityOccurrence(Base):
+    """One match of a document entity's surface variants in the reader text.
+
+    Written by entity_service.refresh_entity_occurrences() as a by-product of
+    refresh_document_entities(): char_offset into the reader text (the
+    _extract_text(prefer_md=True) field) and the detect_chapters() position
+    it falls in — NULL when the text has no markdown chapters or the match
+    precedes the first one. Per-chapter counts are then a GROUP BY.
+    """
+
+    __tablename__ = "document_entity_occurrences"
+    __table_args__ = (
+        Index("idx_entity_occurrences_entity_chapter", "document_entity_id", "chapter_position"),
+        Index("idx_entity_occurrences_document", "document_id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    document_entity_id: Mapped[int] = mapped_column(
+        ForeignKey("document_entities.id", ondelete="CASCADE"), nullable=False,
+    )
+    document_id: Mapped[int] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    chapter_position: Mapped[int | None] = mapped_column(Integer)
+    char_offset: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class LlmConcurrencyState(Base):
+    """Shared adaptive (AIMD) concurrency window of one LLM provider/model.
+
+    One row per (provider, model), updated under SELECT ... FOR UPDATE by
+    every process calling ai_ask() (library/llm_concurrency.py).
+    baselines holds the latency baseline per ai_ask() operation:
+    {"<operation>": {"ms": <ewma>, "n": <samples>}}.
+    """
+
+    __tablename__ = "llm_concurrency_state"
+
+    provider: Mapped[str] = mapped_column(String(40), primary_key=True)
+    model: Mapped[str] = mapped_column(String(100), primary_key=True)
+    concurrency_limit: Mapped[float] = mapped_column(Float, nullable=False)
+    baselines: Mapped[dict] = mapped_column(JSONB, nullable=False, server_default=sa_text("'{}'::jsonb"))
+    last_decrease_at: Mapped[datetime.datetime | None] = mapped_column(DateTime(timezone=True))
+    throttled_total: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=sa_text("0"))
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(),
+    )
+
+
+class LlmConcurrencySlot(Base):
+    """One ai_ask() call waiting for or holding a slot of an LlmConcurrencyState.
+
+    Rows are leases: a process that dies mid-call leaves its row behind until
+    expires_at, after which the next acquirer deletes it.
+    """
+
+    __tablename__ = "llm_concurrency_slots"
+    __table_args__ = (
+        CheckConstraint("state IN ('waiting', 'running')", name="ck_llm_concurrency_slots_state"),
+        Index("idx_llm_concurrency_slots_model_state", "provider", "model", "state", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    provider: Mapped[str] = mapped_column(String(40), nullable=False)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    state: Mapped[str] = mapped_column(String(10), nullable=False)
+    operation: Mapped[str | None] = mapped_column(String(100))
+    holder: Mapped[str | None] = mapped_column(String(200))
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(),
+    )
+    expires_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
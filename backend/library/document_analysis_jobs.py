@@ -0,0 +1,320 @@
+"""Document chunk analysis as a jobs-queue job (type document_analysis).
+
+POST /document/<id>/analyze_chunks records a DocumentAnalysisJob (the row
+the UI polls) and enqueues one document_analysis job pointing at it; the
+web process never runs the analysis itself. worker.py processes started
+with --types document_analysis claim those jobs, so analyses run outside
+the gunicorn workers, several at once across processes, and survive web
+restarts.
+
+Each chunk's LLM result is checkpointed in document_analysis_chunk_results
+as soon as it arrives (ChunkCheckpoints). When a worker dies mid-run,
+job_queue.recover_stale() requeues the job after its heartbeat expires, and
+the retry — like one after a failed attempt — only analyzes the chunks that
+have no checkpoint yet.
+
+The same rows feed GET /analysis_job/<id>/chunks (chunk_results_after()),
+a long-poll stream that hands each analyzed chunk to the review UI as soon
+as it is committed, long before create_run() persists the whole run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from library.db.engine import get_session
+from library.db.models import (
+    Document,
+    DocumentAnalysisChunkResult,
+    DocumentAnalysisJob,
+    DocumentChunk,
+    Job,
+)
+from library.job_queue import enqueue, heartbeat
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE = "document_analysis"
+# Chunk LLM calls can outlast job_queue.recover_stale()'s 120 s window, so
+# the heartbeat is kept alive on a timer rather than only on progress.
+KEEPALIVE_SECONDS = 30
+
+
+def enqueue_document_analysis(session, analysis_job_id: str) -> Job:
+    """Queue the execution of an already added DocumentAnalysisJob.
+
+    job_queue.enqueue() commits, which also persists a DocumentAnalysisJob
+    the caller has just added — both rows land in one transaction.
+    """
+    return enqueue(
+        session, JOB_TYPE, {"analysis_job_id": analysis_job_id},
+        idempotency_key=f"{JOB_TYPE}:{analysis_job_id}",
+    )
+
+
+def update_analysis_job(job_id: str, **values) -> None:
+    """Commit a small progress/status update from the worker."""
+    session = get_session()
+    try:
+        job = session.get(DocumentAnalysisJob, job_id)
+        if job is not None:
+            for key, value in values.items():
+                setattr(job, key, value)
+            session.commit()
+    except Exception:
+        session.rollback()
+        logger.exception("failed to update persistent analysis job %s", job_id)
+    finally:
+        session.close()
+
+
+def chunk_input_hash(chunk_text: str) -> str:
+    return hashlib.md5(chunk_text.encode("utf-8")).hexdigest()
+
+
+class ChunkCheckpoints:
+    """Per-chunk analysis results of one DocumentAnalysisJob.
+
+    Passed to DocumentAnalysisService.create_run(checkpoints=...). Saves go
+    through their own short session and commit at once — create_run's
+    session only commits the finished run — and are best-effort: a failed
+    save costs one LLM call on a retry, never the run.
+    """
+
+    def __init__(self, analysis_job_id: str, session_factory=get_session):
+        self.analysis_job_id = analysis_job_id
+        self.session_factory = session_factory
+        self._saved: dict[int, tuple[str, dict]] | None = None
+
+    def _load(self) -> dict[int, tuple[str, dict]]:
+        if self._saved is None:
+            session = self.session_factory()
+            try:
+                self._saved = {
+                    row.position: (row.input_hash, row.result)
+                    for row in session.scalars(
+                        select(DocumentAnalysisChunkResult).where(
+                            DocumentAnalysisChunkResult.analysis_job_id == self.analysis_job_id,
+                        )
+                    )
+                }
+            finally:
+                session.close()
+        return self._saved
+
+    def get(self, position: int, chunk_text: str) -> dict | None:
+        """Checkpointed result for chunk ``position``, if it was for this text."""
+        saved = self._load().get(position)
+        if saved is None or saved[0] != chunk_input_hash(chunk_text):
+            return None
+        return saved[1]
+
+    def expect(self, total: int) -> None:
+        """Publish the chunk count as soon as the split is known (stream progress)."""
+        update_analysis_job(self.analysis_job_id, chunk_count=total)
+
+    def save(self, position: int, chunk_text: str, result: dict) -> None:
+        input_hash = chunk_input_hash(chunk_text)
+        session = None
+        try:
+            session = self.session_factory()
+            # Saves of one job are serialized on its row, so seq — the stream
+            # cursor — grows in commit order and a reader never skips a row
+            # committed after it read a higher seq.
+            session.execute(
+                select(DocumentAnalysisJob.id)
+                .where(DocumentAnalysisJob.id == self.analysis_job_id)
+                .with_for_update()
+            )
+            seq = session.scalar(
+                select(func.coalesce(func.max(DocumentAnalysisChunkResult.seq), 0) + 1)
+                .where(DocumentAnalysisChunkResult.analysis_job_id == self.analysis_job_id)
+            )
+            stmt = insert(DocumentAnalysisChunkResult).values(
+                analysis_job_id=self.analysis_job_id, position=position, input_hash=input_hash, result=result,
+                seq=seq, chunk_text=chunk_text,
+            )
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[DocumentAnalysisChunkResult.analysis_job_id, DocumentAnalysisChunkResult.position],
+                set_={"input_hash": input_hash, "result": result, "seq": seq, "chunk_text": chunk_text},
+            ))
+            session.commit()
+            self._load()[position] = (input_hash, result)
+        except (SystemExit, Exception):
+            logger.exception("Could not checkpoint chunk %s of analysis job %s", position, self.analysis_job_id)
+            if session is not None:
+                session.rollback()
+        finally:
+            if session is not None:
+                session.close()
+
+
+def chunk_results_after(session, analysis_job_id: str, after: int = 0, limit: int = 50) -> list[dict]:
+    """Analyzed chunks of a job committed after stream cursor ``after`` (a seq)."""
+    rows = session.scalars(
+        select(DocumentAnalysisChunkResult)
+        .where(
+            DocumentAnalysisChunkResult.analysis_job_id == analysis_job_id,
+            DocumentAnalysisChunkResult.seq > after,
+        )
+        .order_by(DocumentAnalysisChunkResult.seq)
+        .limit(limit)
+    ).all()
+    return [
+        {
+            "seq": row.seq,
+            "position": row.position + 1,
+            "type": row.result.get("type"),
+            "topic": row.result.get("topic"),
+            "summary": row.result.get("summary"),
+            "corrected_text": row.result.get("corrected_text"),
+            "rewrite_ratio": row.result.get("rewrite_ratio"),
+            "original_text": row.chunk_text,
+        }
+        for row in rows
+    ]
+
+
+def _keepalive(queue_job_id: str, stop: threading.Event) -> None:
+    session = get_session()
+    try:
+        while not stop.wait(KEEPALIVE_SECONDS):
+            try:
+                heartbeat(session, queue_job_id)
+            except Exception:
+                session.rollback()
+                logger.exception("analysis job heartbeat failed for %s", queue_job_id)
+    finally:
+        session.close()
+
+
+def _auto_finalize_single(work, run, doc_id: int, job_id: str) -> bool:
+    """Approve and embed a lone clean TEMAT chunk; True when it did."""
+    chunks = work.scalars(
+        select(DocumentChunk)
+        .where(DocumentChunk.run_id == run.id)
+        .order_by(DocumentChunk.position)
+    ).all()
+    document = work.get(Document, doc_id)
+    if not (
+        document is not None
+        and document.processing_status == "MD_SIMPLIFIED"
+        and run.mode == "article"
+        and run.scope is None
+        and len(chunks) == 1
+        and chunks[0].type == "TEMAT"
+    ):
+        return False
+    chunks[0].status = "approved"
+    run.status = "reviewed"
+    work.commit()
+    from library.document_analysis_service import generate_embeddings_from_run
+
+    generate_embeddings_from_run(
+        work, run.id,
+        progress_fn=lambda msg: update_analysis_job(job_id, progress=f"Automatyczny embedding: {msg}"),
+    )
+    return True
+
+
+def execute_document_analysis(session, job: Job) -> dict:
+    """worker.py entry point for the document_analysis job type.
+
+    Errors in the document itself (ValueError from create_run: missing
+    text, bad scope) fail the analysis for good and finish the queue job
+    normally; anything else is re-raised so the queue retries the attempt,
+    resuming from the chunk checkpoints.
+    """
+    from library.document_analysis_service import DocumentAnalysisService
+    from library.llm_usage.context import llm_usage_context
+
+    job_id = job.parameters["analysis_job_id"]
+    analysis = session.get(DocumentAnalysisJob, job_id)
+    if analysis is None:
+        return {"analysis_job_id": job_id, "skipped": "analysis job no longer exists"}
+    if analysis.status in ("done", "failed"):
+        return {"analysis_job_id": job_id, "skipped": f"already {analysis.status}"}
+    doc_id, params = analysis.document_id, dict(analysis.parameters or {})
+    checkpoints = ChunkCheckpoints(job_id)
+    update_analysis_job(
+        job_id, status="running", started_at=datetime.utcnow(), error=None,
+        progress="Startowanie..." if job.attempt <= 1 else f"Wznowienie (próba {job.attempt})",
+    )
+
+    def progress(msg: str) -> None:
+        update_analysis_job(job_id, progress=msg)
+
+    stop = threading.Event()
+    keepalive = threading.Thread(
+        target=_keepalive, args=(job.id, stop), daemon=True, name=f"analysis-heartbeat-{job_id[:8]}",
+    )
+    keepalive.start()
+    work = get_session()
+    try:
+        service = DocumentAnalysisService(work)
+        with llm_usage_context(document_id=doc_id, analysis_job_id=job_id):
+            document_enriched = False
+            reuse_existing_entities = bool(params.get("reuse_existing_entities"))
+            if params.get("enrich_document"):
+                from library.document_enrichment import refresh_document_enrichment
+
+                document = work.get(Document, doc_id)
+                refresh_document_enrichment(
+                    work, document, params["model"],
+                    progress_fn=progress,
+                    reuse_existing_entities=reuse_existing_entities,
+                )
+                document_enriched = True
+            run = service.create_run(
+                doc_id=doc_id,
+                model=params["model"], chunk_size=params["chunk_size"],
+                no_synthesis=params["no_synthesis"],
+                progress_fn=progress,
+                mode=params["mode"], split_only=params["split_only"],
+                reclean=params["reclean"],
+                scope_chapter=params.get("scope_chapter"),
+                document_enriched=document_enriched,
+                reuse_existing_entities=reuse_existing_entities,
+                checkpoints=checkpoints,
+            )
+        auto_finalized = bool(params.get("auto_finalize_single")) and _auto_finalize_single(
+            work, run, doc_id, job_id,
+        )
+        ad_count = sum(1 for chunk in run.chunks if chunk.type == "REKLAMA")
+        update_analysis_job(
+            job_id, status="done", run_id=run.id,
+            chunk_count=len(run.chunks), ad_count=ad_count,
+            topic_section_count=len(run.topic_sections),
+            progress=(
+                "Gotowe automatycznie: 1 zatwierdzony chunk i embedding"
+                if auto_finalized
+                else f"Gotowe: {len(run.chunks)} chunków, {len(run.topic_sections)} sekcji"
+            ),
+            finished_at=datetime.utcnow(),
+        )
+        return {"analysis_job_id": job_id, "document_id": doc_id, "run_id": run.id, "chunk_count": len(run.chunks)}
+    except ValueError as exc:
+        logger.exception("analysis rejected for doc %s", doc_id)
+        update_analysis_job(
+            job_id, status="failed", error=str(exc),
+            progress="Analiza nie powiodła się", finished_at=datetime.utcnow(),
+        )
+        return {"analysis_job_id": job_id, "document_id": doc_id, "error": str(exc)}
+    except Exception as exc:
+        logger.exception("background analysis failed for doc %s", doc_id)
+        final = job.attempt >= job.max_attempts
+        update_analysis_job(
+            job_id, status="failed" if final else "queued", error=str(exc),
+            progress="Analiza nie powiodła się" if final else "Błąd — analiza zostanie wznowiona",
+            finished_at=datetime.utcnow() if final else None,
+        )
+        raise
+    finally:
+        work.close()
+        stop.set()
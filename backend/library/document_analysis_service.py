@@ -13,6 +13,7 @@ handles only DB-backed pipeline execution.
 import json
 import logging
 import re
+import time
 from typing import Callable
 
 from library.db.models import (
@@ -42,7 +43,15 @@ SYNTHESIS_MAX_INPUT_CHARS = 20_000
 #   rate limit hit, but per-call latency degrades noticeably (soft ceiling,
 #   likely queuing/GPU contention on CloudFerro's side). Settled below that
 #   tested-safe point rather than extrapolating further untested.
+#
+# This is only the thread ceiling now: how many calls actually run at once is
+# decided per provider/model by the adaptive limiter inside ai_ask()
+# (library/llm_concurrency.py, which shares this ceiling as its maximum).
 CHUNK_ANALYSIS_MAX_WORKERS = 16
+# Failed chunks (after the limiter has backed off) are retried this many
+# times, alone, before the run gives up; the waits before each round.
+CHUNK_RETRY_ROUNDS = 2
+CHUNK_RETRY_BACKOFF_S = (5, 20)
 _SECTION_HEADER_RE = re.compile(r'^### (REKLAMA|TEMAT|ZRODLA|SZUM): ?(.+)$', re.MULTILINE)
 
 # Run statuses that mean review never finished — once a newer run of the same
@@ -430,7 +439,21 @@ def _apply_tags(doc: Document, text: str) -> None:
     # gated by thematic tags: a failed/empty thematic classification used to
     # hide plainly mentioned countries such as Sudan and Qatar from the reader.
     country_tags = extract_countries_hybrid(text, doc.title or "")
-    new_tags = article_tags + country_tags
+    _merge_tags(doc, article_tags + country_tags)
+
+
+def _apply_tags_batch(docs_and_texts: list[tuple[Document, str]]) -> None:
+    """_apply_tags() for many documents, packing several per LLM call (bulk backfills)."""
+    from library.article_tagging import extract_countries_hybrid_batch, tag_article_with_llm_batch
+
+    articles = [(text, doc.title or "") for doc, text in docs_and_texts]
+    article_tags = tag_article_with_llm_batch(articles)
+    country_tags = extract_countries_hybrid_batch(articles)
+    for (doc, _), thematic, countries in zip(docs_and_texts, article_tags, country_tags):
+        _merge_tags(doc, thematic + countries)
+
+
+def _merge_tags(doc: Document, new_tags: list[str]) -> None:
     if not new_tags:
         return
     existing = [t.strip() for t in (doc.tags or "").split(",") if t.strip()]
@@ -510,6 +533,7 @@ class DocumentAnalysisService:
         scope_chapter: int | None = None,
         document_enriched: bool = False,
         reuse_existing_entities: bool = False,
+        checkpoints=None,
     ) -> DocumentAnalysisRun:
         """Create a new analysis run for an existing document and persist to DB.
 
@@ -529,6 +553,10 @@ class DocumentAnalysisService:
             scope_chapter: 1-based chapter position (as returned by detect_chapters /
                           GET /document/<id>/chapters) — analyze only that chapter;
                           run.scope is set to the chapter title. Article mode only.
+            checkpoints:  Optional per-chunk result store (expect(total) / get(i, text) /
+                          save(i, text, result), e.g. document_analysis_jobs.ChunkCheckpoints) —
+                          chunks with a stored result skip the LLM call, and each new
+                          result is saved as soon as it arrives, so a re-run resumes.
 
         Returns:
             Persisted DocumentAnalysisRun with .chunks and .topic_sections populated.
@@ -722,7 +750,17 @@ class DocumentAnalysisService:
         # parallel chunks would silently lose document_id/analysis_job_id on
         # their llm_usage_logs rows.
         results: list[dict] = [{}] * len(chunk_texts_iter)
-        if chunk_texts_iter:
+        pending = list(range(len(chunk_texts_iter)))
+        if checkpoints is not None and pending:
+            checkpoints.expect(len(chunk_texts_iter))
+            for i in list(pending):
+                saved = checkpoints.get(i, chunk_texts_iter[i])
+                if saved is not None:
+                    results[i] = saved
+                    pending.remove(i)
+            if len(pending) < len(chunk_texts_iter):
+                log(f"resuming: {len(chunk_texts_iter) - len(pending)}/{total} chunks from checkpoints")
+        if pending:
             from concurrent.futures import ThreadPoolExecutor, as_completed
 
             from library.llm_usage.context import current_usage_context, llm_usage_context
@@ -735,25 +773,39 @@ class DocumentAnalysisService:
                 ):
                     return _analyze_one(i, chunk_text)
 
-            log(f"analyzing {total} chunks (up to {CHUNK_ANALYSIS_MAX_WORKERS} concurrent)...")
-            max_workers = min(CHUNK_ANALYSIS_MAX_WORKERS, len(chunk_texts_iter))
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_index = {
-                    executor.submit(_run, i, chunk_text): i
-                    for i, chunk_text in enumerate(chunk_texts_iter)
-                }
-                first_error: tuple[int, Exception] | None = None
-                for future in as_completed(future_to_index):
-                    i = future_to_index[future]
-                    try:
-                        results[i] = future.result()
-                        log(f"chunk {i + 1}/{total} done ({len(chunk_texts_iter[i]):,} chars)")
-                    except Exception as exc:
-                        if first_error is None or i < first_error[0]:
-                            first_error = (i, exc)
-                if first_error is not None:
-                    fail_i, exc = first_error
-                    raise RuntimeError(f"LLM call failed for chunk {fail_i + 1}/{total}: {exc}") from exc
+            log(f"analyzing {len(pending)} chunks (up to {CHUNK_ANALYSIS_MAX_WORKERS} threads, "
+                f"adaptive provider limit)...")
+            failures: dict[int, Exception] = {}
+            for attempt in range(CHUNK_RETRY_ROUNDS + 1):
+                if attempt:
+                    # Only the chunks that failed go again, after the limiter
+                    # has had a moment to settle at its reduced concurrency.
+                    log(f"retrying {len(pending)} failed chunks (round {attempt}/{CHUNK_RETRY_ROUNDS})")
+                    time.sleep(CHUNK_RETRY_BACKOFF_S[min(attempt, len(CHUNK_RETRY_BACKOFF_S)) - 1])
+                failures = {}
+                max_workers = min(CHUNK_ANALYSIS_MAX_WORKERS, len(pending))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    future_to_index = {
+                        executor.submit(_run, i, chunk_texts_iter[i]): i
+                        for i in pending
+                    }
+                    for future in as_completed(future_to_index):
+                        i = future_to_index[future]
+                        try:
+                            results[i] = future.result()
+                            if checkpoints is not None:
+                                checkpoints.save(i, chunk_texts_iter[i], results[i])
+                            log(f"chunk {i + 1}/{total} done ({len(chunk_texts_iter[i]):,} chars)")
+                        except Exception as exc:
+                            logger.warning("chunk %s/%s failed: %s", i + 1, total, exc)
+                            failures[i] = exc
+                if not failures:
+                    break
+                pending = sorted(failures)
+            if failures:
+                fail_i = min(failures)
+                exc = failures[fail_i]
+                raise RuntimeError(f"LLM call failed for chunk {fail_i + 1}/{total}: {exc}") from exc
 
         for i, chunk_text in enumerate(chunk_texts_iter):
             result = results[i]
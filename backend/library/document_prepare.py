@@ -14,7 +14,7 @@ from html2markdown import convert
 import html2text
 
 from library.config_loader import load_config
-from library.storage import ObjectStorage, storage_from_config
+from library.storage import ObjectStorage, download_to_file, storage_from_config
 
 logger = logging.getLogger(__name__)
 
@@ -56,8 +56,7 @@ def prepare_markdown(
 
         _log(f"[2/3] Pobieram HTML ({storage_key[:40]}...)")
         try:
-            with open(cache_file_html, "wb") as handle:
-                handle.write(storage.get_bytes(storage_key))
+            download_to_file(storage, storage_key, cache_file_html)
         except Exception:
             _log("Nie udało się pobrać HTML z object storage")
             return None
@@ -11,9 +11,10 @@ from sqlalchemy.orm import Session
 
 from library.article_pipeline import extract_article
 from library.article_cleaner import clean_article_text
+from library.article_reclean import cleaned_text_hash
 from library.db.models import Document, Job
 from library.job_queue import enqueue, heartbeat
-from library.storage import ObjectStorage
+from library.storage import ObjectStorage, download_to_file
 
 
 DOCUMENT_PREPARE = "document_prepare"
@@ -82,7 +83,8 @@ class DocumentProcessingService:
             if not path.is_file():
                 continue
             key = f"{prefix}/{path.name}"
-            self.storage.put_bytes(key, path.read_bytes())
+            with path.open("rb") as handle:
+                self.storage.put_stream(key, handle)
             count += 1
         return count
 
@@ -109,12 +111,12 @@ class DocumentProcessingService:
         raw_key = f"cache/markdown/{document_id}/{document_id}_step_1_all.md"
         raw_path = scratch / f"{document_id}_step_1_all.md"
         if self.storage.exists(raw_key):
-            raw_path.write_bytes(self.storage.get_bytes(raw_key))
+            download_to_file(self.storage, raw_key, raw_path)
         else:
             html_key = f"{document.uuid}.html"
             if not self.storage.exists(html_key):
                 raise RuntimeError(f"source HTML missing from object storage: {html_key}")
-            (scratch / f"{document_id}.html").write_bytes(self.storage.get_bytes(html_key))
+            download_to_file(self.storage, html_key, scratch / f"{document_id}.html")
 
         self._progress(job, "html_to_markdown", document_id)
         markdown_text, article = extract_article(
@@ -134,6 +136,7 @@ class DocumentProcessingService:
         cleaned = clean_article_text(article, document.url)
         document.text_extracted = article
         document.text_md = cleaned["text"]
+        document.text_md_cleaned_hash = cleaned_text_hash(cleaned["text"])
         if cleaned.get("info_sources"):
             from library.information_provenance import refresh_rule_based_sources
 
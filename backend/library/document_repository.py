@@ -2,7 +2,7 @@ import datetime
 import logging
 from typing import Any
 
-from sqlalchemy import Float, and_, delete, func, literal, or_, select
+from sqlalchemy import Float, and_, delete, func, literal, literal_column, or_, select, tuple_
 from sqlalchemy.orm import Session
 
 from library.db.models import ContentGroup, DocumentAnalysisRun, DocumentChunk, Document, DocumentEmbedding, DocumentGroupMembership
@@ -12,6 +12,12 @@ from library.models.stalker_document_type import StalkerDocumentType
 
 logger = logging.getLogger(__name__)
 
+# ingested_at is nullable (legacy rows); the list orders such documents
+# after every dated one and their keyset cursor carries this value instead.
+NO_INGESTED_AT = datetime.datetime(1, 1, 1)
+# Sort key of the document list — must match idx_documents_ingested_at_id.
+_LIST_TIME = func.coalesce(Document.ingested_at, literal_column("TIMESTAMP '0001-01-01 00:00:00'"))
+
 
 class DocumentRepository:
     def __init__(self, session: Session):
@@ -29,7 +35,19 @@ class DocumentRepository:
                  without_embedding: bool = False, topic_group_ids: list[int] | None = None,
                  topic_match: str = "any", priority_group_id: int | None = None,
                  without_topics: bool = False, without_priority: bool = False,
-                 sort: str = "newest") -> list[dict[str, Any]]:
+                 sort: str = "newest", after_id: int | None = None,
+                 after_ingested_at: datetime.datetime | None = None) -> list[dict[str, Any]]:
+        """Filtered document list page, or its total when ``count`` is set.
+
+        Pages either by ``offset`` (page index, multiplied by ``limit``) or —
+        for sort="newest" — by keyset: ``after_ingested_at``/``after_id`` taken
+        from the last row's ``cursor`` of the previous page. Keyset pages cost
+        the same at any depth; OFFSET has to walk every skipped row.
+        """
+        if (after_id is None) != (after_ingested_at is None):
+            raise ValueError("after_id and after_ingested_at must be given together")
+        if after_id is not None and sort != "newest":
+            raise ValueError("cursor pagination requires sort=newest")
 
         if count:
             stmt = select(func.count(Document.id))
@@ -75,19 +93,13 @@ class DocumentRepository:
                 *self._missing_obsidian_note_chunk_conditions(),
             ).exists())
 
+        # Trigger-maintained flags (alembic b2d3e4f5a6c7) — each has a partial
+        # (ingested_at DESC, id DESC) index, so these stay index-only.
         if only_has_obsidian_notes:
-            stmt = stmt.where(or_(
-                func.coalesce(func.jsonb_array_length(Document.obsidian_note_paths), 0) > 0,
-                select(DocumentChunk.id).where(
-                    DocumentChunk.document_id == Document.id,
-                    *self._has_obsidian_note_chunk_conditions(),
-                ).exists(),
-            ))
+            stmt = stmt.where(Document.has_obsidian_notes.is_(True))
 
         if without_embedding:
-            stmt = stmt.where(~select(DocumentEmbedding.id).where(
-                DocumentEmbedding.document_id == Document.id,
-            ).exists())
+            stmt = stmt.where(Document.has_embedding.is_(False))
 
         topic_group_ids = topic_group_ids or []
         if topic_group_ids:
@@ -134,12 +146,17 @@ class DocumentRepository:
                 DocumentGroupMembership.document_id == Document.id,
                 ContentGroup.kind == "priority", ContentGroup.archived_at.is_(None),
             ).order_by(ContentGroup.priority_rank.asc()).limit(1).scalar_subquery()
-            stmt = stmt.order_by(effective_rank.asc().nulls_last(), Document.ingested_at.desc(), Document.id.desc())
+            stmt = stmt.order_by(effective_rank.asc().nulls_last(), _LIST_TIME.desc(), Document.id.desc())
         elif sort == "newest":
-            stmt = stmt.order_by(Document.ingested_at.desc(), Document.id.desc())
+            stmt = stmt.order_by(_LIST_TIME.desc(), Document.id.desc())
         else:
             raise ValueError("sort must be newest or priority")
-        stmt = stmt.limit(limit).offset(offset * limit)
+        if after_id is not None:
+            # Row comparison matches idx_documents_ingested_at_id exactly.
+            stmt = stmt.where(tuple_(_LIST_TIME, Document.id) < tuple_(after_ingested_at, int(after_id)))
+            stmt = stmt.limit(limit)
+        else:
+            stmt = stmt.limit(limit).offset(offset * limit)
 
         rows = self.session.execute(stmt).all()
         doc_ids = [row.id for row in rows]
@@ -154,7 +171,7 @@ class DocumentRepository:
                 "url": row.url,
                 "title": row.title,
                 "document_type": row.document_type,
-                "ingested_at": row.ingested_at.strftime('%Y-%m-%d %H:%M:%S'),
+                "ingested_at": row.ingested_at.strftime('%Y-%m-%d %H:%M:%S') if row.ingested_at else None,
                 "processing_status": row.processing_status,
                 "processing_error_code": row.processing_error_code,
                 "note": row.note,
@@ -162,6 +179,10 @@ class DocumentRepository:
                 "uuid": row.uuid,
                 "byline": row.byline,
                 "obsidian_note_paths": row.obsidian_note_paths or [],
+                "cursor": {
+                    "after_id": row.id,
+                    "after_ingested_at": (row.ingested_at or NO_INGESTED_AT).isoformat(),
+                },
                 "chunks_missing_obsidian_notes": missing,
                 "chunks_with_obsidian_notes": with_notes,
                 "groups": groups_by_doc.get(row.id, {}).get("groups", []),
@@ -133,7 +133,7 @@ class DocumentService:
                 from library.tracking_urls import resolve_tracking_urls_in_text
 
                 doc.email_sender = normalize_sender_email(email_sender)
-                normalized_text = resolve_tracking_urls_in_text(text)
+                normalized_text = resolve_tracking_urls_in_text(text, session=self.session)
                 doc.text = apply_footer_rule(self.session, doc.email_sender, normalized_text) or None
             else:
                 doc.text = text or None
@@ -208,11 +208,11 @@ class DocumentService:
             return False
         from library.tracking_urls import resolve_tracking_urls_in_text
 
-        normalized_text = resolve_tracking_urls_in_text(doc.text)
+        normalized_text = resolve_tracking_urls_in_text(doc.text, session=self.session)
         if normalized_text == doc.text:
             return False
         doc.text = normalized_text
-        doc.text_raw = resolve_tracking_urls_in_text(doc.text_raw or "") or None
+        doc.text_raw = resolve_tracking_urls_in_text(doc.text_raw or "", session=self.session) or None
         doc.document_length = len(doc.text)
         self.session.commit()
         return True
@@ -0,0 +1,126 @@
+"""Cached document counts for the /stats dashboard, /website_count and list totals.
+
+Every dashboard load used to run an exact COUNT(*) plus four GROUP BY scans
+over documents. The document_stats_refresh job (scheduled every 5 minutes by
+worker.scheduler) runs those aggregations once and replaces the
+document_stats table in a single transaction; readers get a consistent
+snapshot in one indexed read, together with its refreshed_at so the UI can
+say how old the numbers are. Until the first refresh has run the table is
+empty and load_snapshot() returns None — callers fall back to live queries.
+They do the same when the snapshot is older than MAX_SNAPSHOT_AGE, i.e.
+when the refresh job has stopped running (no worker, a failing refresh).
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from sqlalchemy import delete, func, select
+
+from library.db.models import DiscoverySource, Document, DocumentStat
+
+logger = logging.getLogger(__name__)
+
+DAILY_DAYS = 365
+# Six missed 5-minute refreshes; past that, live counts beat stale ones.
+MAX_SNAPSHOT_AGE = dt.timedelta(minutes=30)
+NO_SOURCE = "(brak)"
+_SEP = "|"
+
+
+@dataclass
+class DocumentStatsSnapshot:
+    refreshed_at: dt.datetime
+    by_type_state: dict[tuple[str, str], int] = field(default_factory=dict)
+    by_source: dict[str, int] = field(default_factory=dict)
+    by_day: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_type_state.values())
+
+    @property
+    def by_type(self) -> dict[str, int]:
+        return self._rollup(0)
+
+    @property
+    def by_state(self) -> dict[str, int]:
+        return self._rollup(1)
+
+    def _rollup(self, index: int) -> dict[str, int]:
+        totals: dict[str, int] = defaultdict(int)
+        for key, count in self.by_type_state.items():
+            totals[key[index]] += count
+        return dict(totals)
+
+    def count(self, document_type: str = "ALL", processing_status: str = "ALL") -> int:
+        """Documents matching get_list()'s document_type/processing_status filters."""
+        return sum(
+            count for (doc_type, status), count in self.by_type_state.items()
+            if document_type in ("ALL", doc_type) and processing_status in ("ALL", status)
+        )
+
+
+def refresh_document_stats(session, today: dt.date | None = None) -> dict:
+    """Recompute every cached count and replace document_stats; commits."""
+    today = today or dt.date.today()
+    start = dt.datetime.combine(today - dt.timedelta(days=DAILY_DAYS - 1), dt.time.min)
+    rows: list[dict] = []
+
+    for doc_type, status, count in session.execute(
+        select(Document.document_type, Document.processing_status, func.count())
+        .group_by(Document.document_type, Document.processing_status)
+    ).all():
+        rows.append({"dimension": "type_state", "key": f"{doc_type}{_SEP}{status}", "count": count})
+
+    source_name = func.coalesce(DiscoverySource.name, NO_SOURCE)
+    for name, count in session.execute(
+        select(source_name, func.count())
+        .select_from(Document)
+        .outerjoin(DiscoverySource, Document.discovery_source_id == DiscoverySource.id)
+        .group_by(source_name)
+    ).all():
+        rows.append({"dimension": "source", "key": name, "count": count})
+
+    day = func.date(Document.ingested_at)
+    for value, count in session.execute(
+        select(day, func.count()).where(Document.ingested_at >= start).group_by(day)
+    ).all():
+        rows.append({"dimension": "day", "key": str(value), "count": count})
+
+    now = dt.datetime.now(dt.timezone.utc)
+    session.execute(delete(DocumentStat))
+    if rows:
+        session.execute(DocumentStat.__table__.insert(), [{**row, "refreshed_at": now} for row in rows])
+    session.commit()
+    total = sum(row["count"] for row in rows if row["dimension"] == "type_state")
+    return {"rows": len(rows), "total": total, "refreshed_at": now.isoformat()}
+
+
+def load_snapshot(session, max_age: dt.timedelta = MAX_SNAPSHOT_AGE) -> DocumentStatsSnapshot | None:
+    """The last refresh's counts, or None if there is no refresh younger than max_age."""
+    stats = list(session.scalars(select(DocumentStat)))
+    if not stats:
+        return None
+    snapshot = DocumentStatsSnapshot(refreshed_at=min(stat.refreshed_at for stat in stats))
+    if dt.datetime.now(dt.timezone.utc) - snapshot.refreshed_at > max_age:
+        logger.warning("document_stats snapshot from %s is stale; using live counts", snapshot.refreshed_at)
+        return None
+    for stat in stats:
+        if stat.dimension == "type_state":
+            doc_type, _, status = stat.key.partition(_SEP)
+            snapshot.by_type_state[(doc_type, status)] = stat.count
+        elif stat.dimension == "source":
+            snapshot.by_source[stat.key] = stat.count
+        elif stat.dimension == "day":
+            snapshot.by_day[stat.key] = stat.count
+    return snapshot
+
+
+def execute_document_stats_refresh(session, job) -> dict:
+    """worker.py entry point for the document_stats_refresh job type."""
+    del job  # no parameters: a refresh always covers every dimension
+    return refresh_document_stats(session)
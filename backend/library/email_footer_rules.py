@@ -1,15 +1,38 @@
-"""Safe, sender-specific removal of manually approved email footers."""
+"""Safe, sender-specific removal of manually approved email footers.
+
+Footer rules are compiled once into ``FooterMatcher`` objects and kept per
+sender, so importing many messages from one sender neither queries the rule
+nor builds its regex again:
+
+- ``footer_matcher()`` compiles a footer text (LRU cache, the result only
+  depends on the text);
+- ``load_footer_rules()`` / ``apply_footer_rule()`` look rules up in a
+  per-process cache of sender -> matcher, including "no rule" entries.
+  ``invalidate_footer_rule()`` drops a sender after the rule route changes
+  it; other processes (worker, importers) see the change once the entry's
+  ``RULE_TTL_SECONDS`` have passed.
+"""
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from email.utils import parseaddr
+from functools import lru_cache
 import re
+import threading
+import time
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from library.db.models import EmailFooterRule
 
+RULE_TTL_SECONDS = 60
+
+_URL_RE = re.compile(r"https?://[^\s)]+", re.IGNORECASE)
+# The URL wildcard of the reversed footer pattern: "https?://[^\s)]+" read backwards.
+_REVERSED_URL = r"[^\s)]+//:s?ptth"
+
 
 def normalize_sender_email(value: str | None) -> str | None:
     """Return a lowercase bare address, or ``None`` for an invalid value."""
@@ -18,44 +41,116 @@ def normalize_sender_email(value: str | None) -> str | None:
     return address if "@" in address and "." in address.rsplit("@", 1)[-1] else None
 
 
-def apply_footer_rule(session: Session, sender_email: str | None, text: str) -> str:
-    """Remove an approved trailing footer, allowing only its URLs to vary.
+@dataclass(frozen=True)
+class FooterMatcher:
+    """One approved footer, compiled for matching at the end of a message."""
 
-    Newsletter services commonly replace every link with a campaign- and
-    recipient-specific redirect URL. The visible footer is otherwise stable,
-    so a literal comparison would make a sender rule stop working for the next
-    delivery. The fallback treats URLs in the approved footer as wildcards;
-    every non-URL character must still match and the footer must be last.
-    """
-    sender = normalize_sender_email(sender_email)
-    if not sender or not text:
-        return text
-    rule = session.scalar(select(EmailFooterRule).where(EmailFooterRule.sender_email == sender))
-    if rule is None:
-        return text
-    footer = rule.footer_text.strip()
-    candidate = text.rstrip()
-    if footer and candidate.endswith(footer):
-        return candidate[:-len(footer)].rstrip()
-    if footer:
-        match = _trailing_footer_with_variable_urls(footer, candidate)
-        if match is not None:
-            return candidate[:match.start()].rstrip()
-    return text
+    footer: str
+    # Literal text after the footer's last URL; a message has to end with it.
+    tail: re.Pattern[str] | None
+    tail_length: int
+    # The footer reversed, URLs as wildcards, matched against the reversed message.
+    reversed_pattern: re.Pattern[str] | None
 
+    def strip(self, text: str) -> str:
+        """Remove the footer from the end of ``text``, allowing only its URLs to vary.
+
+        Newsletter services commonly replace every link with a campaign- and
+        recipient-specific redirect URL. The visible footer is otherwise
+        stable, so a literal comparison would make a sender rule stop working
+        for the next delivery. The fallback treats URLs in the approved
+        footer as wildcards; every non-URL character must still match and the
+        footer must be last. It works backwards from the end of the message,
+        so a long newsletter is not scanned from its beginning.
+        """
+        candidate = text.rstrip()
+        if not self.footer:
+            return text
+        if candidate.endswith(self.footer):
+            return candidate[:-len(self.footer)].rstrip()
+        if self.reversed_pattern is None:
+            return text
+        if self.tail is not None and not self.tail.fullmatch(candidate, len(candidate) - self.tail_length):
+            return text
+        match = self.reversed_pattern.match(candidate[::-1])
+        if match is None:
+            return text
+        return candidate[:len(candidate) - match.end()].rstrip()
+
+
+@lru_cache(maxsize=1024)
+def footer_matcher(footer_text: str) -> FooterMatcher:
+    """Compile an approved footer text."""
+    footer = footer_text.strip()
+    literals = _URL_RE.split(footer)
+    if len(literals) == 1:
+        return FooterMatcher(footer, None, 0, None)
+    reversed_pattern = _REVERSED_URL.join(re.escape(literal[::-1]) for literal in reversed(literals))
+    tail = re.compile(re.escape(literals[-1]), re.IGNORECASE) if literals[-1] else None
+    return FooterMatcher(footer, tail, len(literals[-1]), re.compile(reversed_pattern, re.IGNORECASE))
 
-_URL_RE = re.compile(r"https?://[^\s)]+", re.IGNORECASE)
 
+_rules: dict[str, tuple[float, FooterMatcher | None]] = {}
+_rules_lock = threading.Lock()
 
-def _trailing_footer_with_variable_urls(footer: str, text: str) -> re.Match[str] | None:
-    """Match ``footer`` at the message end, with its URL values flexible."""
-    parts: list[str] = []
-    position = 0
-    for url_match in _URL_RE.finditer(footer):
-        parts.append(re.escape(footer[position:url_match.start()]))
-        parts.append(r"https?://[^\s)]+")
-        position = url_match.end()
-    parts.append(re.escape(footer[position:]))
-    if len(parts) == 1:
-        return None
-    return re.search("".join(parts) + r"\Z", text, re.IGNORECASE)
+
+def invalidate_footer_rule(sender: str | None = None) -> None:
+    """Forget the cached rule of ``sender`` (all senders when None); call after a rule changes."""
+    with _rules_lock:
+        if sender is None:
+            _rules.clear()
+        else:
+            _rules.pop(sender, None)
+
+
+def _cached_rules(senders: list[str]) -> tuple[dict[str, FooterMatcher | None], list[str]]:
+    now = time.monotonic()
+    cached: dict[str, FooterMatcher | None] = {}
+    missing = []
+    with _rules_lock:
+        for sender in senders:
+            entry = _rules.get(sender)
+            if entry is not None and entry[0] > now:
+                cached[sender] = entry[1]
+            else:
+                missing.append(sender)
+    return cached, missing
+
+
+def _remember(found: dict[str, FooterMatcher | None]) -> None:
+    expires_at = time.monotonic() + RULE_TTL_SECONDS
+    with _rules_lock:
+        _rules.update((sender, (expires_at, matcher)) for sender, matcher in found.items())
+
+
+def load_footer_rules(session: Session, senders) -> dict[str, FooterMatcher]:
+    """Return {normalized sender: matcher} for the senders that have a rule.
+
+    Senders not cached yet are looked up with one query, so a batch import
+    can warm the cache for all its senders before ``apply_footer_rule()``.
+    """
+    normalized = sorted({sender for sender in map(normalize_sender_email, senders) if sender})
+    rules, missing = _cached_rules(normalized)
+    if missing:
+        found = dict.fromkeys(missing)
+        found.update((sender, footer_matcher(footer_text)) for sender, footer_text in session.execute(
+            select(EmailFooterRule.sender_email, EmailFooterRule.footer_text)
+            .where(EmailFooterRule.sender_email.in_(missing))
+        ).all())
+        _remember(found)
+        rules.update(found)
+    return {sender: matcher for sender, matcher in rules.items() if matcher is not None}
+
+
+def apply_footer_rule(session: Session, sender_email: str | None, text: str) -> str:
+    """Remove the sender's approved trailing footer (see ``FooterMatcher.strip``)."""
+    sender = normalize_sender_email(sender_email)
+    if not sender or not text:
+        return text
+    cached, missing = _cached_rules([sender])
+    matcher = cached.get(sender)
+    if missing:
+        rule = session.scalar(select(EmailFooterRule).where(EmailFooterRule.sender_email == sender))
+        matcher = footer_matcher(rule.footer_text) if rule is not None else None
+        _remember({sender: matcher})
+    return matcher.strip(text) if matcher is not None else text
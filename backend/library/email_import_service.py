@@ -0,0 +1,176 @@
+"""Incremental email import: the messages of one mailbox added since the last run.
+
+``email_import.py --sync`` drives it; the mailboxes are in
+library/email_sources.py. A run:
+
+- reads the mailbox checkpoint from ``email_import_checkpoints`` and asks the
+  source for the message keys after it;
+- works through them ``batch_size`` at a time: documents already imported
+  are skipped before fetching when the source knows their URL up front
+  (Gmail), the rest are fetched as raw RFC 822 in one batch and parsed in the
+  executor (a process pool from the CLI; MIME decoding and HTML conversion
+  are CPU-bound);
+- resolves the tracking links of the whole batch together, loads the footer
+  rules of the batch's senders not cached yet with one query and creates the
+  documents the way a single-message import does;
+- commits each batch together with the checkpoint after its last message,
+  so an interrupted run resumes where it stopped.
+
+``dry_run`` needs no database: it parses and converts, reports what would be
+imported and stores nothing.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import Executor
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from library.db.models import DiscoverySource, Document, EmailImportCheckpoint
+from library.email_footer_rules import apply_footer_rule, load_footer_rules
+from library.email_mime import HREF_RE, ParsedEmail, html_to_text, parse_raw_email, replace_urls
+from library.models.stalker_document_status import StalkerDocumentStatus
+from library.models.stalker_document_type import StalkerDocumentType
+from library.tracking_urls import resolve_tracking_urls
+from library.url_normalization import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+# Messages per task sent to a pool process; amortises pickling overhead.
+CHUNK_SIZE = 5
+
+
+def _html_text(html_body: str | None) -> str | None:
+    return html_to_text(html_body) if html_body else None
+
+
+class EmailImportService:
+    def __init__(
+        self, session, source, *, executor: Executor | None = None, batch_size: int = BATCH_SIZE,
+        dry_run: bool = False, discovery_source: str = "email", note: str | None = None,
+        language: str | None = None, detect_language: bool = True,
+    ):
+        self.session = session
+        self.source = source
+        self.executor = executor
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.discovery_source = discovery_source
+        self.note = note
+        self.language = language
+        self.detect_language = detect_language
+
+    def _map(self, function, items: list):
+        if self.executor is None:
+            return list(map(function, items))
+        return list(self.executor.map(function, items, chunksize=CHUNK_SIZE))
+
+    def checkpoint(self) -> str | None:
+        return self.session.scalar(
+            select(EmailImportCheckpoint.checkpoint).where(EmailImportCheckpoint.mailbox == self.source.mailbox)
+        )
+
+    def _save_checkpoint(self, checkpoint: str) -> None:
+        stmt = insert(EmailImportCheckpoint).values(mailbox=self.source.mailbox, checkpoint=checkpoint)
+        self.session.execute(stmt.on_conflict_do_update(
+            index_elements=[EmailImportCheckpoint.mailbox],
+            set_={"checkpoint": stmt.excluded.checkpoint, "updated_at": func.now()},
+        ))
+
+    def _existing_urls(self, urls: list[str]) -> set[str]:
+        if self.dry_run or not urls:
+            return set()
+        by_canonical = {canonicalize_url(url): url for url in urls}
+        found = self.session.scalars(
+            select(Document.canonical_url).where(Document.canonical_url.in_(list(by_canonical)))
+        )
+        return {by_canonical[canonical] for canonical in found}
+
+    def run(self, *, checkpoint_only: bool = False) -> dict:
+        """Import the new messages; ``checkpoint_only`` just marks them as seen."""
+        started = time.monotonic()
+        checkpoint = None if self.dry_run else self.checkpoint()
+        keys, final_checkpoint = self.source.pending(checkpoint)
+        totals = {
+            "mailbox": self.source.mailbox, "found": len(keys), "imported": 0, "skipped_existing": 0,
+            "errors": 0, "dry_run": self.dry_run, "previous_checkpoint": checkpoint,
+        }
+        if checkpoint_only:
+            keys = []
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start:start + self.batch_size]
+            self._import_batch(batch, totals)
+            if not self.dry_run:
+                if (after := self.source.checkpoint_after(batch[-1])) is not None:
+                    self._save_checkpoint(after)
+                self.session.commit()
+            logger.info("Email import %s: %d/%d messages", self.source.mailbox, start + len(batch), len(keys))
+        if not self.dry_run and final_checkpoint is not None:
+            self._save_checkpoint(final_checkpoint)
+            self.session.commit()
+        return {**totals, "checkpoint": final_checkpoint, "elapsed_seconds": round(time.monotonic() - started, 3)}
+
+    def _import_batch(self, keys: list[str], totals: dict) -> None:
+        known_urls = {key: self.source.url_for(key) for key in keys}
+        existing = self._existing_urls([url for url in known_urls.values() if url])
+        to_fetch = [key for key in keys if known_urls[key] not in existing]
+        items = [(key, known_urls[key], raw) for key, raw in self.source.fetch(to_fetch)]
+        parsed = self._map(parse_raw_email, items)
+
+        existing |= self._existing_urls([message.url for message in parsed if known_urls[message.key] is None])
+        messages: dict[str, ParsedEmail] = {}
+        for message in parsed:
+            if message.url not in existing:
+                messages.setdefault(message.url, message)
+        totals["skipped_existing"] += len(keys) - len(messages)
+        if not messages:
+            return
+
+        session = None if self.dry_run else self.session
+        hrefs = [href for message in messages.values() if message.html_body for href in HREF_RE.findall(message.html_body)]
+        resolved = resolve_tracking_urls(hrefs, session)
+        htmls = [replace_urls(message.html_body, resolved) if message.html_body else None for message in messages.values()]
+        texts = self._map(_html_text, htmls)
+        if session is not None:
+            load_footer_rules(session, [message.sender_email for message in messages.values()])
+        source_row = DiscoverySource.ensure(session, self.discovery_source) if session else None
+
+        for message, html_body, html_text in zip(messages.values(), htmls, texts):
+            text = html_text if html_body else message.plain_body
+            if not text:
+                logger.warning("Email %s (%s) has no text body; skipped", message.key, message.subject)
+                totals["errors"] += 1
+                continue
+            totals["imported"] += 1
+            if session is None:
+                continue
+            doc = Document(url=message.url)
+            doc.document_type = StalkerDocumentType.email.name
+            doc.title = message.subject or "(no subject)"
+            doc.byline = message.author
+            doc.email_sender = message.sender_email
+            doc.text = apply_footer_rule(session, message.sender_email, text)
+            doc.text_raw = html_body or message.plain_body
+            doc.document_length = len(doc.text) if doc.text else None
+            doc.discovery_source = source_row
+            doc.original_id = message.key if known_urls[message.key] else message.message_id
+            doc.processing_status = StalkerDocumentStatus.DOCUMENT_INTO_DATABASE.name
+            if language := self.language or self._detect_language(text):
+                doc.language = language
+            if self.note:
+                doc.note = self.note
+            session.add(doc)
+
+    def _detect_language(self, text: str) -> str | None:
+        if not self.detect_language:
+            return None
+        try:
+            from library.text_detect_language import text_language_detect
+            return text_language_detect(text[:500])
+        except Exception:
+            logger.warning("Could not detect language, leaving empty")
+            return None
@@ -0,0 +1,134 @@
+"""Pure parsing of email messages for the email importers.
+
+Everything here works on bytes and strings only, so ``parse_raw_email()``
+can run in a process pool: the incremental importer
+(library/email_import_service.py) parses each fetched batch of RFC 822
+messages in parallel. ``html_to_text()`` is the conversion email_import.py
+has always used for HTML bodies.
+"""
+
+from __future__ import annotations
+
+import email
+import email.policy
+import hashlib
+import html
+import re
+from dataclasses import dataclass
+from email.utils import parseaddr
+from urllib.parse import quote
+
+HREF_RE = re.compile(r"<a\s+[^>]*href\s*=\s*['\"]([^'\"]*)['\"]", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ParsedEmail:
+    key: str
+    url: str
+    message_id: str | None
+    subject: str
+    from_header: str
+    date_header: str
+    html_body: str | None
+    plain_body: str | None
+
+    @property
+    def author(self) -> str:
+        return extract_sender_name(self.from_header)
+
+    @property
+    def sender_email(self) -> str | None:
+        return parseaddr(self.from_header)[1].strip().lower() or None
+
+
+def mid_url(message_id: str | None, raw: bytes) -> str:
+    """RFC 2392 ``mid:`` identity of a message; a content hash when it has no Message-ID."""
+    value = (message_id or "").strip().strip("<>").strip()
+    if not value:
+        value = f"sha256-{hashlib.sha256(raw).hexdigest()}@lenie"
+    return "mid:" + quote(value, safe="@!$&'()*+,;=-._~")
+
+
+def _body(message, subtype: str) -> str | None:
+    part = message.get_body(preferencelist=(subtype,))
+    if part is None:
+        return None
+    try:
+        content = part.get_content()
+    except (LookupError, UnicodeDecodeError):
+        # Unknown or lying charset: keep what decodes rather than lose the body.
+        content = (part.get_payload(decode=True) or b"").decode("utf-8", errors="replace")
+    return content.replace("\r\n", "\n") or None
+
+
+def parse_raw_email(item: tuple[str, str | None, bytes]) -> ParsedEmail:
+    """Pool task: parse one (key, url or None, RFC 822 bytes) message.
+
+    ``url`` is the source's own identity (``gmail://<id>``); sources without
+    one get the ``mid:`` URL of the Message-ID header.
+    """
+    key, url, raw = item
+    message = email.message_from_bytes(raw, policy=email.policy.default)
+    message_id = str(message.get("Message-ID") or "").strip() or None
+    return ParsedEmail(
+        key=key,
+        url=url or mid_url(message_id, raw),
+        message_id=message_id,
+        subject=str(message.get("Subject") or ""),
+        from_header=str(message.get("From") or ""),
+        date_header=str(message.get("Date") or ""),
+        html_body=_body(message, "html"),
+        plain_body=_body(message, "plain"),
+    )
+
+
+def replace_urls(html_content: str, resolved: dict[str, str]) -> str:
+    for original, destination in resolved.items():
+        if destination != original:
+            html_content = html_content.replace(original, destination)
+    return html_content
+
+
+def html_to_text(html_content: str) -> str:
+    """Convert HTML email to readable plain text, preserving links."""
+    text = html_content
+    # Remove <head>, <style>, <script> blocks entirely
+    text = re.sub(r"<head\b[^>]*>.*?</head\b[^>]*>", "", text, flags=re.IGNORECASE | re.DOTALL)
+    text = re.sub(r"<style\b[^>]*>.*?</style\b[^>]*>", "", text, flags=re.IGNORECASE | re.DOTALL)
+    text = re.sub(r"<script\b[^>]*>.*?</script\b[^>]*>", "", text, flags=re.IGNORECASE | re.DOTALL)
+    # Remove HTML comments
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.DOTALL)
+    # <br> -> newline
+    text = re.sub(r"<br\s*/?>", "\n", text, flags=re.IGNORECASE)
+    # Block elements -> newlines
+    text = re.sub(r"</?(?:p|div|tr|table|section|article|header|footer)\s*[^>]*>", "\n", text, flags=re.IGNORECASE)
+    # <h1-h6> -> newline + ## prefix
+    text = re.sub(r"<h([1-6])\s*[^>]*>", lambda m: "\n" + "#" * int(m.group(1)) + " ", text, flags=re.IGNORECASE)
+    text = re.sub(r"</h[1-6]\s*>", "\n", text, flags=re.IGNORECASE)
+    # <li> -> bullet
+    text = re.sub(r"<li\s*[^>]*>", "\n- ", text, flags=re.IGNORECASE)
+    text = re.sub(r"</li\s*>", "", text, flags=re.IGNORECASE)
+    text = re.sub(r"</?[uo]l\s*[^>]*>", "\n", text, flags=re.IGNORECASE)
+    # <a href="...">text</a> -> text (URL)
+    text = re.sub(r'<a\s+[^>]*href="([^"]*)"[^>]*>(.*?)</a>', r"\2 (\1)", text, flags=re.IGNORECASE | re.DOTALL)
+    # <strong>/<b> -> **text**
+    text = re.sub(r"<(?:strong|b)\s*>(.*?)</(?:strong|b)\s*>", r"**\1**", text, flags=re.IGNORECASE | re.DOTALL)
+    # <em>/<i> -> *text*
+    text = re.sub(r"<(?:em|i)\s*>(.*?)</(?:em|i)\s*>", r"*\1*", text, flags=re.IGNORECASE | re.DOTALL)
+    # Strip remaining tags
+    text = re.sub(r"<[^>]+>", "", text)
+    # Decode HTML entities
+    text = html.unescape(text)
+    # Strip trailing whitespace per line
+    text = re.sub(r"[ \t]+$", "", text, flags=re.MULTILINE)
+    # Collapse excessive blank lines (3+ -> 2)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def extract_sender_name(from_header: str) -> str:
+    """Extract display name from 'From' header. 'John Doe <john@example.com>' -> 'John Doe'."""
+    match = re.match(r'^"?([^"<]+)"?\s*<', from_header)
+    if match:
+        return match.group(1).strip()
+    return from_header
@@ -9,6 +9,8 @@ embedding_models = {"amazon.titan-embed-text-v1", "amazon.titan-embed-text-v2:0"
 
 _SHERLOCK_MODELS = {"BAAI/bge-multilingual-gemma2", "intfloat/e5-mistral-7b-instruct"}
 _SHERLOCK_EMBEDDINGS_ENDPOINT = "https://api-sherlock.cloudferro.com/openai/v1/embeddings"
+# Hash-based local embeddings for load tests (library/api/fake/fake_embedding.py).
+_FAKE_MODEL_PREFIX = "fake/"
 
 
 def _record_sherlock_embedding_usage(response, model: str, latency_ms: int) -> None:
@@ -44,14 +46,19 @@ def _record_sherlock_embedding_usage(response, model: str, latency_ms: int) -> N
 def get_embeddings(model: str, texts: list[str]) -> list[EmbeddingResult]:
     """Batch variant of get_embedding — one API call where the provider supports it.
 
-    CloudFerro Sherlock embeds the whole list in a single request; other
-    providers fall back to one get_embedding call per text (which also
-    validates the model name). Always returns one EmbeddingResult per input
-    text, in input order.
+    CloudFerro Sherlock and the local fake/ models embed the whole list in one
+    request; other providers fall back to one get_embedding call per text
+    (which also validates the model name). Always returns one EmbeddingResult
+    per input text, in input order.
     """
     if not texts:
         return []
 
+    if model.startswith(_FAKE_MODEL_PREFIX):
+        from library.api.fake.fake_embedding import get_embeddings as fake_get_embeddings
+
+        return fake_get_embeddings(texts, model)
+
     if model in _SHERLOCK_MODELS:
         from library.api.cloudferro.sherlock.sherlock_embedding import sherlock_create_embeddings
 
@@ -104,6 +111,8 @@ def get_embeddings(model: str, texts: list[str]) -> list[EmbeddingResult]:
 
 
 def get_embedding(model: str, text: str) -> EmbeddingResult:
+    if model.startswith(_FAKE_MODEL_PREFIX):
+        return get_embeddings(model, [text])[0]
     if model not in embedding_models:
         raise Exception(f"DEBUG: Error, no model info for text {model}")
 
@@ -10,12 +10,15 @@ source='manual' (set by merge_document_entities()), which survive a refresh.
 import datetime
 import logging
 import re
+from bisect import bisect_right
+from collections import defaultdict
 
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import delete, func, insert, select, update
 
 from library.db.models import (
     Document,
     DocumentEntity,
+    DocumentEntityOccurrence,
     DocumentOrganization,
     NerContextClassification,
     NerExclusion,
@@ -441,9 +444,126 @@ def refresh_document_entities(session, document_id: int, text: str) -> list[Docu
     from library.facility_service import refresh_document_facilities
 
     refresh_document_facilities(session, document_id, text)
+    if isinstance(doc, Document):
+        refresh_entity_occurrences(session, doc)
     return rows
 
 
+def _entity_pattern(entity: DocumentEntity) -> tuple[re.Pattern, set[str]] | None:
+    """Variant alternation of one entity (no word-start guard) and its initials."""
+    needles = sorted({n for n in (entity.variants or []) if n} or {entity.entity_text} - {""})
+    if not needles:
+        return None
+    pattern = re.compile("|".join(re.escape(n) for n in needles), re.IGNORECASE)
+    return pattern, {n[0].lower() for n in needles}
+
+
+def entity_offsets(text: str, entities: list[DocumentEntity]):
+    r"""Yield (entity, char_offset) for every match of each entity's variants.
+
+    Same matches as re.findall(r"(?<!\w)(?:variants)", text, re.I) run per
+    entity — the word-start, inflection-tolerant matching of
+    GET /document/<id>/entity_occurrences — but in one scan of the text:
+    word starts are visited once and only entities sharing the initial
+    letter are tried there, instead of one full pass per entity.
+    """
+    by_initial: dict[str, list[tuple[DocumentEntity, re.Pattern]]] = defaultdict(list)
+    for entity in entities:
+        compiled = _entity_pattern(entity)
+        if compiled is None:
+            continue
+        pattern, initials = compiled
+        for initial in initials:
+            by_initial[initial].append((entity, pattern))
+    if not by_initial:
+        return
+    starts = re.compile(
+        r"(?<!\w)(?=[" + "".join(re.escape(c) for c in sorted(by_initial)) + "])", re.IGNORECASE,
+    )
+    last_end: dict[int, int] = {}
+    for start in starts.finditer(text):
+        pos = start.start()
+        for entity, pattern in by_initial.get(text[pos].lower(), ()):
+            if pos < last_end.get(id(entity), 0):
+                continue  # findall() never reports overlapping matches
+            match = pattern.match(text, pos)
+            if match:
+                last_end[id(entity)] = max(match.end(), pos + 1)
+                yield entity, pos
+
+
+def refresh_entity_occurrences(session, doc: Document) -> int:
+    """Rebuild document_entity_occurrences for all of doc's entity rows.
+
+    Runs at the end of refresh_document_entities() (so manual rows that
+    survived the refresh are re-indexed too), inside the caller's
+    transaction. Each entity row is stamped with the text hash it was
+    indexed against; readers ignore rows whose stamp differs from
+    documents.text_hash and scan the text instead. Returns the number of
+    occurrence rows written.
+    """
+    from library.chapter_index import source_text_hash
+    from library.document_analysis_service import _extract_text
+    from library.text_functions import detect_chapters
+
+    entities = list(session.scalars(select(DocumentEntity).where(DocumentEntity.document_id == doc.id)))
+    session.execute(delete(DocumentEntityOccurrence).where(DocumentEntityOccurrence.document_id == doc.id))
+    text, _field = _extract_text(doc, prefer_md=True, min_length=0)
+    chapters = detect_chapters(text) if text else []
+    chapter_starts = [chapter["char_start"] for chapter in chapters]
+
+    occurrences = []
+    for entity, offset in entity_offsets(text, entities):
+        index = bisect_right(chapter_starts, offset) - 1
+        inside = index >= 0 and offset < chapters[index]["char_end"]
+        occurrences.append({
+            "document_entity_id": entity.id,
+            "document_id": doc.id,
+            "chapter_position": chapters[index]["position"] if inside else None,
+            "char_offset": offset,
+        })
+    if occurrences:
+        session.execute(insert(DocumentEntityOccurrence), occurrences)
+    text_hash = source_text_hash(doc)
+    for entity in entities:
+        entity.occurrences_text_hash = text_hash
+    return len(occurrences)
+
+
+def occurrences_indexed(doc, rows: list[DocumentEntity]) -> bool:
+    """True when every row's occurrences were computed for doc's current text."""
+    text_hash = getattr(doc, "text_hash", None)
+    return bool(rows) and isinstance(text_hash, str) and all(
+        row.occurrences_text_hash == text_hash for row in rows
+    )
+
+
+def chapter_occurrence_counts(session, entity_ids: list[int]) -> dict[int, dict[int | None, int]]:
+    """{document_id: {chapter_position: count}} for the given entity rows.
+
+    One indexed GROUP BY across however many documents the rows span; only
+    rows indexed against their document's current text are counted. Matches
+    of two rows at the same offset (one name tagged as two entity types)
+    count once, as in the scan.
+    """
+    if not entity_ids:
+        return {}
+    occurrence = DocumentEntityOccurrence
+    result: dict[int, dict[int | None, int]] = defaultdict(dict)
+    for document_id, position, count in session.execute(
+        select(occurrence.document_id, occurrence.chapter_position, func.count(occurrence.char_offset.distinct()))
+        .join(DocumentEntity, DocumentEntity.id == occurrence.document_entity_id)
+        .join(Document, Document.id == occurrence.document_id)
+        .where(
+            occurrence.document_entity_id.in_(entity_ids),
+            DocumentEntity.occurrences_text_hash == Document.text_hash,
+        )
+        .group_by(occurrence.document_id, occurrence.chapter_position)
+    ):
+        result[document_id][position] = count
+    return dict(result)
+
+
 def get_document_entities(session, document_id: int) -> dict[str, list[dict]]:
     """Return the document's stored entities grouped by type, alphabetically.
 
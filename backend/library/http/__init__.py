@@ -0,0 +1,33 @@
+"""Shared client for outbound HTTP calls (feeds, webpages, public APIs).
+
+Call sites use it in place of ``requests``::
+
+    from library import http
+
+    response = http.get(url, upstream="feeds", timeout=(5, 30))
+
+See client.py for the pooling, retry and rate-limit rules and cache.py for
+the optional response cache.
+"""
+
+from library.http.client import (
+    POLICIES,
+    UpstreamPolicy,
+    close_sessions,
+    configure_cache,
+    get,
+    head,
+    post,
+    request,
+)
+
+__all__ = [
+    "POLICIES",
+    "UpstreamPolicy",
+    "close_sessions",
+    "configure_cache",
+    "get",
+    "head",
+    "post",
+    "request",
+]
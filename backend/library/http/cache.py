@@ -0,0 +1,229 @@
+"""Private on-disk HTTP response cache for library.http (RFC 9111).
+
+Only what a single-user private cache needs:
+
+- GET responses with a cacheable status are stored unless the request or the
+  response says ``no-store`` or the response varies on ``*``;
+- freshness comes from ``max-age``, else ``Expires`` minus ``Date``, else the
+  usual 10% of the time since ``Last-Modified`` (capped at a day); the age
+  calculation follows section 4.2.3, including the ``Age`` header;
+- a stale entry (or one stored with ``no-cache``) is revalidated with
+  ``If-None-Match`` / ``If-Modified-Since``; a 304 refreshes its headers
+  and the stored body is served;
+- ``Vary``: the listed request headers are stored with the entry, and a
+  lookup with different values is a miss.
+
+One file per URL under the cache directory: a JSON metadata line followed by
+the body bytes, written to a temporary file and renamed into place so
+concurrent workers never read a torn entry. Stale entries are overwritten on
+the next fetch; nothing else removes them.
+"""
+
+from __future__ import annotations
+
+import calendar
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_tz
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_STATUSES = frozenset({200, 203, 300, 301, 308, 404, 410})
+HEURISTIC_FRACTION = 0.1
+MAX_HEURISTIC_FRESHNESS_S = 86400
+# The stored body is already decoded by requests; these no longer describe it.
+_DROPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+
+def cache_directives(value: str | None) -> dict[str, str | None]:
+    """Parse a Cache-Control header into {directive: argument or None}."""
+    directives: dict[str, str | None] = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') if argument else None
+    return directives
+
+
+def _http_date(value: str | None) -> float | None:
+    parsed = parsedate_tz(value) if value else None
+    if parsed is None:
+        return None
+    return calendar.timegm(parsed[:9]) - (parsed[9] or 0)
+
+
+def _seconds(value: str | None) -> int | None:
+    try:
+        return max(0, int(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _vary_names(headers) -> list[str]:
+    return [name.strip().lower() for name in headers.get("Vary", "").split(",") if name.strip()]
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    status: int
+    reason: str
+    headers: dict[str, str]
+    vary: dict[str, str | None]
+    response_time: float
+    initial_age: float
+    body: bytes = b""
+
+    def _headers(self) -> CaseInsensitiveDict:
+        return CaseInsensitiveDict(self.headers)
+
+    def freshness_lifetime(self) -> float:
+        headers = self._headers()
+        directives = cache_directives(headers.get("Cache-Control"))
+        if "no-cache" in directives:
+            return 0
+        max_age = _seconds(directives.get("max-age"))
+        if max_age is not None:
+            return max_age
+        date = _http_date(headers.get("Date")) or self.response_time
+        if "Expires" in headers:
+            expires = _http_date(headers["Expires"])
+            return max(0.0, expires - date) if expires is not None else 0
+        last_modified = _http_date(headers.get("Last-Modified"))
+        if last_modified is not None and date > last_modified:
+            return min(MAX_HEURISTIC_FRESHNESS_S, (date - last_modified) * HEURISTIC_FRACTION)
+        return 0
+
+    def current_age(self, now: float | None = None) -> float:
+        return self.initial_age + max(0.0, (now or time.time()) - self.response_time)
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        return self.freshness_lifetime() > self.current_age(now)
+
+    def validators(self) -> dict[str, str]:
+        headers = self._headers()
+        conditional = {}
+        if "ETag" in headers:
+            conditional["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+    def to_response(self, request: requests.PreparedRequest | None = None) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status
+        response.reason = self.reason
+        response.url = self.url
+        response.headers = self._headers()
+        response.headers["Age"] = str(int(self.current_age()))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.body
+        response.request = request
+        response.from_cache = True
+        return response
+
+
+def _initial_age(headers, request_time: float, response_time: float) -> float:
+    """corrected_initial_age from RFC 9111 section 4.2.3."""
+    date = _http_date(headers.get("Date"))
+    apparent_age = max(0.0, response_time - date) if date is not None else 0.0
+    corrected_age_value = (_seconds(headers.get("Age")) or 0) + max(0.0, response_time - request_time)
+    return max(apparent_age, corrected_age_value)
+
+
+class ResponseCache:
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[:2], key)
+
+    def lookup(self, url: str, request_headers) -> CachedResponse | None:
+        try:
+            with open(self._path(url), "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Unreadable HTTP cache entry for %s: %s", url, exc)
+            return None
+        entry = CachedResponse(body=body, **meta)
+        if entry.url != url:
+            return None
+        request_headers = CaseInsensitiveDict(request_headers or {})
+        if any(request_headers.get(name) != value for name, value in entry.vary.items()):
+            return None
+        return entry
+
+    def store(
+        self, url: str, request_headers, response: requests.Response, request_time: float,
+    ) -> CachedResponse | None:
+        """Store ``response`` if RFC 9111 allows it; return the stored entry."""
+        if response.request is not None and response.request.method != "GET":
+            return None
+        if response.status_code not in CACHEABLE_STATUSES:
+            return None
+        request_headers = CaseInsensitiveDict(request_headers or {})
+        if "no-store" in cache_directives(request_headers.get("Cache-Control")):
+            return None
+        directives = cache_directives(response.headers.get("Cache-Control"))
+        vary = _vary_names(response.headers)
+        if "no-store" in directives or "*" in vary:
+            return None
+        entry = CachedResponse(
+            url=url,
+            status=response.status_code,
+            reason=response.reason or "",
+            headers={k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+            vary={name: request_headers.get(name) for name in vary},
+            response_time=time.time(),
+            initial_age=0.0,
+            body=response.content,
+        )
+        entry.initial_age = _initial_age(response.headers, request_time, entry.response_time)
+        if not entry.freshness_lifetime() and not entry.validators():
+            return None  # could never be served without a full refetch
+        self._write(entry)
+        return entry
+
+    def refresh(self, entry: CachedResponse, not_modified: requests.Response, request_time: float) -> CachedResponse:
+        """Apply a 304 response to ``entry`` (section 4.3.4) and store it again."""
+        headers = CaseInsensitiveDict(entry.headers)
+        for name, value in not_modified.headers.items():
+            if name.lower() not in _DROPPED_HEADERS:
+                headers[name] = value
+        entry.headers = dict(headers.items())
+        entry.response_time = time.time()
+        entry.initial_age = _initial_age(not_modified.headers, request_time, entry.response_time)
+        self._write(entry)
+        return entry
+
+    def _write(self, entry: CachedResponse) -> None:
+        path = self._path(entry.url)
+        meta = {
+            "url": entry.url, "status": entry.status, "reason": entry.reason, "headers": entry.headers,
+            "vary": entry.vary, "response_time": entry.response_time, "initial_age": entry.initial_age,
+        }
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(meta).encode("utf-8") + b"\n")
+                f.write(entry.body)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("Could not write HTTP cache entry for %s: %s", entry.url, exc)
+            if tmp is not None and os.path.exists(tmp):
+                os.unlink(tmp)
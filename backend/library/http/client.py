@@ -0,0 +1,254 @@
+"""Outbound HTTP: pooled per-host sessions, retries, rate limits and caching.
+
+``request()`` is a drop-in for ``requests.request()`` with one extra keyword,
+``upstream``: the logical service being called. The upstream selects the
+``UpstreamPolicy`` (retries, per-host spacing, caching) and labels the
+metrics, so a slow Overpass mirror and a slow news site show up separately.
+
+- Sessions: one ``requests.Session`` per scheme and host, so repeated calls
+  reuse TCP/TLS connections instead of handshaking every time. The set is
+  bounded, since webpage downloads reach thousands of hosts: the least
+  recently used host is dropped from it, not closed, because another thread
+  may still be using that session; its connections close once the last
+  user lets go of it. Sessions refuse cookies: a call behaves like the
+  stateless ``requests.get()`` it replaces.
+- Retries: connection errors and timeouts, and 429/502/503/504 responses, are
+  retried for the policy's idempotent methods with jittered exponential
+  backoff; ``Retry-After`` is honoured up to ``max_backoff_s`` (a longer
+  wait returns the response to the caller instead). A caller that checks
+  where a URL points (``validate_url_target`` against SSRF) passes the check
+  as ``validate_target``; it runs again before every retry, since the host's
+  DNS answer may have changed meanwhile. A connection the pool already holds
+  is reused without a new lookup — it goes to the address validated when it
+  was opened.
+- Rate limits: ``min_interval_s`` spaces requests to one host across all
+  threads of the process (LocationIQ's free tier, Overpass etiquette).
+- Cache: for policies with ``cache=True`` and ``HTTP_CACHE_DIR`` set,
+  GET responses go through ``ResponseCache`` (see cache.py).
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from library.config_loader import load_config
+from library.http.cache import ResponseCache, cache_directives
+from library.metrics import (
+    observe_upstream_cache,
+    observe_upstream_error,
+    observe_upstream_request,
+    observe_upstream_retry,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+DEFAULT_TIMEOUT_S = (10, 30)
+# Connections kept alive per host; matches the largest worker thread pools.
+POOL_MAXSIZE = 10
+MAX_SESSIONS = 64
+
+
+@dataclass(frozen=True)
+class UpstreamPolicy:
+    retries: int = 2
+    backoff_s: float = 0.5
+    max_backoff_s: float = 30.0
+    retry_statuses: frozenset[int] = RETRY_STATUSES
+    retry_methods: frozenset[str] = frozenset({"GET", "HEAD"})
+    min_interval_s: float = 0.0
+    cache: bool = False
+
+
+DEFAULT_POLICY = UpstreamPolicy()
+POLICIES: dict[str, UpstreamPolicy] = {
+    "webpages": UpstreamPolicy(retries=1),
+    "feeds": UpstreamPolicy(cache=True),
+    # Redirect chains hop across many hosts; the caller falls back to the
+    # original URL, so a slow hop is not worth retrying.
+    "tracking": UpstreamPolicy(retries=0),
+    "wikidata": UpstreamPolicy(cache=True),
+    # Free tier: 2 requests/s, 5 000/day.
+    "locationiq": UpstreamPolicy(min_interval_s=0.6),
+    # A public community service; the query is read-only, so POST is safe to retry.
+    "overpass": UpstreamPolicy(retries=1, backoff_s=5.0, min_interval_s=2.0, retry_methods=frozenset({"POST"})),
+    "book_footnotes": UpstreamPolicy(cache=True),
+}
+
+_sessions: OrderedDict[tuple[str, str], requests.Session] = OrderedDict()
+_sessions_lock = threading.Lock()
+_next_slot: dict[tuple[str, str], float] = {}
+_slots_lock = threading.Lock()
+_cache: ResponseCache | None = None
+_cache_dir: str | None = None
+
+
+def _session(scheme: str, host: str) -> requests.Session:
+    key = (scheme, host)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is not None:
+            _sessions.move_to_end(key)
+            return session
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _sessions[key] = session
+        if len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+        return session
+
+
+def close_sessions() -> None:
+    """Close every pooled connection (tests, and processes about to fork)."""
+    with _sessions_lock:
+        while _sessions:
+            _sessions.popitem()[1].close()
+    with _slots_lock:
+        _next_slot.clear()
+
+
+def _wait_turn(upstream: str, host: str, interval: float) -> None:
+    """Reserve the next free slot for ``host``, then sleep until it comes."""
+    if interval <= 0:
+        return
+    with _slots_lock:
+        now = time.monotonic()
+        slot = max(now, _next_slot.get((upstream, host), 0.0))
+        _next_slot[(upstream, host)] = slot + interval
+    if slot > now:
+        time.sleep(slot - now)
+
+
+def configure_cache(directory: str | None) -> None:
+    """Use ``directory`` for the response cache (None disables it)."""
+    global _cache, _cache_dir
+    _cache_dir = directory or ""
+    _cache = ResponseCache(directory) if directory else None
+
+
+def _response_cache() -> ResponseCache | None:
+    if _cache_dir is None:
+        configure_cache(load_config().get("HTTP_CACHE_DIR"))
+    return _cache
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(policy: UpstreamPolicy, attempt: int) -> float:
+    return min(policy.max_backoff_s, policy.backoff_s * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def _retryable(exc: requests.RequestException) -> bool:
+    if isinstance(exc, requests.exceptions.SSLError):
+        return False
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def _send(upstream: str, policy: UpstreamPolicy, method: str, url: str, kwargs: dict,
+          validate_target: Callable[[str], None] | None = None) -> requests.Response:
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    session = _session(parts.scheme, host)
+    retryable_method = method in policy.retry_methods
+    attempt = 0
+    while True:
+        if attempt and validate_target is not None:
+            validate_target(url)
+        _wait_turn(upstream, host, policy.min_interval_s)
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.RequestException as exc:
+            observe_upstream_request(upstream, method, "error", time.perf_counter() - started)
+            observe_upstream_error(upstream, type(exc).__name__)
+            if attempt >= policy.retries or not retryable_method or not _retryable(exc):
+                raise
+            delay = _backoff(policy, attempt)
+            logger.info("%s %s failed (%s); retrying in %.1fs", method, url, exc, delay)
+        else:
+            observe_upstream_request(upstream, method, response.status_code, time.perf_counter() - started)
+            if response.status_code not in policy.retry_statuses:
+                return response
+            observe_upstream_error(upstream, f"HTTP {response.status_code}")
+            delay = _retry_after(response)
+            if delay is None:
+                delay = _backoff(policy, attempt)
+            if attempt >= policy.retries or not retryable_method or delay > policy.max_backoff_s:
+                return response
+            logger.info("%s %s returned %d; retrying in %.1fs", method, url, response.status_code, delay)
+            response.close()
+        observe_upstream_retry(upstream)
+        attempt += 1
+        time.sleep(delay)
+
+
+def request(method: str, url: str, *, upstream: str, validate_target: Callable[[str], None] | None = None,
+            **kwargs) -> requests.Response:
+    """Like ``requests.request()``, through the pooled session for ``url``'s host.
+
+    ``validate_target(url)`` runs before each retry; the caller runs it
+    before the first attempt, as it must for every redirect hop anyway.
+    """
+    method = method.upper()
+    policy = POLICIES.get(upstream, DEFAULT_POLICY)
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT_S)
+    headers = dict(kwargs.pop("headers", None) or {})
+    cache = _response_cache() if policy.cache and method == "GET" and not kwargs.get("stream") else None
+    if cache is None or "no-store" in cache_directives(headers.get("Cache-Control")):
+        return _send(upstream, policy, method, url, {**kwargs, "headers": headers}, validate_target)
+
+    prepared = requests.Request(method, url, params=kwargs.pop("params", None)).prepare()
+    entry = cache.lookup(prepared.url, headers)
+    conditional = {}
+    if entry is not None:
+        if entry.is_fresh() and "no-cache" not in cache_directives(headers.get("Cache-Control")):
+            observe_upstream_cache(upstream, "hit")
+            return entry.to_response(prepared)
+        conditional = entry.validators()
+    request_time = time.time()
+    response = _send(upstream, policy, method, prepared.url, {**kwargs, "headers": {**headers, **conditional}},
+                     validate_target)
+    if entry is not None and conditional and response.status_code == 304:
+        observe_upstream_cache(upstream, "revalidated")
+        response.close()
+        return cache.refresh(entry, response, request_time).to_response(response.request)
+    observe_upstream_cache(upstream, "miss")
+    cache.store(prepared.url, headers, response, request_time)
+    return response
+
+
+def get(url: str, *, upstream: str, **kwargs) -> requests.Response:
+    return request("GET", url, upstream=upstream, **kwargs)
+
+
+def head(url: str, *, upstream: str, **kwargs) -> requests.Response:
+    return request("HEAD", url, upstream=upstream, **kwargs)
+
+
+def post(url: str, *, upstream: str, **kwargs) -> requests.Response:
+    return request("POST", url, upstream=upstream, **kwargs)
@@ -16,6 +16,11 @@ JOB_TYPES = {
     "legacy_aws_pull",
     "obsidian_reimport",
     "tool_candidate_detect",
+    "storage_usage_reconcile",
+    "document_stats_refresh",
+    "document_analysis",
+    "llm_usage_rollup",
+    "reclean_corpus",
 }
 
 
@@ -45,6 +50,29 @@ def enqueue(
     return job
 
 
+def enqueue_recurring(session, job_type: str, *, idempotency_key: str, since: dt.datetime) -> Job:
+    """Queue a frequently scheduled job on one reusable jobs row.
+
+    enqueue() keeps every idempotency key forever, which for a job scheduled
+    every few minutes means hundreds of rows a day. Here the row under
+    ``idempotency_key`` is reset to queued once its previous run finished.
+    ``since`` is the start of the current schedule slot: a row already
+    queued at or after it, or still queued or running, is returned unchanged,
+    so a scheduler polling several times a minute runs the job once.
+    """
+    existing = session.scalars(
+        select(Job).where(Job.idempotency_key == idempotency_key).with_for_update()
+    ).one_or_none()
+    if existing is None:
+        return enqueue(session, job_type, idempotency_key=idempotency_key)
+    if existing.status in {"done", "failed", "cancelled"} and existing.available_at < since:
+        existing.status, existing.attempt, existing.available_at = "queued", 0, dt.datetime.now(dt.timezone.utc)
+        existing.result = existing.error = existing.progress = None
+        existing.started_at = existing.heartbeat_at = existing.finished_at = None
+    session.commit()
+    return existing
+
+
 def claim(session, allowed_types: set[str] | list[str] | tuple[str, ...]) -> Job | None:
     allowed_types = set(allowed_types or ())
     if not allowed_types:
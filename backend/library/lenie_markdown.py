@@ -56,21 +56,31 @@ def get_images_with_links_md(markdown_text):
     return markdown_text, extracted_images
 
 
-def links_correct(text):
-    text_new = ""
-    inside_link = False
-    i=0
-    while i < len(text):
-        if i + 7 < len(text) and text[i:i+8] == "https://":
-            inside_link = True
-            i += 8
-            text_new = text_new + "https://"
-            continue
+_LINK_END_RE = re.compile(r'[ )\]\r\n]')
+_LINK_GAP_RE = re.compile(r'[\r\n ]*')
 
-        if inside_link and (text[i] == " " or text[i] == ")" or text[i] == "]"):
-            inside_link = False
 
-        if inside_link and text[i] in ("\r", "\n", " "):
+def links_correct(text):
+    # Copies the text between link boundaries in whole runs rather than one
+    # character at a time; the per-character loop dominated
+    # clean_article_text() on long articles.
+    parts = []
+    pos = 0  # start of the run not yet copied to parts
+    scan = 0
+    while True:
+        start = text.find("https://", scan)
+        if start == -1:
+            parts.append(text[pos:])
+            return "".join(parts)
+        i = start + 8
+        while True:
+            end = _LINK_END_RE.search(text, i)
+            if end is None:
+                parts.append(text[pos:])
+                return "".join(parts)
+            i = end.start()
+            if text[i] in " )]":
+                break
             # Whitespace inside a link is usually a converter line-wrap
             # artifact and gets stripped so the URL stays intact (e.g.
             # "https://google.\ncom" -> "https://google.com"). But if what
@@ -79,21 +89,13 @@ def links_correct(text):
             # this is a real boundary (e.g. a one-per-line list of separate
             # source URLs, common in social media posts) and must be kept,
             # or consecutive links/paragraphs get silently merged together.
-            j = i
-            while j < len(text) and text[j] in ("\r", "\n", " "):
-                j += 1
-            resumes_new_url = text[j:j + 8] == "https://" or text[j:j + 7] == "http://"
-            resumes_capitalized = j < len(text) and text[j].isupper()
-            if resumes_new_url or resumes_capitalized:
-                inside_link = False
-            else:
-                i += 1
-                continue
-
-        text_new = text_new + text[i]
-        i += 1
-
-    return text_new
+            j = _LINK_GAP_RE.match(text, i).end()
+            if text.startswith(("https://", "http://"), j) or (j < len(text) and text[j].isupper()):
+                break
+            parts.append(text[pos:i])
+            i += 1
+            pos = i
+        scan = i
 
 
 def md_get_images_as_links(md_text, clean_markdown=True):
@@ -142,6 +144,9 @@ def process_markdown_and_extract_links(md_text):
     return md_text, extracted_links
 
 
+_BRACKET_OR_NEWLINE_RE = re.compile(r'[\[\]\n]')
+
+
 def md_square_brackets_in_one_line(text):
     # Niektóre konwertery HTML -> Markdown sklejają sąsiednie karty z obrazkiem:
     #   [![...](image)](article)[![...](image)](article)
@@ -149,30 +154,30 @@ def md_square_brackets_in_one_line(text):
     # granicę kart, zanim usuniemy nowe linie znajdujące się wewnątrz nawiasów.
     text = re.sub(r'\)(?=\[!\[)', ')\n\n', text)
 
-    is_in_brackets = False
-    text_new = ""
+    # Nowa linia wewnątrz nawiasów (level > 0) zamienia się w spację, chyba że
+    # wynik kończy się już spacją albo "[". Przepisujemy ciągi tekstu między
+    # nawiasami/nowymi liniami, a nie pojedyncze znaki.
+    parts = []
+    last = ""  # ostatni znak zapisany do wyniku
     level = 0
-
-    for i, char in enumerate(text):
-        if char == '[':
-            is_in_brackets = True
-            text_new += char
+    pos = 0
+    for match in _BRACKET_OR_NEWLINE_RE.finditer(text):
+        char = match.group()
+        if char == "[":
             level += 1
-            continue
-        elif char == ']':
-            text_new += char
+        elif char == "]":
             level -= 1
-            if level == 0:
-                is_in_brackets = False
-            continue
-        elif char == "\n" and is_in_brackets and level > 0:
-            if text_new and text_new[-1] not in (" ", "["):
-                text_new += " "
-            continue
-        else:
-            text_new += char
-
-    return text_new
+        elif level > 0:
+            index = match.start()
+            if index > pos:
+                parts.append(text[pos:index])
+                last = text[index - 1]
+            if last and last not in (" ", "["):
+                parts.append(" ")
+                last = " "
+            pos = index + 1
+    parts.append(text[pos:])
+    return "".join(parts)
 
 
 def md_split_for_emb(part, split_limit=200, level=0):
@@ -0,0 +1,459 @@
+"""Adaptive (AIMD) concurrency limit per LLM provider and model.
+
+Sherlock and ARK Labs throttle differently depending on the time of day, so
+no fixed worker count is right for long: 16 parallel chunk calls that are
+fine at night produce 429s and 3x latencies in the afternoon. Every
+ai_ask() call takes a slot (acquire_slot()) for its (provider, model) and
+reports how it went; the limit then follows the provider:
+
+- a healthy call (no error, latency within LATENCY_SPIKE_FACTOR of the
+  baseline for the same ai_ask() operation) adds 1/limit, i.e. about +1 per
+  limit's worth of calls;
+- a throttling error (HTTP 429, any 5xx, a timeout) halves the limit;
+- a latency spike shrinks it by LATENCY_DECREASE.
+
+Baselines are kept per operation because one model serves calls of very
+different sizes (a tag list vs. a 5000-char chunk rewrite); a spike is only
+judged once an operation has MIN_BASELINE_SAMPLES healthy calls. A
+decrease only applies to calls started after the previous decrease, so a
+burst of failures from one overloaded window counts once.
+
+Chunk analysis runs in several worker.py processes, so the window must be
+shared between processes: server.py and worker.py call use_postgres(),
+after which the limit lives in llm_concurrency_state and each call holds a
+leased llm_concurrency_slots row. Any process's /metrics then reports the
+same global state. Without use_postgres() (scripts, tests) — or for a
+minute after the database fails to answer — limits are per process.
+
+In shared mode the state row is the one point every process serialises on,
+so each process keeps its traffic to it small: an uncontended acquire is a
+single transaction; release() only queues the outcome for a background
+"keeper" thread, which applies all queued outcomes of a model under one
+state-row lock and renews the leases of the calls still running (a call
+may legitimately outlast RUNNING_LEASE; a dead process's rows do not).
+A waiting call sleeps with exponential backoff and is woken early when a
+slot of its own process is released.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import os
+import queue
+import random
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from library.db.models import LlmConcurrencySlot, LlmConcurrencyState
+
+logger = logging.getLogger(__name__)
+
+INITIAL_LIMIT = 4.0
+MIN_LIMIT = 1.0
+# Matches the highest fan-out live-tested against Sherlock (see
+# document_analysis_service.CHUNK_ANALYSIS_MAX_WORKERS).
+MAX_LIMIT = 16.0
+THROTTLE_DECREASE = 0.5
+LATENCY_DECREASE = 0.9
+LATENCY_SPIKE_FACTOR = 2.5
+MIN_BASELINE_SAMPLES = 5
+# Weight of one healthy call in an operation's latency baseline (EWMA).
+BASELINE_WEIGHT = 0.1
+
+# Shared (PostgreSQL) mode: a waiting call re-checks for a free slot after
+# POLL_MIN_SECONDS, doubling up to POLL_MAX_SECONDS (releases in the same
+# process wake it at once). Slot rows are leases: the keeper thread renews
+# running ones every RENEW_SECONDS, so RUNNING_LEASE only bounds how long a
+# process that died holding a slot keeps it.
+POLL_MIN_SECONDS = 0.25
+POLL_MAX_SECONDS = 2.0
+WAITING_LEASE = dt.timedelta(seconds=30)
+RUNNING_LEASE = dt.timedelta(minutes=2)
+RENEW_SECONDS = 30
+FALLBACK_SECONDS = 60
+
+
+def _error_status(exc: BaseException) -> int | None:
+    """HTTP status carried by an SDK (openai) or requests exception, if any."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_throttling_error(exc: BaseException) -> bool:
+    """True for errors that mean "too much load": 429, 5xx and timeouts."""
+    status = _error_status(exc)
+    if status is not None:
+        return status == 429 or 500 <= status < 600
+    return isinstance(exc, TimeoutError) or "Timeout" in type(exc).__name__
+
+
+@dataclass
+class AimdWindow:
+    """The adaptive state itself; the same rules apply locally and shared."""
+
+    limit: float = INITIAL_LIMIT
+    baselines: dict[str, dict] = field(default_factory=dict)
+    last_decrease: float = 0.0  # epoch seconds
+    throttled_total: int = 0
+
+    def record(self, *, started: float, latency_ms: float, operation: str,
+               error: BaseException | None = None) -> None:
+        if error is not None:
+            if is_throttling_error(error):
+                self.throttled_total += 1
+                self._decrease(started, THROTTLE_DECREASE)
+            # other errors (bad request, parse failures) say nothing about load
+            return
+        baseline = self.baselines.get(operation)
+        if (
+            baseline is not None
+            and baseline["n"] >= MIN_BASELINE_SAMPLES
+            and latency_ms > baseline["ms"] * LATENCY_SPIKE_FACTOR
+        ):
+            self._decrease(started, LATENCY_DECREASE)
+            return
+        if baseline is None:
+            self.baselines[operation] = {"ms": latency_ms, "n": 1}
+        else:
+            baseline["ms"] = (1 - BASELINE_WEIGHT) * baseline["ms"] + BASELINE_WEIGHT * latency_ms
+            baseline["n"] += 1
+        self.limit = min(MAX_LIMIT, self.limit + 1 / self.limit)
+
+    def _decrease(self, started: float, factor: float) -> None:
+        if started < self.last_decrease:
+            return  # this call was already in flight when the limit last dropped
+        self.limit = max(MIN_LIMIT, self.limit * factor)
+        self.last_decrease = time.time()
+
+
+class Slot:
+    """One admitted call; release() exactly once when it ends."""
+
+    def __init__(self, backend, provider: str, model: str, operation: str, token=None):
+        self.backend = backend
+        self.provider = provider
+        self.model = model
+        self.operation = operation
+        self.token = token
+        self.started = time.time()
+        self._clock = time.monotonic()
+
+    def release(self, error: BaseException | None = None) -> None:
+        latency_ms = (time.monotonic() - self._clock) * 1000
+        self.backend.release(self, latency_ms, error)
+
+
+class LocalBackend:
+    """Per-process windows guarded by a Condition."""
+
+    def __init__(self):
+        self._windows: dict[tuple[str, str], AimdWindow] = {}
+        self._in_flight: dict[tuple[str, str], int] = {}
+        self._waiting: dict[tuple[str, str], int] = {}
+        self._condition = threading.Condition()
+
+    def acquire(self, provider: str, model: str, operation: str) -> Slot:
+        key = (provider, model)
+        with self._condition:
+            window = self._windows.setdefault(key, AimdWindow())
+            self._waiting[key] = self._waiting.get(key, 0) + 1
+            try:
+                while self._in_flight.get(key, 0) >= int(window.limit):
+                    self._condition.wait()
+            finally:
+                self._waiting[key] -= 1
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        return Slot(self, provider, model, operation)
+
+    def release(self, slot: Slot, latency_ms: float, error: BaseException | None) -> None:
+        key = (slot.provider, slot.model)
+        with self._condition:
+            self._in_flight[key] -= 1
+            self._windows[key].record(
+                started=slot.started, latency_ms=latency_ms, operation=slot.operation, error=error,
+            )
+            self._condition.notify_all()
+
+    def snapshot(self) -> list[dict]:
+        with self._condition:
+            return [
+                {
+                    "provider": provider, "model": model, "limit": int(window.limit),
+                    "in_flight": self._in_flight.get((provider, model), 0),
+                    "waiting": self._waiting.get((provider, model), 0),
+                    "throttled_total": window.throttled_total,
+                }
+                for (provider, model), window in sorted(self._windows.items())
+            ]
+
+
+def _now() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+class PostgresBackend:
+    """Windows shared by every process through llm_concurrency_state/_slots.
+
+    A slot is granted to a waiting row when fewer than ``limit`` rows are
+    running and fewer than the free capacity of waiting rows are older than
+    it (FIFO across processes). Both the grant and the AIMD update happen
+    under a row lock on the state row. Database errors switch this process
+    to its LocalBackend for FALLBACK_SECONDS rather than failing LLM calls.
+
+    With ``background=False`` (tests) release() applies the outcome on the
+    caller's thread and no keeper thread is started.
+    """
+
+    def __init__(self, session_factory, local: LocalBackend, *, background: bool = True):
+        self.session_factory = session_factory
+        self.local = local
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self.background = background
+        self._fallback_until = 0.0
+        self._held: set[str] = set()
+        self._releases: queue.SimpleQueue = queue.SimpleQueue()
+        self._released = threading.Condition()
+        self._keeper: threading.Thread | None = None
+        self._keeper_lock = threading.Lock()
+
+    def acquire(self, provider: str, model: str, operation: str) -> Slot:
+        if time.monotonic() < self._fallback_until:
+            return self.local.acquire(provider, model, operation)
+        try:
+            token = self._acquire(provider, model, operation)
+        except Exception:
+            logger.exception("shared LLM concurrency limit unavailable; using a per-process limit")
+            self._fallback_until = time.monotonic() + FALLBACK_SECONDS
+            return self.local.acquire(provider, model, operation)
+        return Slot(self, provider, model, operation, token)
+
+    def _lock_state(self, session, provider: str, model: str) -> LlmConcurrencyState:
+        session.execute(insert(LlmConcurrencyState).values(
+            provider=provider, model=model, concurrency_limit=INITIAL_LIMIT,
+        ).on_conflict_do_nothing())
+        return session.execute(
+            select(LlmConcurrencyState)
+            .where(LlmConcurrencyState.provider == provider, LlmConcurrencyState.model == model)
+            .with_for_update()
+        ).scalar_one()
+
+    def _ensure_keeper(self) -> None:
+        if not self.background or self._keeper is not None:
+            return
+        with self._keeper_lock:
+            if self._keeper is None:
+                self._keeper = threading.Thread(target=self._keep, name="llm-slot-keeper", daemon=True)
+                self._keeper.start()
+
+    def _wait_for_release(self, delay: float) -> None:
+        with self._released:
+            self._released.wait(timeout=delay * random.uniform(0.8, 1.2))
+
+    def _acquire(self, provider: str, model: str, operation: str) -> str:
+        self._ensure_keeper()
+        slot_id = uuid.uuid4().hex
+        session = self.session_factory()
+        delay = POLL_MIN_SECONDS
+        try:
+            while True:
+                state = self._lock_state(session, provider, model)
+                now = _now()
+                scope = (LlmConcurrencySlot.provider == provider, LlmConcurrencySlot.model == model)
+                session.execute(delete(LlmConcurrencySlot).where(*scope, LlmConcurrencySlot.expires_at < now))
+                mine = session.get(LlmConcurrencySlot, slot_id)
+                if mine is None:  # first round, or our waiting lease lapsed (long pause) — queue
+                    mine = LlmConcurrencySlot(
+                        id=slot_id, provider=provider, model=model, state="waiting",
+                        operation=operation[:100], holder=self.holder, expires_at=now + WAITING_LEASE,
+                    )
+                    session.add(mine)
+                    session.flush()
+                running = session.scalar(
+                    select(func.count()).select_from(LlmConcurrencySlot)
+                    .where(*scope, LlmConcurrencySlot.state == "running")
+                )
+                ahead = session.scalar(
+                    select(func.count()).select_from(LlmConcurrencySlot).where(
+                        *scope, LlmConcurrencySlot.state == "waiting",
+                        LlmConcurrencySlot.created_at < mine.created_at,
+                    )
+                )
+                if running + ahead < int(state.concurrency_limit):
+                    mine.state, mine.expires_at = "running", now + RUNNING_LEASE
+                    session.commit()
+                    self._held.add(slot_id)
+                    return slot_id
+                mine.expires_at = now + WAITING_LEASE
+                session.commit()
+                self._wait_for_release(delay)
+                delay = min(delay * 2, POLL_MAX_SECONDS)
+        except BaseException:
+            session.rollback()
+            session.execute(delete(LlmConcurrencySlot).where(LlmConcurrencySlot.id == slot_id))
+            session.commit()
+            raise
+        finally:
+            session.close()
+
+    def release(self, slot: Slot, latency_ms: float, error: BaseException | None) -> None:
+        # No longer renewed from here on: if the release below fails, the row
+        # expires after RUNNING_LEASE instead of holding the slot forever.
+        self._held.discard(slot.token)
+        if not self.background:
+            self._release_batch([(slot, latency_ms, error)])
+            return
+        self._ensure_keeper()
+        self._releases.put((slot, latency_ms, error))
+
+    def _keep(self) -> None:
+        """Keeper thread: apply queued releases in batches, renew running leases."""
+        renewed = time.monotonic()
+        while True:
+            try:
+                batch = [self._releases.get(timeout=RENEW_SECONDS)]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(self._releases.get_nowait())
+                except queue.Empty:
+                    break
+            if batch:
+                self._release_batch(batch)
+            if time.monotonic() - renewed >= RENEW_SECONDS:
+                self._renew_leases()
+                renewed = time.monotonic()
+
+    def _release_batch(self, batch: list[tuple[Slot, float, BaseException | None]]) -> None:
+        by_window: dict[tuple[str, str], list] = {}
+        for item in batch:
+            by_window.setdefault((item[0].provider, item[0].model), []).append(item)
+        session = None
+        try:
+            session = self.session_factory()
+            # Sorted, so two processes locking several state rows cannot deadlock.
+            for (provider, model), items in sorted(by_window.items()):
+                state = self._lock_state(session, provider, model)
+                window = AimdWindow(
+                    limit=state.concurrency_limit, baselines=dict(state.baselines or {}),
+                    last_decrease=state.last_decrease_at.timestamp() if state.last_decrease_at else 0.0,
+                    throttled_total=state.throttled_total,
+                )
+                for slot, latency_ms, error in items:
+                    window.record(started=slot.started, latency_ms=latency_ms, operation=slot.operation, error=error)
+                session.execute(
+                    update(LlmConcurrencyState)
+                    .where(LlmConcurrencyState.provider == provider, LlmConcurrencyState.model == model)
+                    .values(
+                        concurrency_limit=window.limit, baselines=window.baselines,
+                        last_decrease_at=(
+                            dt.datetime.fromtimestamp(window.last_decrease, dt.timezone.utc)
+                            if window.last_decrease else None
+                        ),
+                        throttled_total=window.throttled_total, updated_at=func.now(),
+                    )
+                )
+                session.execute(delete(LlmConcurrencySlot).where(
+                    LlmConcurrencySlot.id.in_([slot.token for slot, _, _ in items])
+                ))
+            session.commit()
+        except (SystemExit, Exception):
+            # The slot rows simply expire; the windows miss these samples.
+            logger.exception("Could not release %d shared LLM slot(s)", len(batch))
+            if session is not None:
+                session.rollback()
+        finally:
+            if session is not None:
+                session.close()
+        with self._released:
+            self._released.notify_all()
+
+    def _renew_leases(self) -> None:
+        held = list(self._held)
+        if not held:
+            return
+        session = None
+        try:
+            session = self.session_factory()
+            session.execute(
+                update(LlmConcurrencySlot)
+                .where(LlmConcurrencySlot.id.in_(held), LlmConcurrencySlot.state == "running")
+                .values(expires_at=_now() + RUNNING_LEASE)
+            )
+            session.commit()
+        except (SystemExit, Exception):
+            logger.exception("Could not renew %d shared LLM slot lease(s)", len(held))
+            if session is not None:
+                session.rollback()
+        finally:
+            if session is not None:
+                session.close()
+
+    def snapshot(self) -> list[dict]:
+        session = self.session_factory()
+        try:
+            now = _now()
+            counts = {
+                (provider, model, state): count
+                for provider, model, state, count in session.execute(
+                    select(LlmConcurrencySlot.provider, LlmConcurrencySlot.model, LlmConcurrencySlot.state,
+                           func.count())
+                    .where(LlmConcurrencySlot.expires_at >= now)
+                    .group_by(LlmConcurrencySlot.provider, LlmConcurrencySlot.model, LlmConcurrencySlot.state)
+                )
+            }
+            return [
+                {
+                    "provider": row.provider, "model": row.model, "limit": int(row.concurrency_limit),
+                    "in_flight": counts.get((row.provider, row.model, "running"), 0),
+                    "waiting": counts.get((row.provider, row.model, "waiting"), 0),
+                    "throttled_total": row.throttled_total,
+                }
+                for row in session.scalars(
+                    select(LlmConcurrencyState).order_by(LlmConcurrencyState.provider, LlmConcurrencyState.model)
+                )
+            ]
+        finally:
+            session.close()
+
+
+_local = LocalBackend()
+_backend: LocalBackend | PostgresBackend = _local
+
+
+def use_postgres(session_factory=None) -> None:
+    """Share limits between processes from now on (server.py, worker.py)."""
+    global _backend
+    if session_factory is None:
+        from library.db.engine import get_session
+
+        session_factory = get_session
+    _backend = PostgresBackend(session_factory, _local)
+
+
+def use_local() -> None:
+    global _backend
+    _backend = _local
+
+
+def acquire_slot(provider: str, model: str, operation: str = "ai_ask") -> Slot:
+    """Block until the (provider, model) window admits another call."""
+    return _backend.acquire(provider, model, operation)
+
+
+def limiter_snapshot() -> list[dict]:
+    """Per provider/model: limit, in_flight, waiting, throttled_total."""
+    try:
+        return _backend.snapshot()
+    except Exception:
+        logger.exception("LLM concurrency snapshot failed; reporting this process only")
+        return _local.snapshot()
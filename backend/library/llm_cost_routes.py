@@ -1,12 +1,13 @@
-"""HTTP reporting API for LLM usage costs."""
+"""HTTP reporting API for LLM usage costs (read from library/llm_usage/rollup.py)."""
 
 from datetime import date, datetime, time, timedelta
 
 from flask import Blueprint, jsonify, request
-from sqlalchemy import func, select
+from sqlalchemy import BigInteger, cast, func, select
 
 from library.db.engine import get_scoped_session
 from library.db.models import Document, DocumentAnalysisJob, LlmUsageLog
+from library.llm_usage.rollup import usage_rows
 
 bp = Blueprint("llm_costs", __name__)
 
@@ -37,65 +38,53 @@ def llm_costs():
     except ValueError as exc:
         return jsonify({"status": "error", "message": str(exc)}), 400
 
-    filters = []
+    start = end = None
     if date_from is not None and date_to is not None:
         start = datetime.combine(date_from, time.min)
         end = datetime.combine(date_to + timedelta(days=1), time.min)
-        filters.extend([LlmUsageLog.called_at >= start, LlmUsageLog.called_at < end])
-    if document_id is not None:
-        filters.append(LlmUsageLog.document_id == document_id)
 
     session = get_scoped_session()
+    # Rollups up to the watermarks, raw llm_usage_logs only after them.
+    usage = usage_rows(session, start=start, end=end, document_id=document_id)
+    calls_sum = func.sum(usage.c.calls).label("calls")
+    tokens_sum = cast(func.coalesce(func.sum(usage.c.tokens), 0), BigInteger).label("tokens")
+    cost_sum = func.sum(usage.c.cost_amount)
+    unknown_sum = cast(func.sum(usage.c.unknown_calls), BigInteger).label("unknown_calls")
     totals = session.execute(
-        select(
-            LlmUsageLog.cost_currency,
-            func.count().label("calls"),
-            func.coalesce(func.sum(LlmUsageLog.total_tokens), 0).label("tokens"),
-            func.sum(LlmUsageLog.cost_amount).label("cost"),
-            func.count().filter(LlmUsageLog.cost_status == "unknown").label("unknown_calls"),
-        ).where(*filters).group_by(LlmUsageLog.cost_currency)
+        select(usage.c.cost_currency, calls_sum, tokens_sum, cost_sum.label("cost"), unknown_sum)
+        .group_by(usage.c.cost_currency)
     ).all()
-    day = func.date(LlmUsageLog.called_at).label("day")
+    day = func.date(usage.c.bucket_start).label("day")
     daily = session.execute(
-        select(day, LlmUsageLog.cost_currency, func.count().label("calls"),
-               func.coalesce(func.sum(LlmUsageLog.total_tokens), 0).label("tokens"),
-               func.sum(LlmUsageLog.cost_amount).label("cost"))
-        .where(*filters).group_by(day, LlmUsageLog.cost_currency).order_by(day)
+        select(day, usage.c.cost_currency, calls_sum, tokens_sum, cost_sum.label("cost"))
+        .group_by(day, usage.c.cost_currency).order_by(day)
     ).all()
     operations = session.execute(
-        select(LlmUsageLog.operation, LlmUsageLog.model, LlmUsageLog.cost_currency,
-               func.count().label("calls"), func.coalesce(func.sum(LlmUsageLog.total_tokens), 0).label("tokens"),
-               func.sum(LlmUsageLog.cost_amount).label("cost"))
-        .where(*filters).group_by(LlmUsageLog.operation, LlmUsageLog.model, LlmUsageLog.cost_currency)
-        .order_by(func.sum(LlmUsageLog.cost_amount).desc().nullslast())
+        select(usage.c.operation, usage.c.model, usage.c.cost_currency, calls_sum, tokens_sum, cost_sum.label("cost"))
+        .group_by(usage.c.operation, usage.c.model, usage.c.cost_currency)
+        .order_by(cost_sum.desc().nullslast())
     ).all()
     documents = session.execute(
-        select(
-            LlmUsageLog.document_id,
-            Document.title,
-            LlmUsageLog.cost_currency,
-            func.count().label("calls"),
-            func.coalesce(func.sum(LlmUsageLog.total_tokens), 0).label("tokens"),
-            func.sum(LlmUsageLog.cost_amount).label("cost"),
-            func.count().filter(LlmUsageLog.cost_status == "unknown").label("unknown_calls"),
-        )
-        .outerjoin(Document, LlmUsageLog.document_id == Document.id)
-        .where(*filters)
-        .group_by(LlmUsageLog.document_id, Document.title, LlmUsageLog.cost_currency)
-        .order_by(func.sum(LlmUsageLog.cost_amount).desc().nullslast(), LlmUsageLog.document_id)
+        select(usage.c.document_id, Document.title, usage.c.cost_currency, calls_sum, tokens_sum,
+               cost_sum.label("cost"), unknown_sum)
+        .outerjoin(Document, usage.c.document_id == Document.id)
+        .group_by(usage.c.document_id, Document.title, usage.c.cost_currency)
+        .order_by(cost_sum.desc().nullslast(), usage.c.document_id)
     ).all()
+    started_at = func.min(usage.c.first_called_at)
     jobs = session.execute(
-        select(LlmUsageLog.analysis_job_id, DocumentAnalysisJob.run_id, LlmUsageLog.cost_currency,
-               func.min(LlmUsageLog.called_at).label("started_at"), func.count().label("calls"),
-               func.coalesce(func.sum(LlmUsageLog.total_tokens), 0).label("tokens"),
-               func.sum(LlmUsageLog.cost_amount).label("cost"))
-        .outerjoin(DocumentAnalysisJob, LlmUsageLog.analysis_job_id == DocumentAnalysisJob.id)
-        .where(*filters, LlmUsageLog.analysis_job_id.isnot(None))
-        .group_by(LlmUsageLog.analysis_job_id, DocumentAnalysisJob.run_id, LlmUsageLog.cost_currency)
-        .order_by(func.min(LlmUsageLog.called_at).desc())
+        select(usage.c.analysis_job_id, DocumentAnalysisJob.run_id, usage.c.cost_currency,
+               started_at.label("started_at"), calls_sum, tokens_sum, cost_sum.label("cost"))
+        .outerjoin(DocumentAnalysisJob, usage.c.analysis_job_id == DocumentAnalysisJob.id)
+        .where(usage.c.analysis_job_id.isnot(None))
+        .group_by(usage.c.analysis_job_id, DocumentAnalysisJob.run_id, usage.c.cost_currency)
+        .order_by(started_at.desc())
     ).all()
     calls = []
     if document_id is not None:
+        filters = [LlmUsageLog.document_id == document_id]
+        if start is not None:
+            filters.extend([LlmUsageLog.called_at >= start, LlmUsageLog.called_at < end])
         calls = session.scalars(
             select(LlmUsageLog).where(*filters).order_by(LlmUsageLog.called_at.desc()).limit(1000)
         ).all()
@@ -6,7 +6,8 @@ never compute costs themselves — they receive the returned ``UsageRecord``
 summary (stage 3 wires this into ``ai.py``).
 
 Writes use their own short-lived session, independent of any business
-transaction: a database failure is logged and swallowed, because usage
+transaction (or, in the server and worker, the batched background writer
+of ``writer.py``): a database failure is logged and swallowed, because usage
 accounting must never break the operation that triggered the LLM call.
 Provider-reported data (token counts) is sanitized, not validated — a
 malformed value from the API becomes NULL with a warning. Money arguments
@@ -30,6 +31,8 @@ from library.llm_usage.pricing import (
     PricingMode,
     estimate_cost,
 )
+from library.llm_usage.writer import active_writer
+from library.metrics import observe_llm_call
 
 logger = logging.getLogger(__name__)
 
@@ -154,11 +157,19 @@ def record_llm_usage(
     total = _sanitize_tokens("total_tokens", total_tokens)
     if total is None and (prompt is not None or completion is not None):
         total = (prompt or 0) + (completion or 0)
+    observe_llm_call(
+        provider=provider, model=model, operation=operation, success=success,
+        latency_ms=latency_ms, prompt_tokens=prompt, completion_tokens=completion,
+    )
 
+    writer = active_writer()
     session = None
     try:
-        session = session_factory()
-        pricing = _active_pricing(session, provider, model)
+        if writer is not None:
+            pricing = writer.pricing(provider, model)
+        else:
+            session = session_factory()
+            pricing = _active_pricing(session, provider, model)
         cost = _resolve_cost(pricing, reported, reported_cost_currency, prompt, completion)
 
         from library.llm_usage.context import current_usage_context
@@ -167,7 +178,7 @@ def record_llm_usage(
         analysis_job_id = analysis_job_id if analysis_job_id is not None else context_job_id
         analysis_run_id = analysis_run_id if analysis_run_id is not None else context_run_id
 
-        log = LlmUsageLog(
+        row = dict(
             request_id=request_id,
             search_interpretation_log_id=search_interpretation_log_id,
             document_id=document_id,
@@ -192,10 +203,15 @@ def record_llm_usage(
             error_code=error_code,
             latency_ms=latency_ms,
         )
-        session.add(log)
-        session.commit()
+        if writer is not None:
+            usage_log_id = writer.submit(row)
+        else:
+            log = LlmUsageLog(**row)
+            session.add(log)
+            session.commit()
+            usage_log_id = log.id
         return UsageRecord(
-            usage_log_id=log.id,
+            usage_log_id=usage_log_id,
             cost=cost,
             prompt_tokens=prompt,
             completion_tokens=completion,
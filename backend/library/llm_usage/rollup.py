@@ -0,0 +1,201 @@
+"""Hourly and daily rollups of llm_usage_logs for the cost reports.
+
+/llm_costs used to aggregate raw llm_usage_logs rows on every request, and
+that table grows with every embedding batch and chunk call. The
+llm_usage_rollup job (scheduled every 5 minutes by worker.scheduler) keeps
+llm_usage_rollups up to date instead:
+
+- an hour is rolled up from raw rows once it ended ``CLOSE_GRACE`` ago, so
+  rows written late (the batched writer, long transactions) are included;
+- a day is rolled up from its hourly rows once all its hours are in;
+- each period has a watermark (llm_usage_rollup_watermarks): everything
+  before it is in the rollups, nothing after it is.
+
+Closed buckets are recomputed, never incremented, so a job that fails
+halfway or runs twice leaves the same rows. ``usage_rows()`` combines daily
+rollups, hourly rollups after the daily watermark and raw rows after the
+hourly one, so a report only scans raw rows for the last hour or so.
+"""
+
+import datetime as dt
+import logging
+
+from sqlalchemy import BigInteger, case, cast, delete, func, insert, literal, select, union_all
+
+from library.db.models import LlmUsageLog, LlmUsageRollup, LlmUsageRollupWatermark
+
+logger = logging.getLogger(__name__)
+
+CLOSE_GRACE = dt.timedelta(minutes=10)
+# Bounds the first backfill transaction; later runs catch up a week at a time.
+MAX_HOURS_PER_RUN = 24 * 7
+# Hourly rows are only read after the daily watermark; older ones are kept
+# this long for ad-hoc analysis and then dropped.
+HOURLY_RETENTION = dt.timedelta(days=35)
+
+_DIMENSIONS = ("provider", "model", "operation", "document_id", "analysis_job_id", "cost_currency")
+_COLUMNS = ("period", "bucket_start", *_DIMENSIONS, "calls", "unknown_calls", "tokens", "cost_amount", "first_called_at")
+
+
+def _hour(value: dt.datetime) -> dt.datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _day(value: dt.datetime) -> dt.datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def load_watermarks(session) -> dict[str, dt.datetime]:
+    return dict(session.execute(
+        select(LlmUsageRollupWatermark.period, LlmUsageRollupWatermark.rolled_up_until)
+    ).all())
+
+
+def _set_watermark(session, period: str, until: dt.datetime) -> None:
+    watermark = session.get(LlmUsageRollupWatermark, period)
+    if watermark is None:
+        session.add(LlmUsageRollupWatermark(period=period, rolled_up_until=until))
+    else:
+        watermark.rolled_up_until = until
+
+
+def _roll_up_hours(session, start: dt.datetime, end: dt.datetime) -> None:
+    log = LlmUsageLog
+    bucket = func.date_trunc("hour", log.called_at)
+    dimensions = [getattr(log, name) for name in _DIMENSIONS]
+    source = (
+        select(
+            literal("hour"), bucket, *dimensions,
+            func.count(),
+            func.count().filter(log.cost_status == "unknown"),
+            func.coalesce(func.sum(log.total_tokens), 0),
+            func.sum(log.cost_amount),
+            func.min(log.called_at),
+        )
+        .where(log.called_at >= start, log.called_at < end)
+        .group_by(bucket, *dimensions)
+    )
+    session.execute(delete(LlmUsageRollup).where(
+        LlmUsageRollup.period == "hour", LlmUsageRollup.bucket_start >= start, LlmUsageRollup.bucket_start < end,
+    ))
+    session.execute(insert(LlmUsageRollup).from_select(_COLUMNS, source))
+
+
+def _roll_up_days(session, start: dt.datetime, end: dt.datetime) -> None:
+    hourly = LlmUsageRollup
+    bucket = func.date_trunc("day", hourly.bucket_start)
+    dimensions = [getattr(hourly, name) for name in _DIMENSIONS]
+    source = (
+        select(
+            literal("day"), bucket, *dimensions,
+            func.sum(hourly.calls), func.sum(hourly.unknown_calls), func.sum(hourly.tokens),
+            func.sum(hourly.cost_amount), func.min(hourly.first_called_at),
+        )
+        .where(hourly.period == "hour", hourly.bucket_start >= start, hourly.bucket_start < end)
+        .group_by(bucket, *dimensions)
+    )
+    session.execute(delete(LlmUsageRollup).where(
+        LlmUsageRollup.period == "day", LlmUsageRollup.bucket_start >= start, LlmUsageRollup.bucket_start < end,
+    ))
+    session.execute(insert(LlmUsageRollup).from_select(_COLUMNS, source))
+
+
+def refresh_rollups(session, now: dt.datetime | None = None) -> dict:
+    """Roll up every closed hour and day after the watermarks, in one transaction.
+
+    ``now`` defaults to the database clock, the same one that stamps
+    ``called_at``.
+    """
+    now = now or session.scalar(select(func.localtimestamp()))
+    watermarks = load_watermarks(session)
+    hour_from = watermarks.get("hour")
+    if hour_from is None:
+        first_call = session.scalar(select(func.min(LlmUsageLog.called_at)))
+        if first_call is None:
+            return {"hours": 0, "days": 0}
+        hour_from = _hour(first_call)
+    hour_to = min(_hour(now - CLOSE_GRACE), hour_from + dt.timedelta(hours=MAX_HOURS_PER_RUN))
+    hours = max(int((hour_to - hour_from) / dt.timedelta(hours=1)), 0)
+    if hours:
+        _roll_up_hours(session, hour_from, hour_to)
+        _set_watermark(session, "hour", hour_to)
+    hour_until = max(hour_from, hour_to)
+
+    day_from = watermarks.get("day")
+    if day_from is None:
+        first_hour = session.scalar(select(func.min(LlmUsageRollup.bucket_start)).where(LlmUsageRollup.period == "hour"))
+        day_from = _day(first_hour or hour_from)
+    day_to = _day(hour_until)
+    days = max((day_to - day_from).days, 0)
+    if days:
+        _roll_up_days(session, day_from, day_to)
+        _set_watermark(session, "day", day_to)
+        session.execute(delete(LlmUsageRollup).where(
+            LlmUsageRollup.period == "hour", LlmUsageRollup.bucket_start < day_to - HOURLY_RETENTION,
+        ))
+    session.commit()
+    logger.info("LLM usage rollup: %d hours, %d days (hourly up to %s)", hours, days, hour_until)
+    return {"hours": hours, "days": days, "rolled_up_until": hour_until.isoformat()}
+
+
+def execute_llm_usage_rollup(session, job) -> dict:
+    """worker.py entry point for the llm_usage_rollup job type."""
+    return refresh_rollups(session)
+
+
+def usage_rows(session, *, start: dt.datetime | None = None, end: dt.datetime | None = None,
+               document_id: int | None = None):
+    """Usage in [start, end) as a subquery over rollups plus the raw tail.
+
+    Columns: bucket_start, the rollup dimensions, calls, unknown_calls,
+    tokens, cost_amount and first_called_at. A raw row is a bucket of one
+    call. ``start``/``end`` must be day-aligned (report filters are dates)
+    so that no rollup bucket straddles them.
+    """
+    watermarks = load_watermarks(session)
+    day_until = watermarks.get("day")
+    hour_until = watermarks.get("hour")
+
+    def _filters(bucket, doc_column):
+        conditions = []
+        if start is not None:
+            conditions.append(bucket >= start)
+        if end is not None:
+            conditions.append(bucket < end)
+        if document_id is not None:
+            conditions.append(doc_column == document_id)
+        return conditions
+
+    rollup = LlmUsageRollup
+    rollup_columns = [
+        rollup.bucket_start, *(getattr(rollup, name) for name in _DIMENSIONS),
+        rollup.calls, rollup.unknown_calls, rollup.tokens, rollup.cost_amount, rollup.first_called_at,
+    ]
+    parts = []
+    if day_until is not None:
+        parts.append(select(*rollup_columns).where(
+            rollup.period == "day", rollup.bucket_start < day_until,
+            *_filters(rollup.bucket_start, rollup.document_id),
+        ))
+    if hour_until is not None:
+        hourly = select(*rollup_columns).where(
+            rollup.period == "hour", rollup.bucket_start < hour_until,
+            *_filters(rollup.bucket_start, rollup.document_id),
+        )
+        if day_until is not None:
+            hourly = hourly.where(rollup.bucket_start >= day_until)
+        parts.append(hourly)
+
+    log = LlmUsageLog
+    raw = select(
+        log.called_at.label("bucket_start"), *(getattr(log, name) for name in _DIMENSIONS),
+        literal(1).label("calls"),
+        case((log.cost_status == "unknown", 1), else_=0).label("unknown_calls"),
+        cast(func.coalesce(log.total_tokens, 0), BigInteger).label("tokens"),
+        log.cost_amount,
+        log.called_at.label("first_called_at"),
+    ).where(*_filters(log.called_at, log.document_id))
+    if hour_until is not None:
+        raw = raw.where(log.called_at >= hour_until)
+    parts.append(raw)
+    return union_all(*parts).subquery("usage") if len(parts) > 1 else raw.subquery("usage")
@@ -0,0 +1,238 @@
+"""Background, batched write path for llm_usage_logs.
+
+``record_llm_usage()`` used to open a session, look up the active price and
+commit one row on the calling thread — for every LLM call, including each
+of the concurrent chunk-analysis threads. With the writer enabled
+(``enable_usage_writer()``, called by server.py and worker.py only) the call
+costs a dictionary lookup and a list append instead:
+
+- active prices are cached per process and reloaded every
+  ``PRICING_TTL_S`` seconds, so the returned cost is still computed from
+  the price list at call time;
+- row ids are reserved from the ``llm_usage_logs`` sequence in blocks of
+  ``ID_BLOCK``, so ``UsageRecord.usage_log_id`` stays available at once;
+- a daemon thread inserts the buffered rows every ``FLUSH_ROWS`` rows or
+  ``FLUSH_INTERVAL_S`` seconds, whichever comes first, and once more at
+  interpreter exit.
+
+The recorder's guarantee is unchanged: a database failure is logged with
+the number of rows lost and never reaches the LLM call. ``called_at`` is
+the insert time, at most one flush interval after the call.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import insert, select, text
+
+from library.db.engine import get_session
+from library.db.models import LlmPricing, LlmUsageLog
+
+logger = logging.getLogger(__name__)
+
+FLUSH_ROWS = 50
+FLUSH_INTERVAL_S = 0.5
+PRICING_TTL_S = 300.0
+# After a failed price load, try again this soon instead of after a full TTL.
+PRICING_RETRY_S = 30.0
+ID_BLOCK = 100
+# Rows buffered while the database is unreachable; beyond this they are dropped.
+MAX_PENDING = 10_000
+
+
+@dataclass(frozen=True)
+class PricingSnapshot:
+    """Detached copy of the active llm_pricing row the cost is computed from."""
+
+    pricing_mode: str
+    pricing_version: str
+    input_price_per_million: Decimal | None
+    output_price_per_million: Decimal | None
+    currency: str
+
+
+class UsageWriter:
+    def __init__(
+        self,
+        session_factory=get_session,
+        *,
+        flush_rows: int = FLUSH_ROWS,
+        flush_interval_s: float = FLUSH_INTERVAL_S,
+        pricing_ttl_s: float = PRICING_TTL_S,
+        id_block: int = ID_BLOCK,
+        start: bool = True,
+    ):
+        self.session_factory = session_factory
+        self.flush_rows = flush_rows
+        self.flush_interval_s = flush_interval_s
+        self.pricing_ttl_s = pricing_ttl_s
+        self.id_block = id_block
+        self._cond = threading.Condition()
+        self._rows: list[dict] = []
+        self._closed = False
+        self._pricing_lock = threading.Lock()
+        self._pricing: dict[tuple[str, str], PricingSnapshot] = {}
+        self._pricing_expires = 0.0
+        self._id_lock = threading.Lock()
+        self._ids: deque[int] = deque()
+        self._thread = None
+        if start:
+            self._thread = threading.Thread(target=self._run, name="llm-usage-writer", daemon=True)
+            self._thread.start()
+
+    # -- called on the LLM caller's thread ---------------------------------
+
+    def pricing(self, provider: str, model: str) -> PricingSnapshot | None:
+        with self._pricing_lock:
+            now = time.monotonic()
+            if now >= self._pricing_expires:
+                self._reload_pricing(now)
+            return self._pricing.get((provider, model))
+
+    def submit(self, row: dict) -> int | None:
+        """Buffer one llm_usage_logs row; return its id when one was reserved."""
+        usage_log_id = self._next_id()
+        if usage_log_id is not None:
+            row = {**row, "id": usage_log_id}
+        with self._cond:
+            if len(self._rows) >= MAX_PENDING:
+                logger.error(
+                    "LLM usage buffer full (%d rows); dropping usage of %s/%s",
+                    MAX_PENDING, row.get("provider"), row.get("model"),
+                )
+                return None
+            self._rows.append(row)
+            if len(self._rows) >= self.flush_rows:
+                self._cond.notify()
+        return usage_log_id
+
+    # -- database ------------------------------------------------------------
+
+    def _reload_pricing(self, now: float) -> None:
+        session = None
+        try:
+            session = self.session_factory()
+            rows = session.execute(select(LlmPricing).where(LlmPricing.effective_to.is_(None))).scalars().all()
+            self._pricing = {
+                (row.provider, row.model): PricingSnapshot(
+                    pricing_mode=row.pricing_mode,
+                    pricing_version=row.pricing_version,
+                    input_price_per_million=row.input_price_per_million,
+                    output_price_per_million=row.output_price_per_million,
+                    currency=row.currency,
+                )
+                for row in rows
+            }
+            self._pricing_expires = now + self.pricing_ttl_s
+        except (SystemExit, Exception):
+            # Keep the previous prices; rows written meanwhile may be 'unknown'.
+            logger.exception("Could not load LLM pricing; retrying in %.0fs", PRICING_RETRY_S)
+            self._pricing_expires = now + PRICING_RETRY_S
+        finally:
+            if session is not None:
+                session.close()
+
+    def _next_id(self) -> int | None:
+        with self._id_lock:
+            if not self._ids:
+                session = None
+                try:
+                    session = self.session_factory()
+                    self._ids.extend(session.execute(
+                        text("SELECT nextval('llm_usage_logs_id_seq') FROM generate_series(1, :n)"),
+                        {"n": self.id_block},
+                    ).scalars())
+                except (SystemExit, Exception):
+                    # The row is still written; the database assigns its id.
+                    logger.exception("Could not reserve llm_usage_logs ids")
+                finally:
+                    if session is not None:
+                        session.close()
+            return self._ids.popleft() if self._ids else None
+
+    def _write(self, rows: list[dict]) -> None:
+        # executemany needs the same columns in every row: rows that got no
+        # reserved id go in a separate statement.
+        for batch in ([r for r in rows if "id" in r], [r for r in rows if "id" not in r]):
+            if not batch:
+                continue
+            session = None
+            try:
+                session = self.session_factory()
+                session.execute(insert(LlmUsageLog), batch)
+                session.commit()
+            except (SystemExit, Exception):
+                logger.exception("Failed to write %d llm_usage_logs rows; they are lost", len(batch))
+                if session is not None:
+                    try:
+                        session.rollback()
+                    except Exception:
+                        logger.exception("Rollback after failed usage write also failed")
+            finally:
+                if session is not None:
+                    try:
+                        session.close()
+                    except Exception:
+                        logger.exception("Closing usage-writer session failed")
+
+    # -- flushing ------------------------------------------------------------
+
+    def _take(self) -> list[dict]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if len(self._rows) < self.flush_rows and not self._closed:
+                    self._cond.wait(self.flush_interval_s)
+                rows = self._take()
+                closed = self._closed
+            if rows:
+                self._write(rows)
+            if closed:
+                return
+
+    def flush(self) -> None:
+        """Write everything buffered so far on the calling thread."""
+        with self._cond:
+            rows = self._take()
+        if rows:
+            self._write(rows)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the flush thread after a final flush (registered with atexit)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+
+_writer: UsageWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def enable_usage_writer() -> UsageWriter:
+    """Route record_llm_usage() through a background writer in this process.
+
+    Called by the long-running processes (server.py, worker.py). Scripts
+    and tests keep the synchronous path, where each call commits its row
+    before returning.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = UsageWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+
+def active_writer() -> UsageWriter | None:
+    return _writer
@@ -6,26 +6,23 @@ geocoder hit is NOT proof: rare Polish exonyms fuzzy-match to wrong places
 so every hit goes through is_plausible_match() before it counts as resolved.
 
 Free tier limits: 5000 req/day, 2 req/s — callers cache results in
-geocode_cache (library/place_verification.py) and this module sleeps between
-consecutive requests. API key from config (LOCATIONIQ_API_KEY, in Vault).
+geocode_cache (library/place_verification.py) and the "locationiq" upstream
+policy in library/http spaces consecutive requests. API key from config (LOCATIONIQ_API_KEY, in Vault).
 """
 
 import logging
-import time
 import unicodedata
 from difflib import SequenceMatcher
 
 import requests
 
+from library import http
+
 logger = logging.getLogger(__name__)
 
 SEARCH_URL = "https://us1.locationiq.com/v1/search"
 REQUEST_TIMEOUT_S = 15
 
-# Free tier: 2 req/s. 0.6s spacing keeps a safety margin.
-MIN_REQUEST_INTERVAL_S = 0.6
-_last_request_at = 0.0
-
 # Minimal similarity between the query and the best token run of display_name
 # for a hit to count as the place we asked about ("Cieśnina Ormuz" vs
 # "Płytka Cieśnina, Iława" scores well below this).
@@ -108,18 +105,11 @@ def geocode(query: str) -> dict | None:
     Rate-limited to the free-tier request spacing. Callers must cache results
     (geocode_cache) — this function performs a live API call every time.
     """
-    global _last_request_at
-
     key = _api_key()
     if not key:
         logger.warning("LOCATIONIQ_API_KEY not configured — place verification disabled")
         return None
 
-    wait = MIN_REQUEST_INTERVAL_S - (time.monotonic() - _last_request_at)
-    if wait > 0:
-        time.sleep(wait)
-    _last_request_at = time.monotonic()
-
     try:
         # accept-language=pl: without it display_name comes back in English
         # ("Kyiv, Ukraine"), which made the name-similarity check reject the
@@ -127,8 +117,9 @@ def geocode(query: str) -> dict | None:
         from library.external_service_events import observed_request
         resp = observed_request(
             service="locationiq", operation="geocode",
-            request_fn=lambda: requests.get(
+            request_fn=lambda: http.get(
                 SEARCH_URL,
+                upstream="locationiq",
                 params={"key": key, "q": query, "format": "json", "limit": 1, "accept-language": "pl,en"},
                 timeout=REQUEST_TIMEOUT_S,
             ),
@@ -0,0 +1,396 @@
+"""In-process Prometheus metrics for the API server and the jobs worker.
+
+The text format is written by hand, like the original ``/metrics`` view, so
+no client library is needed. Each process keeps its own counters and
+histograms; ``render()`` returns them in Prometheus text format along with
+gauges read at scrape time (connection pool, job queue, LLM limiter).
+
+Recording functions (``observe_*``) never raise: metrics must not break the
+request, query or LLM call they describe.
+
+Instrumented paths:
+
+- HTTP requests: ``observe_request()`` from the Flask hooks in server.py,
+  labelled by the route template (never the raw path) to bound cardinality.
+- SQL: ``instrument_engine()`` times every cursor execute through
+  SQLAlchemy engine events and exposes pool gauges; the pool class in
+  ``library/db/engine.py`` reports checkout waits (``observe_pool_wait()``).
+- LLM and embedding calls: ``observe_llm_call()`` from
+  ``library/llm_usage/recorder.py`` — the single write path for usage.
+- NER windows: ``observe_ner_window()`` from ``library/ner_client.py``.
+- Outbound HTTP: ``observe_upstream_*()`` from ``library/http/client.py``,
+  labelled by the logical upstream (``feeds``, ``wikidata``, ...), never
+  the host, since webpages and feeds reach thousands of them.
+- Jobs: queue depth and age from the ``jobs`` table at scrape time, and run
+  times from the worker loop.
+"""
+
+import datetime as dt
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Seconds. Spans fast queries up to slow LLM calls and multi-minute jobs.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# Seconds waited for a pooled connection: usually zero, seconds when exhausted.
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+JOB_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+_SQL_VERBS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"})
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key: tuple, value) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, observed = self._values.get(key, ((0,) * len(self.buckets), 0.0, 0))
+            counts = tuple(count + (value <= bound) for count, bound in zip(counts, self.buckets))
+            self._values[key] = (counts, total + value, observed + 1)
+
+    def _samples(self, key: tuple, value) -> list[str]:
+        counts, total, observed = value
+        labels = _format_labels(self.labelnames, key)
+        lines = [
+            f"{self.name}_bucket{_format_labels(self.labelnames, key, _le(bound))} {count}"
+            for bound, count in zip(self.buckets, counts)
+        ]
+        lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, _le(float('inf')))} {observed}")
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {observed}")
+        return lines
+
+
+def _le(bound: float) -> str:
+    return f'le="{_format_value(bound)}"'
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "lenie_http_request_duration_seconds", "HTTP request latency by route template",
+    ("route", "method", "status"),
+)
+DB_QUERY_SECONDS = Histogram(
+    "lenie_db_query_duration_seconds", "SQL statement execution time by statement verb", ("verb",),
+)
+DB_ERRORS = Counter("lenie_db_errors_total", "SQL statements that raised a DBAPI error", ("verb",))
+DB_POOL_CHECKED_OUT = Gauge(
+    "lenie_db_pool_checked_out", "Connections currently checked out of the pool", ("pool",),
+)
+DB_POOL_SIZE = Gauge("lenie_db_pool_size", "Configured pool size", ("pool",))
+DB_POOL_OVERFLOW = Gauge("lenie_db_pool_overflow", "Connections opened above the pool size", ("pool",))
+DB_POOL_WAIT_SECONDS = Histogram(
+    "lenie_db_pool_wait_seconds", "Time spent waiting to check a connection out of the pool", ("pool",),
+    buckets=POOL_WAIT_BUCKETS,
+)
+LLM_CALL_SECONDS = Histogram(
+    "lenie_llm_call_duration_seconds", "LLM and embedding call latency",
+    ("provider", "model", "operation"),
+)
+LLM_CALLS = Counter(
+    "lenie_llm_calls_total", "LLM and embedding calls by outcome",
+    ("provider", "model", "operation", "outcome"),
+)
+LLM_TOKENS = Counter(
+    "lenie_llm_tokens_total", "Tokens reported by the provider", ("provider", "model", "kind"),
+)
+NER_WINDOW_SECONDS = Histogram(
+    "lenie_ner_window_duration_seconds", "NER service time per text window", ("outcome",),
+)
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "lenie_upstream_request_duration_seconds", "Outbound HTTP attempt latency by upstream",
+    ("upstream", "method", "status"),
+)
+UPSTREAM_ERRORS = Counter(
+    "lenie_upstream_errors_total", "Outbound HTTP attempts that failed or got a 429/5xx", ("upstream", "error"),
+)
+UPSTREAM_RETRIES = Counter("lenie_upstream_retries_total", "Outbound HTTP attempts retried", ("upstream",))
+UPSTREAM_CACHE = Counter(
+    "lenie_upstream_cache_total", "Response cache lookups (hit, miss, revalidated)", ("upstream", "result"),
+)
+JOB_QUEUE_DEPTH = Gauge("lenie_job_queue_depth", "Jobs waiting or running", ("type", "status"))
+JOB_QUEUE_OLDEST_AGE = Gauge(
+    "lenie_job_queue_oldest_age_seconds", "Age of the oldest due queued job", ("type",),
+)
+JOB_RUN_SECONDS = Histogram(
+    "lenie_job_run_duration_seconds", "Worker job run time by outcome", ("type", "outcome"), buckets=JOB_BUCKETS,
+)
+
+REGISTRY: tuple[_Metric, ...] = (
+    HTTP_REQUEST_SECONDS, DB_QUERY_SECONDS, DB_ERRORS, DB_POOL_CHECKED_OUT, DB_POOL_SIZE, DB_POOL_OVERFLOW,
+    DB_POOL_WAIT_SECONDS, LLM_CALL_SECONDS, LLM_CALLS, LLM_TOKENS, NER_WINDOW_SECONDS,
+    UPSTREAM_REQUEST_SECONDS, UPSTREAM_ERRORS, UPSTREAM_RETRIES, UPSTREAM_CACHE,
+    JOB_QUEUE_DEPTH, JOB_QUEUE_OLDEST_AGE, JOB_RUN_SECONDS,
+)
+
+_engines: list[tuple[str, object]] = []
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+
+def observe_request(route: str, method: str, status: int, seconds: float) -> None:
+    HTTP_REQUEST_SECONDS.observe(seconds, route=route, method=method, status=status)
+
+
+def observe_pool_wait(pool: str, seconds: float) -> None:
+    DB_POOL_WAIT_SECONDS.observe(seconds, pool=pool)
+
+
+def observe_llm_call(
+    *, provider: str, model: str, operation: str, success: bool,
+    latency_ms: int | None, prompt_tokens: int | None, completion_tokens: int | None,
+) -> None:
+    LLM_CALLS.inc(provider=provider, model=model, operation=operation, outcome="success" if success else "error")
+    if latency_ms is not None:
+        LLM_CALL_SECONDS.observe(latency_ms / 1000, provider=provider, model=model, operation=operation)
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, provider=provider, model=model, kind="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, provider=provider, model=model, kind="completion")
+
+
+def observe_ner_window(seconds: float, *, success: bool) -> None:
+    NER_WINDOW_SECONDS.observe(seconds, outcome="success" if success else "error")
+
+
+def observe_upstream_request(upstream: str, method: str, status: int | str, seconds: float) -> None:
+    # "error" for attempts without a response; str() keeps label keys sortable.
+    UPSTREAM_REQUEST_SECONDS.observe(seconds, upstream=upstream, method=method, status=str(status))
+
+
+def observe_upstream_error(upstream: str, error: str) -> None:
+    UPSTREAM_ERRORS.inc(upstream=upstream, error=error)
+
+
+def observe_upstream_retry(upstream: str) -> None:
+    UPSTREAM_RETRIES.inc(upstream=upstream)
+
+
+def observe_upstream_cache(upstream: str, result: str) -> None:
+    UPSTREAM_CACHE.inc(upstream=upstream, result=result)
+
+
+def observe_job_run(job_type: str, outcome: str, seconds: float) -> None:
+    JOB_RUN_SECONDS.observe(seconds, type=job_type, outcome=outcome)
+
+
+def _verb(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    verb = words[0].upper() if words else ""
+    return verb if verb in _SQL_VERBS else "OTHER"
+
+
+def instrument_engine(engine, pool: str = "primary") -> None:
+    """Time every statement on ``engine`` and expose its pool as gauges labelled ``pool``."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("lenie_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("lenie_query_started")
+        if started:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started.pop(), verb=_verb(statement))
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("lenie_query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+        DB_ERRORS.inc(verb=_verb(context.statement or ""))
+
+    _engines.append((pool, engine))
+
+
+# ---------------------------------------------------------------------------
+# Scrape-time collection
+# ---------------------------------------------------------------------------
+
+
+def _collect_pool() -> None:
+    from sqlalchemy.pool import QueuePool
+
+    for name, engine in _engines:
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            DB_POOL_CHECKED_OUT.set(pool.checkedout(), pool=name)
+            DB_POOL_SIZE.set(pool.size(), pool=name)
+            DB_POOL_OVERFLOW.set(max(pool.overflow(), 0), pool=name)
+
+
+def collect_job_queue(session, now: dt.datetime | None = None) -> None:
+    """Refresh queue gauges from the ``jobs`` table (one grouped query)."""
+    from sqlalchemy import case, func, select
+
+    from library.db.models import Job
+
+    now = now or dt.datetime.now(dt.timezone.utc)
+    due = case((Job.available_at <= now, Job.available_at))
+    rows = session.execute(
+        select(Job.type, Job.status, func.count(), func.min(due))
+        .where(Job.status.in_(("queued", "running")))
+        .group_by(Job.type, Job.status)
+    ).all()
+    JOB_QUEUE_DEPTH.clear()
+    JOB_QUEUE_OLDEST_AGE.clear()
+    for job_type, status, count, oldest_due in rows:
+        JOB_QUEUE_DEPTH.set(count, type=job_type, status=status)
+        if status == "queued":
+            JOB_QUEUE_OLDEST_AGE.set(
+                max((now - oldest_due).total_seconds(), 0.0) if oldest_due is not None else 0, type=job_type,
+            )
+
+
+def _llm_concurrency_lines() -> list[str]:
+    """Adaptive LLM limiter gauges (library/llm_concurrency.py), shared by all processes."""
+    from library.llm_concurrency import limiter_snapshot
+
+    gauges = (
+        ("limit", "lenie_llm_concurrency_limit", "gauge", "Current adaptive concurrency limit"),
+        ("in_flight", "lenie_llm_concurrency_in_flight", "gauge", "LLM calls currently running"),
+        ("waiting", "lenie_llm_concurrency_queue_depth", "gauge", "LLM calls waiting for a slot"),
+        ("throttled_total", "lenie_llm_throttled_total", "counter", "Calls that failed with 429/5xx/timeout"),
+    )
+    snapshot = limiter_snapshot()
+    lines = []
+    for key, name, kind, help_text in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for state in snapshot:
+            labels = _format_labels(("provider", "model"), (state["provider"], state["model"]))
+            lines.append(f"{name}{labels} {_format_value(state[key])}")
+    return lines
+
+
+def render(session_factory: Callable | None = None) -> str:
+    """All metrics of this process in Prometheus text format.
+
+    With ``session_factory`` the job queue gauges are refreshed first; a
+    database failure leaves them at their previous values and is logged.
+    """
+    if session_factory is not None:
+        session = None
+        try:
+            session = session_factory()
+            collect_job_queue(session)
+        except (SystemExit, Exception):
+            logger.exception("Could not read job queue metrics")
+        finally:
+            if session is not None:
+                session.close()
+    _collect_pool()
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(_llm_concurrency_lines())
+    return "\n".join(lines) + "\n"
+
+
+def serve(port: int, session_factory: Callable | None = None, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``GET /metrics`` from a daemon thread (the worker has no Flask app).
+
+    Unlike the API endpoint there is no API key check, so it listens on
+    loopback unless the caller names another interface (worker.py:
+    ``--metrics-host`` / ``WORKER_METRICS_HOST``, e.g. ``0.0.0.0`` inside a
+    container scraped over the internal network).
+    """
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802 - BaseHTTPRequestHandler naming
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render(session_factory).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # noqa: A002 - scrapes every few seconds would flood the log
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
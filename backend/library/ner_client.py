@@ -10,6 +10,7 @@ Integration plan: docs/ner-integration-plan.md.
 
 import logging
 import re
+import time
 from collections import Counter
 
 import requests
@@ -17,6 +18,7 @@ import requests
 from library.city_gazetteer import canonical_city_name
 from library.geo_feature_gazetteer import canonical_geo_feature_name
 from library.geopolitical_region_gazetteer import canonical_geopolitical_region_name
+from library.metrics import observe_ner_window
 from library.region_gazetteer import canonical_region_name
 from library.ner_normalization import (
     canonical_country_for_surface,
@@ -121,6 +123,7 @@ def _extract_entities(text: str, *, strict: bool) -> list[dict]:
     text = strip_content_markers(text)
     collected: list[dict] = []
     for window_index, window in enumerate(_iter_windows(text), start=1):
+        started = time.monotonic()
         try:
             resp = requests.post(
                 f"{_service_url()}/ner",
@@ -132,7 +135,9 @@ def _extract_entities(text: str, *, strict: bool) -> list[dict]:
             if not isinstance(entities, list):
                 raise ValueError("NER service returned unexpected payload shape")
             collected.extend(entities)
+            observe_ner_window(time.monotonic() - started, success=True)
         except (requests.RequestException, ValueError) as exc:
+            observe_ner_window(time.monotonic() - started, success=False)
             message = f"NER extraction failed in window {window_index}: {exc}"
             if strict:
                 raise NERExtractionError(message) from exc
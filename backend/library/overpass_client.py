@@ -17,10 +17,10 @@ Data © OpenStreetMap contributors (ODbL).
 
 import logging
 import re
-import time
 
 import requests
 
+from library import http
 from library.db.models import InfraGeometry
 
 logger = logging.getLogger(__name__)
@@ -35,10 +35,6 @@ USER_AGENT = "lenie-ai/0.3 (personal research assistant; https://www.lenie-ai.eu
 class OverpassUnavailable(Exception):
     """Transport-level Overpass failure — retryable, must NOT be cached as a miss."""
 
-# Overpass etiquette: a shared free service. 2s spacing between live calls.
-MIN_REQUEST_INTERVAL_S = 2.0
-_last_request_at = 0.0
-
 # A pipeline route can have thousands of nodes; the map only needs the shape.
 MAX_POINTS_PER_LINE = 200
 # Cap matched OSM elements per name (popular names could match hundreds).
@@ -72,8 +68,6 @@ def fetch_pipeline(name: str) -> dict | None:
     must not poison the cache with false misses. Callers must cache results
     (infra_geometries) — this performs a live call.
     """
-    global _last_request_at
-
     name = (name or "").strip()
     if len(name) < MIN_QUERY_LENGTH or '"' in name:
         return None
@@ -87,17 +81,12 @@ def fetch_pipeline(name: str) -> dict | None:
         f'out geom {MAX_ELEMENTS};'
     )
 
-    wait = MIN_REQUEST_INTERVAL_S - (time.monotonic() - _last_request_at)
-    if wait > 0:
-        time.sleep(wait)
-    _last_request_at = time.monotonic()
-
     try:
         from library.external_service_events import observed_request
         resp = observed_request(
             service="overpass", operation="pipeline_lookup",
-            request_fn=lambda: requests.post(
-                _overpass_url(), data={"data": query}, headers={"User-Agent": USER_AGENT}, timeout=REQUEST_TIMEOUT_S,
+            request_fn=lambda: http.post(
+                _overpass_url(), upstream="overpass", data={"data": query}, headers={"User-Agent": USER_AGENT}, timeout=REQUEST_TIMEOUT_S,
             ),
         )
         resp.raise_for_status()
@@ -141,28 +141,42 @@ def resolve_document_persons(session, doc, text: str, progress_callback=None) ->
         .all()
     )
 
-    linked: list[tuple[str, str, str]] = []
-    skipped: list[str] = []
+    # 1. Known full alias/canonical name — cheapest, no network. A bare
+    # surname is context-dependent ("Trump" may mean Donald, Donald Jr.,
+    # Ivanka, ...), so it must go through contextual disambiguation below.
+    # Everything else gets its Wikidata candidates up front, so that all
+    # mentions of the document are disambiguated in batched LLM calls.
+    aliased: dict[str, Person] = {}
+    wikidata: dict[str, list[dict]] = {}
     for index, ent in enumerate(entities, start=1):
         if progress_callback is not None:
             progress_callback(index, len(entities))
         name = ent.entity_text.strip()
-
-        # 1. Known full alias/canonical name — cheapest, no network. A bare
-        # surname is context-dependent ("Trump" may mean Donald, Donald Jr.,
-        # Ivanka, ...), so it must go through contextual disambiguation below.
         person = find_by_alias(session, name) if len(name.split()) >= 2 else None
+        if person is not None:
+            aliased[name] = person
+        else:
+            wikidata[name] = search_persons(name)
+    picks = {}
+    if any(wikidata.values()):
+        from library.article_tagging import confirm_person_with_llm_batch
+
+        picks = confirm_person_with_llm_batch(text, doc.title or "", wikidata)
+
+    linked: list[tuple[str, str, str]] = []
+    skipped: list[str] = []
+    for ent in entities:
+        name = ent.entity_text.strip()
+        person = aliased.get(name)
         if person is not None:
             if _link(session, doc.id, person, name, CONFIDENCE_ALIAS):
                 linked.append((name, person.canonical_name, CONFIDENCE_ALIAS))
             continue
 
         # 2. Wikidata humans + LLM context disambiguation
-        candidates = search_persons(name)
+        candidates = wikidata[name]
         if candidates:
-            from library.article_tagging import confirm_person_with_llm
-
-            qid = confirm_person_with_llm(text, doc.title or "", name, candidates)
+            qid = picks.get(name)
             if qid:
                 chosen = next(c for c in candidates if c["qid"] == qid)
                 if not label_matches_mention(name, chosen["label"]):
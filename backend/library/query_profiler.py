@@ -0,0 +1,148 @@
+"""Per-request SQL statement counting, to find N+1 query patterns.
+
+Routes that walk ORM relationships in a loop (``link.source``,
+``source.organization``, ``doc.publisher``) issue one lazy load per row.
+That only shows up in production as a slow page. With ``QUERY_PROFILE=true``
+server.py wraps every request in a ``QueryProfile``: SQLAlchemy
+cursor events count statements and time spent in the database, and grouped
+by statement shape. After the request a warning is logged when any of the
+thresholds is crossed:
+
+- more than ``QUERY_PROFILE_MAX_STATEMENTS`` statements (default 30);
+- more than ``QUERY_PROFILE_MAX_DB_MS`` milliseconds in the database
+  (default 500);
+- one statement shape executed ``QUERY_PROFILE_REPEAT`` times or more
+  (default 5) — the N+1 signature; the log lists the repeated shapes.
+
+A statement's shape is its SQL text, which SQLAlchemy already renders with
+bound parameters, so two lazy loads of different rows share one shape.
+Expanded ``IN (...)`` lists are collapsed so their length does not matter.
+Profiled responses also carry a ``Server-Timing`` header with the count and
+DB time, which browser dev tools show next to each API call.
+
+Profiling is off by default. The listeners are registered once on the
+``Engine`` class, so they cover the primary and replica engines alike, and
+cost one context-variable lookup per statement outside a profiled request.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_STATEMENTS = 30
+DEFAULT_MAX_DB_MS = 500.0
+DEFAULT_REPEAT_THRESHOLD = 5
+# Longest statement shape quoted in the log.
+SHAPE_LOG_CHARS = 300
+
+_WHITESPACE = re.compile(r"\s+")
+# "(%(id_1_1)s, %(id_1_2)s, ...)" from expanding IN parameters.
+_EXPANDED_IN = re.compile(r"\((?:\s*%\(\w+\)s\s*,)+\s*%\(\w+\)s\s*\)")
+
+
+@dataclass(frozen=True)
+class ProfileSettings:
+    max_statements: int = DEFAULT_MAX_STATEMENTS
+    max_db_ms: float = DEFAULT_MAX_DB_MS
+    repeat_threshold: int = DEFAULT_REPEAT_THRESHOLD
+
+    @classmethod
+    def from_config(cls, cfg) -> "ProfileSettings | None":
+        """Settings from ``QUERY_PROFILE*`` config keys, or None when profiling is off."""
+        if (cfg.get("QUERY_PROFILE") or "false").lower() != "true":
+            return None
+        return cls(
+            max_statements=int(cfg.get("QUERY_PROFILE_MAX_STATEMENTS") or DEFAULT_MAX_STATEMENTS),
+            max_db_ms=float(cfg.get("QUERY_PROFILE_MAX_DB_MS") or DEFAULT_MAX_DB_MS),
+            repeat_threshold=int(cfg.get("QUERY_PROFILE_REPEAT") or DEFAULT_REPEAT_THRESHOLD),
+        )
+
+
+@dataclass
+class QueryProfile:
+    label: str
+    statements: int = 0
+    db_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.db_seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} queries"'
+
+
+_current: ContextVar[QueryProfile | None] = ContextVar("lenie_query_profile", default=None)
+_installed = False
+_install_lock = threading.Lock()
+
+
+def statement_shape(statement: str) -> str:
+    return _EXPANDED_IN.sub("(...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def start(label: str) -> Token:
+    """Begin profiling the statements executed in the current context."""
+    return _current.set(QueryProfile(label))
+
+
+def stop(token: Token) -> QueryProfile | None:
+    profile = _current.get()
+    _current.reset(token)
+    return profile
+
+
+def report(profile: QueryProfile, settings: ProfileSettings) -> bool:
+    """Log ``profile`` when it crosses a threshold; return whether it did."""
+    db_ms = profile.db_seconds * 1000
+    repeated = profile.repeated(settings.repeat_threshold)
+    if profile.statements <= settings.max_statements and db_ms <= settings.max_db_ms and not repeated:
+        return False
+    lines = [f"{count}x {shape[:SHAPE_LOG_CHARS]}" for shape, count in repeated]
+    logger.warning(
+        "Query profile %s: %d statements, %.1f ms in DB%s",
+        profile.label, profile.statements, db_ms,
+        "; repeated shapes:\n  " + "\n  ".join(lines) if lines else "",
+    )
+    return True
+
+
+def install() -> None:
+    """Register the cursor listeners on every SQLAlchemy engine (once per process)."""
+    global _installed
+    from sqlalchemy import Engine, event
+
+    with _install_lock:
+        if _installed:
+            return
+
+        @event.listens_for(Engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            if _current.get() is not None:
+                conn.info.setdefault("lenie_profile_started", []).append(time.perf_counter())
+
+        @event.listens_for(Engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            profile = _current.get()
+            started = conn.info.get("lenie_profile_started")
+            if profile is not None and started:
+                profile.record(statement, time.perf_counter() - started.pop())
+
+        @event.listens_for(Engine, "handle_error")
+        def _error(context):
+            started = context.connection.info.get("lenie_profile_started") if context.connection is not None else None
+            if started:
+                started.pop()
+
+        _installed = True
@@ -8,7 +8,7 @@ import logging
 
 from flask import Blueprint, jsonify, request
 
-from library.db.engine import get_scoped_session
+from library.db.engine import get_read_session
 from library.publisher_registry import resolve_publisher
 from library.search.audit_repository import parsed_query_to_dict, record_feedback
 from library.search.name_resolution import resolve_author_name, resolve_discovery_source_name
@@ -151,7 +151,7 @@ def execute_search():
             "error_code": None,
         }
 
-    ambiguities = _ambiguities(get_scoped_session(), parsed)
+    ambiguities = _ambiguities(get_read_session(), parsed)
     if parsed.clarification_required or ambiguities:
         response.update({
             "results": [],
@@ -165,7 +165,7 @@ def execute_search():
         return jsonify(response), 200
 
     try:
-        results_with_sentinel = SearchService(get_scoped_session()).search(
+        results_with_sentinel = SearchService(get_read_session()).search(
             parsed.query, parsed.to_filters(), limit=limit + 1, offset=offset, sort=sort,
         )
     except RuntimeError:
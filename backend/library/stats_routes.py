@@ -1,18 +1,23 @@
 """HTTP reporting API for document counts: by type, by processing state, by
-discovery source, and recent daily ingestion volume — the /stats dashboard."""
+discovery source, and recent daily ingestion volume — the /stats dashboard.
+
+Counts come from the document_stats snapshot (library/document_stats.py) and
+carry its refreshed_at; ``?live=1``, or a snapshot that does not exist yet,
+runs the exact aggregations instead."""
 
 from datetime import date, datetime, time, timedelta
 
 from flask import Blueprint, jsonify, request
 from sqlalchemy import func, select
 
-from library.db.engine import get_scoped_session
+from library.db.engine import get_read_session
 from library.db.models import Document, DiscoverySource
+from library.document_stats import DAILY_DAYS, NO_SOURCE, load_snapshot
 
 bp = Blueprint("stats", __name__)
 
 DEFAULT_DAYS = 30
-MAX_DAYS = 365
+MAX_DAYS = DAILY_DAYS
 RECENT_LIMIT = 20
 
 
@@ -22,48 +27,29 @@ def stats():
     if days is None or days < 1 or days > MAX_DAYS:
         return jsonify({"status": "error", "message": f"days must be between 1 and {MAX_DAYS}"}), 400
 
-    session = get_scoped_session()
-
-    total = session.execute(select(func.count(Document.id))).scalar_one()
-
-    by_type = session.execute(
-        select(Document.document_type, func.count().label("count"))
-        .group_by(Document.document_type)
-        .order_by(func.count().desc())
-    ).all()
-
-    by_state = session.execute(
-        select(Document.processing_status, func.count().label("count"))
-        .group_by(Document.processing_status)
-        .order_by(func.count().desc())
-    ).all()
-
-    source_name = func.coalesce(DiscoverySource.name, "(brak)").label("name")
-    by_source = session.execute(
-        select(source_name, func.count().label("count"))
-        .select_from(Document)
-        .outerjoin(DiscoverySource, Document.discovery_source_id == DiscoverySource.id)
-        .group_by(source_name)
-        .order_by(func.count().desc())
-    ).all()
-
+    session = get_read_session()
     today = date.today()
     date_from = today - timedelta(days=days - 1)
-    start = datetime.combine(date_from, time.min)
-    day = func.date(Document.ingested_at).label("day")
-    daily_rows = session.execute(
-        select(day, func.count().label("count"))
-        .where(Document.ingested_at >= start)
-        .group_by(day)
-        .order_by(day)
-    ).all()
-    counts_by_day = {str(r.day): r.count for r in daily_rows}
+    snapshot = None if request.args.get("live", "").lower() in ("1", "true") else load_snapshot(session)
+    if snapshot is None:
+        counts = _live_counts(session, datetime.combine(date_from, time.min))
+        refreshed_at = None
+    else:
+        counts = {
+            "total": snapshot.total,
+            "by_type": snapshot.by_type,
+            "by_state": snapshot.by_state,
+            "by_source": snapshot.by_source,
+            "by_day": snapshot.by_day,
+        }
+        refreshed_at = snapshot.refreshed_at.isoformat()
     daily = [
         {"day": (date_from + timedelta(days=i)).isoformat(),
-         "count": counts_by_day.get((date_from + timedelta(days=i)).isoformat(), 0)}
+         "count": counts["by_day"].get((date_from + timedelta(days=i)).isoformat(), 0)}
         for i in range(days)
     ]
 
+    source_name = func.coalesce(DiscoverySource.name, NO_SOURCE).label("name")
     recent_rows = session.execute(
         select(Document.id, Document.title, Document.document_type, Document.processing_status,
                source_name, Document.ingested_at)
@@ -75,10 +61,11 @@ def stats():
 
     return jsonify({
         "status": "success",
-        "total": total,
-        "by_type": [{"document_type": r.document_type, "count": r.count} for r in by_type],
-        "by_state": [{"processing_status": r.processing_status, "count": r.count} for r in by_state],
-        "by_source": [{"name": r.name, "count": r.count} for r in by_source],
+        "refreshed_at": refreshed_at,
+        "total": counts["total"],
+        "by_type": [{"document_type": k, "count": v} for k, v in _by_count(counts["by_type"])],
+        "by_state": [{"processing_status": k, "count": v} for k, v in _by_count(counts["by_state"])],
+        "by_source": [{"name": k, "count": v} for k, v in _by_count(counts["by_source"])],
         "daily": daily,
         "recent": [{
             "id": r.id, "title": r.title, "document_type": r.document_type,
@@ -86,3 +73,36 @@ def stats():
             "ingested_at": r.ingested_at.isoformat() if r.ingested_at else None,
         } for r in recent_rows],
     }), 200
+
+
+def _by_count(counts: dict[str, int]) -> list[tuple[str, int]]:
+    return sorted(counts.items(), key=lambda item: item[1], reverse=True)
+
+
+def _live_counts(session, start: datetime) -> dict:
+    """Exact aggregations straight from documents (no snapshot yet, or ?live=1)."""
+    total = session.execute(select(func.count(Document.id))).scalar_one()
+    by_type = session.execute(
+        select(Document.document_type, func.count().label("count")).group_by(Document.document_type)
+    ).all()
+    by_state = session.execute(
+        select(Document.processing_status, func.count().label("count")).group_by(Document.processing_status)
+    ).all()
+    source_name = func.coalesce(DiscoverySource.name, NO_SOURCE).label("name")
+    by_source = session.execute(
+        select(source_name, func.count().label("count"))
+        .select_from(Document)
+        .outerjoin(DiscoverySource, Document.discovery_source_id == DiscoverySource.id)
+        .group_by(source_name)
+    ).all()
+    day = func.date(Document.ingested_at).label("day")
+    daily_rows = session.execute(
+        select(day, func.count().label("count")).where(Document.ingested_at >= start).group_by(day)
+    ).all()
+    return {
+        "total": total,
+        "by_type": {r.document_type: r.count for r in by_type},
+        "by_state": {r.processing_status: r.count for r in by_state},
+        "by_source": {r.name: r.count for r in by_source},
+        "by_day": {str(r.day): r.count for r in daily_rows},
+    }
@@ -6,20 +6,72 @@ Local storage remains the zero-configuration default.
 
 from __future__ import annotations
 
+import io
 import os
+import tempfile
+from contextlib import closing
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Protocol
+from typing import BinaryIO, Protocol
+
+# Buffer size for copying streams. Every streaming path holds at most one
+# chunk (LocalStorage) or one multipart part (S3Storage) in memory at a time.
+STREAM_CHUNK_SIZE = 1024 * 1024
+# S3 requires every part but the last to be at least 5 MiB; objects smaller
+# than one part go through a single put_object instead.
+S3_MULTIPART_PART_SIZE = 8 * 1024 * 1024
 
 
 class ObjectStorage(Protocol):
     def put_bytes(self, key: str, data: bytes, content_type: str | None = None) -> None: ...
     def get_bytes(self, key: str) -> bytes: ...
+    def put_stream(self, key: str, stream: BinaryIO, content_type: str | None = None) -> int: ...
+    def open_read(self, key: str, start: int = 0, length: int | None = None) -> BinaryIO: ...
+    def delete(self, key: str) -> None: ...
     def exists(self, key: str) -> bool: ...
     def iter_objects(self, prefix: str = ""): ...
     def presigned_get_url(self, key: str, expires_in: int = 3600) -> str | None: ...
 
 
+class UsageLedger(Protocol):
+    """Receives object count/byte deltas per top-level prefix (see usage_prefix()).
+
+    library.storage_usage.PostgresUsageLedger is the real implementation;
+    storage_from_config() attaches it so put/delete keep a running total
+    that status endpoints can read without walking the bucket.
+    """
+
+    def record(self, prefix: str, count_delta: int, bytes_delta: int) -> None: ...
+
+
+def usage_prefix(key: str) -> str:
+    """Ledger bucket for a key: its first path segment ("uploads",
+    "documents", "cache"), or "" for root-level document sources
+    (<uuid>.html / <uuid>.txt / <uuid>.pdf)."""
+    value = key.replace("\\", "/").lstrip("/")
+    return value.split("/", 1)[0] if "/" in value else ""
+
+
+def _record_usage(ledger: UsageLedger | None, key: str, old_size: int | None, new_size: int | None) -> None:
+    if ledger is None:
+        return
+    count_delta = (new_size is not None) - (old_size is not None)
+    bytes_delta = (new_size or 0) - (old_size or 0)
+    if count_delta or bytes_delta:
+        ledger.record(usage_prefix(key), count_delta, bytes_delta)
+
+
+def _read_umask() -> int:
+    # The umask can only be read by setting it, which is not thread-safe, so
+    # this runs once at import time.
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+_FILE_MODE = 0o666 & ~_read_umask()
+
+
 def _safe_key(key: str) -> str:
     value = key.replace("\\", "/").lstrip("/")
     if not value or any(part in ("", ".", "..") for part in value.split("/")):
@@ -33,7 +85,45 @@ class StoredObject:
     size: int
 
 
+def _read_exactly(stream: BinaryIO, size: int) -> bytes:
+    """Read up to `size` bytes, looping over short reads (sockets, pipes)."""
+    parts = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            break
+        parts.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(parts)
+
+
+class _RangeReader(io.RawIOBase):
+    """Read-only view of `length` bytes of an already-positioned file."""
+
+    def __init__(self, raw: BinaryIO, length: int):
+        self._raw = raw
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:self._remaining]
+        count = self._raw.readinto(view)
+        self._remaining -= count or 0
+        return count or 0
+
+    def close(self) -> None:
+        self._raw.close()
+        super().close()
+
+
 class LocalStorage:
+    usage_ledger: UsageLedger | None = None
+
     def __init__(self, root: str | os.PathLike):
         self.root = Path(root).resolve()
 
@@ -43,14 +133,71 @@ class LocalStorage:
             raise ValueError(f"Storage key escapes root: {key!r}")
         return path
 
+    def _size(self, path: Path) -> int | None:
+        if self.usage_ledger is None:
+            return None
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return None
+
     def put_bytes(self, key: str, data: bytes, content_type: str | None = None) -> None:
         path = self._path(key)
         path.parent.mkdir(parents=True, exist_ok=True)
+        old_size = self._size(path)
         path.write_bytes(data)
+        _record_usage(self.usage_ledger, key, old_size, len(data))
 
     def get_bytes(self, key: str) -> bytes:
         return self._path(key).read_bytes()
 
+    def put_stream(self, key: str, stream: BinaryIO, content_type: str | None = None) -> int:
+        """Copy a stream to disk chunk by chunk; returns the number of bytes written.
+
+        Written to a temporary sibling and renamed into place, so a reader
+        never sees a half-written object and a failed copy leaves nothing behind.
+        The file gets the mode put_bytes() would give it (0o666 minus the
+        umask) instead of NamedTemporaryFile's private 0o600.
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        old_size = self._size(path)
+        written = 0
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", delete=False) as handle:
+            try:
+                while chunk := stream.read(STREAM_CHUNK_SIZE):
+                    handle.write(chunk)
+                    written += len(chunk)
+            except BaseException:
+                handle.close()
+                os.unlink(handle.name)
+                raise
+        os.chmod(handle.name, _FILE_MODE)
+        os.replace(handle.name, path)
+        _record_usage(self.usage_ledger, key, old_size, written)
+        return written
+
+    def delete(self, key: str) -> None:
+        """Remove an object; deleting a missing key is a no-op, as on S3."""
+        path = self._path(key)
+        old_size = self._size(path)
+        path.unlink(missing_ok=True)
+        _record_usage(self.usage_ledger, key, old_size, None)
+
+    def open_read(self, key: str, start: int = 0, length: int | None = None) -> BinaryIO:
+        """Open an object for reading, optionally only `length` bytes from `start`.
+
+        A whole-object read returns the plain file object, so callers can
+        mmap it or hand it to Flask's send_file() (which uses sendfile via
+        its fileno); a ranged read wraps it in a bounded reader.
+        """
+        handle = self._path(key).open("rb")
+        if start:
+            handle.seek(start)
+        if length is None:
+            return handle
+        return io.BufferedReader(_RangeReader(handle, length), STREAM_CHUNK_SIZE)
+
     def exists(self, key: str) -> bool:
         return self._path(key).is_file()
 
@@ -69,6 +216,8 @@ class LocalStorage:
 
 
 class S3Storage:
+    usage_ledger: UsageLedger | None = None
+
     def __init__(self, bucket: str, endpoint_url: str | None = None, region: str | None = None,
                  access_key: str | None = None, secret_key: str | None = None, client=None,
                  public_endpoint_url: str | None = None):
@@ -88,15 +237,84 @@ class S3Storage:
             client = boto3.client("s3", **{k: v for k, v in kwargs.items() if v})
         self.client = client
 
+    def _size(self, key: str) -> int | None:
+        """Current object size for the usage ledger — one HEAD, only when a ledger is attached."""
+        if self.usage_ledger is None:
+            return None
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=_safe_key(key))["ContentLength"]
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
     def put_bytes(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        old_size = self._size(key)
         kwargs = {"Bucket": self.bucket, "Key": _safe_key(key), "Body": data}
         if content_type:
             kwargs["ContentType"] = content_type
         self.client.put_object(**kwargs)
+        _record_usage(self.usage_ledger, key, old_size, len(data))
 
     def get_bytes(self, key: str) -> bytes:
         return self.client.get_object(Bucket=self.bucket, Key=_safe_key(key))["Body"].read()
 
+    def put_stream(self, key: str, stream: BinaryIO, content_type: str | None = None,
+                   part_size: int = S3_MULTIPART_PART_SIZE) -> int:
+        """Upload a stream, as a multipart upload once it exceeds one part.
+
+        Only one part is buffered at a time, so memory stays at part_size
+        regardless of object size. A failed multipart upload is aborted so
+        the bucket isn't left holding orphaned parts.
+        """
+        safe_key = _safe_key(key)
+        old_size = self._size(key)
+        extra = {"ContentType": content_type} if content_type else {}
+        first = _read_exactly(stream, part_size)
+        if len(first) < part_size:
+            self.client.put_object(Bucket=self.bucket, Key=safe_key, Body=first, **extra)
+            _record_usage(self.usage_ledger, key, old_size, len(first))
+            return len(first)
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=safe_key, **extra)["UploadId"]
+        parts = []
+        written = 0
+        try:
+            chunk = first
+            while chunk:
+                part_number = len(parts) + 1
+                response = self.client.upload_part(
+                    Bucket=self.bucket, Key=safe_key, UploadId=upload_id, PartNumber=part_number, Body=chunk,
+                )
+                parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+                written += len(chunk)
+                chunk = _read_exactly(stream, part_size)
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=safe_key, UploadId=upload_id, MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=safe_key, UploadId=upload_id)
+            raise
+        _record_usage(self.usage_ledger, key, old_size, written)
+        return written
+
+    def delete(self, key: str) -> None:
+        old_size = self._size(key)
+        self.client.delete_object(Bucket=self.bucket, Key=_safe_key(key))
+        _record_usage(self.usage_ledger, key, old_size, None)
+
+    def open_read(self, key: str, start: int = 0, length: int | None = None) -> BinaryIO:
+        """Streaming body of an object; a start/length becomes an HTTP Range request."""
+        kwargs = {"Bucket": self.bucket, "Key": _safe_key(key)}
+        if length is not None:
+            if length <= 0:
+                return io.BytesIO(b"")
+            kwargs["Range"] = f"bytes={start}-{start + length - 1}"
+        elif start:
+            kwargs["Range"] = f"bytes={start}-"
+        return self.client.get_object(**kwargs)["Body"]
+
     def exists(self, key: str) -> bool:
         from botocore.exceptions import ClientError
         try:
@@ -141,8 +359,39 @@ class S3Storage:
         )
 
 
+_usage_ledger_enabled = False
+
+
+def enable_usage_ledger() -> None:
+    """Attach the PostgreSQL usage ledger to storage built from now on.
+
+    Called by the long-running processes only (server.py, worker.py): the
+    ledger costs a stat/HEAD and a database round trip per write, which a
+    bulk script (a book import with hundreds of page images) should not pay
+    on one hot row. Writes made without it are picked up by the daily
+    storage_usage_reconcile job.
+    """
+    global _usage_ledger_enabled
+    _usage_ledger_enabled = True
+
+
 def storage_from_config(cfg, *, local_root: str = "/app/data") -> ObjectStorage:
-    """Build storage. STORAGE_BACKEND defaults to local for desktop installs."""
+    """Build storage. STORAGE_BACKEND defaults to local for desktop installs.
+
+    The PostgreSQL usage ledger (library.storage_usage) is attached after
+    enable_usage_ledger(), unless STORAGE_USAGE_LEDGER is set to false.
+    """
+    storage = _storage_backend_from_config(cfg, local_root)
+    if _usage_ledger_enabled and str(cfg.get("STORAGE_USAGE_LEDGER") or "true").lower() not in (
+        "0", "false", "no", "off",
+    ):
+        from library.storage_usage import PostgresUsageLedger
+
+        storage.usage_ledger = PostgresUsageLedger()
+    return storage
+
+
+def _storage_backend_from_config(cfg, local_root: str) -> ObjectStorage:
     backend = (cfg.get("STORAGE_BACKEND") or "local").lower()
     if backend == "local":
         return LocalStorage(cfg.get("STORAGE_LOCAL_ROOT") or local_root)
@@ -161,6 +410,16 @@ def storage_from_config(cfg, *, local_root: str = "/app/data") -> ObjectStorage:
     )
 
 
+def download_to_file(storage: ObjectStorage, key: str, path: str | os.PathLike) -> int:
+    """Stream an object into a local file without holding it in memory; returns its size."""
+    written = 0
+    with closing(storage.open_read(key)) as source, open(path, "wb") as target:
+        while chunk := source.read(STREAM_CHUNK_SIZE):
+            target.write(chunk)
+            written += len(chunk)
+    return written
+
+
 def usage(storage: ObjectStorage, prefix: str = "") -> tuple[int, int]:
     count = total = 0
     for obj in storage.iter_objects(prefix):
@@ -0,0 +1,155 @@
+"""Incrementally maintained object storage usage, per top-level prefix.
+
+storage.usage() answers "how many objects / bytes" by walking the store —
+an rglob with a stat per file locally, a full paginated listing on S3. That
+is fine for imports/storage_migrate.py but not for a status endpoint hit on
+every page load. Instead, every put/delete made by the server and workers
+(library.storage.enable_usage_ledger()) reports its delta to
+PostgresUsageLedger, which keeps one storage_usage row per top-level prefix
+(library.storage.usage_prefix()). Writes that bypass the ledger (import
+scripts, a manual `mc cp`) are corrected by the storage_usage_reconcile job,
+which does the one full walk and overwrites the rows. Until its first run
+the rows only hold deltas, so ledger_usage() does not answer from them.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+from collections import defaultdict
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from library.db.engine import get_session
+from library.db.models import StorageUsage
+from library.storage import ObjectStorage, usage_prefix
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresUsageLedger:
+    """UsageLedger writing deltas to storage_usage, best-effort.
+
+    Opens its own short session per delta (same as
+    external_service_events.record_external_service_event()), so it never
+    joins or commits the caller's transaction, and a database hiccup only
+    costs accuracy until the next reconcile — never the object write itself.
+    """
+
+    def __init__(self, session_factory=get_session):
+        self.session_factory = session_factory
+
+    def record(self, prefix: str, count_delta: int, bytes_delta: int) -> None:
+        session = None
+        try:
+            session = self.session_factory()
+            stmt = insert(StorageUsage).values(
+                prefix=prefix, object_count=count_delta, total_bytes=bytes_delta,
+            )
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[StorageUsage.prefix],
+                set_={
+                    "object_count": StorageUsage.object_count + stmt.excluded.object_count,
+                    "total_bytes": StorageUsage.total_bytes + stmt.excluded.total_bytes,
+                    "updated_at": func.now(),
+                },
+            ))
+            session.commit()
+        except (SystemExit, Exception):
+            logger.exception("Could not record storage usage delta for prefix %r", prefix)
+            if session is not None:
+                session.rollback()
+        finally:
+            if session is not None:
+                session.close()
+
+
+def _ledger_prefix(prefix: str) -> str | None:
+    """Ledger row a usage() prefix maps to, or None when the ledger is too coarse.
+
+    "" means the whole store; "uploads" / "uploads/" is one row; anything
+    deeper ("cache/markdown/12") isn't tracked separately.
+    """
+    value = prefix.replace("\\", "/").strip("/")
+    if "/" in value:
+        return None
+    return value
+
+
+def ledger_usage(session, prefix: str = "") -> tuple[int, int] | None:
+    """(object_count, total_bytes) from the ledger, or None if it can't answer.
+
+    None also covers a ledger that has never been reconciled: its rows only
+    count writes since the ledger was installed, and a partial total would
+    look like a real one.
+    """
+    ledger_prefix = _ledger_prefix(prefix)
+    if ledger_prefix is None:
+        return None
+    if session.scalar(select(func.max(StorageUsage.reconciled_at))) is None:
+        return None
+    query = select(
+        func.coalesce(func.sum(StorageUsage.object_count), 0),
+        func.coalesce(func.sum(StorageUsage.total_bytes), 0),
+    )
+    if ledger_prefix:
+        query = query.where(StorageUsage.prefix == ledger_prefix)
+    # no row for the prefix after a reconcile just means nothing is stored there
+    count, total = session.execute(query).one()
+    return int(count), int(total)
+
+
+def usage_by_prefix(session) -> list[StorageUsage]:
+    return list(session.scalars(select(StorageUsage).order_by(StorageUsage.prefix)))
+
+
+def reconcile(session, storage: ObjectStorage) -> dict:
+    """Recount everything with one full walk and overwrite the ledger.
+
+    Returns per-prefix drift (ledger minus actual, before the fix) so the
+    job result shows how far the incremental totals had wandered. Writes
+    racing with the walk can leave a small new drift; the next run fixes it.
+    """
+    actual: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    for obj in storage.iter_objects():
+        totals = actual[usage_prefix(obj.key)]
+        totals[0] += 1
+        totals[1] += obj.size
+    previous = {row.prefix: (row.object_count, row.total_bytes) for row in usage_by_prefix(session)}
+
+    now = dt.datetime.now(dt.timezone.utc)
+    for prefix, (count, total) in actual.items():
+        stmt = insert(StorageUsage).values(
+            prefix=prefix, object_count=count, total_bytes=total, updated_at=now, reconciled_at=now,
+        )
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[StorageUsage.prefix],
+            set_={"object_count": count, "total_bytes": total, "updated_at": now, "reconciled_at": now},
+        ))
+    stale = set(previous) - set(actual)
+    if stale:
+        session.execute(delete(StorageUsage).where(StorageUsage.prefix.in_(stale)))
+    session.commit()
+
+    drift = {}
+    for prefix in sorted(set(previous) | set(actual)):
+        ledger_count, ledger_bytes = previous.get(prefix, (0, 0))
+        count, total = actual.get(prefix, (0, 0))
+        if (ledger_count, ledger_bytes) != (count, total):
+            drift[prefix] = {"objects": ledger_count - count, "bytes": ledger_bytes - total}
+    return {
+        "prefixes": len(actual),
+        "objects": sum(count for count, _total in actual.values()),
+        "bytes": sum(total for _count, total in actual.values()),
+        "drift": drift,
+    }
+
+
+def execute_storage_usage_reconcile(session, job, storage: ObjectStorage) -> dict:
+    """worker.py entry point for the storage_usage_reconcile job type."""
+    del job  # no parameters: a reconcile always covers the whole store
+    result = reconcile(session, storage)
+    if result["drift"]:
+        logger.info("storage usage ledger drift corrected: %s", result["drift"])
+    return result
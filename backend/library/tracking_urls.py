@@ -1,12 +1,18 @@
 """Resolve newsletter tracking links without allowing redirects to internal hosts."""
 
 import base64
+import hashlib
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse
 
 import requests
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
+from library import http
+from library.db.models import TrackingUrlResolution
 from library.url_normalization import canonicalize_url
 from library.website.website_download_context import validate_url_target
 
@@ -29,6 +35,8 @@ _TRACKING_HOST_PATTERNS = (
 # not the URL, and is reattached after a replacement.
 _TEXT_URL_RE = re.compile(r"https?://[^\s<>\"']+")
 _TRAILING_URL_PUNCTUATION = ".,;:!?)]}"
+# Links followed at once; each one is a few sequential HEAD/GET hops.
+MAX_CONCURRENT_RESOLUTIONS = 8
 
 
 def is_tracking_url(url: str) -> bool:
@@ -77,12 +85,21 @@ def resolve_tracking_url(url: str, timeout: int = 5, max_redirects: int = 5) ->
     if destination := _embedded_destination(url):
         return canonicalize_url(destination)
 
+    return _follow_redirects(url, timeout, max_redirects) or url
+
+
+def _follow_redirects(url: str, timeout: int, max_redirects: int = 5) -> str | None:
+    """Return the canonical destination of ``url``, or None when it cannot be resolved."""
     for method in ("HEAD", "GET"):
         current_url = url
         try:
             for _ in range(max_redirects + 1):
                 validate_url_target(current_url)
-                response = requests.request(method, current_url, allow_redirects=False, timeout=timeout, stream=method == "GET")
+                response = http.request(
+                    method, current_url, upstream="tracking",
+                    allow_redirects=False, timeout=timeout, stream=method == "GET",
+                    validate_target=validate_url_target,
+                )
                 try:
                     if response.is_redirect or response.is_permanent_redirect:
                         location = response.headers.get("Location")
@@ -104,29 +121,92 @@ def resolve_tracking_url(url: str, timeout: int = 5, max_redirects: int = 5) ->
                 raise ValueError(f"Too many redirects (>{max_redirects})")
         except (requests.RequestException, ValueError) as exc:
             logger.warning("Could not resolve tracking URL %s: %s", url, exc)
-            return url
+            return None
+
+    return None
+
+
+def _url_hash(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _cached_destinations(session, urls: list[str]) -> dict[str, str]:
+    by_hash = {_url_hash(url): url for url in urls}
+    rows = session.execute(
+        select(TrackingUrlResolution.url_hash, TrackingUrlResolution.destination)
+        .where(TrackingUrlResolution.url_hash.in_(list(by_hash)))
+    ).all()
+    return {by_hash[url_hash]: destination for url_hash, destination in rows}
 
-    return url
+
+def _store_destinations(session, resolved: dict[str, str]) -> None:
+    session.execute(
+        insert(TrackingUrlResolution)
+        .values([
+            {"url_hash": _url_hash(url), "url": url, "destination": destination}
+            for url, destination in resolved.items()
+        ])
+        .on_conflict_do_nothing()
+    )
 
 
-def resolve_tracking_urls_in_text(text: str, timeout: int = 5) -> str:
+def resolve_tracking_urls(
+    urls, session=None, *, timeout: int = 5, max_workers: int = MAX_CONCURRENT_RESOLUTIONS,
+) -> dict[str, str]:
+    """Resolve many links at once; return {tracking url: destination}.
+
+    Regular URLs are left out of the result. Each distinct link is resolved
+    once: Kit links are decoded in place, links already in
+    ``tracking_url_resolutions`` come from the table (when a ``session`` is
+    given), and the rest are followed concurrently by up to ``max_workers``
+    threads. New resolutions are written in the caller's transaction; a link
+    that could not be resolved maps to itself.
+    """
+    pending = [url for url in dict.fromkeys(urls) if is_tracking_url(url)]
+    resolved: dict[str, str] = {}
+    for url in pending:
+        if destination := _embedded_destination(url):
+            resolved[url] = canonicalize_url(destination)
+    misses = [url for url in pending if url not in resolved]
+    if misses and session is not None:
+        resolved.update(_cached_destinations(session, misses))
+        misses = [url for url in misses if url not in resolved]
+    if not misses:
+        return resolved
+
+    logger.info("Resolving %d tracking URL(s)", len(misses))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(misses)))) as pool:
+        destinations = list(pool.map(lambda url: _follow_redirects(url, timeout), misses))
+    followed = {url: destination for url, destination in zip(misses, destinations) if destination is not None}
+    if followed and session is not None:
+        _store_destinations(session, followed)
+    resolved.update(followed)
+    resolved.update((url, url) for url in misses if url not in followed)
+    return resolved
+
+
+def resolve_tracking_urls_in_text(text: str, timeout: int = 5, session=None) -> str:
     """Replace known newsletter redirect URLs in plain text with destinations.
 
     This is the client-independent counterpart to the HTML importer's link
     normalization.  It also makes browser, Gmail API and future import paths
-    behave identically.  Regular URLs are never fetched or changed.
+    behave identically.  Regular URLs are never fetched or changed.  All
+    links are resolved in one ``resolve_tracking_urls()`` batch.
     """
     if not text:
         return text
 
+    def split(raw: str) -> tuple[str, str]:
+        stripped = raw.rstrip(_TRAILING_URL_PUNCTUATION)
+        return stripped, raw[len(stripped):]
+
+    urls = [split(match.group(0))[0] for match in _TEXT_URL_RE.finditer(text)]
+    resolved = resolve_tracking_urls(urls, session, timeout=timeout)
+    if not resolved:
+        return text
+
     def replace(match: re.Match) -> str:
-        raw = match.group(0)
-        suffix = ""
-        while raw and raw[-1] in _TRAILING_URL_PUNCTUATION:
-            suffix = raw[-1] + suffix
-            raw = raw[:-1]
-        if not raw or not is_tracking_url(raw):
-            return raw + suffix
-        return resolve_tracking_url(raw, timeout=timeout) + suffix
+        raw, suffix = split(match.group(0))
+        return resolved.get(raw, raw) + suffix
 
     return _TEXT_URL_RE.sub(replace, text)
@@ -7,11 +7,13 @@ from this area without needing the file to exist on their local filesystem.
 
 from __future__ import annotations
 
+import io
 import mimetypes
 import uuid
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import BinaryIO
 
 from werkzeug.utils import secure_filename
 
@@ -47,25 +49,38 @@ def validate_upload_filename(filename: str) -> tuple[str, str]:
     return safe_name, extension
 
 
-def store_uploaded_file(storage: ObjectStorage, filename: str, data: bytes) -> UploadedFile:
+def store_uploaded_file(storage: ObjectStorage, filename: str, data: bytes | BinaryIO) -> UploadedFile:
+    """Stream an upload into the staging area.
+
+    data may be bytes or a readable, seekable stream (werkzeug's
+    FileStorage.stream) — a stream is copied in chunks via put_stream(), so a
+    large PDF never needs to be read into worker memory as a whole.
+    """
     safe_name, extension = validate_upload_filename(filename)
-    if not data:
+    stream = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+    start = stream.tell()
+    if not stream.read(1):
         raise ValueError("file is empty")
+    stream.seek(start)
     now = datetime.now(UTC)
     key = f"{UPLOAD_PREFIX}/{now:%Y}/{now:%m}/{uuid.uuid4().hex}-{safe_name}"
     content_type = mimetypes.guess_type(safe_name)[0] or "application/octet-stream"
-    storage.put_bytes(key, data, content_type=content_type)
-    return UploadedFile(key=key, filename=safe_name, size=len(data), extension=extension)
+    size = storage.put_stream(key, stream, content_type=content_type)
+    return UploadedFile(key=key, filename=safe_name, size=size, extension=extension)
 
 
-def get_uploaded_file(storage: ObjectStorage, key: str) -> bytes:
-    """Read an upload key while preventing import scripts from reading arbitrary objects."""
+def _validated_upload_key(key: str) -> str:
     normalized = key.replace("\\", "/").lstrip("/")
     if not normalized.startswith(f"{UPLOAD_PREFIX}/"):
         raise ValueError(f"upload storage key must start with {UPLOAD_PREFIX!r}")
     if Path(normalized).suffix.lower() not in ALLOWED_EXTENSIONS:
         raise ValueError("upload storage key has an unsupported file type")
-    return storage.get_bytes(normalized)
+    return normalized
+
+
+def get_uploaded_file(storage: ObjectStorage, key: str) -> bytes:
+    """Read an upload key while preventing import scripts from reading arbitrary objects."""
+    return storage.get_bytes(_validated_upload_key(key))
 
 
 def list_uploaded_files(storage: ObjectStorage, limit: int = 100) -> list[UploadedFile]:
@@ -0,0 +1,179 @@
+"""Compiled, cached site cleanup rules from ``site_rules.json``.
+
+``webpage_text_clean()`` used to re-read and re-parse the JSON file on every
+call, scan every rule key with ``url.find()`` and let ``re`` look up each
+pattern string again. ``get_site_rules()`` keeps one ``SiteRuleSet`` per
+file and process instead:
+
+- the file is parsed once and re-read only when its mtime or size changes,
+  so edits still apply without a restart;
+- rules are indexed by the host of their key; a URL only tests the keys
+  filed under its host and that host's parent domains. A candidate still
+  has to contain the key as a substring of the URL, as before, so
+  ``https://www.onet.pl`` does not match ``https://wiadomosci.onet.pl``;
+- regexes are compiled at load time. A pattern that does not compile is
+  logged and skipped instead of failing every clean;
+- the literal ``remove_string`` entries of a rule are removed in a single
+  regex pass instead of one ``str.replace`` per entry.
+
+The JSON format is unchanged: site keys (usually ``scheme://host``) map to
+``remove_before`` / ``remove_after`` / ``remove_string`` /
+``remove_string_regexp`` lists, and ``_global`` holds ``remove_string`` and
+``remove_string_regexp`` applied to every URL.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_KEY = "_global"
+
+
+def _compile_all(patterns: list, where: str) -> tuple[re.Pattern, ...]:
+    compiled = []
+    for pattern in patterns:
+        try:
+            compiled.append(re.compile(pattern))
+        except re.error as exc:
+            logger.error("Skipping invalid site rule regex %r in %s: %s", pattern, where, exc)
+    return tuple(compiled)
+
+
+def _literal_pattern(strings: list) -> re.Pattern | None:
+    strings = [s for s in strings if s]
+    if not strings:
+        return None
+    # Longest first, so an entry that contains another one wins at the same position.
+    return re.compile("|".join(re.escape(s) for s in sorted(strings, key=len, reverse=True)))
+
+
+def _key_host(key: str) -> str:
+    host = urlsplit(key).hostname if "://" in key else key.split("/", 1)[0]
+    return (host or "").lower().removeprefix(".")
+
+
+@dataclass(frozen=True)
+class SiteRule:
+    key: str
+    order: int
+    remove_before: tuple[re.Pattern, ...] = ()
+    remove_after: tuple[re.Pattern, ...] = ()
+    remove_strings: re.Pattern | None = None
+    remove_regexps: tuple[re.Pattern, ...] = ()
+
+    @classmethod
+    def from_dict(cls, key: str, order: int, spec: dict) -> "SiteRule":
+        return cls(
+            key=key,
+            order=order,
+            remove_before=_compile_all(spec.get("remove_before", []), key),
+            remove_after=_compile_all(spec.get("remove_after", []), key),
+            remove_strings=_literal_pattern(spec.get("remove_string", [])),
+            remove_regexps=_compile_all(spec.get("remove_string_regexp", []), key),
+        )
+
+    def apply(self, content: str) -> str:
+        for pattern in self.remove_before:
+            match = pattern.search(content)
+            if match:
+                content = content[match.end():].strip()
+        for pattern in self.remove_after:
+            last = None
+            for last in pattern.finditer(content):
+                pass
+            if last is not None:
+                content = content[:last.start()]
+        if self.remove_strings is not None:
+            content = self.remove_strings.sub("", content)
+        for pattern in self.remove_regexps:
+            content = pattern.sub("", content)
+        return content
+
+
+class SiteRuleSet:
+    """Site rules indexed by host, with precompiled patterns."""
+
+    def __init__(self, rules: dict):
+        self._by_host: dict[str, list[SiteRule]] = {}
+        # Keys without a recognisable host keep the plain substring scan.
+        self._unindexed: list[SiteRule] = []
+        self._size = 0
+        global_spec = rules.get(GLOBAL_KEY) or {}
+        self.global_rule = SiteRule(
+            key=GLOBAL_KEY,
+            order=-1,
+            remove_strings=_literal_pattern(global_spec.get("remove_string", [])),
+            remove_regexps=_compile_all(global_spec.get("remove_string_regexp", []), GLOBAL_KEY),
+        )
+        for order, (key, spec) in enumerate(rules.items()):
+            if key == GLOBAL_KEY or not isinstance(spec, dict):
+                continue
+            rule = SiteRule.from_dict(key, order, spec)
+            host = _key_host(key)
+            if "." in host:
+                self._by_host.setdefault(host, []).append(rule)
+            else:
+                self._unindexed.append(rule)
+            self._size += 1
+        self._has_global = bool(global_spec)
+
+    @classmethod
+    def from_file(cls, path: str) -> "SiteRuleSet":
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return cls(json.load(file))
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning("Cannot load site cleanup rules from %s: %s", path, exc)
+            return cls({})
+
+    def __len__(self) -> int:
+        return self._size + self._has_global
+
+    def rules_for(self, url: str) -> list[SiteRule]:
+        """Site rules whose key occurs in ``url``, in file order (``_global`` excluded)."""
+        host = (urlsplit(url).hostname or "") if url else ""
+        candidates = list(self._unindexed)
+        labels = host.split(".")
+        for start in range(len(labels)):
+            candidates.extend(self._by_host.get(".".join(labels[start:]), ()))
+        return sorted((rule for rule in candidates if rule.key in url), key=lambda rule: rule.order)
+
+    def clean(self, url: str, content: str) -> str:
+        for rule in self.rules_for(url):
+            content = rule.apply(content)
+        return self.global_rule.apply(content)
+
+
+_cache: dict[str, tuple[tuple[int, int] | None, SiteRuleSet]] = {}
+_cache_lock = threading.Lock()
+
+
+def _file_version(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_site_rules(path: str) -> SiteRuleSet:
+    """Return the rules in ``path``, parsed once and reloaded when the file changes."""
+    version = _file_version(path)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is None or cached[0] != version:
+            rule_set = SiteRuleSet.from_file(path) if version is not None else SiteRuleSet({})
+            if version is None:
+                logger.warning("Site cleanup rules file %s does not exist", path)
+            cached = (version, rule_set)
+            _cache[path] = cached
+        return cached[1]
@@ -6,15 +6,24 @@ import socket
 from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 
-from library.text_functions import remove_before_regex, remove_last_occurrence_and_after, remove_text_regex
+from library import http
 from library.config_loader import load_config
 
 from library.models.webpage_parse_result import WebPageParseResult
+from library.website.site_rules import get_site_rules
 
 logger = logging.getLogger(__name__)
 
+# Elements that start a new paragraph in WebPageParseResult.text.
+PARAGRAPH_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6", "p"})
+PARAGRAPH_BREAK = "\n\n"
+# BeautifulSoup tree builder. HTML_PARSER=lxml (with the lxml extra) parses
+# large pages several times faster, but repairs broken markup differently,
+# so text from malformed pages can change.
+DEFAULT_HTML_PARSER = "html.parser"
+
 
 def load_site_rules(file_path: str) -> dict:
     try:
@@ -55,7 +64,8 @@ def download_raw_html(url: str, max_redirects: int = 5) -> bytes | None:
     # Follow redirects manually so every hop is validated before it is fetched
     for _ in range(max_redirects + 1):
         validate_url_target(url)
-        response = requests.get(url, timeout=30, allow_redirects=False)
+        response = http.get(url, upstream="webpages", timeout=30, allow_redirects=False,
+                            validate_target=validate_url_target)
         if response.is_redirect or response.is_permanent_redirect:
             url = requests.compat.urljoin(url, response.headers["Location"])
             continue
@@ -65,10 +75,41 @@ def download_raw_html(url: str, max_redirects: int = 5) -> bytes | None:
     raise ValueError(f"Too many redirects (>{max_redirects}) while fetching {url!r}")
 
 
+def _page_text(soup: BeautifulSoup) -> tuple[str, str]:
+    """Return the page text, plain and with paragraph breaks, in one tree walk.
+
+    The plain text equals ``soup.get_text()``. The second text has
+    ``PARAGRAPH_BREAK`` before the first string of every heading and ``<p>``
+    that has any text; empty blocks add nothing.
+    """
+    string_types = soup.interesting_string_types
+    plain: list[str] = []
+    structured: list[str] = []
+    pending: Tag | None = None  # block whose break goes before its first string
+    for node in soup.descendants:
+        if isinstance(node, Tag):
+            if node.name in PARAGRAPH_TAGS and not (pending is not None and _inside(node, pending)):
+                pending = node
+        elif type(node) in string_types:
+            if pending is not None:
+                if _inside(node, pending):
+                    structured.append(PARAGRAPH_BREAK)
+                pending = None
+            plain.append(node)
+            structured.append(node)
+    return "".join(plain), "".join(structured)
+
+
+def _inside(node, block: Tag) -> bool:
+    return any(parent is block for parent in node.parents)
+
+
 def webpage_raw_parse(url: str, raw_html: bytes, analyze_content: bool = True) -> WebPageParseResult:
-    soup = BeautifulSoup(raw_html, 'html.parser')
+    parser = load_config().get("HTML_PARSER") or DEFAULT_HTML_PARSER
+    soup = BeautifulSoup(raw_html, parser)
     result = WebPageParseResult(url)
-    result.text_raw = soup.get_text()
+    text_raw, content = _page_text(soup)
+    result.text_raw = text_raw
     result.language = ""
 
     result.title = soup.title.string if soup.title else ''
@@ -80,25 +121,10 @@ def webpage_raw_parse(url: str, raw_html: bytes, analyze_content: bool = True) -
             result.language = soup.find('html')['lang']
 
     if analyze_content:
-        content = soup.get_text()
-
         content = re.sub(r'^\n+', '', content)
         content = re.sub(r'\n+$', '', content)
         content = re.sub(r'\n\n+', '\n\n', content)
 
-        for h_size in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-            h_elements = soup.find_all(h_size)
-            for element in h_elements:
-                index = content.find(element.text)
-                if index != -1:
-                    content = content[:index] + '\n\n' + content[index:]
-
-        bold_elements = soup.find_all('p')
-        for element in bold_elements:
-            index = content.find(element.text)
-            if index != -1:
-                content = content[:index] + '\n\n' + content[index:]
-
         result.text = webpage_text_clean(url, content)
 
     return result
@@ -107,26 +133,9 @@ def webpage_raw_parse(url: str, raw_html: bytes, analyze_content: bool = True) -
 def webpage_text_clean(url: str, content: str):
     content = re.sub('\xa0', " ", content)
 
+    # Site rules first, then the "_global" rules (common ad/boilerplate patterns across all sites).
     site_rules_path = load_config().get("SITE_RULES_PATH", "data/site_rules.json")
-    site_rules = load_site_rules(site_rules_path)
-
-    for url_path in site_rules:
-        if url.find(url_path) != -1:
-            for regex in site_rules[url_path]["remove_before"]:
-                content = remove_before_regex(content, regex)
-            for regex in site_rules[url_path]["remove_after"]:
-                content = remove_last_occurrence_and_after(content, regex)
-            for data_string in site_rules[url_path]["remove_string"]:
-                content = content.replace(data_string, "")
-            for regex in site_rules[url_path]["remove_string_regexp"]:
-                content = remove_text_regex(content, regex)
-
-    # Apply global rules (key "_global") — common ad/boilerplate patterns across all sites
-    global_rules = site_rules.get("_global", {})
-    for data_string in global_rules.get("remove_string", []):
-        content = content.replace(data_string, "")
-    for regex in global_rules.get("remove_string_regexp", []):
-        content = remove_text_regex(content, regex)
+    content = get_site_rules(site_rules_path).clean(url, content)
 
     content = re.sub(r'\n[^\S\n]+\n', '\n\n', content)
     content = re.sub(r'\n{2,}', '\n\n', content)
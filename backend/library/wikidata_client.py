@@ -13,6 +13,8 @@ import logging
 
 import requests
 
+from library import http
+
 logger = logging.getLogger(__name__)
 
 API_URL = "https://www.wikidata.org/w/api.php"
@@ -28,8 +30,9 @@ def _get(params: dict) -> dict | None:
         from library.external_service_events import observed_request
         resp = observed_request(
             service="wikidata", operation=str(params.get("action") or "request"),
-            request_fn=lambda: requests.get(
+            request_fn=lambda: http.get(
                 API_URL,
+                upstream="wikidata",
                 params={**params, "format": "json"},
                 headers={"User-Agent": USER_AGENT},
                 timeout=REQUEST_TIMEOUT_S,
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Time clean_article_text() on long articles, per portal.
+
+Without arguments the benchmark builds a long article with the usual portal
+chrome (player controls, "Czytaj także" cards, ads, photo credits, tag
+lines, links and images) and cleans it with each portal's URL. Pass saved
+extracted markdown files with ``--url`` to time those instead. To compare
+with an older revision, run the same command from a worktree of it::
+
+    PYTHONPATH=. python scripts/bench_article_cleaner.py --paragraphs 800
+    PYTHONPATH=. python scripts/bench_article_cleaner.py article.md --url https://www.wp.pl/a
+
+    git worktree add /tmp/lenie-base <rev>
+    (cd /tmp/lenie-base/backend && PYTHONPATH=. python <this script> --paragraphs 800)
+"""
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+
+from library.article_cleaner import clean_article_text
+
+PORTAL_URLS = {
+    "onet": "https://wiadomosci.onet.pl/kraj/artykul/abc123",
+    "money": "https://www.money.pl/gospodarka/artykul-7012345678901234a.html",
+    "wp": "https://wiadomosci.wp.pl/artykul-7012345678901234a",
+    "interia": "https://wydarzenia.interia.pl/kraj/news-artykul,nId,123",
+    "gazeta": "https://wiadomosci.gazeta.pl/wiadomosci/7,114883,123.html",
+    "bankier": "https://www.bankier.pl/wiadomosc/Artykul-123.html",
+    "generic": "https://example.com/blog/artykul",
+}
+WORDS = ["Lorem", "ipsum", "dolor", "sit", "amet,", "zażółć", "gęślą", "jaźń", "consectetur", "rynek", "rząd"]
+
+
+def long_article(paragraphs: int, seed: int = 1) -> str:
+    rnd = random.Random(seed)
+    lines = ["# Tytuł długiego artykułu", "", "Posłuchaj artykułu", "", "17 marca 2026, 12:31", "5 min czytania", ""]
+    for i in range(paragraphs):
+        if i % 15 == 0:
+            lines += [f"## Śródtytuł sekcji {i}", ""]
+        if i % 25 == 3:
+            lines += [f"![Zdjęcie {i}](https://ocdn.eu/pulscms/img{i}.jpg)", "", "Fot. PAP/Jan Kowalski", ""]
+        if i % 30 == 7:
+            lines += ["REKLAMA", "", "Dalszy ciąg materiału pod wideo", "", "00:09 / 00:16", ""]
+        if i % 40 == 11:
+            lines += [f"**Czytaj także:** [Inny artykuł](https://example.com/inny/{i})", ""]
+        words = " ".join(rnd.choice(WORDS) for _ in range(60))
+        link = f" [źródło {i}](https://example.com/a/{i})" if i % 5 == 0 else ""
+        lines += [f"Akapit {i}: {words}.{link}", ""]
+    lines += ["gospodarka rząd rynek +2", "", "Powiązane tematy: Polityka Gospodarka", "",
+              "Dziękujemy, że przeczytałaś/eś nasz artykuł do końca."]
+    return "\n".join(lines)
+
+
+def timed(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark clean_article_text() on long articles")
+    parser.add_argument("articles", nargs="*", type=Path, help="extracted markdown files (default: generated)")
+    parser.add_argument("--url", default="", help="URL for the given files (selects the portal rules)")
+    parser.add_argument("--paragraphs", type=int, default=400, help="paragraphs in the generated article")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.articles:
+        cases = [(path.name, path.read_text(encoding="utf-8"), args.url) for path in args.articles]
+    else:
+        text = long_article(args.paragraphs)
+        cases = [(portal, text, url) for portal, url in PORTAL_URLS.items()]
+    for name, text, url in cases:
+        seconds = timed(lambda: clean_article_text(text, url), args.repeat)
+        print(f"{name:10} {len(text) / 1024:7.0f} KiB  {seconds * 1000:8.1f} ms  "
+              f"{len(text) / seconds / 1024 / 1024:6.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
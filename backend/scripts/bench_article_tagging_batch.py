@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Compare single and batched LLM tagging (library/article_tagging.py).
+
+Tags a generated set of short articles (thematic tags + gazetteer country
+confirmation, as _apply_tags() does) once with one call per article and once
+with the *_batch functions. ai_ask is replaced by a local fake that answers
+both prompt styles, estimates tokens as characters / 4 and sleeps for a
+simulated provider latency, so the run needs no LLM endpoint::
+
+    PYTHONPATH=. python scripts/bench_article_tagging_batch.py --articles 200
+    PYTHONPATH=. python scripts/bench_article_tagging_batch.py --latency-ms 800 --ms-per-1k-tokens 40
+"""
+
+import argparse
+import json
+import random
+import time
+from types import SimpleNamespace
+
+import library.ai
+from library import article_tagging
+
+TOPICS = ["wojsko", "gospodarka", "geopolityka", "technologia", "religia"]
+COUNTRIES = ["Polska", "Niemcy", "Ukraina", "Francja", "Chiny", "Japonia"]
+WORDS = ["rząd", "rynek", "armia", "umowa", "sojusz", "budżet", "wybory", "granica", "eksport", "szczyt"]
+
+
+def articles(count: int, words: int, seed: int = 1) -> list[tuple[str, str]]:
+    rnd = random.Random(seed)
+    result = []
+    for i in range(count):
+        countries = rnd.sample(COUNTRIES, 2)
+        body = " ".join(rnd.choice(WORDS) for _ in range(words))
+        result.append((f"{countries[0]} i {countries[1]}: {body}.", f"Artykuł {i} o {rnd.choice(TOPICS)}"))
+    return result
+
+
+class FakeLlm:
+    def __init__(self, latency_ms: float, ms_per_1k_tokens: float):
+        self.latency_ms = latency_ms
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+        self.calls = self.prompt_tokens = self.completion_tokens = 0
+
+    def _answer(self, prompt: str) -> str:
+        if "DANE JSON:\n" in prompt:
+            items = json.loads(prompt.split("DANE JSON:\n", 1)[1])
+            return json.dumps({"results": [
+                {"id": item["id"], "values": item.get("kandydaci", TOPICS)[:1]} for item in items
+            ]}, ensure_ascii=False)
+        if "Kandydaci:" in prompt:
+            return prompt.split("Kandydaci:", 1)[1].split(",", 1)[0].strip()
+        return TOPICS[0]
+
+    def __call__(self, prompt, model, temperature=0.7, max_token_count=4096, top_p=0.9, **kwargs):
+        answer = self._answer(prompt)
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(answer) // 4
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        time.sleep((self.latency_ms + (prompt_tokens + completion_tokens) * self.ms_per_1k_tokens / 1000) / 1000)
+        return SimpleNamespace(response_text=answer)
+
+
+def single(fixture):
+    return [
+        article_tagging.tag_article_with_llm(text, title) + article_tagging.extract_countries_hybrid(text, title)
+        for text, title in fixture
+    ]
+
+
+def batched(fixture):
+    tags = article_tagging.tag_article_with_llm_batch(fixture)
+    countries = article_tagging.extract_countries_hybrid_batch(fixture)
+    return [a + b for a, b in zip(tags, countries)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark batched LLM tagging against one call per article")
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--words", type=int, default=150, help="words per generated article")
+    parser.add_argument("--latency-ms", type=float, default=300, help="simulated fixed latency per call")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=20, help="simulated latency per 1000 tokens")
+    args = parser.parse_args()
+
+    fixture = articles(args.articles, args.words)
+    article_tagging._tagging_model = lambda: "fake-model"
+    for name, run in (("single", single), ("batched", batched)):
+        fake = FakeLlm(args.latency_ms, args.ms_per_1k_tokens)
+        library.ai.ai_ask = fake
+        started = time.perf_counter()
+        tagged = run(fixture)
+        seconds = time.perf_counter() - started
+        assert len(tagged) == len(fixture)
+        print(f"{name:8} {fake.calls:5} calls  {fake.prompt_tokens:8} prompt tok  "
+              f"{fake.completion_tokens:6} completion tok  {seconds:7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Time an incremental email import of a generated mailbox.
+
+Builds an mbox of HTML newsletters (multipart/alternative, quoted-printable,
+a few dozen links each) and runs EmailImportService over it as a dry run —
+no database, no network — once in this process and once with a process pool
+parsing MIME and converting HTML, the way ``email_import.py --sync`` does::
+
+    PYTHONPATH=. python scripts/bench_email_import.py --messages 2000
+    PYTHONPATH=. python scripts/bench_email_import.py export.mbox --processes 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from pathlib import Path
+
+from library.email_import_service import EmailImportService
+from library.email_sources import LocalMailboxSource
+
+WORDS = ["Lorem", "ipsum", "dolor", "sit", "amet,", "zażółć", "gęślą", "jaźń", "consectetur", "rynek", "rząd"]
+
+
+def newsletter(i: int, rnd: random.Random, paragraphs: int) -> bytes:
+    message = EmailMessage()
+    message["From"] = f"Newsletter {i % 20} <news{i % 20}@example.com>"
+    message["To"] = "reader@example.com"
+    message["Subject"] = f"Wydanie {i}: {' '.join(rnd.choice(WORDS) for _ in range(5))}"
+    message["Date"] = formatdate(1_700_000_000 + i * 3600)
+    message["Message-ID"] = make_msgid(idstring=str(i), domain="example.com")
+    body = [f"<h1>Wydanie {i}</h1>"]
+    for p in range(paragraphs):
+        words = " ".join(rnd.choice(WORDS) for _ in range(50))
+        body.append(f'<p>{words} <a href="https://example.com/{i}/{p}">czytaj</a> <b>{rnd.choice(WORDS)}</b></p>')
+    html_body = "<html><head><style>p { margin: 0 }</style></head><body>" + "".join(body) + "</body></html>"
+    message.set_content("Wersja tekstowa newslettera.")
+    message.add_alternative(html_body, subtype="html", cte="quoted-printable")
+    return message.as_bytes()
+
+
+def generated_mbox(directory: str, messages: int, paragraphs: int) -> str:
+    rnd = random.Random(1)
+    path = os.path.join(directory, "bench.mbox")
+    with open(path, "wb") as handle:
+        for i in range(messages):
+            handle.write(b"From bench@example.com Thu Jan  1 00:00:00 2026\n")
+            handle.write(newsletter(i, rnd, paragraphs).replace(b"\nFrom ", b"\n>From ") + b"\n")
+    return path
+
+
+def run(path: str, processes: int, batch_size: int) -> dict:
+    source = LocalMailboxSource(path)
+    executor = None
+    if processes > 1:
+        executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        service = EmailImportService(
+            None, source, executor=executor, batch_size=batch_size, dry_run=True, detect_language=False,
+        )
+        started = time.perf_counter()
+        result = service.run()
+        result["elapsed_seconds"] = time.perf_counter() - started
+        return result
+    finally:
+        source.close()
+        if executor is not None:
+            executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the incremental email import on an mbox")
+    parser.add_argument("mbox", nargs="?", type=Path, help="mbox file (default: generated)")
+    parser.add_argument("--messages", type=int, default=1000, help="messages in the generated mbox")
+    parser.add_argument("--paragraphs", type=int, default=40, help="paragraphs per generated newsletter")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(args.mbox) if args.mbox else generated_mbox(directory, args.messages, args.paragraphs)
+        size = os.path.getsize(path)
+        for processes in sorted({1, args.processes}):
+            result = run(path, processes, args.batch_size)
+            seconds = result["elapsed_seconds"]
+            print(f"processes={processes:<3} {result['found']:6} messages  {size / 1024 / 1024:7.1f} MiB  "
+                  f"{seconds:7.2f} s  {result['found'] / seconds:8.1f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Load-test analysis, search and entity enrichment against the fake/ provider.
+
+Every LLM and embedding call goes to the local fake/ models
+(library/api/fake/): deterministic answers, hash-based embeddings, and the
+latency, error rate and answer length given on the command line. The rest is
+the production path — DocumentAnalysisService.create_run(),
+SearchService.search() and execute_entity_enrichment() on the configured
+PostgreSQL, from a thread pool of the given size, with ai_ask()'s adaptive
+concurrency limit and usage recording in between.
+
+It writes what those paths write (analysis runs, tags, enrichment jobs and
+results, llm_usage_log rows with provider ``fake``), so point it at a
+development database. Search finds semantic matches only for documents
+embedded with the fake model; otherwise it exercises the lexical path plus
+the query embedding. Examples::
+
+    PYTHONPATH=. python scripts/bench_fake_load.py --documents 20 --concurrency 8
+    PYTHONPATH=. python scripts/bench_fake_load.py --scenario search --queries 500 --concurrency 32
+    PYTHONPATH=. python scripts/bench_fake_load.py --scenario analysis --latency-ms 900 --error-rate 0.05
+"""
+
+import argparse
+import datetime as dt
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from library.config_loader import load_config
+from library.db.engine import get_session
+from library.db.models import Document, Job
+from library.llm_concurrency import limiter_snapshot
+
+SCENARIOS = ("analysis", "search", "enrichment")
+
+
+def _pick_documents(count: int) -> list[tuple[int, str]]:
+    session = get_session()
+    try:
+        return list(session.execute(
+            select(Document.id, Document.title)
+            .where(func.length(func.coalesce(Document.text_md, Document.text)) > 500)
+            .order_by(Document.id.desc())
+            .limit(count)
+        ).all())
+    finally:
+        session.close()
+
+
+def _analysis(model: str):
+    from library.document_analysis_service import DocumentAnalysisService
+
+    def run(doc_id: int) -> None:
+        session = get_session()
+        try:
+            DocumentAnalysisService(session).create_run(doc_id, model=model, mode="article")
+        finally:
+            session.close()
+
+    return run
+
+
+def _search():
+    from library.search.types import SearchFilters
+    from library.search_service import SearchService
+
+    def run(query: str) -> None:
+        session = get_session()
+        try:
+            SearchService(session).search(query, SearchFilters(), limit=20)
+        finally:
+            session.close()
+
+    return run
+
+
+def _enrichment():
+    from library.entity_enrichment_service import ENTITY_ENRICHMENT, _text_digest, execute_entity_enrichment
+    from library.job_queue import finish
+
+    def run(doc_id: int) -> None:
+        session = get_session()
+        try:
+            doc = session.get(Document, doc_id)
+            now = dt.datetime.now(dt.timezone.utc)
+            # Created as running, so a worker on the same database never claims it.
+            job = Job(
+                id=uuid.uuid4().hex, type=ENTITY_ENRICHMENT, status="running", attempt=1,
+                parameters={"document_id": doc_id, "text_digest": _text_digest(doc)},
+                idempotency_key=f"bench_fake_load:{uuid.uuid4().hex}", started_at=now, heartbeat_at=now,
+            )
+            session.add(job)
+            session.commit()
+            try:
+                result = execute_entity_enrichment(session, job)
+            except Exception as exc:
+                finish(session, job, "failed", error=str(exc))
+                raise
+            finish(session, job, "done", result=result)
+        finally:
+            session.close()
+
+    return run
+
+
+def _timed(function, item) -> tuple[float, str | None]:
+    started = time.perf_counter()
+    try:
+        function(item)
+        error = None
+    except Exception as exc:
+        error = type(exc).__name__
+    return (time.perf_counter() - started) * 1000, error
+
+
+def run(label: str, function, items: list, concurrency: int) -> None:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda item: _timed(function, item), items))
+    seconds = time.perf_counter() - started
+    timings = sorted(ms for ms, _ in outcomes)
+    errors = [error for _, error in outcomes if error]
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    print(f"{label:<11} {len(items):5} ops  {len(errors):4} errors  {seconds:8.2f} s  {len(items) / seconds:7.2f} ops/s  "
+          f"p50 {statistics.median(timings):8.0f} ms  p95 {p95:8.0f} ms  max {timings[-1]:8.0f} ms")
+    for name in sorted(set(errors)):
+        print(f"{'':<11} {errors.count(name):5} x {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test analysis, search and enrichment with the fake/ LLM provider")
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="default: all three")
+    parser.add_argument("--documents", type=int, default=10, help="latest documents with text to analyse/enrich")
+    parser.add_argument("--document-ids", type=int, nargs="+", help="use these documents instead")
+    parser.add_argument("--queries", type=int, default=200, help="search queries (taken from document titles)")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel operations per scenario")
+    parser.add_argument("--model", default="fake/bielik")
+    parser.add_argument("--embedding-model", default="fake/embedding")
+    parser.add_argument("--latency-ms", type=float, default=600, help="fixed latency per LLM call")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=30, help="latency per 1000 prompt+completion tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of LLM calls failing with HTTP 503")
+    parser.add_argument("--completion-tokens", type=int, default=120, help="length of free-text answers")
+    parser.add_argument("--embedding-latency-ms", type=float, default=80)
+    parser.add_argument("--embedding-dimensions", type=int, default=1024)
+    args = parser.parse_args()
+
+    # Config is a dict read lazily by every caller: overriding the model keys
+    # here routes tagging, NER context checks and search to the fake models.
+    load_config().update({
+        "TAGGING_MODEL": args.model,
+        "NER_CONTEXT_MODEL": args.model,
+        "EMBEDDING_MODEL": args.embedding_model,
+        "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+        "FAKE_LLM_MS_PER_1K_TOKENS": str(args.ms_per_1k_tokens),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "FAKE_LLM_COMPLETION_TOKENS": str(args.completion_tokens),
+        "FAKE_EMBEDDING_LATENCY_MS": str(args.embedding_latency_ms),
+        "FAKE_EMBEDDING_DIMENSIONS": str(args.embedding_dimensions),
+    })
+
+    documents = _pick_documents(max(args.documents, args.queries))
+    doc_ids = args.document_ids or [doc_id for doc_id, _ in documents[:args.documents]]
+    titles = [" ".join((title or "").split()[:4]) for _, title in documents if title] or ["wojna ekonomia"]
+    queries = [titles[i % len(titles)] for i in range(args.queries)]
+
+    for scenario in args.scenario or SCENARIOS:
+        if scenario == "analysis":
+            run("analysis", _analysis(args.model), doc_ids, args.concurrency)
+        elif scenario == "search":
+            run("search", _search(), queries, args.concurrency)
+        else:
+            run("enrichment", _enrichment(), doc_ids, args.concurrency)
+
+    for window in limiter_snapshot():
+        print(f"limiter {window['model']} ({window['provider']}): limit {window['limit']}, "
+              f"throttled {window['throttled_total']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Measure the time record_llm_usage() adds to every ai_ask() call.
+
+Runs the same workload through the synchronous path (one session, pricing
+query and commit per call) and through the batched writer
+(library/llm_usage/writer.py), from several threads as the concurrent
+chunk analysis does. Needs the configured PostgreSQL; the rows it writes
+(provider ``benchmark``) are deleted at the end. record_llm_usage() logs and
+swallows database errors, so each phase also checks that every call left a
+row — otherwise the timings would be those of failed connects. Example::
+
+    PYTHONPATH=. python scripts/bench_llm_usage_recorder.py --calls 500 --threads 8
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import delete, func, select, text
+
+from library.db.engine import get_session
+from library.db.models import LlmUsageLog
+from library.llm_usage import recorder
+from library.llm_usage.writer import UsageWriter
+
+PROVIDER = "benchmark"
+
+
+def _one_call(_index: int) -> float:
+    started = time.perf_counter()
+    recorder.record_llm_usage(
+        operation="benchmark", provider=PROVIDER, model="bench-model",
+        prompt_tokens=1200, completion_tokens=300, latency_ms=900,
+    )
+    return (time.perf_counter() - started) * 1000
+
+
+def _rows() -> int:
+    session = get_session()
+    try:
+        return session.execute(select(func.count()).where(LlmUsageLog.provider == PROVIDER)).scalar_one()
+    finally:
+        session.close()
+
+
+def run(label: str, calls: int, threads: int, flush=None) -> None:
+    before = _rows()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        timings = sorted(pool.map(_one_call, range(calls)))
+    if flush is not None:
+        flush()
+    written = _rows() - before
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<12} mean {statistics.fmean(timings):7.3f} ms  p50 {statistics.median(timings):7.3f} ms  "
+          f"p95 {p95:7.3f} ms  ({calls} calls, {threads} threads, {written} rows written)")
+    if written != calls:
+        sys.exit(f"{label}: {calls - written} of {calls} usage rows were not written; see the log above")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the LLM usage recording overhead per call")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    session = get_session()
+    try:
+        session.execute(text("SELECT 1"))
+    except Exception as exc:
+        sys.exit(f"The configured PostgreSQL is not reachable: {exc}")
+    finally:
+        session.close()
+
+    try:
+        run("synchronous", args.calls, args.threads)
+        writer = UsageWriter()
+        original = recorder.active_writer
+        recorder.active_writer = lambda: writer
+        try:
+            # close() waits for the flush thread, so every queued row is counted.
+            run("batched", args.calls, args.threads, flush=writer.close)
+        finally:
+            recorder.active_writer = original
+            writer.close()
+    finally:
+        session = get_session()
+        try:
+            deleted = session.execute(delete(LlmUsageLog).where(LlmUsageLog.provider == PROVIDER)).rowcount
+            session.commit()
+            print(f"removed {deleted} benchmark rows")
+        finally:
+            session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Compare webpage_raw_parse() with the former quadratic text structuring.
+
+The old code called ``soup.get_text()`` twice and then, for every heading
+and ``<p>``, searched the whole text and rebuilt it with a paragraph break —
+one full copy per block. Without arguments the benchmark builds a large
+news-portal page (navigation, teaser lists, a long article, comments);
+pass saved pages to time those instead. Example::
+
+    PYTHONPATH=. python scripts/bench_webpage_raw_parse.py --blocks 3000
+    PYTHONPATH=. python scripts/bench_webpage_raw_parse.py page1.html page2.html
+"""
+
+import argparse
+import re
+import statistics
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from library.website.website_download_context import webpage_raw_parse, webpage_text_clean
+
+URL = "https://example.com/benchmark"
+
+
+def legacy_parse(url: str, raw_html: bytes) -> str:
+    soup = BeautifulSoup(raw_html, "html.parser")
+    soup.get_text()  # text_raw
+    content = soup.get_text()
+    content = re.sub(r"^\n+", "", content)
+    content = re.sub(r"\n+$", "", content)
+    content = re.sub(r"\n\n+", "\n\n", content)
+    for tag in ["h1", "h2", "h3", "h4", "h5", "h6", "p"]:
+        for element in soup.find_all(tag):
+            index = content.find(element.text)
+            if index != -1:
+                content = content[:index] + "\n\n" + content[index:]
+    return webpage_text_clean(url, content)
+
+
+def portal_page(blocks: int) -> bytes:
+    nav = "".join(f'<li><a href="/dzial/{i}">Dział {i}</a></li>' for i in range(60))
+    teasers = "".join(
+        f'<div class="teaser"><h3><a href="/a/{i}">Nagłówek wiadomości numer {i}</a></h3>'
+        f"<p>Krótki lead wiadomości {i} z portalu.</p></div>"
+        for i in range(blocks // 4)
+    )
+    article = "".join(
+        (f"<h2>Śródtytuł {i}</h2>" if i % 10 == 0 else "")
+        + f"<p>Akapit {i}: Lorem ipsum dolor sit amet, <b>consectetur</b> adipiscing elit, "
+        f'sed do eiusmod tempor <a href="/tag/{i}">incididunt</a> ut labore et dolore magna aliqua.</p>'
+        for i in range(blocks)
+    )
+    comments = "".join(f'<div class="comment"><h5>Użytkownik {i}</h5><p>Komentarz {i}.</p></div>'
+                       for i in range(blocks // 4))
+    html = (
+        '<!DOCTYPE html><html lang="pl"><head><title>Portal - artykuł</title>'
+        "<script>var tracking = {id: 1};</script><style>.a{color:red}</style></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header><main><aside>{teasers}</aside>"
+        f"<article><h1>Tytuł artykułu na portalu</h1>{article}</article></main>"
+        f'<section class="comments">{comments}</section><footer><p>© Portal</p></footer></body></html>'
+    )
+    return html.encode("utf-8")
+
+
+def timed(function, repeat: int) -> tuple[float, object]:
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark webpage_raw_parse() against the legacy structuring")
+    parser.add_argument("pages", nargs="*", type=Path, help="saved HTML pages (default: a generated portal page)")
+    parser.add_argument("--blocks", type=int, default=2000, help="paragraphs in the generated page")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = [(path.name, path.read_bytes()) for path in args.pages] or [
+        (f"generated portal ({args.blocks} paragraphs)", portal_page(args.blocks))
+    ]
+    for name, raw_html in pages:
+        legacy_s, legacy_text = timed(lambda: legacy_parse(URL, raw_html), args.repeat)
+        current_s, result = timed(lambda: webpage_raw_parse(URL, raw_html), args.repeat)
+        print(f"{name}: {len(raw_html) / 1024:.0f} KiB")
+        print(f"  legacy   {legacy_s * 1000:9.1f} ms")
+        print(f"  current  {current_s * 1000:9.1f} ms  ({legacy_s / current_s:.1f}x)")
+        print(f"  same text: {legacy_text == result.text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Re-clean stored articles with the current article_cleaner rules.
+
+Enqueues a reclean_corpus job for the worker, or with ``--inline`` runs it
+here and prints the per-portal report. Start with ``--dry-run`` to see how
+many documents a rule change would touch. Examples::
+
+    PYTHONPATH=. python scripts/reclean_corpus.py --portal onet --dry-run --inline
+    PYTHONPATH=. python scripts/reclean_corpus.py --portal onet --portal wp --processes 4
+"""
+
+import argparse
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from library.article_reclean import PORTALS, enqueue_reclean_corpus, reclean_corpus
+from library.db.engine import get_session, set_process_role
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-run article_cleaner over stored webpage documents")
+    parser.add_argument("--portal", action="append", choices=sorted(PORTALS),
+                        help="limit to a portal (repeatable; default: all documents)")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing them")
+    parser.add_argument("--processes", type=int, help="pool size (default: CPU count)")
+    parser.add_argument("--inline", action="store_true", help="run here instead of enqueueing a job")
+    args = parser.parse_args()
+
+    set_process_role("script")
+    session = get_session()
+    try:
+        if not args.inline:
+            job = enqueue_reclean_corpus(session, args.portal, dry_run=args.dry_run, processes=args.processes)
+            print(f"Enqueued reclean_corpus job {job.id}")
+            return
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=args.processes, mp_context=context) as executor:
+            result = reclean_corpus(session, args.portal, dry_run=args.dry_run, executor=executor,
+                                    progress=lambda counts: print(json.dumps(counts)))
+        print(json.dumps(result, indent=2))
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
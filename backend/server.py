@@ -1,16 +1,21 @@
 from flask import Flask, Response, g, request, abort, jsonify
 from flask_cors import CORS
+import datetime
 import logging
+import time
 from sqlalchemy import select
 
 from library.config_loader import load_config
-from library.db.engine import get_scoped_session
+from library.db.engine import (
+    get_read_session, get_scoped_session, get_session, remove_read_session, set_process_role,
+)
 from library.db.models import ContentGroup, TranscriptionLog, Document, EmailFooterRule
-from library.email_footer_rules import apply_footer_rule, normalize_sender_email
+from library.email_footer_rules import footer_matcher, invalidate_footer_rule, normalize_sender_email
 from library.document_service import DocumentService
 from library.document_ingest_service import DocumentIngestService, IngestRequest
 from library.search_service import SearchService
 from library.document_repository import DocumentRepository
+from library.document_stats import load_snapshot
 from library.website.website_paid import website_is_paid
 from library.ai_intent_parser import parse_intent
 from library.models.stalker_document_status import StalkerDocumentStatus
@@ -18,7 +23,7 @@ from library.models.stalker_document_type import StalkerDocumentType
 from library.models.stalker_document_status_error import StalkerDocumentStatusError
 from library.api_key_routes import bp as api_key_bp
 from library.auth import resolve_api_key
-from library.chunk_review_routes import bp as chunk_review_bp, start_analysis_worker
+from library.chunk_review_routes import bp as chunk_review_bp
 from library.llm_cost_routes import bp as llm_cost_bp
 from library.service_status_routes import bp as service_status_bp
 from library.reader_routes import bp as reader_bp
@@ -29,9 +34,12 @@ from library.feed_monitor_service import link_matching_feed_items_to_document
 from library.tool_candidate_routes import bp as tool_candidate_bp
 from library.tool_routes import bp as tool_bp
 from library.llm_analysis_routes import bp as llm_analysis_bp
+from library.metrics import observe_request, render as render_metrics
+from library import query_profiler
 from library.youtube_processing import process_youtube_url
 from library.storage import storage_from_config
-from library.upload_storage import list_uploaded_files, store_uploaded_file
+from library.storage_usage import ledger_usage, usage_by_prefix
+from library.upload_storage import UPLOAD_PREFIX, list_uploaded_files, store_uploaded_file
 
 logging.basicConfig(level=logging.INFO)
 
@@ -95,6 +103,10 @@ def check_auth_header():
 logging.info("Starting flask application")
 app = Flask(__name__)
 app.config["MAX_CONTENT_LENGTH"] = int(cfg.get("UPLOAD_MAX_BYTES") or 250 * 1024 * 1024)
+query_profile_settings = query_profiler.ProfileSettings.from_config(cfg)
+if query_profile_settings is not None:
+    logging.info("Query profiling enabled: %s", query_profile_settings)
+    query_profiler.install()
 logging.info("Flask - enabling CORS for all routes")
 CORS(app)  # This will enable CORS for all routes
 
@@ -109,13 +121,35 @@ app.register_blueprint(feed_bp)
 app.register_blueprint(tool_candidate_bp)
 app.register_blueprint(tool_bp)
 app.register_blueprint(llm_analysis_bp)
-start_analysis_worker()
 
 
 @app.teardown_appcontext
 def shutdown_session(exception=None):
-    """Clean up scoped session at end of Flask request."""
+    """Clean up scoped sessions at end of Flask request."""
     get_scoped_session().remove()
+    remove_read_session()
+
+
+@app.before_request
+def start_request_timer():
+    # Registered before the auth check so rejected requests are timed too.
+    g.request_started = time.perf_counter()
+    if query_profile_settings is not None:
+        g.query_profile_token = query_profiler.start(f"{request.method} {request.path}")
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get("request_started")
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        observe_request(route, request.method, response.status_code, time.perf_counter() - started)
+    token = g.pop("query_profile_token", None)
+    if token is not None:
+        profile = query_profiler.stop(token)
+        query_profiler.report(profile, query_profile_settings)
+        response.headers["Server-Timing"] = profile.server_timing()
+    return response
 
 
 @app.before_request
@@ -142,7 +176,7 @@ def upload_file():
     if uploaded is None:
         return jsonify(error="multipart field 'file' is required"), 400
     try:
-        result = store_uploaded_file(storage_from_config(cfg), uploaded.filename, uploaded.read())
+        result = store_uploaded_file(storage_from_config(cfg), uploaded.filename, uploaded.stream)
     except ValueError as exc:
         return jsonify(error=str(exc)), 400
     except Exception:  # noqa: BLE001 - storage details must not leak to the browser
@@ -168,12 +202,41 @@ def list_uploads():
     except Exception:  # noqa: BLE001 - storage details must not leak to API clients
         logging.exception("Could not list uploaded files")
         return jsonify(error="could not list uploaded files"), 502
+    area = ledger_usage(get_scoped_session(), UPLOAD_PREFIX)
     return jsonify({
         "uploads": [
             {"key": item.key, "filename": item.filename, "size": item.size, "format": item.extension.removeprefix(".")}
             for item in uploads
         ],
         "limit": limit,
+        "usage": {"objects": area[0], "bytes": area[1]} if area is not None else None,
+    })
+
+
+@app.route('/storage/usage', methods=['GET'])
+def get_storage_usage():
+    """Object storage totals per top-level prefix, read from the usage ledger.
+
+    Constant time regardless of bucket size — one small table, never a
+    listing. reconciled_at is the oldest per-prefix reconcile, i.e. how long
+    incremental totals have been running without a full recount.
+    """
+    rows = usage_by_prefix(get_scoped_session())
+    reconciled = [row.reconciled_at for row in rows if row.reconciled_at is not None]
+    return jsonify({
+        "prefixes": [
+            {
+                "prefix": row.prefix,
+                "objects": row.object_count,
+                "bytes": row.total_bytes,
+                "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+                "reconciled_at": row.reconciled_at.isoformat() if row.reconciled_at else None,
+            }
+            for row in rows
+        ],
+        "objects": sum(row.object_count for row in rows),
+        "bytes": sum(row.total_bytes for row in rows),
+        "reconciled_at": min(reconciled).isoformat() if len(reconciled) == len(rows) and rows else None,
     })
 
 @app.route('/', methods=['GET', 'OPTIONS'])
@@ -380,9 +443,19 @@ def website_list():
         page = max(int(request.args.get('page', 1)), 1)
     except (TypeError, ValueError):
         return {"status": "error", "message": "limit and page must be integers"}, 400
+    # Keyset cursor (the last row's "cursor" from the previous response) —
+    # when present, page is ignored and the list continues after that row.
+    try:
+        after_id = int(request.args['after_id']) if request.args.get('after_id') else None
+        after_ingested_at = (datetime.datetime.fromisoformat(request.args['after_ingested_at'])
+                             if request.args.get('after_ingested_at') else None)
+        if (after_id is None) != (after_ingested_at is None):
+            raise ValueError
+    except (TypeError, ValueError):
+        return {"status": "error", "message": "after_id and after_ingested_at must be given together"}, 400
     logging.debug(document_type)
 
-    session = get_scoped_session()
+    session = get_read_session()
     group_ids = topic_group_ids + ([priority_group_id] if priority_group_id else [])
     if group_ids:
         groups = {group.id: group for group in session.scalars(select(ContentGroup).where(ContentGroup.id.in_(group_ids), ContentGroup.archived_at.is_(None))).all()}
@@ -405,12 +478,24 @@ def website_list():
         "without_priority": without_priority,
         "sort": sort,
     }
+    if after_id is not None:
+        list_kwargs.update(after_id=after_id, after_ingested_at=after_ingested_at)
     try:
         websites_list = repo.get_list(**list_kwargs)
     except ValueError as exc:
         return {"status": "error", "message": str(exc)}, 400
-    count_kwargs = {key: value for key, value in list_kwargs.items() if key not in ("limit", "offset")}
-    websites_list_count = repo.get_list(**count_kwargs, count=True)
+    count_kwargs = {key: value for key, value in list_kwargs.items()
+                    if key not in ("limit", "offset", "after_id", "after_ingested_at")}
+    # Type/status-only filters are answered by the document_stats snapshot;
+    # anything narrower needs the exact filtered COUNT.
+    snapshot = None
+    if not (search_in_documents or only_missing_obsidian_notes or only_has_obsidian_notes or without_embedding
+            or topic_group_ids or priority_group_id or without_topics or without_priority):
+        snapshot = load_snapshot(session)
+    if snapshot is not None:
+        websites_list_count = snapshot.count(document_type, processing_status)
+    else:
+        websites_list_count = repo.get_list(**count_kwargs, count=True)
     logging.debug("website count: %s", websites_list_count)
 
     response = {
@@ -419,10 +504,12 @@ def website_list():
         "encoding": "utf8",
         "websites": websites_list,
         "all_results_count": websites_list_count,
+        "count_refreshed_at": snapshot.refreshed_at.isoformat() if snapshot is not None else None,
         "pagination": {
             "page": page,
             "page_size": limit,
             "total_pages": max(1, (websites_list_count + limit - 1) // limit),
+            "next_cursor": websites_list[-1].get("cursor") if sort == "newest" and len(websites_list) == limit else None,
         },
     }
 
@@ -431,12 +518,15 @@ def website_list():
 
 @app.route('/website_count', methods=['GET'])
 def website_count():
-    """Return document counts grouped by type in a single query."""
+    """Return document counts grouped by type, from the document_stats snapshot when there is one."""
     logging.debug("Getting document counts by type")
-    session = get_scoped_session()
-    repo = DocumentRepository(session)
-    counts = repo.get_count_by_type()
-    return {"status": "success", "counts": counts}, 200
+    session = get_read_session()
+    snapshot = load_snapshot(session)
+    if snapshot is None:
+        counts = DocumentRepository(session).get_count_by_type()
+        return {"status": "success", "counts": counts, "refreshed_at": None}, 200
+    counts = {**snapshot.by_type, "ALL": snapshot.total}
+    return {"status": "success", "counts": counts, "refreshed_at": snapshot.refreshed_at.isoformat()}, 200
 
 
 @app.route('/document_states', methods=['GET', 'OPTIONS'])
@@ -777,9 +867,13 @@ def person_documents():
     link's raw_mention) and the list is sorted by it — the person page shows
     where the person is actually discussed, not just referenced once. A count
     of 0 means the entity row is gone (entities were refreshed after linking).
+    Documents whose occurrences are indexed (document_entity_occurrences) also
+    carry the per-chapter "occurrences" of GET /document/<id>/entity_occurrences,
+    all from one aggregate query; null means "ask that endpoint".
     """
-    from sqlalchemy import select as sa_select
-    from library.db.models import DocumentEntity, DocumentPerson, Person
+    from sqlalchemy import select as sa_select, tuple_
+    from library.db.models import Document, DocumentChapterIndex, DocumentEntity, DocumentPerson, Person
+    from library.entity_service import chapter_occurrence_counts
 
     person_id, error = _entities_doc_id(request.args.get('id'))
     if error:
@@ -793,20 +887,51 @@ def person_documents():
     links = session.execute(
         sa_select(DocumentPerson).where(DocumentPerson.person_id == person_id)
     ).scalars().all()
+    entities = {}
+    if links:
+        entities = {
+            row.document_id: row
+            for row in session.execute(
+                sa_select(DocumentEntity).where(
+                    DocumentEntity.entity_type == "persName",
+                    tuple_(DocumentEntity.document_id, DocumentEntity.entity_text).in_(
+                        [(link.document_id, link.raw_mention) for link in links]
+                    ),
+                )
+            ).scalars()
+        }
+    counts = chapter_occurrence_counts(session, [row.id for row in entities.values()])
+    chapter_titles = {}
+    if counts:
+        chapter_titles = {
+            document_id: {ch["position"]: ch["title"] for ch in chapters}
+            for document_id, chapters in session.execute(
+                sa_select(DocumentChapterIndex.document_id, DocumentChapterIndex.chapters)
+                .join(Document, Document.id == DocumentChapterIndex.document_id)
+                .where(
+                    DocumentChapterIndex.document_id.in_(list(counts)),
+                    DocumentChapterIndex.text_hash == Document.text_hash,
+                )
+            )
+        }
     documents = []
     for link in links:
-        mention_count = session.execute(
-            sa_select(DocumentEntity.mention_count).where(
-                DocumentEntity.document_id == link.document_id,
-                DocumentEntity.entity_type == "persName",
-                DocumentEntity.entity_text == link.raw_mention,
-            )
-        ).scalar_one_or_none() or 0
+        entity = entities.get(link.document_id)
+        titles = chapter_titles.get(link.document_id)
+        occurrences = None
+        if titles:
+            occurrences = [
+                {"position": position, "title": titles.get(position, ""), "count": count}
+                for position, count in sorted(
+                    item for item in counts[link.document_id].items() if item[0] is not None
+                )
+            ]
         documents.append({
             "id": link.document.id, "title": link.document.title,
             "document_type": link.document.document_type,
             "raw_mention": link.raw_mention, "confidence": link.confidence,
-            "mention_count": mention_count, "role": link.role,
+            "mention_count": entity.mention_count if entity is not None else 0, "role": link.role,
+            "occurrences": occurrences,
         })
     documents.sort(key=lambda d: (d["role"] != "author", -d["mention_count"]))
     return {
@@ -2831,6 +2956,7 @@ def email_footer_rule(document_id: int):
         if rule is not None:
             session.delete(rule)
             session.commit()
+            invalidate_footer_rule(sender)
         return {"status": "success"}, 200
 
     data = request.get_json(silent=True) or {}
@@ -2851,9 +2977,10 @@ def email_footer_rule(document_id: int):
     else:
         rule.footer_text = footer
     doc.email_sender = sender
-    doc.text = apply_footer_rule(session, sender, current_text)
+    doc.text = footer_matcher(footer).strip(current_text)
     doc.document_length = len(doc.text or "")
     session.commit()
+    invalidate_footer_rule(sender)
     return {"status": "success", "email_sender": sender, "text": doc.text}, 200
 
 
@@ -2990,6 +3117,7 @@ def kubernetes_metrics():
     metrics = "# HELP lenie_app_info Application information\n"
     metrics += "# TYPE lenie_app_info gauge\n"
     metrics += f'lenie_app_info{{version="{APP_VERSION}"}} 1\n'
+    metrics += render_metrics(get_session)
     return Response(metrics, mimetype='text/plain; charset=utf-8')
 
 
@@ -3024,6 +3152,15 @@ def app_version():
 
 
 if __name__ == '__main__':
+    from library.llm_concurrency import use_postgres
+    from library.llm_usage.writer import enable_usage_writer
+    from library.storage import enable_usage_ledger
+
+    set_process_role("web")
+    # LLM concurrency limits are shared with the worker.py processes.
+    use_postgres()
+    enable_usage_ledger()
+    enable_usage_writer()
     # Default bind on all interfaces is intentional — the server runs in a container
     bind_host = cfg.require("BIND_HOST", "0.0.0.0")  # nosec B104
     if cfg.require("USE_SSL", "false") == "true":
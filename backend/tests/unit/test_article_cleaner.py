@@ -248,6 +248,15 @@ class TestGenericLineCleaning:
         assert _detect_h2_ads(text) == set()
 
 
+    def test_portal_filter_sees_only_lines_kept_by_generic_pass(self):
+        # Generyczny filtr usuwa "REKLAMA" między "Źródło:" a jego wartością;
+        # filtr bankier.pl ma więc pominąć "PAP", a zachować następny akapit —
+        # tak jak przy dwóch osobnych przebiegach po liście.
+        text = "\n".join(["Źródło:", "REKLAMA", "PAP", LONG_PARAGRAPH])
+        result = clean_article_text(text, url="https://www.bankier.pl/wiadomosc/x-1.html")
+        assert result["text"] == LONG_PARAGRAPH
+
+
 class TestNormalization:
     def test_nbsp_replaced_and_blank_lines_collapsed(self):
         text = f"Pierwszy\xa0akapit.\n\n\n\n\n{LONG_PARAGRAPH}"
@@ -255,6 +264,11 @@ class TestNormalization:
         assert "Pierwszy akapit." in result["text"]
         assert "\n\n\n" not in result["text"]
 
+    def test_space_runs_mixed_with_nbsp_collapse_to_one(self):
+        text = f"Pierwszy \xa0 \xa0akapit   z\xa0\xa0odstępami.\n\n{LONG_PARAGRAPH}"
+        result = clean_article_text(text)
+        assert result["text"].startswith("Pierwszy akapit z odstępami.\n\n")
+
     def test_universal_footer_marker_cuts_text(self):
         text = f"{LONG_PARAGRAPH}\n\nDziękujemy, że przeczytałaś/eś nasz artykuł.\n\nStopka portalu."
         result = clean_article_text(text)
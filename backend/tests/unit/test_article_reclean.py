@@ -0,0 +1,174 @@
+"""Tests for library/article_reclean.py — batch re-clean of stored articles."""
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.dialects import postgresql  # noqa: E402
+from sqlalchemy.sql import Select  # noqa: E402
+
+from library import article_reclean, document_images, information_provenance  # noqa: E402
+from library.article_reclean import cleaned_text_hash, enqueue_reclean_corpus, reclean_corpus  # noqa: E402
+
+
+def _row(document_id, url, text_extracted, text_md, edited=False):
+    """A prepared document; ``edited`` means text_md was changed after cleaning."""
+    cleaned_hash = cleaned_text_hash("an earlier text_md" if edited else text_md)
+    return SimpleNamespace(
+        id=document_id, url=url, text_extracted=text_extracted, text_md=text_md, text_md_cleaned_hash=cleaned_hash,
+    )
+
+
+def _session(batches, embedded=()):
+    """Session whose SELECTs return ``batches`` in turn; other statements are recorded."""
+    session = MagicMock()
+    pending = list(batches) + [[]]
+    session.selects = []
+    session.writes = []
+
+    def execute(stmt, params=None):
+        result = MagicMock()
+        if isinstance(stmt, Select):
+            session.selects.append(str(stmt.compile(dialect=postgresql.dialect())))
+            result.all.return_value = pending.pop(0)
+        else:
+            session.writes.append(params)
+        return result
+
+    session.execute.side_effect = execute
+    session.scalars.return_value = list(embedded)
+    return session
+
+
+@pytest.fixture(autouse=True)
+def no_side_tables(monkeypatch):
+    images = MagicMock()
+    monkeypatch.setattr(document_images, "replace_document_images", images)
+    monkeypatch.setattr(information_provenance, "refresh_rule_based_sources", MagicMock())
+    return images
+
+
+def test_writes_only_changed_documents_without_embeddings(no_side_tables):
+    session = _session(
+        [[
+            _row(1, "https://wiadomosci.onet.pl/a", "Treść pierwsza.", "Treść pierwsza."),
+            _row(2, "https://wiadomosci.onet.pl/b", "Treść druga.", "Treść druga.\n\nReklama"),
+            _row(3, "https://example.com/c", "Treść trzecia.", "Stara treść"),
+        ]],
+        embedded=[3],
+    )
+    progress = []
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = reclean_corpus(session, executor=executor, progress=progress.append)
+
+    assert result["scanned"] == 3
+    assert result["changed"] == 2
+    assert result["written"] == 1
+    assert result["skipped_embedded"] == 1
+    assert result["portals"]["onet"]["documents"] == 2
+    assert result["portals"]["onet"]["changed"] == 1
+    assert result["portals"]["generic"] == {"documents": 1, "changed": 1, "clean_seconds": pytest.approx(0, abs=1)}
+    [update_rows] = session.writes
+    assert [row["id"] for row in update_rows] == [2]
+    assert update_rows[0]["text_md"] == "Treść druga."
+    assert update_rows[0]["text_md_cleaned_hash"] == cleaned_text_hash("Treść druga.")
+    assert update_rows[0]["quality"] is None
+    no_side_tables.assert_called_once_with(session, 2, [])
+    session.commit.assert_called_once()
+    assert progress == [{
+        "scanned": 3, "changed": 2, "written": 1, "skipped_edited": 0, "skipped_embedded": 1, "last_document_id": 3,
+    }]
+
+
+def test_text_md_edited_after_preparation_is_never_rewritten(no_side_tables):
+    session = _session([[
+        _row(1, "https://example.com/a", "Treść z biogramem.", "Treść poprawiona ręcznie.", edited=True),
+        _row(2, "https://example.com/b", "Treść.", "Treść.\n\n[1] przypis", edited=True),
+        SimpleNamespace(id=3, url="https://example.com/c", text_extracted="Nowa.", text_md="Stara.",
+                        text_md_cleaned_hash=None),
+    ]])
+
+    result = reclean_corpus(session)
+
+    assert result["changed"] == 3
+    assert result["skipped_edited"] == 3
+    assert result["written"] == 0
+    assert session.writes == []
+    no_side_tables.assert_not_called()
+
+
+def test_dry_run_reports_without_writing():
+    session = _session([[_row(5, "https://www.wp.pl/x", "Nowa treść.", "Stara treść.")]])
+
+    result = reclean_corpus(session, dry_run=True)
+
+    assert result["changed"] == 1
+    assert result["written"] == 0
+    assert result["dry_run"] is True
+    assert session.writes == []
+    session.scalars.assert_not_called()
+    session.commit.assert_not_called()
+
+
+def test_portal_filter_preselects_in_sql_and_pages_by_id():
+    session = _session(
+        [[_row(7, "https://www.money.pl/x", "A.", "A."), _row(9, "https://www.onet.pl/y", "B.", "B.")]],
+    )
+
+    result = reclean_corpus(session, ["onet"], batch_size=2)
+
+    assert result["scanned"] == 1  # the money.pl row matched "onet.pl" in SQL, not _detect_portal
+    assert "documents.url ILIKE" in session.selects[0]
+    assert "fakt.pl" in str(session.execute.call_args_list[0].args[0].compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "LIMIT" in session.selects[0]
+    last_id = session.execute.call_args_list[1].args[0].compile(dialect=postgresql.dialect()).params
+    assert 9 in last_id.values()
+
+
+def test_generic_portal_scans_all_urls_in_python():
+    session = _session([[
+        _row(1, "https://www.onet.pl/a", "A.", "A."),
+        _row(2, "https://example.com/b", "B.", "B."),
+    ]])
+
+    result = reclean_corpus(session, ["generic"])
+
+    assert "ILIKE" not in session.selects[0]
+    assert result["scanned"] == 1
+    assert list(result["portals"]) == ["generic"]
+
+
+def test_enqueue_validates_portals(monkeypatch):
+    enqueue = MagicMock()
+    monkeypatch.setattr(article_reclean, "enqueue", enqueue)
+
+    with pytest.raises(ValueError, match="unknown portals: nope"):
+        enqueue_reclean_corpus(MagicMock(), ["onet", "nope"])
+
+    enqueue_reclean_corpus("session", ["wp", "onet"], dry_run=True, processes=4)
+    enqueue.assert_called_once_with(
+        "session", "reclean_corpus", {"portals": ["onet", "wp"], "dry_run": True, "processes": 4}, user_id=None,
+    )
+
+
+@pytest.mark.parametrize("parameters, config, expected", [
+    ({"processes": 3}, {"RECLEAN_CORPUS_PROCESSES": "2"}, 3),
+    ({}, {"RECLEAN_CORPUS_PROCESSES": "2"}, 2),
+    ({}, {}, 7),
+])
+def test_job_pool_size_comes_from_the_job_then_config_then_cpu_count(monkeypatch, parameters, config, expected):
+    pool = MagicMock()
+    monkeypatch.setattr(article_reclean, "ProcessPoolExecutor", pool)
+    monkeypatch.setattr(article_reclean, "load_config", lambda: config)
+    monkeypatch.setattr(article_reclean.os, "cpu_count", lambda: 7)
+    monkeypatch.setattr(article_reclean, "reclean_corpus", MagicMock(return_value={}))
+
+    article_reclean.execute_reclean_corpus(MagicMock(), SimpleNamespace(id="job-1", parameters=parameters))
+
+    assert pool.call_args.kwargs["max_workers"] == expected
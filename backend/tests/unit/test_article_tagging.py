@@ -3,6 +3,7 @@
 ai_ask is monkeypatched — no real LLM calls.
 """
 
+import json
 from types import SimpleNamespace
 
 import pytest
@@ -192,6 +193,97 @@ class TestExtractCountriesHybrid:
         assert result == []
 
 
+def _fake_batch_ai(answer, calls):
+    """Podróbka ai_ask: prompty wsadowe dostają JSON z answer(item), pojedyncze — "single"."""
+    def fake(prompt, model, temperature=0.7, max_token_count=4096, top_p=0.9, **kwargs):
+        calls.append(prompt)
+        if "DANE JSON:\n" not in prompt:
+            return SimpleNamespace(response_text="single")
+        items = json.loads(prompt.split("DANE JSON:\n", 1)[1])
+        results = [{"id": item["id"], "values": values} for item in items if (values := answer(item)) is not None]
+        return SimpleNamespace(response_text=json.dumps({"results": results}, ensure_ascii=False))
+    return fake
+
+
+@pytest.mark.usefixtures("fixed_model")
+class TestBatchedMode:
+    def test_packs_articles_into_one_call_with_per_item_results(self, monkeypatch):
+        calls = []
+        answers = {"a": ["wojsko", "Gospodarka"], "b": [], "c": ["religia"]}
+        monkeypatch.setattr("library.ai.ai_ask", _fake_batch_ai(lambda item: answers[item["tytul"]], calls))
+
+        result = article_tagging.tag_article_with_llm_batch([("t1", "a"), ("t2", "b"), ("t3", "c")])
+
+        assert result == [["wojsko", "gospodarka"], [], ["religia"]]
+        assert len(calls) == 1
+        assert calls[0].count("Dostępne kategorie") == 1
+
+    def test_invalid_or_missing_items_fall_back_to_single_calls(self, monkeypatch):
+        calls = []
+        answers = {"a": ["wojsko"], "b": ["kosmici"], "c": None}
+        monkeypatch.setattr("library.ai.ai_ask", _fake_batch_ai(lambda item: answers[item["tytul"]], calls))
+        monkeypatch.setattr(article_tagging, "tag_article_with_llm", lambda text, title: [f"single-{title}"])
+
+        result = article_tagging.tag_article_with_llm_batch([("t1", "a"), ("t2", "b"), ("t3", "c")])
+
+        assert result == [["wojsko"], ["single-b"], ["single-c"]]
+
+    def test_unparsable_response_falls_back_for_the_whole_batch(self, monkeypatch):
+        monkeypatch.setattr("library.ai.ai_ask", _fake_ai("wojsko, gospodarka"))
+
+        assert article_tagging.tag_article_with_llm_batch([("t1", "a"), ("t2", "b")]) == [
+            ["wojsko", "gospodarka"], ["wojsko", "gospodarka"],
+        ]
+
+    def test_batches_respect_item_and_size_limits(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(article_tagging, "MAX_BATCH_ITEMS", 2)
+        monkeypatch.setattr("library.ai.ai_ask", _fake_batch_ai(lambda item: ["polska"], calls))
+
+        result = article_tagging.extract_countries_with_llm_batch([("x" * 10000, "a")] * 5)
+
+        assert len(calls) == 3  # 2 + 2 paczki, piąty artykuł pojedynczo
+        assert all("x" * 3001 not in prompt for prompt in calls)
+        assert result[:4] == [["kraj-polska"]] * 4
+
+    def test_hybrid_countries_skip_articles_without_gazetteer_candidates(self, monkeypatch):
+        pytest.importorskip("unidecode")
+        calls = []
+        monkeypatch.setattr("library.ai.ai_ask", _fake_batch_ai(lambda item: item["kandydaci"][:1], calls))
+
+        result = article_tagging.extract_countries_hybrid_batch([
+            ("Polska ogłosiła nowy program.", "a"), ("tekst bez kraju", "b"), ("Niemcy podpisały umowę.", "c"),
+        ])
+
+        assert result == [["kraj-polska"], [], ["kraj-niemcy"]]
+        assert len(calls) == 1
+
+    def test_places_outside_the_documents_own_candidates_are_retried(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr("library.ai.ai_ask", _fake_batch_ai(lambda item: ["Kijów"], calls))
+        monkeypatch.setattr(article_tagging, "confirm_places_with_llm", lambda text, title, names: ["single"])
+
+        result = article_tagging.confirm_places_with_llm_batch([
+            ("o Kijowie", "a", ["kijów"]), ("bez miejsc", "b", []), ("o Lwowie", "c", ["Lwów"]),
+        ])
+
+        assert result == [["kijów"], [], ["single"]]
+
+    def test_persons_of_one_document_are_disambiguated_together(self, monkeypatch):
+        calls = []
+        picks = {"Tusk": ["Q946"], "Nawrocki": [], "Duda": ["Q1"]}
+        monkeypatch.setattr("library.ai.ai_ask", _fake_batch_ai(lambda item: picks[item["wzmianka"]], calls))
+        monkeypatch.setattr(article_tagging, "confirm_person_with_llm", lambda text, title, mention, c: "single")
+        candidates = [{"qid": "Q946", "label": "Donald Tusk", "description": None}]
+
+        result = article_tagging.confirm_person_with_llm_batch("Tusk, Nawrocki i Duda", "tytuł", {
+            "Tusk": candidates, "Nawrocki": candidates, "Duda": candidates, "Kowalski": [],
+        })
+
+        assert result == {"Tusk": "Q946", "Nawrocki": None, "Duda": "single", "Kowalski": None}
+        assert len(calls) == 1
+
+
 class TestConstants:
     def test_country_triggers_are_subset_of_thematic_tags(self):
         assert article_tagging.COUNTRY_TAG_TRIGGERS <= set(article_tagging.THEMATIC_TAGS)
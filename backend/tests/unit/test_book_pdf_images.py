@@ -9,18 +9,28 @@ at all.
 """
 
 import sys
+import threading
+import time
 import types
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 pytest.importorskip("sqlalchemy")
 
+from library import book_pdf_import  # noqa: E402
 from library.book_pdf_import import (  # noqa: E402
+    PageImage,
+    _submit_page_image_uploads,
     build_book_markdown,
     caption_for_page,
     detect_heading_texts,
     extract_page_images,
+    import_pdf_book,
+    iter_page_images,
 )
+from library.document_service import ExistingDocumentError  # noqa: E402
 
 
 class _FakePage:
@@ -84,6 +94,151 @@ class TestExtractPageImages:
 
         assert [(img.page_index, img.xref) for img in images] == [(0, 12), (1, 13)]
 
+    def test_dedup_by_content_across_distinct_xrefs(self, monkeypatch):
+        logo = b"L" * 6000
+        extract_image_map = {
+            20: {"image": logo, "width": 200, "height": 200, "ext": "png"},
+            21: {"image": logo, "width": 200, "height": 200, "ext": "png"},  # same bitmap, new xref
+            22: {"image": b"y" * 6000, "width": 200, "height": 200, "ext": "png"},
+        }
+        pages = [_FakePage([(20,)]), _FakePage([(21,), (22,)])]
+        _install_fake_fitz(monkeypatch, pages, extract_image_map)
+
+        images = extract_page_images(b"fake-pdf-bytes")
+
+        assert [img.xref for img in images] == [20, 22]
+        assert images[0].sha256 != images[1].sha256
+
+    def test_iter_page_images_is_lazy(self, monkeypatch):
+        calls = []
+        extract_image_map = {
+            12: {"image": b"x" * 6000, "width": 200, "height": 300, "ext": "png"},
+            13: {"image": b"z" * 6000, "width": 200, "height": 300, "ext": "png"},
+        }
+        pages = [_FakePage([(12,)]), _FakePage([(13,)])]
+        _install_fake_fitz(monkeypatch, pages, extract_image_map)
+        monkeypatch.setattr(_FakeFitzDocument, "extract_image", lambda self, xref: calls.append(xref) or extract_image_map[xref])
+
+        images = iter_page_images(b"fake-pdf-bytes")
+        first = next(images)
+
+        assert first.xref == 12
+        assert calls == [12]
+
+
+# ---------------------------------------------------------------------------
+# _submit_page_image_uploads — bounded concurrent upload
+# ---------------------------------------------------------------------------
+
+
+class _SlowStorage:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.objects = {}
+
+    def put_bytes(self, key, data, content_type=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+            self.objects[key] = (data, content_type)
+
+
+def _page_image(page_index, ext="png"):
+    return PageImage(page_index=page_index, xref=page_index, data=b"d%d" % page_index, ext=ext,
+                     width=200, height=200, sha256=f"h{page_index}")
+
+
+class TestSubmitPageImageUploads:
+    def test_uploads_every_image_under_positional_keys(self):
+        storage = _SlowStorage()
+        images = [_page_image(0), _page_image(3, ext="jpeg")]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            uploads = _submit_page_image_uploads(executor, storage, iter(images), "documents/u/images", 2)
+        for _stored, future in uploads:
+            future.result()
+
+        assert [(s.position, s.page_index, s.storage_key) for s, _f in uploads] == [
+            (0, 0, "documents/u/images/0.png"),
+            (1, 3, "documents/u/images/1.jpeg"),
+        ]
+        assert storage.objects["documents/u/images/1.jpeg"] == (b"d3", "image/jpeg")
+
+    def test_in_flight_uploads_bounded_by_limit(self):
+        storage = _SlowStorage()
+        pulled = []
+
+        def images():
+            for i in range(12):
+                pulled.append(i)
+                yield _page_image(i)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            uploads = _submit_page_image_uploads(executor, storage, images(), "p", 3)
+
+        assert len(uploads) == 12
+        assert len(storage.objects) == 12
+        assert storage.max_in_flight <= 3
+
+    def test_storage_error_surfaces_from_future(self):
+        class _FailingStorage:
+            def put_bytes(self, key, data, content_type=None):
+                raise RuntimeError("bucket gone")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            uploads = _submit_page_image_uploads(executor, _FailingStorage(), iter([_page_image(0)]), "p", 1)
+        with pytest.raises(RuntimeError, match="bucket gone"):
+            uploads[0][1].result()
+
+
+# ---------------------------------------------------------------------------
+# import_pdf_book — no storage objects left behind by a failed import
+# ---------------------------------------------------------------------------
+
+
+class _MemoryStorage(_SlowStorage):
+    def iter_objects(self, prefix=""):
+        return [types.SimpleNamespace(key=key) for key in list(self.objects) if key.startswith(prefix)]
+
+    def exists(self, key):
+        return key in self.objects
+
+    def delete(self, key):
+        self.objects.pop(key, None)
+
+
+def _import(storage, pages, *, existing=None, **kwargs):
+    with (
+        patch.object(book_pdf_import, "load_config"),
+        patch.object(book_pdf_import, "storage_from_config", return_value=storage),
+        patch.object(book_pdf_import.Document, "get_by_url", return_value=existing),
+        patch.object(book_pdf_import, "extract_pages", return_value=pages),
+        patch.object(book_pdf_import, "detect_heading_texts", return_value=set()),
+        patch.object(book_pdf_import, "iter_page_images", return_value=iter([_page_image(0), _page_image(1)])),
+    ):
+        return import_pdf_book(
+            MagicMock(), b"%PDF", title="Książka", detect_tables=False, apply_styles=False, **kwargs,
+        )
+
+
+class TestImportPdfBookFailures:
+    def test_duplicate_url_is_rejected_before_any_upload(self):
+        storage = _MemoryStorage()
+        with pytest.raises(ExistingDocumentError):
+            _import(storage, ["// ROZDZIAŁ 001 // Start\ntekst"], existing=MagicMock(id=7))
+        assert storage.objects == {}
+
+    def test_no_chapters_deletes_the_uploaded_images(self):
+        storage = _MemoryStorage()
+        storage.objects["documents/other/images/0.png"] = (b"x", "image/png")
+        with pytest.raises(ValueError, match="No chapters detected"):
+            _import(storage, ["zwykły tekst bez rozdziałów"])
+        assert list(storage.objects) == ["documents/other/images/0.png"]
+
 
 # ---------------------------------------------------------------------------
 # detect_heading_texts — font_prefix/min_size are per-book overrides (each
@@ -0,0 +1,81 @@
+"""Unit tests for library.chapter_index (persisted reader chapter index)."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from library.chapter_index import reader_text  # noqa: E402
+from library.db.models import Document, DocumentChapterIndex  # noqa: E402
+
+BOOK = "# Jeden\n\nPierwszy rozdział.\n\n# Dwa\n\nDrugi rozdział."
+STORED_CHAPTERS = [
+    {"position": 1, "level": 1, "title": "Jeden", "char_start": 0, "char_end": 28, "length": 28},
+    {"position": 2, "level": 1, "title": "Dwa", "char_start": 28, "char_end": 49, "length": 21},
+]
+
+
+def _session_with_index(row):
+    session = MagicMock()
+    session.get.side_effect = lambda model, pk: row if model is DocumentChapterIndex else None
+    return session
+
+
+class TestReaderText:
+    def test_current_index_is_served_without_loading_text(self):
+        doc = Document(id=7, text_hash="abc")  # text columns never set — deferred
+        row = DocumentChapterIndex(
+            document_id=7, text_hash="abc", source_field="text_md", text_length=49, word_count=8,
+            chapters=STORED_CHAPTERS,
+        )
+        session = _session_with_index(row)
+        session.scalar.return_value = "# Dwa\n\nDrugi rozdział."
+        store = MagicMock()
+
+        reader = reader_text(session, doc, session_factory=store)
+
+        assert reader.chapters == STORED_CHAPTERS
+        assert (reader.length, reader.word_count) == (49, 8)
+        assert reader.slice(28, 49) == "# Dwa\n\nDrugi rozdział."
+        sql = str(session.scalar.call_args.args[0].compile(compile_kwargs={"literal_binds": True}))
+        assert "substr(documents.text_md, 29, 21)" in sql
+        store.assert_not_called()
+
+    def test_stale_hash_recomputes_and_stores(self):
+        doc = Document(id=7, text_hash="new", text_md=BOOK)
+        row = DocumentChapterIndex(
+            document_id=7, text_hash="old", source_field="text_md", text_length=1, word_count=1, chapters=[],
+        )
+        store_session = MagicMock()
+
+        reader = reader_text(_session_with_index(row), doc, session_factory=lambda: store_session)
+
+        assert [c["title"] for c in reader.chapters] == ["Jeden", "Dwa"]
+        assert reader.slice(0, 8) == BOOK[:8]  # in memory: no SQL round trip
+        store_session.execute.assert_called_once()
+        store_session.commit.assert_called_once()
+
+    def test_store_failure_is_swallowed(self):
+        doc = Document(id=7, text_hash="new", text_md=BOOK)
+        store_session = MagicMock()
+        store_session.execute.side_effect = RuntimeError("db down")
+
+        reader = reader_text(_session_with_index(None), doc, session_factory=lambda: store_session)
+
+        assert len(reader.chapters) == 2
+        store_session.rollback.assert_called_once()
+        store_session.close.assert_called_once()
+
+    def test_non_orm_document_is_handled_in_memory(self):
+        doc = SimpleNamespace(id=7, text_md=BOOK, text=None, text_raw=None)
+        session = MagicMock()
+        store = MagicMock()
+
+        reader = reader_text(session, doc, session_factory=store)
+
+        assert reader.length == len(BOOK)
+        assert reader.find("# Dwa") == BOOK.find("# Dwa")
+        session.get.assert_not_called()
+        store.assert_not_called()
@@ -31,10 +31,11 @@ CFG_VARS = MockConfig({
 @pytest.fixture(autouse=True)
 def _reset_engine_module():
     """Reset the engine module between tests using the public API."""
-    from library.db.engine import dispose_engine
+    from library.db.engine import dispose_engine, set_process_role
     dispose_engine()
     yield
     dispose_engine()
+    set_process_role("script")
 
 
 class TestGetEngine:
@@ -100,18 +101,18 @@ class TestGetEngine:
             get_engine()
             mock_create.assert_called_once()
             _, kwargs = mock_create.call_args
-            assert kwargs["connect_args"] == {"sslmode": "require"}
+            assert kwargs["connect_args"]["sslmode"] == "require"
 
     @patch("library.db.engine.load_config", return_value=CFG_VARS)
     def test_sslmode_not_set_when_absent(self, _mock_cfg):
-        """When POSTGRESQL_SSLMODE is not in config, connect_args should be empty."""
+        """When POSTGRESQL_SSLMODE is not in config, only the script defaults are sent."""
         from library.db.engine import get_engine
 
         with patch("library.db.engine.create_engine", wraps=sqlalchemy.create_engine) as mock_create:
             get_engine()
             mock_create.assert_called_once()
             _, kwargs = mock_create.call_args
-            assert kwargs["connect_args"] == {}
+            assert kwargs["connect_args"] == {"application_name": "lenie-script"}
 
     @patch("library.db.engine.load_config")
     def test_missing_required_config_raises(self, mock_cfg):
@@ -141,6 +142,96 @@ class TestGetEngine:
         assert engine is not None
 
 
+class TestPoolSettings:
+    """Tests for per-role pool settings, timeouts and the driver option."""
+
+    @staticmethod
+    def _create_kwargs(cfg: dict, role: str | None = None) -> dict:
+        from library.db.engine import get_engine, set_process_role
+
+        if role:
+            set_process_role(role)
+        with patch("library.db.engine.load_config", return_value=MockConfig(cfg)), \
+                patch("library.db.engine.create_engine", wraps=sqlalchemy.create_engine) as mock_create:
+            get_engine()
+        return mock_create.call_args.kwargs
+
+    def test_web_role_defaults(self):
+        kwargs = self._create_kwargs(CFG_VARS, "web")
+        assert (kwargs["pool_size"], kwargs["max_overflow"], kwargs["pool_timeout"]) == (10, 10, 10)
+        assert kwargs["connect_args"] == {
+            "application_name": "lenie-web", "options": "-c statement_timeout=30000",
+        }
+
+    def test_worker_pool_covers_every_chunk_analysis_thread(self):
+        from library.document_analysis_service import CHUNK_ANALYSIS_MAX_WORKERS
+
+        kwargs = self._create_kwargs(CFG_VARS, "worker")
+        assert (kwargs["pool_size"], kwargs["pool_timeout"]) == (4, 30)
+        assert kwargs["max_overflow"] >= CHUNK_ANALYSIS_MAX_WORKERS
+
+    def test_role_specific_setting_wins_over_the_shared_one(self):
+        kwargs = self._create_kwargs({
+            **CFG_VARS, "POSTGRESQL_POOL_SIZE": "7", "POSTGRESQL_WORKER_POOL_SIZE": "2",
+            "POSTGRESQL_STATEMENT_TIMEOUT_MS": "0",
+        }, "worker")
+        assert kwargs["pool_size"] == 2
+        assert "options" not in kwargs["connect_args"]
+
+    def test_pool_reports_checkout_waits(self):
+        from library import metrics
+
+        self._create_kwargs(CFG_VARS)
+        from library.db.engine import get_engine
+
+        pool = get_engine().pool
+        with patch.object(type(pool).__mro__[1], "_do_get", return_value="conn"):
+            before = metrics.DB_POOL_WAIT_SECONDS._values.get(("primary",), (None, 0, 0))[2]
+            assert pool._do_get() == "conn"
+        assert metrics.DB_POOL_WAIT_SECONDS._values[("primary",)][2] == before + 1
+
+    def test_non_numeric_setting_raises(self):
+        with pytest.raises(ValueError, match="POSTGRESQL_POOL_SIZE must be numeric"):
+            self._create_kwargs({**CFG_VARS, "POSTGRESQL_POOL_SIZE": "many"})
+
+    def test_unknown_role_raises(self):
+        from library.db.engine import set_process_role
+
+        with pytest.raises(ValueError, match="Unknown process role"):
+            set_process_role("cron")
+
+    def test_unknown_driver_raises(self):
+        with pytest.raises(ValueError, match="POSTGRESQL_DRIVER"):
+            self._create_kwargs({**CFG_VARS, "POSTGRESQL_DRIVER": "pg8000"})
+
+    def test_psycopg3_prepare_threshold(self):
+        pytest.importorskip("psycopg")
+        kwargs = self._create_kwargs({**CFG_VARS, "POSTGRESQL_DRIVER": "psycopg", "POSTGRESQL_PREPARE_THRESHOLD": "off"})
+        assert kwargs["connect_args"]["prepare_threshold"] is None
+
+
+class TestGetReadSession:
+    """Tests for get_read_session() replica routing."""
+
+    @patch("library.db.engine.load_config", return_value=CFG_VARS)
+    def test_without_replica_is_the_primary_scoped_session(self, _mock_cfg):
+        from library.db.engine import get_read_engine, get_read_session, get_scoped_session
+
+        assert get_read_engine() is None
+        assert get_read_session() is get_scoped_session()
+
+    @patch("library.db.engine.load_config")
+    def test_replica_host_gets_its_own_engine(self, mock_cfg):
+        mock_cfg.return_value = MockConfig({**CFG_VARS, "POSTGRESQL_READ_HOST": "replica"})
+        from library.db.engine import get_engine, get_read_session, get_scoped_session
+
+        read_session = get_read_session()
+        assert read_session is not get_scoped_session()
+        assert read_session.bind.url.host == "replica"
+        assert read_session.bind.url.port == 5432
+        assert get_engine().url.host == "localhost"
+
+
 class TestGetSession:
     """Tests for get_session() factory."""
 
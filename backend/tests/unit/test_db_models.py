@@ -183,14 +183,15 @@ class TestWebDocumentColumns:
         "chapter_list", "processing_status", "processing_error_code",
         "text_raw", "transcript_job_id", "ai_summary_needed",
         "byline", "byline_method", "note", "uuid", "collection_id", "text_md",
-        "text_extracted", "transcript_needed", "reviewed_at",
+        "text_extracted", "text_md_cleaned_hash", "transcript_needed", "reviewed_at",
         "obsidian_note_paths", "video_description", "ner_unavailable_at",
         "quality", "canonical_url", "enrichment_run_at", "entities_checked_at",
         "email_sender", "search_terms", "obsidian_source_hash",
+        "has_embedding", "has_obsidian_notes", "text_hash",
     }
 
     def test_column_count(self):
-        assert len(_column_names(Document)) == 43
+        assert len(_column_names(Document)) == 47
 
     def test_all_column_names(self):
         assert _column_names(Document) == self.EXPECTED_COLUMNS
@@ -252,6 +252,66 @@ class TestArticleMode:
         assert article_env["speakers"] == 0
         assert article_env["fillers"] == 0
 
+    def test_checkpointed_chunks_skip_the_llm_and_new_results_are_saved(self, session, article_env):
+        class Checkpoints:
+            def __init__(self):
+                self.saved = {}
+                self.total = None
+
+            def expect(self, total):
+                self.total = total
+
+            def get(self, i, text):
+                return self.saved.get(i)
+
+            def save(self, i, text, result):
+                self.saved[i] = result
+
+        checkpoints = Checkpoints()
+        checkpoints.saved[0] = {
+            "type": "TEMAT", "topic": "z checkpointu", "corrected_text": None,
+            "summary": "zapisane", "rewrite_ratio": None,
+        }
+        service = DocumentAnalysisService(session)
+        service.create_run(doc_id=42, model="test-model", mode="article", chunk_size=300, checkpoints=checkpoints)
+
+        chunks = [o for o in session.added if isinstance(o, DocumentChunk)]
+        assert chunks[0].topic == "z checkpointu"
+        assert article_env["article"] == len(chunks) - 1
+        assert sorted(checkpoints.saved) == list(range(len(chunks)))
+        assert checkpoints.total == len(chunks)
+
+    def test_only_failed_chunks_are_retried(self, session, article_env, monkeypatch):
+        monkeypatch.setattr(das, "CHUNK_RETRY_BACKOFF_S", (0, 0))
+        calls = []
+
+        def flaky_article(text, model, position=1, total=1):
+            calls.append(position)
+            if position == 2 and calls.count(2) == 1:
+                raise RuntimeError("HTTP 429")
+            return {"type": "TEMAT", "topic": f"temat {position}", "corrected_text": None,
+                    "summary": None, "rewrite_ratio": None}
+
+        monkeypatch.setattr(llm, "analyze_article_chunk", flaky_article)
+        service = DocumentAnalysisService(session)
+        service.create_run(doc_id=42, model="test-model", mode="article", chunk_size=300)
+
+        chunks = [o for o in session.added if isinstance(o, DocumentChunk)]
+        assert calls.count(2) == 2
+        assert all(calls.count(p) == 1 for p in range(1, len(chunks) + 1) if p != 2)
+        assert chunks[1].topic == "temat 2"
+
+    def test_chunk_failing_every_round_fails_the_run(self, session, article_env, monkeypatch):
+        monkeypatch.setattr(das, "CHUNK_RETRY_BACKOFF_S", (0, 0))
+
+        def broken(text, model, position=1, total=1):
+            raise RuntimeError("HTTP 503")
+
+        monkeypatch.setattr(llm, "analyze_article_chunk", broken)
+        service = DocumentAnalysisService(session)
+        with pytest.raises(RuntimeError, match="LLM call failed for chunk 1/"):
+            service.create_run(doc_id=42, model="test-model", mode="article", chunk_size=300)
+
     def test_split_only_makes_no_llm_calls(self, session, article_env):
         service = DocumentAnalysisService(session)
         run = service.create_run(
@@ -221,7 +221,7 @@ def client(monkeypatch, run_with_sections):
 
     fake_session = MagicMock()
 
-    def fake_get(model, pk):
+    def fake_get(model, pk, **_kw):
         if model is DocumentAnalysisRun:
             return run if pk == run.id else None
         if model is Document:
@@ -320,7 +320,7 @@ class TestChaptersEndpoint:
         doc.obsidian_note_paths = ["Geopolityka i polityka/Kraje/Testowa książka.md"]
 
         fake_session = MagicMock()
-        fake_session.get.side_effect = lambda model, pk: doc if model is Document else None
+        fake_session.get.side_effect = lambda model, pk, **_kw: doc if model is Document else None
         fake_session.scalars.side_effect = lambda *_a, **_kw: _ScalarsResult([])
         monkeypatch.setattr(crr, "get_scoped_session", lambda: fake_session)
 
@@ -337,7 +337,7 @@ class TestCompactReaderChapters:
         long_text = BOOK_TEXT + (" bardzo długi tekst" * 1_000)
         chapters = detect_chapters(long_text)
 
-        result, compact = crr._compact_reader_chapters(long_text, chapters)
+        result, compact = crr._compact_reader_chapters(len(long_text), len(long_text.split()), chapters)
 
         assert compact is False
         assert result == chapters
@@ -630,7 +630,7 @@ def transcript_run():
 def transcript_client(monkeypatch, transcript_run):
     doc = FakeTranscriptDoc()
     fake_session = MagicMock()
-    fake_session.get.side_effect = lambda model, pk: doc if model is Document and pk == 88 else None
+    fake_session.get.side_effect = lambda model, pk, **_kw: doc if model is Document and pk == 88 else None
     # chapter-scoped synthesis lookup (GET /document/<id>/chapter/<pos>) — no
     # chapter-scoped run exists for this chunk-based-chapters document
     fake_session.scalars.side_effect = lambda *_a, **_kw: _ScalarsResult([])
@@ -682,7 +682,7 @@ class TestChaptersFallbackToChunks:
     def test_no_headers_and_no_run_returns_error(self, monkeypatch):
         doc = FakeTranscriptDoc()
         fake_session = MagicMock()
-        fake_session.get.side_effect = lambda model, pk: doc if model is Document else None
+        fake_session.get.side_effect = lambda model, pk, **_kw: doc if model is Document else None
         monkeypatch.setattr(crr, "get_scoped_session", lambda: fake_session)
         monkeypatch.setattr(crr, "_latest_run_for_document", lambda _session, _doc_id: None)
 
@@ -702,7 +702,7 @@ class TestExtractSpeakers:
     def _make_client(self, monkeypatch, run, chunks_for_query):
         fake_session = MagicMock()
         fake_session.get.side_effect = (
-            lambda model, pk: run if model is DocumentAnalysisRun and pk == run.id else None
+            lambda model, pk, **_kw: run if model is DocumentAnalysisRun and pk == run.id else None
         )
         fake_session.scalars.return_value = _ScalarsResult(chunks_for_query)
         monkeypatch.setattr(crr, "get_scoped_session", lambda: fake_session)
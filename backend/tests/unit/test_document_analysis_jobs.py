@@ -0,0 +1,198 @@
+"""Unit tests for library/document_analysis_jobs.py — analysis on the jobs queue."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.dialects import postgresql  # noqa: E402
+
+import library.document_analysis_jobs as jobs  # noqa: E402
+from library.document_analysis_jobs import (  # noqa: E402
+    ChunkCheckpoints,
+    chunk_input_hash,
+    enqueue_document_analysis,
+    execute_document_analysis,
+)
+
+PARAMS = {
+    "model": "m", "chunk_size": 5000, "no_synthesis": False, "mode": "article",
+    "split_only": False, "reclean": False, "scope_chapter": None,
+}
+
+
+def _checkpoint_session(rows=()):
+    session = MagicMock()
+    session.scalars.return_value = list(rows)
+    return session
+
+
+class TestChunkCheckpoints:
+    def test_get_returns_result_only_for_the_same_chunk_text(self):
+        row = SimpleNamespace(position=2, input_hash=chunk_input_hash("tekst"), result={"type": "TEMAT"})
+        checkpoints = ChunkCheckpoints("job1", session_factory=lambda: _checkpoint_session([row]))
+
+        assert checkpoints.get(2, "tekst") == {"type": "TEMAT"}
+        assert checkpoints.get(2, "inny tekst") is None
+        assert checkpoints.get(3, "tekst") is None
+
+    def test_save_upserts_and_is_visible_to_get(self):
+        session = _checkpoint_session()
+        checkpoints = ChunkCheckpoints("job1", session_factory=lambda: session)
+
+        session.scalar.return_value = 4
+        checkpoints.save(0, "tekst", {"type": "SZUM"})
+
+        lock = str(session.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+        assert "FROM document_analysis_jobs" in lock and "FOR UPDATE" in lock
+        stmt = session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        assert "INSERT INTO document_analysis_chunk_results" in str(stmt)
+        assert "ON CONFLICT (analysis_job_id, position) DO UPDATE" in str(stmt)
+        assert (stmt.params["seq"], stmt.params["chunk_text"]) == (4, "tekst")
+        session.commit.assert_called_once()
+        assert checkpoints.get(0, "tekst") == {"type": "SZUM"}
+
+    def test_save_failure_is_logged_and_rolled_back(self):
+        session = _checkpoint_session()
+        session.execute.side_effect = RuntimeError("db down")
+        checkpoints = ChunkCheckpoints("job1", session_factory=lambda: session)
+
+        checkpoints.save(0, "tekst", {"type": "SZUM"})
+
+        session.rollback.assert_called_once()
+        session.close.assert_called_once()
+
+
+def test_chunk_results_after_maps_rows_in_seq_order():
+    session = MagicMock()
+    session.scalars.return_value.all.return_value = [
+        SimpleNamespace(seq=3, position=0, chunk_text="źródło", result={
+            "type": "TEMAT", "topic": "T", "summary": "S", "corrected_text": "C", "rewrite_ratio": 0.2,
+        }),
+    ]
+
+    chunks = jobs.chunk_results_after(session, "job1", after=2)
+
+    assert chunks == [{
+        "seq": 3, "position": 1, "type": "TEMAT", "topic": "T", "summary": "S",
+        "corrected_text": "C", "rewrite_ratio": 0.2, "original_text": "źródło",
+    }]
+    sql = str(session.scalars.call_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "document_analysis_chunk_results.seq > " in sql
+    assert "ORDER BY document_analysis_chunk_results.seq" in sql
+
+
+class TestChunkStreamEndpoint:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        flask = pytest.importorskip("flask")
+        from library import chunk_review_routes as crr
+
+        self.session = MagicMock()
+        self.job = MagicMock(
+            id="job1", status="running", document_id=5, run_id=None, parameters={"model": "m"},
+            chunk_count=3, ad_count=None, topic_section_count=None, progress="chunk 1/3 done", error=None,
+            created_at=None, started_at=None, finished_at=None,
+        )
+        self.session.get.return_value = self.job
+        monkeypatch.setattr(crr, "get_scoped_session", lambda: self.session)
+        monkeypatch.setattr(crr, "CHUNK_STREAM_POLL_S", 0)
+        self.results = []
+        monkeypatch.setattr(crr, "chunk_results_after", lambda session, job_id, after: self.results.pop(0))
+        app = flask.Flask(__name__)
+        app.register_blueprint(crr.bp)
+        return app.test_client()
+
+    def test_waits_until_a_chunk_arrives(self, client):
+        self.results = [[], [], [{"seq": 1, "position": 1}]]
+
+        data = client.get("/analysis_job/job1/chunks?after=0&wait=5").get_json()
+
+        assert data["chunks"] == [{"seq": 1, "position": 1}]
+        assert data["cursor"] == 1
+        assert data["finished"] is False
+        assert self.session.rollback.call_count == 2  # connection released between checks
+
+    def test_finished_job_answers_at_once_with_the_same_cursor(self, client):
+        self.job.status = "done"
+        self.results = [[]]
+
+        data = client.get("/analysis_job/job1/chunks?after=7").get_json()
+
+        assert (data["cursor"], data["finished"], data["job"]["status"]) == (7, True, "done")
+
+    def test_bad_cursor_is_rejected(self, client):
+        assert client.get("/analysis_job/job1/chunks?after=x").status_code == 400
+
+
+def test_enqueue_uses_one_idempotent_job_per_analysis():
+    session = MagicMock()
+    with patch.object(jobs, "enqueue") as enqueue:
+        enqueue_document_analysis(session, "abc")
+    enqueue.assert_called_once_with(
+        session, "document_analysis", {"analysis_job_id": "abc"}, idempotency_key="document_analysis:abc",
+    )
+
+
+class TestExecuteDocumentAnalysis:
+    def _run(self, create_run, *, attempt=1, max_attempts=3, status="queued"):
+        analysis = SimpleNamespace(document_id=7, parameters=dict(PARAMS), status=status)
+        session = MagicMock()
+        session.get.return_value = analysis
+        job = SimpleNamespace(id="q1", attempt=attempt, max_attempts=max_attempts,
+                              parameters={"analysis_job_id": "a1"})
+        service = MagicMock()
+        service.create_run.side_effect = create_run
+        with (
+            patch.object(jobs, "update_analysis_job") as update,
+            patch.object(jobs, "get_session", return_value=MagicMock()),
+            patch.object(jobs, "KEEPALIVE_SECONDS", 3600),
+            patch("library.document_analysis_service.DocumentAnalysisService", return_value=service),
+        ):
+            try:
+                result = execute_document_analysis(session, job)
+            except Exception as exc:  # noqa: BLE001 - asserted by the caller
+                result = exc
+        return result, update, service
+
+    def test_success_marks_done_and_passes_checkpoints(self):
+        run = SimpleNamespace(id=11, chunks=[SimpleNamespace(type="TEMAT")], topic_sections=[])
+        result, update, service = self._run(lambda **kw: run)
+
+        assert result["run_id"] == 11
+        assert isinstance(service.create_run.call_args.kwargs["checkpoints"], ChunkCheckpoints)
+        assert update.call_args.kwargs["status"] == "done"
+
+    def test_transient_failure_requeues_and_reraises_for_retry(self):
+        def boom(**kw):
+            raise RuntimeError("LLM call failed for chunk 3/9")
+
+        result, update, _service = self._run(boom, attempt=1)
+
+        assert isinstance(result, RuntimeError)
+        assert update.call_args.kwargs["status"] == "queued"
+
+    def test_last_attempt_failure_marks_failed(self):
+        def boom(**kw):
+            raise RuntimeError("LLM down")
+
+        _result, update, _service = self._run(boom, attempt=3, max_attempts=3)
+
+        assert update.call_args.kwargs["status"] == "failed"
+
+    def test_document_error_fails_without_retry(self):
+        def no_text(**kw):
+            raise ValueError("Document 7 has no usable text")
+
+        result, update, _service = self._run(no_text)
+
+        assert result["error"] == "Document 7 has no usable text"
+        assert update.call_args.kwargs["status"] == "failed"
+
+    def test_finished_analysis_is_not_rerun(self):
+        result, _update, service = self._run(lambda **kw: None, status="done")
+
+        assert result["skipped"] == "already done"
+        service.create_run.assert_not_called()
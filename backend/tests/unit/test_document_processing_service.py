@@ -1,3 +1,5 @@
+import hashlib
+import io
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import patch
@@ -18,6 +20,14 @@ class MemoryStorage:
     def get_bytes(self, key):
         return self.objects[key]
 
+    def put_stream(self, key, stream, content_type=None):
+        self.objects[key] = stream.read()
+        return len(self.objects[key])
+
+    def open_read(self, key, start=0, length=None):
+        data = self.objects[key][start:]
+        return io.BytesIO(data if length is None else data[:length])
+
     def exists(self, key):
         return key in self.objects
 
@@ -69,4 +79,5 @@ def test_execute_materializes_html_runs_pipeline_and_uploads_artifacts(tmp_path)
     assert result["artifacts_uploaded"] == 2  # materialized HTML + fake artifact
     assert document.text_extracted == "ARTICLE"
     assert document.text_md == "CLEAN"
+    assert document.text_md_cleaned_hash == hashlib.md5(b"CLEAN").hexdigest()
     assert storage.objects["cache/markdown/12/12.html"] == b"<p>HTML</p>"
@@ -226,12 +226,12 @@ class TestCreateDocument:
         }])
         session.commit.assert_called_once()
 
-    @patch("library.tracking_urls.resolve_tracking_url")
-    def test_create_email_normalizes_tracking_links(self, resolve_url):
-        resolve_url.return_value = "https://incidentimpact.com/"
+    @patch("library.tracking_urls.resolve_tracking_urls")
+    def test_create_email_normalizes_tracking_links(self, resolve_urls):
+        tracking_url = "https://click.example.com/redirect"
+        resolve_urls.return_value = {tracking_url: "https://incidentimpact.com/"}
         session = _make_session()
         service = DocumentService(session)
-        tracking_url = "https://click.example.com/redirect"
 
         service.create_document(
             url="gmail://message-2", url_type="email",
@@ -240,8 +240,12 @@ class TestCreateDocument:
 
         doc = session.add.call_args.args[0]
         assert doc.text == "Incident Impact (https://incidentimpact.com/)"
+        assert resolve_urls.call_args.args == ([tracking_url], session)
 
-    @patch("library.tracking_urls.resolve_tracking_url", return_value="https://incidentimpact.com/")
+    @patch(
+        "library.tracking_urls.resolve_tracking_urls",
+        return_value={"https://click.example.com/redirect": "https://incidentimpact.com/"},
+    )
     def test_normalize_existing_email_tracking_links_without_replacing_other_text(self, _resolve_url):
         session = _make_session()
         service = DocumentService(session)
@@ -0,0 +1,80 @@
+"""Unit tests for library.document_stats (snapshot refresh and lookups)."""
+
+import datetime as dt
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from library.document_stats import DocumentStatsSnapshot, load_snapshot, refresh_document_stats  # noqa: E402
+
+REFRESHED = dt.datetime.now(dt.timezone.utc).replace(microsecond=0) - dt.timedelta(minutes=1)
+
+
+def _stat(dimension, key, count, refreshed_at=REFRESHED):
+    return MagicMock(dimension=dimension, key=key, count=count, refreshed_at=refreshed_at)
+
+
+class TestRefresh:
+    def test_replaces_rows_from_the_three_aggregations(self):
+        session = MagicMock()
+        session.execute.side_effect = [
+            MagicMock(all=MagicMock(return_value=[("webpage", "READY", 3), ("link", "URL_ADDED", 2)])),
+            MagicMock(all=MagicMock(return_value=[("own", 5)])),
+            MagicMock(all=MagicMock(return_value=[(dt.date(2026, 10, 1), 4)])),
+            MagicMock(),  # delete
+            MagicMock(),  # insert
+        ]
+
+        result = refresh_document_stats(session, today=dt.date(2026, 10, 1))
+
+        assert result["rows"] == 4
+        assert result["total"] == 5
+        inserted = session.execute.call_args_list[4].args[1]
+        assert {(r["dimension"], r["key"], r["count"]) for r in inserted} == {
+            ("type_state", "webpage|READY", 3),
+            ("type_state", "link|URL_ADDED", 2),
+            ("source", "own", 5),
+            ("day", "2026-10-01", 4),
+        }
+        assert len({r["refreshed_at"] for r in inserted}) == 1
+        session.commit.assert_called_once()
+
+
+class TestSnapshot:
+    def test_empty_table_means_no_snapshot(self):
+        session = MagicMock()
+        session.scalars.return_value = []
+        assert load_snapshot(session) is None
+
+    def test_rollups_and_filtered_counts(self):
+        session = MagicMock()
+        session.scalars.return_value = [
+            _stat("type_state", "webpage|READY", 3),
+            _stat("type_state", "webpage|URL_ADDED", 1),
+            _stat("type_state", "link|URL_ADDED", 2, refreshed_at=REFRESHED - dt.timedelta(seconds=1)),
+            _stat("source", "own", 6),
+        ]
+
+        snapshot = load_snapshot(session)
+
+        assert snapshot.refreshed_at == REFRESHED - dt.timedelta(seconds=1)
+        assert snapshot.total == 6
+        assert snapshot.by_type == {"webpage": 4, "link": 2}
+        assert snapshot.by_state == {"READY": 3, "URL_ADDED": 3}
+        assert snapshot.count("webpage", "URL_ADDED") == 1
+        assert snapshot.count(processing_status="URL_ADDED") == 3
+        assert snapshot.count() == 6
+        assert snapshot.by_source == {"own": 6}
+
+    def test_stale_snapshot_is_ignored(self):
+        session = MagicMock()
+        session.scalars.return_value = [
+            _stat("type_state", "webpage|READY", 3, refreshed_at=REFRESHED - dt.timedelta(hours=2)),
+        ]
+        assert load_snapshot(session) is None
+        assert load_snapshot(session, max_age=dt.timedelta(days=1)).total == 3
+
+    def test_count_of_unknown_type_is_zero(self):
+        assert DocumentStatsSnapshot(refreshed_at=REFRESHED).count("youtube") == 0
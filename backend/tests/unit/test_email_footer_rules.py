@@ -1,15 +1,37 @@
 from types import SimpleNamespace
 
-from library.email_footer_rules import apply_footer_rule, normalize_sender_email
+import pytest
+
+from library.email_footer_rules import (
+    apply_footer_rule,
+    footer_matcher,
+    invalidate_footer_rule,
+    load_footer_rules,
+    normalize_sender_email,
+)
 
 
 class _Session:
     def __init__(self, footer_text: str | None):
         self.footer_text = footer_text
+        self.queries = 0
 
     def scalar(self, _statement):
+        self.queries += 1
         return SimpleNamespace(footer_text=self.footer_text) if self.footer_text else None
 
+    def execute(self, _statement):
+        self.queries += 1
+        rows = [("sender@example.com", self.footer_text)] if self.footer_text else []
+        return SimpleNamespace(all=lambda: rows)
+
+
+@pytest.fixture(autouse=True)
+def empty_rule_cache():
+    invalidate_footer_rule()
+    yield
+    invalidate_footer_rule()
+
 
 def test_normalize_sender_email_uses_address_not_display_name():
     assert normalize_sender_email("News Letter <NEWS@example.com>") == "news@example.com"
@@ -43,3 +65,49 @@ def test_apply_footer_rule_does_not_match_changed_non_url_footer_text():
     session = _Session("Brand (https://old.example/a)\nAddress Warsaw")
     text = "Body\nBrand (https://new.example/b)\nAddress Krakow"
     assert apply_footer_rule(session, "sender@example.com", text) == text
+
+
+
+def test_url_wildcards_at_the_start_and_end_of_a_footer():
+    matcher = footer_matcher("https://old.example/a Brand https://old.example/b")
+    assert matcher.strip("Body\nhttps://new.example/x Brand https://new.example/y\n") == "Body"
+    assert matcher.strip("Body\nhttps://new.example/x Other https://new.example/y") == (
+        "Body\nhttps://new.example/x Other https://new.example/y"
+    )
+
+
+def test_a_long_newsletter_keeps_everything_before_its_footer():
+    matcher = footer_matcher("Unsubscribe (https://old.example/u)\nCopyright Brand")
+    body = "Akapit (https://example.com/a)\n" * 20000
+    text = body + "Unsubscribe (https://new.example/u/123)\ncopyright brand\n"
+    assert matcher.strip(text) == body.rstrip()
+    assert matcher.strip(body) == body
+
+
+def test_rules_are_cached_per_sender_until_invalidated():
+    session = _Session("Stopka")
+    assert apply_footer_rule(session, "sender@example.com", "Treść\nStopka") == "Treść"
+    assert apply_footer_rule(session, "Sender <sender@example.com>", "Inna\nStopka") == "Inna"
+    assert session.queries == 1
+
+    session.footer_text = "Nowa stopka"
+    invalidate_footer_rule("sender@example.com")
+    assert apply_footer_rule(session, "sender@example.com", "Treść\nNowa stopka") == "Treść"
+    assert session.queries == 2
+
+
+def test_senders_without_a_rule_are_cached_too():
+    session = _Session(None)
+    apply_footer_rule(session, "sender@example.com", "Treść")
+    apply_footer_rule(session, "sender@example.com", "Treść")
+    assert session.queries == 1
+
+
+def test_load_footer_rules_fills_the_cache_with_one_query():
+    session = _Session("Stopka")
+    rules = load_footer_rules(session, ["Sender <SENDER@example.com>", "other@example.com", "not an address"])
+    assert list(rules) == ["sender@example.com"]
+    assert apply_footer_rule(session, "sender@example.com", "Treść\nStopka") == "Treść"
+    assert apply_footer_rule(session, "other@example.com", "Treść\nStopka") == "Treść\nStopka"
+    assert load_footer_rules(session, ["sender@example.com"]) == rules
+    assert session.queries == 1
@@ -0,0 +1,167 @@
+"""Tests for the incremental email import (library/email_import_service.py, email_sources.py, email_mime.py)."""
+
+import base64
+import mailbox
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.dialects import postgresql  # noqa: E402
+from sqlalchemy.sql import Select  # noqa: E402
+
+from library import email_import_service  # noqa: E402
+from library.email_footer_rules import invalidate_footer_rule  # noqa: E402
+from library.email_import_service import EmailImportService  # noqa: E402
+from library.email_mime import mid_url, parse_raw_email  # noqa: E402
+from library.email_sources import GmailSource, LocalMailboxSource  # noqa: E402
+
+
+def _message(i, html=True, message_id=True):
+    message = EmailMessage()
+    message["From"] = f"Newsletter {i} <news{i}@example.com>"
+    message["Subject"] = f"Wydanie {i}"
+    if message_id:
+        message["Message-ID"] = f"<issue-{i}@example.com>"
+    message.set_content(f"Tekst {i}\nStopka {i}")
+    if html:
+        message.add_alternative(
+            f'<p>Wydanie <b>{i}</b> <a href="https://click.esp.example/{i}">czytaj</a></p><p>Stopka {i}</p>',
+            subtype="html",
+        )
+    return message
+
+
+@pytest.fixture
+def mbox_path(tmp_path):
+    path = tmp_path / "news.mbox"
+    box = mailbox.mbox(str(path))
+    for i in range(3):
+        box.add(_message(i))
+    box.flush()
+    box.close()
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def no_network(monkeypatch):
+    resolve = MagicMock(side_effect=lambda urls, session: {url: url.replace("click.esp", "www") for url in urls})
+    monkeypatch.setattr(email_import_service, "resolve_tracking_urls", resolve)
+    monkeypatch.setattr(email_import_service.DiscoverySource, "ensure", MagicMock(return_value="source-row"))
+    invalidate_footer_rule()
+    yield resolve
+    invalidate_footer_rule()
+
+
+def _session(checkpoint=None, existing=(), footers=()):
+    session = MagicMock()
+    session.scalar.return_value = checkpoint
+    session.scalars.return_value = list(existing)
+    session.checkpoints = []
+
+    def execute(stmt, params=None):
+        result = MagicMock()
+        if isinstance(stmt, Select):
+            result.all.return_value = list(footers)
+        else:
+            session.checkpoints.append(stmt.compile(dialect=postgresql.dialect()).params["checkpoint"])
+        return result
+
+    session.execute.side_effect = execute
+    return session
+
+
+def _added(session):
+    return [call.args[0] for call in session.add.call_args_list]
+
+
+def test_imports_messages_after_the_checkpoint_and_commits_it_per_batch(mbox_path):
+    session = _session(checkpoint="0", footers=[("news2@example.com", "Stopka 2")])
+    source = LocalMailboxSource(mbox_path)
+
+    result = EmailImportService(session, source, batch_size=1, detect_language=False).run()
+
+    docs = _added(session)
+    assert [doc.url for doc in docs] == ["mid:issue-1@example.com", "mid:issue-2@example.com"]
+    assert docs[0].text == "Wydanie **1** czytaj (https://www.example/1)\n\nStopka 1"
+    assert docs[1].text == "Wydanie **2** czytaj (https://www.example/2)"
+    assert docs[0].email_sender == "news1@example.com"
+    assert docs[0].byline == "Newsletter 1"
+    assert docs[0].original_id == "<issue-1@example.com>"
+    assert docs[0].discovery_source == "source-row"
+    assert session.checkpoints == ["1", "2", "2"]
+    assert session.commit.call_count == 3
+    assert result["found"] == 2 and result["imported"] == 2
+    assert result["previous_checkpoint"] == "0" and result["checkpoint"] == "2"
+
+
+def test_messages_already_imported_are_skipped(mbox_path):
+    session = _session(existing=["mid:issue-0@example.com"])
+
+    result = EmailImportService(session, LocalMailboxSource(mbox_path), detect_language=False).run()
+
+    assert [doc.url for doc in _added(session)] == ["mid:issue-1@example.com", "mid:issue-2@example.com"]
+    assert result["skipped_existing"] == 1
+
+
+def test_dry_run_parses_in_the_executor_without_a_database(mbox_path):
+    with ThreadPoolExecutor(2) as executor:
+        result = EmailImportService(
+            None, LocalMailboxSource(mbox_path), executor=executor, dry_run=True, detect_language=False,
+        ).run()
+
+    assert result["found"] == 3 and result["imported"] == 3
+    assert result["previous_checkpoint"] is None
+
+
+def test_checkpoint_only_stores_the_checkpoint_without_importing(mbox_path):
+    session = _session()
+
+    result = EmailImportService(session, LocalMailboxSource(mbox_path)).run(checkpoint_only=True)
+
+    session.add.assert_not_called()
+    assert session.checkpoints == ["2"]
+    assert result["imported"] == 0 and result["checkpoint"] == "2"
+
+
+def test_parse_raw_email_prefers_html_and_hashes_missing_message_ids():
+    raw = _message(7, message_id=False).as_bytes()
+
+    parsed = parse_raw_email(("k", None, raw))
+
+    assert parsed.url == mid_url(None, raw) and parsed.url.startswith("mid:sha256-")
+    assert parsed.html_body.startswith("<p>Wydanie")
+    assert parsed.plain_body == "Tekst 7\nStopka 7\n"
+    assert parse_raw_email(("k", "gmail://abc", raw)).url == "gmail://abc"
+
+
+def test_gmail_source_lists_the_label_then_reads_history():
+    history = {
+        "historyId": "120",
+        "history": [
+            {"messagesAdded": [{"message": {"id": "m3", "labelIds": ["Label_1"]}}]},
+            {"messagesAdded": [{"message": {"id": "m4", "labelIds": ["INBOX"]}}]},
+            {"labelsAdded": [{"message": {"id": "m3", "labelIds": ["Label_1"]}}]},
+        ],
+    }
+    raw = base64.urlsafe_b64encode(b"Subject: x\r\n\r\nbody").decode().rstrip("=")
+
+    def run(args):
+        return {
+            ("labels", "list"): {"labels": [{"id": "Label_1", "name": "Newsletters"}]},
+            ("getProfile", "--params"): {"historyId": 100},
+            ("messages", "list"): {"messages": [{"id": "m2"}, {"id": "m1"}]},
+            ("history", "list"): history,
+            ("messages", "get"): {"raw": raw},
+        }[tuple(args[2:4])]
+
+    source = GmailSource("Newsletters", run=run)
+
+    assert source.mailbox == "gmail:me/Label_1"
+    assert source.pending(None) == (["m1", "m2"], "100")
+    assert source.pending("100") == (["m3"], "120")
+    assert source.fetch(["m3"]) == [("m3", b"Subject: x\r\n\r\nbody")]
+    assert source.url_for("m3") == "gmail://m3"
@@ -1,5 +1,7 @@
 """Unit tests for library/entity_service.py — document_entities persistence layer."""
 
+import hashlib
+import re
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -8,14 +10,17 @@ from sqlalchemy.dialects import postgresql
 pytest.importorskip("sqlalchemy")
 pytest.importorskip("requests")
 
-from library.db.models import DocumentEntity, NerExclusion  # noqa: E402
+from library.db.models import Document, DocumentEntity, NerExclusion  # noqa: E402
 from library.entity_service import (  # noqa: E402
     _temporal_candidate_rows,
+    chapter_occurrence_counts,
+    entity_offsets,
     filter_entities_to_text,
     get_document_entities,
     is_excluded,
     merge_document_entities,
     refresh_document_entities,
+    refresh_entity_occurrences,
 )
 
 
@@ -496,3 +501,63 @@ class TestGetDocumentEntities:
         assert get_document_entities(session, 42) == {
             "persName": [], "orgName": [], "geogName": [], "placeName": [], "facility": [],
         }
+
+
+class TestEntityOccurrenceIndex:
+    BOOK = ("# Rozdział pierwszy\n\nPutin przemawiał. Krytyka Putina narastała. Tusk milczał.\n\n"
+            "# Rozdział drugi\n\nZupełnie inny temat, Donald Tusk i putinizm.\n\n"
+            "# Rozdział trzeci\n\nPowrót do PUTINA.")
+
+    def _entities(self):
+        return [
+            DocumentEntity(id=1, document_id=9, entity_type="persName", entity_text="Putin",
+                           variants=["Putin", "Putina"]),
+            DocumentEntity(id=2, document_id=9, entity_type="persName", entity_text="Tusk", variants=[]),
+            DocumentEntity(id=3, document_id=9, entity_type="persName", entity_text="Donald Tusk",
+                           variants=["Donald Tusk"]),
+        ]
+
+    def test_offsets_match_per_entity_findall(self):
+        entities = self._entities()
+        found = {}
+        for entity, offset in entity_offsets(self.BOOK, entities):
+            found.setdefault(entity.id, []).append(offset)
+
+        for entity in entities:
+            needles = sorted(entity.variants or [entity.entity_text])
+            pattern = re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, needles)) + ")", re.IGNORECASE)
+            assert found.get(entity.id, []) == [m.start() for m in pattern.finditer(self.BOOK)]
+
+    def test_refresh_writes_chapter_positions_and_stamps_rows(self):
+        doc = Document(id=9, text_md=self.BOOK)
+        entities = self._entities()
+        session = MagicMock()
+        session.scalars.return_value = entities
+
+        written = refresh_entity_occurrences(session, doc)
+
+        insert_call = session.execute.call_args_list[-1]
+        rows = insert_call.args[1]
+        assert written == len(rows) == 7
+        putin = [(r["chapter_position"], r["char_offset"]) for r in rows if r["document_entity_id"] == 1]
+        assert [position for position, _offset in putin] == [1, 1, 2, 3]  # "putinizm" starts with "Putin"
+        assert {r["chapter_position"] for r in rows if r["document_entity_id"] == 3} == {2}
+        expected_hash = hashlib.md5(self.BOOK.encode("utf-8")).hexdigest()
+        assert {e.occurrences_text_hash for e in entities} == {expected_hash}
+
+    def test_chapter_counts_group_current_rows_in_one_query(self):
+        session = MagicMock()
+        session.execute.return_value = [(9, 1, 2), (9, None, 1), (12, 4, 5)]
+
+        counts = chapter_occurrence_counts(session, [1, 7])
+
+        assert counts == {9: {1: 2, None: 1}, 12: {4: 5}}
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "count(DISTINCT document_entity_occurrences.char_offset)" in sql
+        assert "document_entities.occurrences_text_hash = documents.text_hash" in sql
+        assert "GROUP BY document_entity_occurrences.document_id, document_entity_occurrences.chapter_position" in sql
+
+    def test_chapter_counts_without_rows_skips_query(self):
+        session = MagicMock()
+        assert chapter_occurrence_counts(session, []) == {}
+        session.execute.assert_not_called()
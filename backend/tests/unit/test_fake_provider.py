@@ -0,0 +1,143 @@
+"""Tests for the local fake/ LLM and embedding provider (library/api/fake/)."""
+
+import json
+import math
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from library import embedding  # noqa: E402
+from library.ai import ai_ask, supports_response_format  # noqa: E402
+from library.api.fake import fake_completion  # noqa: E402
+from library.api.fake.fake_completion import FakeProviderError, fake_get_completion  # noqa: E402
+from library.api.fake.fake_embedding import hash_embedding  # noqa: E402
+from library.llm_concurrency import is_throttling_error  # noqa: E402
+from library.person_context_classifier import _RESPONSE_SCHEMA  # noqa: E402
+
+
+@pytest.fixture
+def config(monkeypatch):
+    values = {}
+    monkeypatch.setattr("library.config_loader.load_config", lambda: values)
+    return values
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr("library.api.fake.fake_completion.time.sleep", calls.append)
+    monkeypatch.setattr("library.api.fake.fake_embedding.time.sleep", calls.append)
+    return calls
+
+
+def _cosine(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+def test_ai_ask_routes_fake_models_and_records_estimated_tokens(config, sleeps):
+    with patch("library.llm_usage.recorder.record_llm_usage") as record:
+        first = ai_ask("Napisz streszczenie artykułu o gospodarce", model="fake/bielik", system_prompt="System.")
+        second = ai_ask("Napisz streszczenie artykułu o gospodarce", model="fake/bielik", system_prompt="System.")
+
+    assert first.response_text == second.response_text
+    assert len(first.response_text.split()) == 64
+    assert set(first.response_text.split()) <= {"Napisz", "streszczenie", "artykułu", "o", "gospodarce"}
+    assert first.total_tokens == first.prompt_tokens + first.completion_tokens
+    kwargs = record.call_args.kwargs
+    assert kwargs["provider"] == "fake" and kwargs["model"] == "fake/bielik"
+    assert kwargs["prompt_tokens"] == first.prompt_tokens
+    assert supports_response_format("fake/bielik") and not supports_response_format("gpt-4o")
+
+
+def test_structured_answers_follow_the_schema_with_one_result_per_prompt_id(config, sleeps):
+    items = [{"id": 0, "candidate": "Kowalski"}, {"id": 3, "candidate": "Nowak"}]
+    prompt = f"Sklasyfikuj kandydatów.\n\nDANE JSON:\n{json.dumps(items)}"
+
+    response = fake_get_completion(prompt, model="fake/bielik", response_format=_RESPONSE_SCHEMA)
+
+    results = json.loads(response.response_text)["results"]
+    assert [result["id"] for result in results] == [0, 3]
+    for result in results:
+        assert set(result) == {"id", "class", "confidence", "rationale"}
+        assert result["class"] in {"person", "not_person", "uncertain"}
+        assert result["confidence"] in {"high", "medium", "low"}
+        assert isinstance(result["rationale"], str) and result["rationale"]
+
+
+def test_schema_instance_respects_bounds_refs_and_nullable_types():
+    schema = {
+        "$defs": {"Score": {"type": "integer", "minimum": 1, "maximum": 5}},
+        "type": "object",
+        "properties": {
+            "score": {"$ref": "#/$defs/Score"},
+            "tags": {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}, "uniqueItems": True},
+            "note": {"type": ["string", "null"], "maxLength": 5},
+            "ok": {"type": "boolean"},
+        },
+    }
+
+    value = fake_completion.schema_instance(schema, fake_completion.request_random("x"), ["słowo"])
+
+    assert 1 <= value["score"] <= 5
+    assert len(value["tags"]) == len(set(value["tags"])) and set(value["tags"]) <= {"a", "b"}
+    assert isinstance(value["note"], str) and len(value["note"]) <= 5
+    assert isinstance(value["ok"], bool)
+
+
+def test_latency_follows_fixed_and_per_token_settings(config, sleeps):
+    config.update({"FAKE_LLM_LATENCY_MS": "500", "FAKE_LLM_MS_PER_1K_TOKENS": "1000", "FAKE_LLM_COMPLETION_TOKENS": "3"})
+
+    response = fake_get_completion("x" * 400, model="fake/bielik")
+
+    assert sleeps == [pytest.approx((500 + response.total_tokens) / 1000)]
+
+
+def test_injected_errors_look_like_throttling(config, sleeps):
+    config["FAKE_LLM_ERROR_RATE"] = "1"
+
+    with patch("library.llm_usage.recorder.record_llm_usage") as record, pytest.raises(FakeProviderError) as error:
+        ai_ask("pytanie", model="fake/bielik")
+
+    assert is_throttling_error(error.value)
+    assert record.call_args.kwargs["success"] is False
+
+
+def test_hash_embeddings_are_deterministic_unit_vectors_ranking_shared_words_higher():
+    query = hash_embedding("wojna na Ukrainie", 256)
+
+    assert query == hash_embedding("Wojna na Ukrainie", 256)
+    assert math.isclose(math.sqrt(_cosine(query, query)), 1.0)
+    assert _cosine(query, hash_embedding("wojna na Ukrainie trwa", 256)) > _cosine(query, hash_embedding("przepis na sernik", 256))
+    assert math.isclose(_cosine(hash_embedding("", 8), hash_embedding("", 8)), 1.0)
+
+
+def test_embedding_module_routes_fake_models_in_one_batch(config, sleeps):
+    config.update({"FAKE_EMBEDDING_DIMENSIONS": "32", "FAKE_EMBEDDING_LATENCY_MS": "40"})
+
+    results = embedding.get_embeddings("fake/embedding", ["jeden", "dwa"])
+    single = embedding.get_embedding("fake/embedding", "jeden")
+
+    assert [result.status for result in results] == ["success", "success"]
+    assert len(results[0].embedding) == 32 and results[0].status_code == 200
+    assert single.embedding == results[0].embedding
+    assert sleeps == [0.04, 0.04]
+
+    config["FAKE_EMBEDDING_ERROR_RATE"] = "1"
+    failed = embedding.get_embeddings("fake/embedding", ["jeden", "dwa"])
+    assert [(result.status, result.status_code) for result in failed] == [("error", 503), ("error", 503)]
+
+
+def test_batched_tagging_gets_offered_tags_in_one_call_per_batch(config, sleeps, monkeypatch):
+    from library import article_tagging
+
+    config["TAGGING_MODEL"] = "fake/bielik"
+    single = []
+    monkeypatch.setattr(article_tagging, "tag_article_with_llm", lambda *args: single.append(args) or [])
+
+    with patch("library.llm_usage.recorder.record_llm_usage") as record:
+        tags = article_tagging.tag_article_with_llm_batch([("Armia i budżet.", f"Artykuł {i}") for i in range(8)])
+
+    assert record.call_count == 1 and single == []
+    assert all(set(article_tags) <= set(article_tagging.THEMATIC_TAGS) for article_tags in tags)
@@ -229,6 +229,33 @@ class TestEntityOccurrences:
             {"position": 3, "title": "Temat trzeci", "count": 1},
         ]
 
+    def test_indexed_occurrences_are_served_from_the_table(self, client):
+        doc = MagicMock(text_md=self.BOOK, text=None, text_hash="abc")
+        row = MagicMock(id=3, variants=["Putin"], occurrences_text_hash="abc")
+        with self._client_with(doc, [row]):
+            with patch("library.entity_service.chapter_occurrence_counts",
+                       return_value={9: {3: 1, 1: 2, None: 1}}) as counts:
+                resp = client.get("/document/9/entity_occurrences?text=Putin", headers=API_HEADERS)
+
+        counts.assert_called_once()
+        assert counts.call_args.args[1] == [3]
+        data = resp.get_json()
+        assert data["total"] == 4
+        assert data["occurrences"] == [
+            {"position": 1, "title": "Rozdział pierwszy", "count": 2},
+            {"position": 3, "title": "Rozdział trzeci", "count": 1},
+        ]
+
+    def test_stale_index_falls_back_to_scanning(self, client):
+        doc = MagicMock(text_md=self.BOOK, text=None, text_hash="new")
+        row = MagicMock(id=3, variants=["Putin", "Putina"], occurrences_text_hash="old")
+        with self._client_with(doc, [row]):
+            with patch("library.entity_service.chapter_occurrence_counts") as counts:
+                resp = client.get("/document/9/entity_occurrences?text=Putin", headers=API_HEADERS)
+
+        counts.assert_not_called()
+        assert resp.get_json()["total"] == 3
+
     def test_no_chapters_and_no_run_returns_empty_occurrences(self, client):
         doc = MagicMock(text_md=None, text="Tekst bez nagłówków. Putin raz. " + "Wypełniacz. " * 10)
         with self._client_with(doc, []):
@@ -4,6 +4,7 @@ Tests verify that Flask route handlers correctly use ORM models and scoped sessi
 while preserving the exact API response formats expected by the frontend.
 """
 
+import datetime
 from unittest.mock import ANY, MagicMock, patch
 
 import pytest
@@ -40,7 +41,7 @@ class TestWebsiteList:
                        "processing_status": "URL_ADDED", "processing_error_code": "NONE",
                        "note": None, "collection_id": None, "uuid": None}]
         mock_session = MagicMock()
-        with patch("server.get_scoped_session", return_value=mock_session):
+        with patch("server.get_read_session", return_value=mock_session):
             with patch("server.DocumentRepository") as MockRepo:
                 repo_instance = MagicMock()
                 repo_instance.get_list.side_effect = lambda **kw: 1 if kw.get("count") else mock_list
@@ -58,7 +59,7 @@ class TestWebsiteList:
 
     def test_passes_query_params(self, client):
         mock_session = MagicMock()
-        with patch("server.get_scoped_session", return_value=mock_session):
+        with patch("server.get_read_session", return_value=mock_session):
             with patch("server.DocumentRepository") as MockRepo:
                 repo_instance = MagicMock()
                 repo_instance.get_list.side_effect = lambda **kw: 0 if kw.get("count") else []
@@ -82,7 +83,27 @@ class TestWebsiteList:
                 assert "limit" not in calls[1].kwargs
                 assert "offset" not in calls[1].kwargs
 
-    @pytest.mark.parametrize("query", ["page=bad", "limit=bad"])
+    def test_keyset_cursor_is_passed_to_list_but_not_count(self, client):
+        rows = [{"id": 5, "cursor": {"after_id": 5, "after_ingested_at": "2026-03-09T10:30:45.123456"}}]
+        mock_session = MagicMock()
+        with patch("server.get_read_session", return_value=mock_session):
+            with patch("server.DocumentRepository") as MockRepo:
+                repo_instance = MagicMock()
+                repo_instance.get_list.side_effect = lambda **kw: 7 if kw.get("count") else rows
+                MockRepo.return_value = repo_instance
+
+                resp = client.get(
+                    "/website_list?limit=1&after_id=9&after_ingested_at=2026-03-09T10:31:00.5",
+                    headers=API_HEADERS,
+                )
+
+                list_call, count_call = repo_instance.get_list.call_args_list
+                assert list_call.kwargs["after_id"] == 9
+                assert list_call.kwargs["after_ingested_at"] == datetime.datetime(2026, 3, 9, 10, 31, 0, 500000)
+                assert "after_id" not in count_call.kwargs
+        assert resp.get_json()["pagination"]["next_cursor"] == rows[0]["cursor"]
+
+    @pytest.mark.parametrize("query", ["page=bad", "limit=bad", "after_id=3", "after_id=3&after_ingested_at=bad"])
     def test_rejects_invalid_pagination(self, client, query):
         resp = client.get(f"/website_list?{query}", headers=API_HEADERS)
         assert resp.status_code == 400
@@ -97,7 +118,7 @@ class TestWebsiteCount:
     def test_returns_correct_format(self, client):
         mock_counts = {"webpage": 10, "link": 5, "ALL": 15}
         mock_session = MagicMock()
-        with patch("server.get_scoped_session", return_value=mock_session):
+        with patch("server.get_read_session", return_value=mock_session):
             with patch("server.DocumentRepository") as MockRepo:
                 repo_instance = MagicMock()
                 repo_instance.get_count_by_type.return_value = mock_counts
@@ -111,6 +132,23 @@ class TestWebsiteCount:
         assert data["counts"] == mock_counts
 
 
+    def test_serves_snapshot_when_refreshed(self, client):
+        from library.document_stats import DocumentStatsSnapshot
+
+        snapshot = DocumentStatsSnapshot(
+            refreshed_at=datetime.datetime(2026, 10, 1, 12, 0, tzinfo=datetime.timezone.utc),
+            by_type_state={("webpage", "READY"): 10, ("link", "URL_ADDED"): 5},
+        )
+        with patch("server.get_read_session", return_value=MagicMock()):
+            with patch("server.load_snapshot", return_value=snapshot):
+                with patch("server.DocumentRepository") as MockRepo:
+                    resp = client.get("/website_count", headers=API_HEADERS)
+
+        MockRepo.return_value.get_count_by_type.assert_not_called()
+        assert resp.get_json()["counts"] == {"webpage": 10, "link": 5, "ALL": 15}
+        assert resp.get_json()["refreshed_at"] == "2026-10-01T12:00:00+00:00"
+
+
 # ---------------------------------------------------------------------------
 # /website_get
 # ---------------------------------------------------------------------------
@@ -0,0 +1,185 @@
+"""Tests for library/http — pooled outbound client, retries, rate limits and cache."""
+
+from email.utils import formatdate
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from library import http, metrics
+from library.http import client
+
+_pooled_session = client._session
+
+
+def _response(status=200, body=b"", headers=None, method="GET", url="https://example.com/feed"):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response._content_consumed = True
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.url = url
+    response.request = requests.Request(method, url).prepare()
+    return response
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    session = MagicMock()
+    monkeypatch.setattr(client, "_session", lambda scheme, host: session)
+    sleeps = []
+    monkeypatch.setattr(client.time, "sleep", sleeps.append)
+    monkeypatch.setattr(client.random, "uniform", lambda low, high: high)
+    http.configure_cache(str(tmp_path))
+    yield session, sleeps
+    http.configure_cache(None)
+    client.close_sessions()
+
+
+def test_retries_503_honouring_retry_after(isolated):
+    session, sleeps = isolated
+    session.request.side_effect = [_response(503, headers={"Retry-After": "3"}), _response(200, b"ok")]
+    before = metrics.UPSTREAM_RETRIES._values.get(("wikidata",), 0)
+
+    response = http.get("https://www.wikidata.org/w/api.php", upstream="wikidata", headers={"Cache-Control": "no-store"})
+
+    assert response.content == b"ok"
+    assert sleeps == [3.0]
+    assert metrics.UPSTREAM_RETRIES._values[("wikidata",)] == before + 1
+    assert metrics.UPSTREAM_ERRORS._values[("wikidata", "HTTP 503")] >= 1
+    assert session.request.call_args.kwargs["timeout"] == client.DEFAULT_TIMEOUT_S
+
+
+def test_connection_errors_retry_with_backoff_then_raise(isolated):
+    session, sleeps = isolated
+    session.request.side_effect = requests.ConnectionError("refused")
+
+    with pytest.raises(requests.ConnectionError):
+        http.get("https://example.com/a", upstream="webpages", timeout=30)
+
+    assert session.request.call_count == 2  # "webpages" allows one retry
+    assert sleeps == [0.5]
+
+
+def test_retries_run_the_callers_target_check_again(isolated):
+    session, _ = isolated
+    session.request.side_effect = [requests.ConnectionError("refused"), _response(200, b"ok")]
+    checked = []
+
+    http.get("https://example.com/a", upstream="webpages", validate_target=checked.append)
+
+    assert checked == ["https://example.com/a"]  # the retry only; the caller checks the first attempt
+    assert "validate_target" not in session.request.call_args.kwargs
+
+    session.request.side_effect = [requests.ConnectionError("refused")]
+    rejecting = MagicMock(side_effect=ValueError("resolves to non-public address"))
+    with pytest.raises(ValueError):
+        http.get("https://example.com/a", upstream="webpages", validate_target=rejecting)
+    assert session.request.call_count == 3
+
+
+def test_post_is_not_retried_unless_the_policy_allows_it(isolated):
+    session, _ = isolated
+    session.request.return_value = _response(502, method="POST")
+
+    assert http.post("https://example.com/api", upstream="anything", data={}).status_code == 502
+    assert session.request.call_count == 1
+
+
+def test_a_long_retry_after_is_returned_to_the_caller(isolated):
+    session, sleeps = isolated
+    session.request.return_value = _response(429, headers={"Retry-After": "3600"})
+
+    assert http.get("https://example.com/a", upstream="webpages").status_code == 429
+    assert sleeps == []
+
+
+def test_min_interval_spaces_requests_to_one_host(monkeypatch):
+    now = [100.0]
+    sleeps = []
+    monkeypatch.setattr(client.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(client.time, "sleep", sleeps.append)
+
+    client._wait_turn("locationiq", "us1.locationiq.com", 0.6)
+    client._wait_turn("locationiq", "us1.locationiq.com", 0.6)
+    client._wait_turn("locationiq", "other.example", 0.6)
+    now[0] += 5
+    client._wait_turn("locationiq", "us1.locationiq.com", 0.6)
+
+    assert sleeps == [pytest.approx(0.6)]
+
+
+def test_fresh_cached_response_skips_the_network(isolated):
+    session, _ = isolated
+    session.request.return_value = _response(200, b"<rss/>", {"Cache-Control": "max-age=300"})
+
+    first = http.get("https://example.com/feed", upstream="feeds")
+    second = http.get("https://example.com/feed", upstream="feeds")
+
+    assert session.request.call_count == 1
+    assert first.content == second.content == b"<rss/>"
+    assert second.from_cache is True
+
+
+def test_stale_entry_is_revalidated_with_its_etag(isolated):
+    session, _ = isolated
+    session.request.side_effect = [
+        _response(200, b"<rss/>", {"ETag": '"v1"', "Cache-Control": "no-cache"}),
+        _response(304, headers={"ETag": '"v1"', "Date": formatdate(usegmt=True)}),
+    ]
+
+    http.get("https://example.com/feed", upstream="feeds")
+    response = http.get("https://example.com/feed", upstream="feeds")
+
+    assert session.request.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert response.status_code == 200
+    assert response.content == b"<rss/>"
+
+
+def test_no_store_and_uncacheable_upstreams_bypass_the_cache(isolated):
+    session, _ = isolated
+    session.request.return_value = _response(200, b"x", {"Cache-Control": "no-store, max-age=60"})
+    http.get("https://example.com/feed", upstream="feeds")
+    http.get("https://example.com/feed", upstream="feeds")
+    session.request.return_value = _response(200, b"x", {"Cache-Control": "max-age=60"})
+    http.get("https://us1.locationiq.com/v1/search", upstream="locationiq")
+    http.get("https://us1.locationiq.com/v1/search", upstream="locationiq")
+
+    assert session.request.call_count == 4
+
+
+def test_vary_header_mismatch_is_a_miss(isolated):
+    session, _ = isolated
+    session.request.return_value = _response(200, b"pl", {"Cache-Control": "max-age=60", "Vary": "Accept-Language"})
+
+    http.get("https://example.com/feed", upstream="feeds", headers={"Accept-Language": "pl"})
+    http.get("https://example.com/feed", upstream="feeds", headers={"Accept-Language": "pl"})
+    http.get("https://example.com/feed", upstream="feeds", headers={"Accept-Language": "en"})
+
+    assert session.request.call_count == 2
+
+
+def test_query_params_are_part_of_the_cache_key(isolated):
+    session, _ = isolated
+    session.request.return_value = _response(200, b"{}", {"Cache-Control": "max-age=60"})
+
+    http.get("https://www.wikidata.org/w/api.php", upstream="wikidata", params={"search": "a"})
+    http.get("https://www.wikidata.org/w/api.php", upstream="wikidata", params={"search": "b"})
+    http.get("https://www.wikidata.org/w/api.php", upstream="wikidata", params={"search": "a"})
+
+    assert session.request.call_count == 2
+    assert session.request.call_args.args[1] == "https://www.wikidata.org/w/api.php?search=b"
+
+
+def test_sessions_are_pooled_per_host_and_refuse_cookies(monkeypatch):
+    monkeypatch.setattr(client, "MAX_SESSIONS", 2)
+    a = _pooled_session("https", "a.example")
+    assert _pooled_session("https", "a.example") is a
+    assert _pooled_session("https", "b.example") is not a
+    a.close = MagicMock()
+    _pooled_session("https", "c.example")
+    assert ("https", "a.example") not in client._sessions
+    a.close.assert_not_called()  # a thread may still be using it
+    assert a.cookies.get_policy().allowed_domains() == ()
+    client.close_sessions()
@@ -1,8 +1,9 @@
+import datetime as dt
 from unittest.mock import MagicMock
 
 import pytest
 
-from library.job_queue import JOB_TYPES, claim
+from library.job_queue import JOB_TYPES, claim, enqueue_recurring
 
 
 def test_document_and_legacy_job_types_are_supported():
@@ -17,3 +18,30 @@ def test_claim_requires_non_empty_allowed_types():
 def test_claim_rejects_unknown_allowed_type():
     with pytest.raises(ValueError, match="unsupported job types"):
         claim(MagicMock(), {"not_a_job"})
+
+
+def _finished_job(available_at):
+    return MagicMock(status="done", attempt=1, available_at=available_at, result={"rows": 3})
+
+
+def test_enqueue_recurring_resets_the_finished_row():
+    slot = dt.datetime(2026, 10, 1, 12, 5, tzinfo=dt.timezone.utc)
+    job = _finished_job(slot - dt.timedelta(minutes=5))
+    session = MagicMock()
+    session.scalars.return_value.one_or_none.return_value = job
+
+    assert enqueue_recurring(session, "document_stats_refresh", idempotency_key="k", since=slot) is job
+
+    assert (job.status, job.attempt, job.result, job.finished_at) == ("queued", 0, None, None)
+    session.add.assert_not_called()
+
+
+def test_enqueue_recurring_runs_once_per_slot():
+    slot = dt.datetime(2026, 10, 1, 12, 5, tzinfo=dt.timezone.utc)
+    job = _finished_job(slot + dt.timedelta(seconds=2))  # already run in this slot
+    session = MagicMock()
+    session.scalars.return_value.one_or_none.return_value = job
+
+    enqueue_recurring(session, "document_stats_refresh", idempotency_key="k", since=slot)
+
+    assert job.status == "done"
@@ -0,0 +1,244 @@
+"""Unit tests for library/llm_concurrency.py — adaptive LLM concurrency limits."""
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.dialects import postgresql  # noqa: E402
+
+from library import llm_concurrency  # noqa: E402
+from library.llm_concurrency import (  # noqa: E402
+    AimdWindow,
+    LocalBackend,
+    PostgresBackend,
+    Slot,
+    is_throttling_error,
+)
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class APITimeoutError(Exception):
+    pass
+
+
+@pytest.mark.parametrize("exc, expected", [
+    (_StatusError(429), True),
+    (_StatusError(503), True),
+    (_StatusError(400), False),
+    (type("HTTPError", (Exception,), {})("x"), False),
+    (APITimeoutError("slow"), True),
+    (ValueError("bad json"), False),
+])
+def test_throttling_classification(exc, expected):
+    assert is_throttling_error(exc) is expected
+
+
+def test_requests_style_response_status_is_recognised():
+    exc = Exception("boom")
+    exc.response = SimpleNamespace(status_code=429)
+    assert is_throttling_error(exc)
+
+
+def test_healthy_calls_grow_the_limit_additively():
+    window = AimdWindow(limit=2)
+    for _ in range(4):
+        window.record(started=0.0, latency_ms=100, operation="op")
+    assert int(window.limit) == 3
+
+
+def test_throttling_halves_once_per_window():
+    window = AimdWindow(limit=8)
+    window.record(started=1.0, latency_ms=100, operation="op", error=_StatusError(429))
+    # started before the decrease above
+    window.record(started=1.0, latency_ms=100, operation="op", error=_StatusError(429))
+    assert window.limit == 4
+    assert window.throttled_total == 2
+
+
+def test_latency_spike_is_judged_against_the_same_operation_only():
+    window = AimdWindow(limit=10)
+    for _ in range(llm_concurrency.MIN_BASELINE_SAMPLES):
+        window.record(started=0.0, latency_ms=1000, operation="tags")
+    limit = window.limit
+    # a long chunk rewrite is not a spike relative to short tag calls
+    window.record(started=0.0, latency_ms=30000, operation="chunk_rewrite")
+    assert window.limit > limit
+    limit = window.limit
+    window.record(started=float("inf"), latency_ms=10000, operation="tags")
+    assert window.limit == pytest.approx(limit * llm_concurrency.LATENCY_DECREASE)
+
+
+def test_no_spike_before_the_baseline_has_enough_samples():
+    window = AimdWindow(limit=10)
+    window.record(started=0.0, latency_ms=1000, operation="op")
+    window.record(started=0.0, latency_ms=10000, operation="op")
+    assert window.limit > 10
+
+
+def test_non_throttling_errors_leave_the_limit_alone():
+    window = AimdWindow(limit=4)
+    window.record(started=0.0, latency_ms=100, operation="op", error=ValueError("unparseable answer"))
+    assert window.limit == 4
+
+
+def test_local_acquire_blocks_at_the_limit_and_counts_waiters():
+    backend = LocalBackend()
+    held = backend.acquire("p", "m", "op")
+    backend._windows[("p", "m")].limit = 1
+    acquired = threading.Event()
+
+    def second():
+        backend.acquire("p", "m", "op").release()
+        acquired.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    for _ in range(100):
+        if backend.snapshot()[0]["waiting"]:
+            break
+        threading.Event().wait(0.01)
+    assert backend.snapshot()[0]["waiting"] == 1
+    assert not acquired.is_set()
+    held.release()
+    thread.join(timeout=2)
+    assert acquired.is_set()
+    assert backend.snapshot()[0]["in_flight"] == 0
+
+
+def test_postgres_backend_falls_back_to_local_when_the_database_fails():
+    local = LocalBackend()
+    backend = PostgresBackend(MagicMock(side_effect=RuntimeError("db down")), local)
+    slot = backend.acquire("p", "m", "op")
+    assert slot.backend is local
+    slot.release()
+    # the next call does not retry the database during the fallback window
+    backend.acquire("p", "m", "op").release()
+    assert backend.session_factory.call_count == 1
+
+
+def test_postgres_release_applies_aimd_and_deletes_the_slot():
+    session = MagicMock()
+    state = SimpleNamespace(
+        concurrency_limit=8.0, baselines={}, last_decrease_at=None, throttled_total=3,
+    )
+    session.execute.return_value.scalar_one.return_value = state
+    backend = PostgresBackend(MagicMock(return_value=session), LocalBackend(), background=False)
+    slot = Slot(backend, "p", "m", "op", token="slot-1")
+    slot.release(error=_StatusError(429))
+
+    compiled = [call.args[0].compile(dialect=postgresql.dialect()) for call in session.execute.call_args_list]
+    assert any("FOR UPDATE" in str(stmt) for stmt in compiled)
+    update = next(stmt for stmt in compiled if str(stmt).startswith("UPDATE llm_concurrency_state"))
+    assert update.params["concurrency_limit"] == 4.0
+    assert update.params["throttled_total"] == 4
+    assert any(
+        str(stmt).startswith("DELETE FROM llm_concurrency_slots") and ["slot-1"] in stmt.params.values()
+        for stmt in compiled
+    )
+    session.commit.assert_called_once()
+    session.close.assert_called_once()
+
+
+def test_postgres_release_failure_is_logged_not_raised():
+    session = MagicMock()
+    session.execute.side_effect = RuntimeError("db down")
+    backend = PostgresBackend(MagicMock(return_value=session), LocalBackend(), background=False)
+    Slot(backend, "p", "m", "op", token="slot-1").release()
+    session.rollback.assert_called_once()
+
+
+def test_postgres_release_is_queued_off_the_callers_thread():
+    factory = MagicMock()
+    backend = PostgresBackend(factory, LocalBackend())
+    backend._keeper = MagicMock()  # keep the real keeper thread out of the test
+    backend._held.add("slot-1")
+
+    Slot(backend, "p", "m", "op", token="slot-1").release()
+
+    factory.assert_not_called()
+    assert backend._held == set()
+    assert backend._releases.get_nowait()[0].token == "slot-1"
+
+
+def test_postgres_batch_release_locks_each_window_once_and_commits_once():
+    session = MagicMock()
+    session.execute.return_value.scalar_one.side_effect = lambda: SimpleNamespace(
+        concurrency_limit=8.0, baselines={}, last_decrease_at=None, throttled_total=0,
+    )
+    backend = PostgresBackend(MagicMock(return_value=session), LocalBackend(), background=False)
+    batch = [
+        (Slot(backend, "p", model, "op", token=token), 100.0, None)
+        for model, token in [("m2", "b"), ("m1", "a1"), ("m1", "a2")]
+    ]
+
+    backend._release_batch(batch)
+
+    compiled = [call.args[0].compile(dialect=postgresql.dialect()) for call in session.execute.call_args_list]
+    locked = [stmt.params["model_1"] for stmt in compiled if "FOR UPDATE" in str(stmt)]
+    assert locked == ["m1", "m2"]
+    deleted = [stmt.params for stmt in compiled if str(stmt).startswith("DELETE FROM llm_concurrency_slots")]
+    assert [sorted(v for value in params.values() for v in value) for params in deleted] == [["a1", "a2"], ["b"]]
+    session.commit.assert_called_once()
+
+
+def test_postgres_renews_only_the_leases_this_process_still_holds():
+    session = MagicMock()
+    backend = PostgresBackend(MagicMock(return_value=session), LocalBackend(), background=False)
+    backend._renew_leases()
+    session.execute.assert_not_called()
+
+    backend._held.update({"slot-1", "slot-2"})
+    backend._renew_leases()
+
+    stmt = session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    assert str(stmt).startswith("UPDATE llm_concurrency_slots SET expires_at")
+    assert sorted(stmt.params["id_1"]) == ["slot-1", "slot-2"]
+    session.commit.assert_called_once()
+
+
+def test_snapshot_falls_back_to_this_process_when_the_backend_fails():
+    failing = MagicMock()
+    failing.snapshot.side_effect = RuntimeError("db down")
+    with patch.object(llm_concurrency, "_backend", failing):
+        assert isinstance(llm_concurrency.limiter_snapshot(), list)
+
+
+def test_ai_ask_releases_the_slot_with_the_error():
+    from library import ai
+
+    slot = MagicMock()
+    with (
+        patch.object(ai, "acquire_slot", return_value=slot) as acquire,
+        patch.object(ai, "_record_usage"),
+        patch("library.api.cloudferro.sherlock.sherlock.sherlock_get_completion",
+              side_effect=_StatusError(429)),
+    ):
+        with pytest.raises(_StatusError):
+            ai.ai_ask("pytanie", "Bielik-11B-v3.0-Instruct", operation="tags")
+    acquire.assert_called_once_with("cloudferro", "Bielik-11B-v3.0-Instruct", "tags")
+    assert isinstance(slot.release.call_args.kwargs["error"], _StatusError)
+
+
+def test_ai_ask_releases_the_slot_on_system_exit():
+    from library import ai
+
+    slot = MagicMock()
+    with (
+        patch.object(ai, "acquire_slot", return_value=slot),
+        patch.object(ai, "_record_usage") as record,
+        patch("library.api.cloudferro.sherlock.sherlock.sherlock_get_completion",
+              side_effect=SystemExit(1)),
+    ):
+        with pytest.raises(SystemExit):
+            ai.ai_ask("pytanie", "Bielik-11B-v3.0-Instruct")
+    slot.release.assert_called_once()
+    record.assert_not_called()
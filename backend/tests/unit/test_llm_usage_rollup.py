@@ -0,0 +1,84 @@
+"""Tests for library/llm_usage/rollup.py — LLM cost rollups and the raw tail."""
+
+import datetime as dt
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+
+from library.db.models import LlmUsageRollupWatermark  # noqa: E402
+from library.llm_usage import rollup  # noqa: E402
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _session(watermarks: dict, first_call=None):
+    session = MagicMock()
+    session.execute.return_value.all.return_value = list(watermarks.items())
+    session.scalar.return_value = first_call
+    stored = {period: LlmUsageRollupWatermark(period=period, rolled_up_until=until)
+              for period, until in watermarks.items()}
+    session.get.side_effect = lambda model, period: stored.get(period)
+    session.add.side_effect = lambda row: stored.__setitem__(row.period, row)
+    return session, stored
+
+
+def test_empty_log_has_nothing_to_roll_up():
+    session, _ = _session({}, first_call=None)
+    assert rollup.refresh_rollups(session, now=dt.datetime(2026, 10, 1, 12, 30)) == {"hours": 0, "days": 0}
+    session.commit.assert_not_called()
+
+
+def test_closed_hours_and_days_are_recomputed_and_watermarks_advance():
+    session, stored = _session({
+        "hour": dt.datetime(2026, 9, 30, 22, 0),
+        "day": dt.datetime(2026, 9, 30),
+    })
+
+    result = rollup.refresh_rollups(session, now=dt.datetime(2026, 10, 1, 2, 5))
+
+    # 02:00-03:00 is not closed yet: 01:55 is the cut-off with the grace period.
+    assert (result["hours"], result["days"]) == (3, 1)
+    assert stored["hour"].rolled_up_until == dt.datetime(2026, 10, 1, 1, 0)
+    assert stored["day"].rolled_up_until == dt.datetime(2026, 10, 1)
+    statements = [_sql(call.args[0]) for call in session.execute.call_args_list[1:]]
+    assert statements[0].startswith("DELETE FROM llm_usage_rollups")
+    assert "FROM llm_usage_logs" in statements[1] and "date_trunc" in statements[1]
+    assert "INSERT INTO llm_usage_rollups" in statements[3] and "sum(llm_usage_rollups.calls)" in statements[3]
+    assert statements[4].startswith("DELETE FROM llm_usage_rollups")  # hourly retention
+    session.commit.assert_called_once()
+
+
+def test_first_run_starts_at_the_first_call_and_backfills_a_bounded_slice():
+    session, stored = _session({}, first_call=dt.datetime(2026, 1, 5, 7, 42))
+
+    result = rollup.refresh_rollups(session, now=dt.datetime(2026, 10, 1, 12, 0))
+
+    assert result["hours"] == rollup.MAX_HOURS_PER_RUN
+    assert stored["hour"].rolled_up_until == dt.datetime(2026, 1, 12, 7, 0)
+
+
+def test_usage_rows_without_watermarks_reads_raw_rows_only():
+    session, _ = _session({})
+    sql = _sql(select(rollup.usage_rows(session, document_id=7)))
+    assert "llm_usage_rollups" not in sql
+    assert "llm_usage_logs.document_id = " in sql
+
+
+def test_usage_rows_splits_daily_hourly_and_raw_at_the_watermarks():
+    session, _ = _session({"day": dt.datetime(2026, 10, 1), "hour": dt.datetime(2026, 10, 1, 9, 0)})
+    stmt = select(rollup.usage_rows(
+        session, start=dt.datetime(2026, 9, 1), end=dt.datetime(2026, 10, 2),
+    )).compile(dialect=postgresql.dialect())
+
+    sql = str(stmt)
+    assert sql.count("UNION ALL") == 2
+    assert "llm_usage_logs.called_at >= " in sql
+    assert dt.datetime(2026, 10, 1, 9, 0) in stmt.params.values()
+    assert {"day", "hour"} <= set(stmt.params.values())
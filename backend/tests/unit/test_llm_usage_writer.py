@@ -0,0 +1,127 @@
+"""Tests for library/llm_usage/writer.py — the batched llm_usage_logs writer."""
+
+import threading
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from library.db.models import LlmPricing  # noqa: E402
+from library.llm_usage import recorder  # noqa: E402
+from library.llm_usage.pricing import CostStatus  # noqa: E402
+from library.llm_usage.writer import UsageWriter  # noqa: E402
+
+BIELIK = LlmPricing(
+    pricing_version="cloudferro-bielik-2026-07-18", provider="cloudferro", model="Bielik-11B-v3.0-Instruct",
+    pricing_mode="per_token", input_price_per_million=Decimal("0.56"), output_price_per_million=Decimal("0.56"),
+    currency="EUR", effective_from=date(2026, 7, 18),
+)
+
+
+class FakeDatabase:
+    """Session factory answering the writer's three statements."""
+
+    def __init__(self, fail_inserts: bool = False):
+        self.inserted: list[list[dict]] = []
+        self.pricing_loads = 0
+        self.next_id = 1000
+        self.fail_inserts = fail_inserts
+        self.written = threading.Event()
+
+    def __call__(self):
+        session = MagicMock()
+        session.execute.side_effect = self._execute
+        return session
+
+    def _execute(self, stmt, params=None):
+        sql = str(stmt)
+        result = MagicMock()
+        if "nextval" in sql:
+            ids = list(range(self.next_id, self.next_id + params["n"]))
+            self.next_id += params["n"]
+            result.scalars.return_value = ids
+        elif sql.startswith("INSERT"):
+            if self.fail_inserts:
+                raise RuntimeError("db down")
+            self.inserted.append(params)
+            self.written.set()
+        else:
+            self.pricing_loads += 1
+            result.scalars.return_value.all.return_value = [BIELIK]
+        return result
+
+
+def test_pricing_is_cached_until_the_ttl_expires():
+    db = FakeDatabase()
+    writer = UsageWriter(db, start=False)
+    for _ in range(3):
+        assert writer.pricing("cloudferro", "Bielik-11B-v3.0-Instruct").pricing_version == BIELIK.pricing_version
+    assert writer.pricing("openai", "gpt-4o") is None
+    assert db.pricing_loads == 1
+
+
+def test_ids_come_from_a_reserved_block_and_rows_are_inserted_in_one_batch():
+    db = FakeDatabase()
+    writer = UsageWriter(db, id_block=2, start=False)
+
+    ids = [writer.submit({"operation": "tags", "provider": "p", "model": "m"}) for _ in range(3)]
+    writer.flush()
+
+    assert ids == [1000, 1001, 1002]
+    assert [row["id"] for row in db.inserted[0]] == ids
+
+
+def test_background_thread_flushes_at_the_row_threshold():
+    db = FakeDatabase()
+    writer = UsageWriter(db, flush_rows=2, flush_interval_s=60)
+    writer.submit({"operation": "tags"})
+    writer.submit({"operation": "tags"})
+    assert db.written.wait(5)
+    writer.close()
+    assert len(db.inserted[0]) == 2
+
+
+def test_close_flushes_what_is_left():
+    db = FakeDatabase()
+    writer = UsageWriter(db, flush_rows=100, flush_interval_s=60)
+    writer.submit({"operation": "tags"})
+    writer.close()
+    assert sum(len(batch) for batch in db.inserted) == 1
+
+
+def test_failed_insert_is_logged_not_raised(caplog):
+    writer = UsageWriter(FakeDatabase(fail_inserts=True), start=False)
+    writer.submit({"operation": "tags"})
+    writer.flush()
+    assert "Failed to write 1 llm_usage_logs rows" in caplog.text
+
+
+def test_rows_without_a_reserved_id_go_in_their_own_statement():
+    db = FakeDatabase()
+    writer = UsageWriter(db, start=False)
+    with patch.object(writer, "_next_id", side_effect=[7, None]):
+        writer.submit({"operation": "a"})
+        writer.submit({"operation": "b"})
+    writer.flush()
+    assert db.inserted == [[{"operation": "a", "id": 7}], [{"operation": "b"}]]
+
+
+def test_recorder_uses_the_writer_and_still_returns_id_and_cost():
+    db = FakeDatabase()
+    writer = UsageWriter(db, start=False)
+    session_factory = MagicMock()
+    with patch.object(recorder, "active_writer", return_value=writer):
+        usage = recorder.record_llm_usage(
+            operation="tags", provider="cloudferro", model="Bielik-11B-v3.0-Instruct",
+            prompt_tokens=1_000_000, completion_tokens=0, session_factory=session_factory,
+        )
+    writer.flush()
+
+    session_factory.assert_not_called()
+    assert usage.usage_log_id == 1000
+    assert (usage.cost.status, usage.cost.total_cost) == (CostStatus.ESTIMATED, Decimal("0.56"))
+    row = db.inserted[0][0]
+    assert (row["id"], row["pricing_version"], row["cost_status"]) == (1000, BIELIK.pricing_version, "estimated")
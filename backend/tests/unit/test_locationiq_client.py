@@ -81,34 +81,34 @@ def _response(status=200, body=None):
 
 class TestGeocode:
     def test_returns_first_hit(self):
-        with patch("library.locationiq_client.requests.get", return_value=_response(body=[HORMUZ_HIT])):
+        with patch("library.locationiq_client.http.get", return_value=_response(body=[HORMUZ_HIT])):
             with patch("library.locationiq_client._api_key", return_value="pk.test"):
                 assert geocode("Strait of Hormuz") == HORMUZ_HIT
 
     def test_requests_polish_display_names(self):
         """Bez accept-language=pl display_name wraca po angielsku ("Kyiv") i podobieństwo nazw odrzuca "Kijów"."""
-        with patch("library.locationiq_client.requests.get", return_value=_response(body=[KYIV_HIT])) as mock_get:
+        with patch("library.locationiq_client.http.get", return_value=_response(body=[KYIV_HIT])) as mock_get:
             with patch("library.locationiq_client._api_key", return_value="pk.test"):
                 geocode("Kijów")
         assert mock_get.call_args.kwargs["params"]["accept-language"] == "pl,en"
 
     def test_404_means_clean_miss(self):
-        with patch("library.locationiq_client.requests.get", return_value=_response(status=404)):
+        with patch("library.locationiq_client.http.get", return_value=_response(status=404)):
             with patch("library.locationiq_client._api_key", return_value="pk.test"):
                 assert geocode("Xyzzyplugh") is None
 
     def test_no_api_key_returns_none_without_request(self):
-        with patch("library.locationiq_client.requests.get") as mock_get:
+        with patch("library.locationiq_client.http.get") as mock_get:
             with patch("library.locationiq_client._api_key", return_value=None):
                 assert geocode("Kijów") is None
         mock_get.assert_not_called()
 
     def test_request_failure_returns_none(self):
-        with patch("library.locationiq_client.requests.get", side_effect=requests.ConnectionError("boom")):
+        with patch("library.locationiq_client.http.get", side_effect=requests.ConnectionError("boom")):
             with patch("library.locationiq_client._api_key", return_value="pk.test"):
                 assert geocode("Kijów") is None
 
     def test_empty_result_list_returns_none(self):
-        with patch("library.locationiq_client.requests.get", return_value=_response(body=[])):
+        with patch("library.locationiq_client.http.get", return_value=_response(body=[])):
             with patch("library.locationiq_client._api_key", return_value="pk.test"):
                 assert geocode("Kijów") is None
@@ -13,6 +13,19 @@ com"""
 
         self.assertEqual(link_expected, link_corrected)
 
+    def test_link_wrap_is_joined_but_text_around_is_kept(self):
+        text = "Zob. [opis](https://example.com/a\n/b) i dalej\n\nnastępny akapit"
+        self.assertEqual("Zob. [opis](https://example.com/a/b) i dalej\n\nnastępny akapit", links_correct(text))
+
+    def test_line_break_before_new_url_or_sentence_is_kept(self):
+        text = "https://a.example.com/x\nhttps://b.example.com/y\nKolejne zdanie."
+        self.assertEqual(text, links_correct(text))
+
+    def test_text_without_links_is_unchanged(self):
+        text = "Zwykły tekst\n\n z [nawiasami] (i spacjami)\n"
+        self.assertEqual(text, links_correct(text))
+
+
 
 if __name__ == '__main__':
     unittest.main()
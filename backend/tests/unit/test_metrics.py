@@ -0,0 +1,127 @@
+"""Unit tests for library/metrics.py — in-process Prometheus metrics."""
+
+import datetime as dt
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.pool import QueuePool  # noqa: E402
+
+from library import metrics  # noqa: E402
+from library.metrics import Counter, Histogram  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _empty_limiter():
+    with patch("library.llm_concurrency.limiter_snapshot", return_value=[]):
+        yield
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    histogram = Histogram("t_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+
+    assert histogram.render() == [
+        "# HELP t_seconds test",
+        "# TYPE t_seconds histogram",
+        't_seconds_bucket{route="/a",le="0.1"} 1',
+        't_seconds_bucket{route="/a",le="1"} 2',
+        't_seconds_bucket{route="/a",le="+Inf"} 3',
+        't_seconds_sum{route="/a"} 5.55',
+        't_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("t_total", "test", ("model",))
+    counter.inc(model='a"b\\c')
+    assert counter.render()[-1] == 't_total{model="a\\"b\\\\c"} 1'
+
+
+def test_engine_events_time_statements_by_verb():
+    engine = create_engine("sqlite://", poolclass=QueuePool)
+    metrics.instrument_engine(engine, "test")
+    before = metrics.DB_QUERY_SECONDS._values.get(("SELECT",), (None, 0, 0))[2]
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing_table"))
+
+    assert metrics.DB_QUERY_SECONDS._values[("SELECT",)][2] == before + 1
+    assert metrics.DB_ERRORS._values[("SELECT",)] >= 1
+    assert 'lenie_db_pool_checked_out{pool="test"} 0' in metrics.render()
+
+
+def test_job_queue_gauges_report_depth_and_age_of_due_jobs():
+    now = dt.datetime(2026, 10, 1, 12, 0, tzinfo=dt.timezone.utc)
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [
+        ("feed_check", "queued", 4, now - dt.timedelta(minutes=2)),
+        ("feed_check", "running", 1, now - dt.timedelta(minutes=9)),
+        ("document_analysis", "queued", 2, None),  # scheduled for later only
+    ]
+
+    metrics.collect_job_queue(session, now)
+    output = "\n".join(metrics.JOB_QUEUE_DEPTH.render() + metrics.JOB_QUEUE_OLDEST_AGE.render())
+
+    assert 'lenie_job_queue_depth{type="feed_check",status="queued"} 4' in output
+    assert 'lenie_job_queue_oldest_age_seconds{type="feed_check"} 120' in output
+    assert 'lenie_job_queue_oldest_age_seconds{type="document_analysis"} 0' in output
+    assert 'lenie_job_queue_oldest_age_seconds{type="feed_check",' not in output
+
+
+def test_render_survives_a_failing_database():
+    output = metrics.render(MagicMock(side_effect=RuntimeError("db down")))
+    assert "# TYPE lenie_job_queue_depth gauge" in output
+
+
+def test_recorder_counts_the_call_even_when_the_write_fails():
+    from library.llm_usage.recorder import record_llm_usage
+
+    labels = ("fake", "m1", "tags", "error")
+    before = metrics.LLM_CALLS._values.get(labels, 0)
+    record_llm_usage(
+        operation="tags", provider="fake", model="m1", prompt_tokens=10, completion_tokens=3,
+        success=False, latency_ms=1500, session_factory=MagicMock(side_effect=RuntimeError("db down")),
+    )
+
+    assert metrics.LLM_CALLS._values[labels] == before + 1
+    assert metrics.LLM_TOKENS._values[("fake", "m1", "completion")] >= 3
+    assert metrics.LLM_CALL_SECONDS._values[("fake", "m1", "tags")][1] >= 1.5
+
+
+def test_limiter_gauges_escape_provider_and_model_labels():
+    snapshot = [{"provider": "openai", "model": 'ft:"x"\\y', "limit": 4.5, "in_flight": 1, "waiting": 0,
+                 "throttled_total": 2}]
+    with patch("library.llm_concurrency.limiter_snapshot", return_value=snapshot):
+        lines = metrics._llm_concurrency_lines()
+
+    assert 'lenie_llm_concurrency_limit{provider="openai",model="ft:\\"x\\"\\\\y"} 4.5' in lines
+    assert 'lenie_llm_throttled_total{provider="openai",model="ft:\\"x\\"\\\\y"} 2' in lines
+
+
+def test_serve_listens_on_loopback_by_default():
+    server = metrics.serve(0)
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_worker_endpoint_serves_the_text_format():
+    import urllib.request
+
+    server = metrics.serve(0, host="127.0.0.1")
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics", timeout=5) as response:
+            body = response.read().decode()
+        assert "# TYPE lenie_job_run_duration_seconds histogram" in body
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -84,6 +84,33 @@ class TestMetricsEndpoint(unittest.TestCase):
         response = self.client.get('/metrics', headers={'x-api-key': self.api_key})
         self.assertIn('text/plain', response.content_type)
 
+    def test_metrics_exposes_llm_limiter_state(self):
+        snapshot = [{"provider": "cloudferro", "model": "Bielik-11B-v3.0-Instruct",
+                     "limit": 6, "in_flight": 2, "waiting": 3, "throttled_total": 1}]
+        with patch('library.llm_concurrency.limiter_snapshot', return_value=snapshot):
+            response = self.client.get('/metrics', headers={'x-api-key': self.api_key})
+        self.assertIn(b'# TYPE lenie_llm_concurrency_limit gauge', response.data)
+        self.assertIn(
+            b'lenie_llm_concurrency_limit{provider="cloudferro",model="Bielik-11B-v3.0-Instruct"} 6', response.data,
+        )
+        self.assertIn(b'lenie_llm_concurrency_queue_depth{provider="cloudferro"', response.data)
+
+    def test_metrics_times_requests_by_route_template(self):
+        self.client.get('/healthz')
+        response = self.client.get('/metrics', headers={'x-api-key': self.api_key})
+        self.assertIn(
+            b'lenie_http_request_duration_seconds_count{route="/healthz",method="GET",status="200"}', response.data,
+        )
+        self.assertIn(b'# TYPE lenie_job_queue_depth gauge', response.data)
+
+    def test_query_profiling_adds_server_timing_header(self):
+        from library.query_profiler import ProfileSettings
+
+        with patch.object(_server_module, 'query_profile_settings', ProfileSettings()):
+            response = self.client.get('/healthz')
+        self.assertEqual(response.headers['Server-Timing'], 'db;dur=0.0;desc="0 queries"')
+        self.assertNotIn('Server-Timing', self.client.get('/healthz').headers)
+
     def test_healthz_not_affected(self):
         response = self.client.get('/healthz', headers={'x-api-key': self.api_key})
         self.assertEqual(response.status_code, 200)
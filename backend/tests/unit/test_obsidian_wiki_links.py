@@ -118,7 +118,7 @@ class TestChapterEndpointWikiLinks:
     def client(self, monkeypatch):
         doc = _make_note()
         session = MagicMock()
-        session.get.side_effect = lambda model, pk: doc if model is Document and pk == doc.id else None
+        session.get.side_effect = lambda model, pk, **_kw: doc if model is Document and pk == doc.id else None
         session.scalars.return_value.first.return_value = None
         # The only session.query(...).filter(...).all() call in this route is
         # the Document.id/Document.title wikilink lookup -- the
@@ -37,7 +37,7 @@ def _response(elements):
 
 class TestFetchPipeline:
     def test_returns_geometry_and_tags(self):
-        with patch("library.overpass_client.requests.post", return_value=_response([BALTIC_WAY])):
+        with patch("library.overpass_client.http.post", return_value=_response([BALTIC_WAY])):
             with patch("library.overpass_client._overpass_url", return_value="http://ov/api"):
                 hit = fetch_pipeline("Baltic Pipe")
 
@@ -48,26 +48,26 @@ class TestFetchPipeline:
         assert hit["geojson"]["coordinates"] == [[[15.0, 55.0], [15.2, 55.1], [15.4, 55.2]]]
 
     def test_no_elements_means_miss(self):
-        with patch("library.overpass_client.requests.post", return_value=_response([])):
+        with patch("library.overpass_client.http.post", return_value=_response([])):
             with patch("library.overpass_client._overpass_url", return_value="http://ov/api"):
                 assert fetch_pipeline("Beludżystan") is None
 
     def test_request_failure_raises_not_cached_as_miss(self):
         """Awaria transportu (np. 406/timeout) nie może zatruć cache fałszywym missem."""
-        with patch("library.overpass_client.requests.post", side_effect=requests.ConnectionError("boom")):
+        with patch("library.overpass_client.http.post", side_effect=requests.ConnectionError("boom")):
             with patch("library.overpass_client._overpass_url", return_value="http://ov/api"):
                 with pytest.raises(OverpassUnavailable):
                     fetch_pipeline("Baltic Pipe")
 
     def test_sends_identifying_user_agent(self):
         """overpass-api.de odrzuca generyczne UA (live test 2026-07-11: HTTP 406)."""
-        with patch("library.overpass_client.requests.post", return_value=_response([BALTIC_WAY])) as mock_post:
+        with patch("library.overpass_client.http.post", return_value=_response([BALTIC_WAY])) as mock_post:
             with patch("library.overpass_client._overpass_url", return_value="http://ov/api"):
                 fetch_pipeline("Baltic Pipe")
         assert "lenie-ai" in mock_post.call_args.kwargs["headers"]["User-Agent"]
 
     def test_short_or_quoted_names_rejected_without_request(self):
-        with patch("library.overpass_client.requests.post") as mock_post:
+        with patch("library.overpass_client.http.post") as mock_post:
             assert fetch_pipeline("dom") is None
             assert fetch_pipeline('Nord "Stream"') is None
         mock_post.assert_not_called()
@@ -81,7 +81,7 @@ class TestFetchPipeline:
                 {"type": "way", "geometry": [{"lat": 52.1, "lon": 23.5}, {"lat": 52.2, "lon": 24.0}]},
             ],
         }
-        with patch("library.overpass_client.requests.post", return_value=_response([relation])):
+        with patch("library.overpass_client.http.post", return_value=_response([relation])):
             with patch("library.overpass_client._overpass_url", return_value="http://ov/api"):
                 hit = fetch_pipeline("Przyjaźń")
         assert len(hit["geojson"]["coordinates"]) == 2
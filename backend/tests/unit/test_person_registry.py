@@ -189,6 +189,17 @@ class TestResolveDocumentPersons:
         assert created[0].description == "polski polityk, premier"
         mock_llm.assert_called_once()
 
+    def test_mentions_of_one_document_are_disambiguated_in_one_batch(self):
+        session = _session([_entity("Donald Tusk"), _entity("Tusk")])
+        picks = {"Donald Tusk": "Q946", "Tusk": "Q946"}
+        with patch("library.wikidata_client.search_persons", return_value=TUSK_CANDIDATES):
+            with patch("library.article_tagging.confirm_person_with_llm_batch", return_value=picks) as mock_llm:
+                result = resolve_document_persons(session, _doc(), "artykuł o premierze")
+
+        mock_llm.assert_called_once()
+        assert set(mock_llm.call_args.args[2]) == {"Donald Tusk", "Tusk"}
+        assert [name for name, _, _ in result["linked"]] == ["Donald Tusk", "Tusk"]
+
     def test_existing_alias_short_circuits_wikidata(self):
         person = MagicMock(spec=Person)
         person.id = 7
@@ -0,0 +1,77 @@
+"""Tests for library/query_profiler.py — per-request statement counting."""
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import bindparam, create_engine, text  # noqa: E402
+
+from library import query_profiler  # noqa: E402
+from library.query_profiler import ProfileSettings, QueryProfile  # noqa: E402
+
+
+@pytest.fixture
+def engine():
+    query_profiler.install()
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO t (id) VALUES (1), (2), (3)"))
+    return engine
+
+
+def test_counts_statements_only_inside_a_profile(engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        token = query_profiler.start("GET /persons")
+        for row_id in (1, 2, 3):
+            conn.execute(text("SELECT id FROM t WHERE id = :id"), {"id": row_id})
+        profile = query_profiler.stop(token)
+        conn.execute(text("SELECT 2"))
+
+    assert profile.statements == 3
+    assert profile.db_seconds > 0
+    assert profile.repeated(3) == [("SELECT id FROM t WHERE id = ?", 3)]
+
+
+def test_expanded_in_lists_share_a_shape(engine):
+    stmt = text("SELECT id FROM t WHERE id IN :ids").bindparams(bindparam("ids", expanding=True))
+    shapes = {
+        query_profiler.statement_shape("SELECT id FROM t WHERE id IN (%(ids_1)s, %(ids_2)s)"),
+        query_profiler.statement_shape("SELECT id FROM t\n WHERE id IN (%(ids_1)s, %(ids_2)s, %(ids_3)s)"),
+    }
+    assert shapes == {"SELECT id FROM t WHERE id IN (...)"}
+    with engine.connect() as conn:
+        token = query_profiler.start("test")
+        conn.execute(stmt, {"ids": [1, 2]})
+        assert query_profiler.stop(token).statements == 1
+
+
+def test_report_logs_repeated_shapes(caplog):
+    profile = QueryProfile("GET /information_sources")
+    for _ in range(6):
+        profile.record("SELECT organizations.name FROM organizations WHERE organizations.id = %(pk_1)s", 0.001)
+
+    assert query_profiler.report(profile, ProfileSettings())
+    assert "6 statements" in caplog.text
+    assert "6x SELECT organizations.name" in caplog.text
+
+
+def test_report_stays_quiet_under_the_thresholds(caplog):
+    profile = QueryProfile("GET /website_list")
+    profile.record("SELECT count(*) FROM documents", 0.002)
+    assert not query_profiler.report(profile, ProfileSettings())
+    assert caplog.text == ""
+
+
+def test_report_flags_slow_database_time(caplog):
+    profile = QueryProfile("GET /search")
+    profile.record("SELECT 1", 0.8)
+    assert query_profiler.report(profile, ProfileSettings(max_db_ms=500))
+    assert profile.server_timing() == 'db;dur=800.0;desc="1 queries"'
+
+
+def test_settings_from_config():
+    assert ProfileSettings.from_config({}) is None
+    settings = ProfileSettings.from_config({"QUERY_PROFILE": "true", "QUERY_PROFILE_REPEAT": "3"})
+    assert settings == ProfileSettings(repeat_threshold=3)
@@ -52,7 +52,7 @@ def _make_obsidian_note(doc_id=9766, text_md=NOTE_TEXT) -> Document:
 
 class TestWholeDocumentChapter:
     def test_covers_the_full_text(self):
-        chapters = cr._whole_document_chapter(NOTE_TEXT)
+        chapters = cr._whole_document_chapter(len(NOTE_TEXT))
         assert chapters == [{
             "position": 1, "level": 1, "title": "(całość)",
             "char_start": 0, "char_end": len(NOTE_TEXT), "length": len(NOTE_TEXT),
@@ -102,7 +102,7 @@ class TestDocumentChaptersEndpoint:
     def client(self, monkeypatch):
         doc = _make_obsidian_note()
         session = MagicMock()
-        session.get.side_effect = lambda model, pk: doc if model is Document and pk == doc.id else None
+        session.get.side_effect = lambda model, pk, **_kw: doc if model is Document and pk == doc.id else None
         # document_chapters() separately looks up a whole-document run for its
         # "synthesis" field -- none exists here, keep it out of the JSON body.
         session.scalars.return_value.first.return_value = None
@@ -132,7 +132,7 @@ class TestDocumentChaptersEndpointShortNote:
     def client(self, monkeypatch):
         doc = _make_obsidian_note(doc_id=9923, text_md=SHORT_NOTE_TEXT)
         session = MagicMock()
-        session.get.side_effect = lambda model, pk: doc if model is Document and pk == doc.id else None
+        session.get.side_effect = lambda model, pk, **_kw: doc if model is Document and pk == doc.id else None
         session.scalars.return_value.first.return_value = None
         monkeypatch.setattr(cr, "get_scoped_session", lambda: session)
         monkeypatch.setattr(cr, "_latest_run_for_document", lambda _session, _doc_id: None)
@@ -197,7 +197,7 @@ class TestGetList:
         assert result == []
         session.execute.assert_called_once()
 
-    def test_without_embedding_uses_not_exists_filter(self):
+    def test_without_embedding_uses_materialized_flag(self):
         session = MagicMock()
         repo = _make_repo(session)
         session.execute.return_value.all.return_value = []
@@ -206,8 +206,65 @@ class TestGetList:
 
         stmt = session.execute.call_args.args[0]
         sql = str(stmt.compile(compile_kwargs={"literal_binds": True}))
-        assert "NOT (EXISTS" in sql
-        assert "document_embeddings.document_id = documents.id" in sql
+        assert "documents.has_embedding IS false" in sql
+        assert "document_embeddings" not in sql
+
+    def test_only_has_obsidian_notes_uses_materialized_flag(self):
+        session = MagicMock()
+        repo = _make_repo(session)
+        session.execute.return_value.all.return_value = []
+
+        repo.get_list(only_has_obsidian_notes=True)
+
+        sql = str(session.execute.call_args.args[0].compile(compile_kwargs={"literal_binds": True}))
+        assert "documents.has_obsidian_notes IS true" in sql
+        assert "document_chunks" not in sql
+
+    def test_keyset_cursor_replaces_offset(self):
+        session = MagicMock()
+        repo = _make_repo(session)
+        session.execute.return_value.all.return_value = []
+
+        repo.get_list(limit=20, offset=5, after_id=17,
+                      after_ingested_at=datetime.datetime(2026, 2, 1, 8, 0, 0, 123456))
+
+        sql = str(session.execute.call_args.args[0].compile(compile_kwargs={"literal_binds": True}))
+        assert (
+            "(coalesce(documents.ingested_at, TIMESTAMP '0001-01-01 00:00:00'), documents.id)"
+            " < ('2026-02-01 08:00:00.123456', 17)"
+        ) in sql
+        assert "ORDER BY coalesce(documents.ingested_at, TIMESTAMP '0001-01-01 00:00:00') DESC" in sql
+        assert "OFFSET" not in sql
+        assert "LIMIT 20" in sql
+
+    def test_document_without_ingested_at_gets_a_usable_cursor(self):
+        session = MagicMock()
+        repo = _make_repo(session)
+        mock_row = _make_row(
+            id=4, url="https://example.com", title="Legacy", document_type="webpage",
+            ingested_at=None, processing_status="URL_ADDED",
+            processing_error_code=None, note=None, collection_id=None, uuid=None, byline=None,
+            obsidian_note_paths=None,
+        )
+        list_result = MagicMock(all=MagicMock(return_value=[mock_row]))
+        empty = MagicMock(all=MagicMock(return_value=[]))
+        session.execute.side_effect = [list_result, empty, empty]
+
+        result = repo.get_list()
+
+        assert result[0]["ingested_at"] is None
+        assert result[0]["cursor"] == {"after_id": 4, "after_ingested_at": "0001-01-01T00:00:00"}
+
+    @pytest.mark.parametrize("kwargs", [
+        {"after_id": 17},
+        {"after_ingested_at": datetime.datetime(2026, 2, 1)},
+        {"after_id": 17, "after_ingested_at": datetime.datetime(2026, 2, 1), "sort": "priority"},
+    ])
+    def test_keyset_cursor_rejects_incomplete_or_priority_sort(self, kwargs):
+        repo = _make_repo(MagicMock())
+
+        with pytest.raises(ValueError):
+            repo.get_list(**kwargs)
 
     def test_empty_result(self):
         session = MagicMock()
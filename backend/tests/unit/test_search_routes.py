@@ -68,7 +68,7 @@ class TestSearchEndpoint:
         service.search.return_value = [{"document_id": 7}]
         with patch.object(routes, "SearchService", return_value=service):
             with patch.object(routes, "parse_search_query") as parser:
-                with patch.object(routes, "get_scoped_session", return_value=MagicMock()):
+                with patch.object(routes, "get_read_session", return_value=MagicMock()):
                     response = client.post("/search", json={
                         "filters": {"languages": ["pl"], "published_on_from": "2020-01-01"},
                         "limit": 5,
@@ -92,7 +92,7 @@ class TestSearchEndpoint:
         service = MagicMock()
         service.search.return_value = [{"document_id": i} for i in range(1, 5)]
         with patch.object(routes, "SearchService", return_value=service):
-            with patch.object(routes, "get_scoped_session", return_value=MagicMock()):
+            with patch.object(routes, "get_read_session", return_value=MagicMock()):
                 response = client.post("/search", json={
                     "filters": {"languages": ["pl"]}, "limit": 3, "offset": 6,
                 })
@@ -109,7 +109,7 @@ class TestSearchEndpoint:
         service.search.return_value = []
         with patch.object(routes, "parse_search_query", return_value=_parse_result()) as parser:
             with patch.object(routes, "SearchService", return_value=service):
-                with patch.object(routes, "get_scoped_session", return_value=MagicMock()):
+                with patch.object(routes, "get_read_session", return_value=MagicMock()):
                     response = client.post("/search", json={"natural_query": "wojna", "limit": 4})
         assert response.status_code == 200
         assert response.get_json()["search_id"] == 123
@@ -125,7 +125,7 @@ class TestSearchEndpoint:
         service.search.return_value = []
         with patch.object(routes, "parse_search_query", return_value=result):
             with patch.object(routes, "SearchService", return_value=service):
-                with patch.object(routes, "get_scoped_session", return_value=MagicMock()):
+                with patch.object(routes, "get_read_session", return_value=MagicMock()):
                     response = client.post("/search", json={"natural_query": "wojna"})
         assert response.status_code == 200
         assert response.get_json()["fallback_used"] is True
@@ -134,7 +134,7 @@ class TestSearchEndpoint:
     def test_ambiguity_requests_clarification_without_search(self, client):
         resolution = SimpleNamespace(count=2)
         with patch.object(routes, "resolve_author_name", return_value=resolution):
-            with patch.object(routes, "get_scoped_session", return_value=MagicMock()):
+            with patch.object(routes, "get_read_session", return_value=MagicMock()):
                 with patch.object(routes, "SearchService") as service:
                     response = client.post("/search", json={
                         "filters": {"author_name": "Artur Rubinstein"},
@@ -151,7 +151,7 @@ class TestSearchEndpoint:
         service.search.return_value = []
         with patch.object(routes, "resolve_author_name", side_effect=RuntimeError("db")):
             with patch.object(routes, "SearchService", return_value=service):
-                with patch.object(routes, "get_scoped_session", return_value=MagicMock()):
+                with patch.object(routes, "get_read_session", return_value=MagicMock()):
                     response = client.post("/search", json={"filters": {"author_name": "Jan"}})
         assert response.status_code == 200
         service.search.assert_called_once()
@@ -167,7 +167,7 @@ class TestSearchEndpoint:
         service = MagicMock()
         service.search.side_effect = RuntimeError("embedding secret detail")
         with patch.object(routes, "SearchService", return_value=service):
-            with patch.object(routes, "get_scoped_session", return_value=MagicMock()):
+            with patch.object(routes, "get_read_session", return_value=MagicMock()):
                 response = client.post("/search", json={"query": "x"})
         assert response.status_code == 503
         assert "secret detail" not in response.get_data(as_text=True)
@@ -0,0 +1,77 @@
+"""Tests for library/website/site_rules.py — compiled, cached site cleanup rules."""
+
+import json
+import logging
+import os
+
+from library.website.site_rules import SiteRuleSet, get_site_rules
+
+
+def _rule(**spec) -> dict:
+    return {"remove_before": [], "remove_after": [], "remove_string": [], "remove_string_regexp": [], **spec}
+
+
+def _write(path, rules: dict, mtime_ns: int) -> None:
+    path.write_text(json.dumps(rules), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_rules_are_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / "site_rules.json"
+    _write(path, {"example.com": _rule(remove_string=["AD"])}, 1_000_000_000)
+
+    first = get_site_rules(str(path))
+    assert get_site_rules(str(path)) is first
+    assert first.clean("https://example.com/a", "text AD") == "text "
+
+    _write(path, {"example.com": _rule(remove_string=["PROMO"])}, 2_000_000_000)
+    reloaded = get_site_rules(str(path))
+    assert reloaded is not first
+    assert reloaded.clean("https://example.com/a", "text AD PROMO") == "text AD "
+
+
+def test_missing_file_gives_empty_rules(tmp_path, caplog):
+    with caplog.at_level(logging.WARNING):
+        rules = get_site_rules(str(tmp_path / "missing.json"))
+    assert len(rules) == 0
+    assert rules.clean("https://example.com/", "unchanged") == "unchanged"
+    assert "does not exist" in caplog.text
+
+
+def test_keys_match_as_url_substrings_through_the_host_index():
+    rules = SiteRuleSet({
+        "https://www.onet.pl": _rule(remove_string=["onet"]),
+        "example.com": _rule(remove_string=["example"]),
+        "/blog/": _rule(remove_string=["blog"]),
+    })
+
+    assert [r.key for r in rules.rules_for("https://wiadomosci.onet.pl/a")] == []
+    assert [r.key for r in rules.rules_for("https://www.onet.pl/a")] == ["https://www.onet.pl"]
+    assert [r.key for r in rules.rules_for("https://news.example.com/blog/1")] == ["example.com", "/blog/"]
+    assert rules.rules_for("") == []
+
+
+def test_site_steps_run_in_the_legacy_order_then_global():
+    rules = SiteRuleSet({
+        "_global": {"remove_string": [], "remove_string_regexp": [r"Reklama\n"]},
+        "https://www.o2.pl": _rule(
+            remove_before=["Udostępnij"],
+            remove_after=["Wybrane"],
+            remove_string_regexp=[r"\d{2}:\d{2}"],
+        ),
+    })
+    text = "Nagłówek Udostępnij\nTreść 12:30\nReklama\nWybrane 1\nWybrane 2"
+
+    assert rules.clean("https://www.o2.pl/x", text) == "Treść \nWybrane 1\n"
+
+
+def test_literal_removals_prefer_the_longest_entry():
+    rules = SiteRuleSet({"example.com": _rule(remove_string=["Czytaj", "Czytaj także:"])})
+    assert rules.clean("https://example.com/", "A Czytaj także: B Czytaj C") == "A  B  C"
+
+
+def test_invalid_regex_is_skipped_and_the_rest_still_applies(caplog):
+    with caplog.at_level(logging.ERROR):
+        rules = SiteRuleSet({"example.com": _rule(remove_string_regexp=["(unclosed", "drop"])})
+    assert rules.clean("https://example.com/", "keep drop") == "keep "
+    assert "Skipping invalid site rule regex" in caplog.text
@@ -1,6 +1,6 @@
 """Unit tests for GET /stats (document counts by type/state/source + recent daily ingestion)."""
 
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -9,6 +9,7 @@ pytest.importorskip("sqlalchemy")
 pytest.importorskip("flask")
 
 API_HEADERS = {"x-api-key": "test-api-key"}
+REFRESHED = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(minutes=1)
 
 
 @pytest.fixture()
@@ -41,9 +42,15 @@ def _session_with(total, by_type, by_state, by_source, daily, recent):
     session.execute.side_effect = [
         total_result, by_type_result, by_state_result, by_source_result, daily_result, recent_result,
     ]
+    session.scalars.return_value = []  # no document_stats snapshot yet
     return session
 
 
+def _stat(dimension, key, count):
+    return _row(dimension=dimension, key=key, count=count,
+                refreshed_at=REFRESHED)
+
+
 class TestStats:
     def test_returns_expected_shape(self, client):
         session = _session_with(
@@ -55,7 +62,7 @@ class TestStats:
             recent=[_row(id=1, title="T", document_type="webpage", processing_status="EMBEDDING_EXIST",
                           name="own", ingested_at=None)],
         )
-        with patch("library.stats_routes.get_scoped_session", return_value=session):
+        with patch("library.stats_routes.get_read_session", return_value=session):
             resp = client.get("/stats", headers=API_HEADERS)
 
         assert resp.status_code == 200
@@ -75,7 +82,7 @@ class TestStats:
         today = date.today()
         session = _session_with(total=0, by_type=[], by_state=[], by_source=[],
                                  daily=[_row(day=str(today), count=2)], recent=[])
-        with patch("library.stats_routes.get_scoped_session", return_value=session):
+        with patch("library.stats_routes.get_read_session", return_value=session):
             resp = client.get("/stats?days=3", headers=API_HEADERS)
 
         assert resp.status_code == 200
@@ -85,6 +92,37 @@ class TestStats:
         assert data["daily"][-1]["count"] == 2
         assert data["daily"][0]["count"] == 0
 
+    def test_serves_snapshot_without_aggregating(self, client):
+        today = date.today()
+        session = MagicMock()
+        session.scalars.return_value = [
+            _stat("type_state", "webpage|READY_FOR_EMBEDDING", 2),
+            _stat("type_state", "webpage|EMBEDDING_EXIST", 5),
+            _stat("type_state", "link|URL_ADDED", 1),
+            _stat("source", "own", 8),
+            _stat("day", today.isoformat(), 4),
+        ]
+        session.execute.return_value.all.return_value = []  # recent
+        with patch("library.stats_routes.get_read_session", return_value=session):
+            resp = client.get("/stats?days=2", headers=API_HEADERS)
+
+        data = resp.get_json()
+        assert session.execute.call_count == 1  # only the LIMIT 20 recent list
+        assert data["refreshed_at"] == REFRESHED.isoformat()
+        assert data["total"] == 8
+        assert data["by_type"] == [{"document_type": "webpage", "count": 7}, {"document_type": "link", "count": 1}]
+        assert data["by_state"][0] == {"processing_status": "EMBEDDING_EXIST", "count": 5}
+        assert data["daily"][-1] == {"day": today.isoformat(), "count": 4}
+
+    def test_live_param_bypasses_snapshot(self, client):
+        session = _session_with(total=0, by_type=[], by_state=[], by_source=[], daily=[], recent=[])
+        session.scalars.return_value = [_stat("type_state", "webpage|URL_ADDED", 9)]
+        with patch("library.stats_routes.get_read_session", return_value=session):
+            resp = client.get("/stats?live=1", headers=API_HEADERS)
+
+        assert resp.get_json()["total"] == 0
+        assert resp.get_json()["refreshed_at"] is None
+
     def test_days_zero_returns_400(self, client):
         resp = client.get("/stats?days=0", headers=API_HEADERS)
         assert resp.status_code == 400
@@ -1,6 +1,10 @@
+import io
 from unittest.mock import MagicMock
 
-from library.storage import LocalStorage, S3Storage, storage_from_config, usage
+import pytest
+
+from library import storage as storage_module
+from library.storage import LocalStorage, S3Storage, download_to_file, storage_from_config, usage
 
 
 def test_local_roundtrip_and_usage(tmp_path):
@@ -22,6 +26,92 @@ def test_s3_uses_endpoint_agnostic_api():
     )
 
 
+def test_local_put_stream_and_ranged_open_read(tmp_path):
+    storage = LocalStorage(tmp_path)
+    written = storage.put_stream("audio/a.bin", io.BytesIO(b"0123456789"), "application/octet-stream")
+    assert written == 10
+    with storage.open_read("audio/a.bin") as handle:
+        assert handle.fileno() >= 0  # plain file: sendfile/mmap-friendly
+        assert handle.read() == b"0123456789"
+    with storage.open_read("audio/a.bin", start=3, length=4) as handle:
+        assert handle.read() == b"3456"
+    assert [p.name for p in (tmp_path / "audio").iterdir()] == ["a.bin"]
+
+
+def test_local_put_stream_gets_the_same_mode_as_put_bytes(tmp_path):
+    storage = LocalStorage(tmp_path)
+    storage.put_bytes("a/bytes.bin", b"x")
+    storage.put_stream("a/stream.bin", io.BytesIO(b"x"))
+    assert (tmp_path / "a" / "stream.bin").stat().st_mode == (tmp_path / "a" / "bytes.bin").stat().st_mode
+
+
+def test_local_put_stream_failure_leaves_no_object(tmp_path):
+    class _Broken(io.RawIOBase):
+        def readable(self):
+            return True
+
+        def read(self, size=-1):
+            raise OSError("client disconnected")
+
+    storage = LocalStorage(tmp_path)
+    with pytest.raises(OSError):
+        storage.put_stream("uploads/x.pdf", _Broken())
+    assert list((tmp_path / "uploads").iterdir()) == []
+
+
+def test_download_to_file_streams_object(tmp_path):
+    storage = LocalStorage(tmp_path / "store")
+    storage.put_bytes("a/b.html", b"<p>x</p>")
+    target = tmp_path / "b.html"
+    assert download_to_file(storage, "a/b.html", target) == 8
+    assert target.read_bytes() == b"<p>x</p>"
+
+
+def test_s3_put_stream_small_object_is_single_put():
+    client = MagicMock()
+    storage = S3Storage("lenie", client=client)
+    assert storage.put_stream("a.txt", io.BytesIO(b"abc"), "text/plain", part_size=5) == 3
+    client.put_object.assert_called_once_with(Bucket="lenie", Key="a.txt", Body=b"abc", ContentType="text/plain")
+    client.create_multipart_upload.assert_not_called()
+
+
+def test_s3_put_stream_large_object_uses_multipart():
+    client = MagicMock()
+    client.create_multipart_upload.return_value = {"UploadId": "u1"}
+    client.upload_part.side_effect = [{"ETag": "e1"}, {"ETag": "e2"}, {"ETag": "e3"}]
+    storage = S3Storage("lenie", client=client)
+
+    assert storage.put_stream("big.mp3", io.BytesIO(b"aaaaabbbbbcc"), "audio/mpeg", part_size=5) == 12
+
+    client.put_object.assert_not_called()
+    client.create_multipart_upload.assert_called_once_with(Bucket="lenie", Key="big.mp3", ContentType="audio/mpeg")
+    assert [c.kwargs["Body"] for c in client.upload_part.call_args_list] == [b"aaaaa", b"bbbbb", b"cc"]
+    client.complete_multipart_upload.assert_called_once_with(
+        Bucket="lenie", Key="big.mp3", UploadId="u1",
+        MultipartUpload={"Parts": [
+            {"ETag": "e1", "PartNumber": 1}, {"ETag": "e2", "PartNumber": 2}, {"ETag": "e3", "PartNumber": 3},
+        ]},
+    )
+
+
+def test_s3_put_stream_aborts_failed_multipart():
+    client = MagicMock()
+    client.create_multipart_upload.return_value = {"UploadId": "u1"}
+    client.upload_part.side_effect = RuntimeError("network")
+    storage = S3Storage("lenie", client=client)
+    with pytest.raises(RuntimeError):
+        storage.put_stream("big.mp3", io.BytesIO(b"aaaaabbbbb"), part_size=5)
+    client.abort_multipart_upload.assert_called_once_with(Bucket="lenie", Key="big.mp3", UploadId="u1")
+    client.complete_multipart_upload.assert_not_called()
+
+
+def test_s3_open_read_sends_range_header():
+    client = MagicMock()
+    storage = S3Storage("lenie", client=client)
+    storage.open_read("a.bin", start=10, length=5)
+    client.get_object.assert_called_once_with(Bucket="lenie", Key="a.bin", Range="bytes=10-14")
+
+
 def test_local_rejects_path_traversal(tmp_path):
     storage = LocalStorage(tmp_path)
     try:
@@ -85,3 +175,62 @@ def test_storage_from_config_passes_public_endpoint(monkeypatch):
     storage = storage_from_config(cfg)
     assert isinstance(storage, S3Storage)
     assert storage.public_endpoint_url == "http://192.168.200.7:9000"
+
+
+class _RecordingLedger:
+    def __init__(self):
+        self.deltas = []
+
+    def record(self, prefix, count_delta, bytes_delta):
+        self.deltas.append((prefix, count_delta, bytes_delta))
+
+
+def test_local_ledger_tracks_new_overwrite_and_delete(tmp_path):
+    storage = LocalStorage(tmp_path)
+    storage.usage_ledger = ledger = _RecordingLedger()
+
+    storage.put_bytes("uploads/2026/a.pdf", b"12345")
+    storage.put_stream("uploads/2026/a.pdf", io.BytesIO(b"12"))  # overwrite: size only
+    storage.put_bytes("abc.html", b"<p>")
+    storage.delete("uploads/2026/a.pdf")
+    storage.delete("uploads/2026/a.pdf")  # already gone: nothing to record
+
+    assert ledger.deltas == [
+        ("uploads", 1, 5),
+        ("uploads", 0, -3),
+        ("", 1, 3),
+        ("uploads", -1, -2),
+    ]
+
+
+def test_s3_ledger_uses_head_for_previous_size():
+    from botocore.exceptions import ClientError
+
+    client = MagicMock()
+    client.head_object.side_effect = [
+        ClientError({"Error": {"Code": "404"}}, "HeadObject"),
+        {"ContentLength": 4},
+    ]
+    storage = S3Storage("lenie", client=client)
+    storage.usage_ledger = ledger = _RecordingLedger()
+
+    storage.put_bytes("documents/u/images/0.png", b"abcd")
+    storage.delete("documents/u/images/0.png")
+
+    assert ledger.deltas == [("documents", 1, 4), ("documents", -1, -4)]
+    client.delete_object.assert_called_once_with(Bucket="lenie", Key="documents/u/images/0.png")
+
+
+def test_storage_without_ledger_skips_size_lookups():
+    client = MagicMock()
+    S3Storage("lenie", client=client).put_bytes("a.txt", b"x")
+    client.head_object.assert_not_called()
+
+
+def test_storage_from_config_attaches_ledger_only_once_enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module, "_usage_ledger_enabled", False)
+    assert storage_from_config({"STORAGE_LOCAL_ROOT": str(tmp_path)}).usage_ledger is None
+    storage_module.enable_usage_ledger()
+    assert storage_from_config({"STORAGE_LOCAL_ROOT": str(tmp_path)}).usage_ledger is not None
+    disabled = storage_from_config({"STORAGE_LOCAL_ROOT": str(tmp_path), "STORAGE_USAGE_LEDGER": "false"})
+    assert disabled.usage_ledger is None
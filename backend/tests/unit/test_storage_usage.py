@@ -0,0 +1,77 @@
+"""Unit tests for library.storage_usage (ledger lookups and reconcile).
+
+Sessions are MagicMocks — the upserts are PostgreSQL-specific, so these
+tests check which totals are computed and returned, not the SQL itself.
+"""
+
+import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from library.storage import LocalStorage  # noqa: E402
+from library.storage_usage import (  # noqa: E402
+    PostgresUsageLedger,
+    ledger_usage,
+    reconcile,
+)
+
+
+def _row(prefix, count, total):
+    row = MagicMock()
+    row.prefix, row.object_count, row.total_bytes = prefix, count, total
+    return row
+
+
+class TestLedgerUsage:
+    def test_whole_store_sums_all_rows(self):
+        session = MagicMock()
+        session.scalar.return_value = datetime.datetime(2026, 10, 1, tzinfo=datetime.timezone.utc)
+        session.execute.return_value.one.return_value = (12, 3400)
+        assert ledger_usage(session) == (12, 3400)
+
+    def test_deep_prefix_is_not_answerable(self):
+        session = MagicMock()
+        assert ledger_usage(session, "cache/markdown/12") is None
+        session.execute.assert_not_called()
+
+    def test_never_reconciled_ledger_returns_none(self):
+        session = MagicMock()
+        session.scalar.return_value = None  # rows only hold deltas so far
+        assert ledger_usage(session, "uploads/") is None
+        session.execute.assert_not_called()
+
+    def test_reconciled_ledger_without_prefix_row_is_zero(self):
+        session = MagicMock()
+        session.scalar.return_value = datetime.datetime(2026, 10, 1, tzinfo=datetime.timezone.utc)
+        session.execute.return_value.one.return_value = (0, 0)
+        assert ledger_usage(session, "uploads") == (0, 0)
+
+
+def test_reconcile_overwrites_rows_and_reports_drift(tmp_path):
+    storage = LocalStorage(tmp_path)
+    storage.put_bytes("uploads/2026/a.pdf", b"12345")
+    storage.put_bytes("abc.html", b"<p>")
+    session = MagicMock()
+    session.scalars.return_value = [_row("uploads", 2, 9), _row("gone", 1, 1)]
+
+    result = reconcile(session, storage)
+
+    assert result["objects"] == 2
+    assert result["bytes"] == 8
+    assert result["drift"] == {
+        "": {"objects": -1, "bytes": -3},
+        "gone": {"objects": 1, "bytes": 1},
+        "uploads": {"objects": 1, "bytes": 4},
+    }
+    session.commit.assert_called_once()
+
+
+def test_ledger_record_never_raises():
+    session = MagicMock()
+    session.execute.side_effect = RuntimeError("db down")
+    PostgresUsageLedger(lambda: session).record("uploads", 1, 10)
+    session.rollback.assert_called_once()
+    session.close.assert_called_once()
@@ -1,6 +1,14 @@
 from unittest.mock import MagicMock, patch
 
-from library.tracking_urls import is_tracking_url, resolve_tracking_url, resolve_tracking_urls_in_text
+from sqlalchemy.dialects import postgresql
+
+from library.tracking_urls import (
+    _url_hash,
+    is_tracking_url,
+    resolve_tracking_url,
+    resolve_tracking_urls,
+    resolve_tracking_urls_in_text,
+)
 
 
 KIT_URL = (
@@ -26,14 +34,14 @@ def test_recognizes_kit_tracking_host_with_hyphen():
 
 
 @patch("library.tracking_urls.validate_url_target")
-@patch("library.tracking_urls.requests.request")
+@patch("library.tracking_urls.http.request")
 def test_decodes_kit_tracking_link_without_request(mock_request, mock_validate):
     assert resolve_tracking_url(KIT_URL) == CANONICAL_DESTINATION
     mock_request.assert_not_called()
     mock_validate.assert_not_called()
 
 
-@patch("library.tracking_urls.requests.request")
+@patch("library.tracking_urls.http.request")
 def test_replaces_embedded_kit_link_in_plain_email_text_without_request(mock_request):
     text = f"Incident Impact: policzyłem ({KIT_URL})"
 
@@ -42,7 +50,7 @@ def test_replaces_embedded_kit_link_in_plain_email_text_without_request(mock_req
 
 
 @patch("library.tracking_urls.validate_url_target")
-@patch("library.tracking_urls.requests.request")
+@patch("library.tracking_urls.http.request")
 def test_resolves_redirect_based_tracking_link(mock_request, mock_validate):
     mock_request.side_effect = [_response(302, DESTINATION), _response(200)]
 
@@ -52,7 +60,7 @@ def test_resolves_redirect_based_tracking_link(mock_request, mock_validate):
 
 
 @patch("library.tracking_urls.validate_url_target")
-@patch("library.tracking_urls.requests.request")
+@patch("library.tracking_urls.http.request")
 def test_falls_back_to_streamed_get_when_head_is_rejected(mock_request, mock_validate):
     mock_request.side_effect = [_response(405), _response(302, DESTINATION), _response(200)]
 
@@ -63,6 +71,60 @@ def test_falls_back_to_streamed_get_when_head_is_rejected(mock_request, mock_val
 
 def test_does_not_fetch_regular_url():
     url = "https://example.com/article"
-    with patch("library.tracking_urls.requests.request") as mock_request:
+    with patch("library.tracking_urls.http.request") as mock_request:
         assert resolve_tracking_url(url) == url
     mock_request.assert_not_called()
+
+
+def _route(responses: dict):
+    """http.request stand-in answering by URL, safe to call from pool threads."""
+    def request(method, url, **kwargs):
+        status, location = responses[url]
+        return _response(status, location)
+    return request
+
+
+@patch("library.tracking_urls.validate_url_target")
+@patch("library.tracking_urls.http.request")
+def test_text_links_are_resolved_once_each_in_one_batch(mock_request, _validate):
+    other = "https://click.example.com/other"
+    mock_request.side_effect = _route({
+        GENERIC_TRACKING_URL: (302, DESTINATION),
+        DESTINATION: (200, None),
+        other: (302, "https://example.org/b"),
+        "https://example.org/b": (200, None),
+    })
+    text = f"A ({GENERIC_TRACKING_URL}), B {other}. A again: {GENERIC_TRACKING_URL}! https://example.com/x"
+
+    assert resolve_tracking_urls_in_text(text) == (
+        f"A ({CANONICAL_DESTINATION}), B https://example.org/b. A again: {CANONICAL_DESTINATION}! "
+        "https://example.com/x"
+    )
+    assert mock_request.call_count == 4  # two hops per distinct link, none for the regular URL
+
+
+@patch("library.tracking_urls.validate_url_target")
+@patch("library.tracking_urls.http.request")
+def test_cached_destinations_skip_the_network_and_only_successes_are_stored(mock_request, _validate):
+    failing = "https://click.example.com/broken"
+    fresh = "https://click.example.com/fresh"
+    mock_request.side_effect = _route({
+        failing: (500, None),
+        fresh: (302, "https://example.org/new"),
+        "https://example.org/new": (200, None),
+    })
+    session = MagicMock()
+    session.execute.return_value.all.return_value = [(_url_hash(GENERIC_TRACKING_URL), CANONICAL_DESTINATION)]
+
+    resolved = resolve_tracking_urls([GENERIC_TRACKING_URL, failing, fresh, KIT_URL, "https://example.com/"], session)
+
+    assert resolved == {
+        GENERIC_TRACKING_URL: CANONICAL_DESTINATION,
+        failing: failing,
+        fresh: "https://example.org/new",
+        KIT_URL: CANONICAL_DESTINATION,
+    }
+    assert GENERIC_TRACKING_URL not in [call.args[1] for call in mock_request.call_args_list]
+    insert = session.execute.call_args_list[-1].args[0].compile(dialect=postgresql.dialect())
+    assert "ON CONFLICT DO NOTHING" in str(insert)
+    assert [value for key, value in insert.params.items() if key.startswith("url_")] == [_url_hash(fresh), fresh]
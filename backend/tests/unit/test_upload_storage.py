@@ -1,20 +1,39 @@
+import io
 from unittest.mock import MagicMock
 
 import pytest
 
-from library.storage import StoredObject
+from library.storage import LocalStorage, StoredObject
 from library.upload_storage import get_uploaded_file, list_uploaded_files, store_uploaded_file, validate_upload_filename
 
 
 def test_store_uploaded_file_uses_dedicated_prefix_and_safe_filename():
     storage = MagicMock()
+    storage.put_stream.side_effect = lambda key, stream, content_type=None: len(stream.read())
 
     result = store_uploaded_file(storage, "M\u00f3j katalog.pdf", b"%PDF-test")
 
     assert result.key.startswith("uploads/")
     assert result.key.endswith("-Moj_katalog.pdf")
     assert result.extension == ".pdf"
-    storage.put_bytes.assert_called_once()
+    assert result.size == len(b"%PDF-test")
+    storage.put_stream.assert_called_once()
+
+
+def test_store_uploaded_file_streams_from_the_start_of_a_file_object(tmp_path):
+    storage = LocalStorage(tmp_path)
+
+    result = store_uploaded_file(storage, "book.pdf", io.BytesIO(b"%PDF-streamed"))
+
+    assert result.size == len(b"%PDF-streamed")
+    assert storage.get_bytes(result.key) == b"%PDF-streamed"
+
+
+def test_store_uploaded_file_rejects_empty_stream():
+    storage = MagicMock()
+    with pytest.raises(ValueError, match="empty"):
+        store_uploaded_file(storage, "book.pdf", io.BytesIO(b""))
+    storage.put_stream.assert_not_called()
 
 
 @pytest.mark.parametrize("filename", ["book.txt", "", "book.pdf.exe"])
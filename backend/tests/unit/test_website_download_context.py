@@ -1,9 +1,17 @@
-"""Unit tests for SSRF protection in library/website/website_download_context.py."""
+"""Unit tests for library/website/website_download_context.py: SSRF protection and page text."""
+import re
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+from bs4 import BeautifulSoup
 
-from library.website.website_download_context import download_raw_html, validate_url_target
+from library.website.website_download_context import (
+    download_raw_html,
+    validate_url_target,
+    webpage_raw_parse,
+    webpage_text_clean,
+)
 
 
 class TestValidateUrlTarget:
@@ -41,7 +49,7 @@ class TestValidateUrlTarget:
 
 
 class TestDownloadRawHtml:
-    @patch("library.website.website_download_context.requests.get")
+    @patch("library.website.website_download_context.http.get")
     def test_downloads_content_with_timeout(self, mock_get):
         response = MagicMock()
         response.status_code = 200
@@ -56,7 +64,7 @@ class TestDownloadRawHtml:
         assert mock_get.call_args.kwargs["timeout"] == 30
         assert mock_get.call_args.kwargs["allow_redirects"] is False
 
-    @patch("library.website.website_download_context.requests.get")
+    @patch("library.website.website_download_context.http.get")
     def test_returns_none_on_error_status(self, mock_get):
         response = MagicMock()
         response.status_code = 404
@@ -66,7 +74,7 @@ class TestDownloadRawHtml:
 
         assert download_raw_html("https://1.1.1.1/missing") is None
 
-    @patch("library.website.website_download_context.requests.get")
+    @patch("library.website.website_download_context.http.get")
     def test_rejects_redirect_to_private_address(self, mock_get):
         response = MagicMock()
         response.is_redirect = True
@@ -77,7 +85,7 @@ class TestDownloadRawHtml:
         with pytest.raises(ValueError, match="non-public address"):
             download_raw_html("https://1.1.1.1/redirect")
 
-    @patch("library.website.website_download_context.requests.get")
+    @patch("library.website.website_download_context.http.get")
     def test_follows_public_redirect(self, mock_get):
         redirect = MagicMock()
         redirect.is_redirect = True
@@ -94,7 +102,7 @@ class TestDownloadRawHtml:
 
         assert download_raw_html("https://1.1.1.1/start") == b"ok"
 
-    @patch("library.website.website_download_context.requests.get")
+    @patch("library.website.website_download_context.http.get")
     def test_raises_on_redirect_loop(self, mock_get):
         response = MagicMock()
         response.is_redirect = True
@@ -108,3 +116,53 @@ class TestDownloadRawHtml:
     def test_rejects_private_url_before_any_request(self):
         with pytest.raises(ValueError, match="non-public address"):
             download_raw_html("http://127.0.0.1:8080/")
+
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures" / "webpages"
+
+
+def _legacy_text(url: str, raw_html: bytes) -> str:
+    """The former quadratic webpage_raw_parse() structuring, kept as the reference."""
+    soup = BeautifulSoup(raw_html, "html.parser")
+    content = soup.get_text()
+    content = re.sub(r"^\n+", "", content)
+    content = re.sub(r"\n+$", "", content)
+    content = re.sub(r"\n\n+", "\n\n", content)
+    for tag in ["h1", "h2", "h3", "h4", "h5", "h6", "p"]:
+        for element in soup.find_all(tag):
+            index = content.find(element.text)
+            if index != -1:
+                content = content[:index] + "\n\n" + content[index:]
+    return webpage_text_clean(url, content)
+
+
+class TestWebpageRawParse:
+    @pytest.mark.parametrize("page", ["portal_article.html", "blog_post.html"])
+    def test_matches_the_legacy_structuring_on_saved_pages(self, page):
+        raw_html = (FIXTURES / page).read_bytes()
+        url = "https://example.com/" + page
+
+        result = webpage_raw_parse(url, raw_html)
+
+        assert result.text == _legacy_text(url, raw_html)
+        assert result.text_raw == BeautifulSoup(raw_html, "html.parser").get_text()
+
+    def test_headings_and_paragraphs_start_paragraphs(self):
+        result = webpage_raw_parse("https://example.com/a", (FIXTURES / "portal_article.html").read_bytes())
+
+        assert "\n\nKary do 10 mln euro\n\nFirmy, które nie zgłoszą" in result.text
+        assert "zgłoszą incydentu w ciągu 24 godzin, zapłacą kary.\n\nNadzór obejmie" in result.text
+        assert "dataLayer" not in result.text
+        assert result.title == "Sejm przyjął ustawę o cyberbezpieczeństwie - Wydarzenia"
+
+    def test_break_goes_before_the_heading_even_when_its_text_appears_earlier(self):
+        # The old code inserted the break at the first occurrence of the
+        # heading text, here the <title>, leaving the <h2> glued to it.
+        result = webpage_raw_parse("https://example.com/news", (FIXTURES / "listing_page.html").read_bytes())
+
+        assert result.text.startswith("Latest news\n\nLatest news\n\nMarkets rally")
+
+    def test_empty_blocks_add_no_break(self):
+        result = webpage_raw_parse("https://example.com/e", b"<div>one<p></p><template><p>x</p></template>two</div>")
+
+        assert result.text == "onetwo"
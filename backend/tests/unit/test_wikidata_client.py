@@ -37,7 +37,7 @@ def _response(body):
 class TestSearchPersons:
     def test_returns_candidates_with_labels_and_descriptions(self):
         responses = [_response(SEARCH_BODY), _response(ENTITIES_BODY)]
-        with patch("library.wikidata_client.requests.get", side_effect=responses) as mock_get:
+        with patch("library.wikidata_client.http.get", side_effect=responses) as mock_get:
             results = search_persons("Trump")
 
         assert results == [
@@ -50,26 +50,26 @@ class TestSearchPersons:
 
     def test_english_fallback_for_missing_polish_label(self):
         responses = [_response(SEARCH_BODY), _response(ENTITIES_BODY)]
-        with patch("library.wikidata_client.requests.get", side_effect=responses):
+        with patch("library.wikidata_client.http.get", side_effect=responses):
             results = search_persons("Trump")
         assert results[1]["label"] == "Trump"  # z labels.en
 
     def test_no_search_hits_returns_empty(self):
         body = {"query": {"search": []}}
-        with patch("library.wikidata_client.requests.get", return_value=_response(body)) as mock_get:
+        with patch("library.wikidata_client.http.get", return_value=_response(body)) as mock_get:
             assert search_persons("Xyzzyplugh Qwerty") == []
         assert mock_get.call_count == 1  # bez drugiego zapytania o encje
 
     def test_blank_name_short_circuits(self):
-        with patch("library.wikidata_client.requests.get") as mock_get:
+        with patch("library.wikidata_client.http.get") as mock_get:
             assert search_persons("  ") == []
         mock_get.assert_not_called()
 
     def test_request_failure_returns_empty(self):
-        with patch("library.wikidata_client.requests.get", side_effect=requests.ConnectionError("boom")):
+        with patch("library.wikidata_client.http.get", side_effect=requests.ConnectionError("boom")):
             assert search_persons("Donald Trump") == []
 
     def test_sends_user_agent(self):
-        with patch("library.wikidata_client.requests.get", return_value=_response({"query": {"search": []}})) as mock_get:
+        with patch("library.wikidata_client.http.get", return_value=_response({"query": {"search": []}})) as mock_get:
             search_persons("Donald Trump")
         assert "lenie-ai" in mock_get.call_args.kwargs["headers"]["User-Agent"]
@@ -159,3 +159,67 @@ def test_scheduler_rejects_invalid_task_time():
         assert str(exc) == "invalid schedule for legacy_aws_pull"
     else:
         raise AssertionError("invalid schedule must be rejected")
+
+
+def test_storage_usage_reconcile_job_uses_worker_storage(monkeypatch):
+    execute_reconcile = MagicMock(return_value={"prefixes": 1, "objects": 3, "bytes": 10, "drift": {}})
+    monkeypatch.setattr("library.storage_usage.execute_storage_usage_reconcile", execute_reconcile)
+
+    session, storage = MagicMock(), MagicMock()
+    job = MagicMock(type="storage_usage_reconcile")
+    assert worker.execute(session, job, storage=storage)["objects"] == 3
+    execute_reconcile.assert_called_once_with(session, job, storage)
+
+
+def test_scheduler_enqueues_one_storage_usage_reconcile_per_local_day(monkeypatch):
+    session = MagicMock()
+    task = MagicMock(id="storage_usage_reconcile", enabled=True, timezone="Europe/Warsaw", times=["03:30"])
+    session.scalars.return_value.all.return_value = [task]
+    enqueue = MagicMock()
+    monkeypatch.setattr(worker, "enqueue", enqueue)
+
+    worker.scheduler(session, dt.datetime(2026, 7, 29, 1, 30, tzinfo=dt.timezone.utc))
+
+    enqueue.assert_called_once_with(
+        session, "storage_usage_reconcile", idempotency_key="storage_usage_reconcile:2026-07-29"
+    )
+
+
+def test_scheduler_requeues_document_stats_refresh_on_one_row(monkeypatch):
+    session = MagicMock()
+    task = MagicMock(id="document_stats_refresh", enabled=True, timezone="Europe/Warsaw", times=["03:35"])
+    session.scalars.return_value.all.return_value = [task]
+    enqueue_recurring = MagicMock()
+    monkeypatch.setattr(worker, "enqueue_recurring", enqueue_recurring)
+
+    worker.scheduler(session, dt.datetime(2026, 7, 29, 1, 35, 42, tzinfo=dt.timezone.utc))
+
+    enqueue_recurring.assert_called_once_with(
+        session, "document_stats_refresh", idempotency_key="document_stats_refresh",
+        since=dt.datetime(2026, 7, 29, 1, 35, tzinfo=dt.timezone.utc),
+    )
+
+
+def test_scheduler_requeues_llm_usage_rollup_on_one_row(monkeypatch):
+    session = MagicMock()
+    task = MagicMock(id="llm_usage_rollup", enabled=True, timezone="Europe/Warsaw", times=["03:35"])
+    session.scalars.return_value.all.return_value = [task]
+    enqueue_recurring = MagicMock()
+    monkeypatch.setattr(worker, "enqueue_recurring", enqueue_recurring)
+
+    worker.scheduler(session, dt.datetime(2026, 7, 29, 1, 35, 42, tzinfo=dt.timezone.utc))
+
+    enqueue_recurring.assert_called_once_with(
+        session, "llm_usage_rollup", idempotency_key="llm_usage_rollup",
+        since=dt.datetime(2026, 7, 29, 1, 35, tzinfo=dt.timezone.utc),
+    )
+
+
+def test_document_analysis_job_is_dispatched_to_analysis_runner(monkeypatch):
+    runner = MagicMock(return_value={"run_id": 5})
+    monkeypatch.setattr("library.document_analysis_jobs.execute_document_analysis", runner)
+    session = MagicMock()
+    job = MagicMock(type="document_analysis", parameters={"analysis_job_id": "a" * 32})
+
+    assert worker.execute(session, job) == {"run_id": 5}
+    runner.assert_called_once_with(session, job)
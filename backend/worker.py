@@ -7,11 +7,15 @@ import os
 import time
 from zoneinfo import ZoneInfo
 from sqlalchemy import text, select
-from library.db.engine import get_session
+from library.db.engine import get_session, set_process_role
 from library.db.models import Job, ScheduledTask
 from library.feed_monitor_service import run_check
-from library.job_queue import claim, finish, heartbeat, recover_stale, enqueue, retry
+from library.job_queue import claim, finish, heartbeat, recover_stale, enqueue, enqueue_recurring, retry
 from library.job_queue import JOB_TYPES
+from library.llm_concurrency import use_postgres
+from library.llm_usage.writer import enable_usage_writer
+from library import metrics
+from library.storage import enable_usage_ledger
 
 logger = logging.getLogger("lenie.worker")
 logging.basicConfig(level=logging.INFO)
@@ -59,6 +63,31 @@ def execute(session, job: Job, *, storage=None, work_dir: str = "/app/work") ->
         from library.tool_candidate_detection_service import execute_tool_candidate_detect
 
         return execute_tool_candidate_detect(session, job)
+    if job.type == "storage_usage_reconcile":
+        if storage is None:
+            from library.config_loader import load_config
+            from library.storage import storage_from_config
+
+            storage = storage_from_config(load_config())
+        from library.storage_usage import execute_storage_usage_reconcile
+
+        return execute_storage_usage_reconcile(session, job, storage)
+    if job.type == "document_stats_refresh":
+        from library.document_stats import execute_document_stats_refresh
+
+        return execute_document_stats_refresh(session, job)
+    if job.type == "llm_usage_rollup":
+        from library.llm_usage.rollup import execute_llm_usage_rollup
+
+        return execute_llm_usage_rollup(session, job)
+    if job.type == "reclean_corpus":
+        from library.article_reclean import execute_reclean_corpus
+
+        return execute_reclean_corpus(session, job)
+    if job.type == "document_analysis":
+        from library.document_analysis_jobs import execute_document_analysis
+
+        return execute_document_analysis(session, job)
     if job.type == "legacy_aws_pull":
         from library.config_loader import load_config
         from library.legacy_aws_pull_service import LegacyAwsPullService
@@ -92,6 +121,18 @@ def scheduler(session, now: dt.datetime) -> None:
             _schedule_legacy_aws_pull(session, now, task)
         elif task.id == "obsidian_reimport":
             _schedule_obsidian_reimport(session, now, task)
+        elif task.id == "storage_usage_reconcile":
+            local = now.astimezone(ZoneInfo(task.timezone))
+            enqueue(
+                session,
+                "storage_usage_reconcile",
+                idempotency_key=f"storage_usage_reconcile:{local.date().isoformat()}",
+            )
+        elif task.id in ("document_stats_refresh", "llm_usage_rollup"):
+            # Runs every few minutes: one reused jobs row instead of one per run.
+            enqueue_recurring(
+                session, task.id, idempotency_key=task.id, since=now.replace(second=0, microsecond=0),
+            )
 
 
 def _is_due(task: ScheduledTask, now: dt.datetime) -> bool:
@@ -164,15 +205,27 @@ def main() -> int:
     parser.add_argument("--healthcheck", action="store_true")
     parser.add_argument(
         "--types",
-        default="feed_check,feed_check_all,feed_auto_import,feed_daily,content_group_suggest,entity_enrichment,obsidian_reimport,tool_candidate_detect",
+        default="feed_check,feed_check_all,feed_auto_import,feed_daily,content_group_suggest,entity_enrichment,obsidian_reimport,tool_candidate_detect,document_stats_refresh,llm_usage_rollup",
         help="comma-separated job types handled by this worker",
     )
     parser.add_argument("--scheduler", action="store_true")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.getenv("WORKER_METRICS_PORT", "0")),
+        help="serve Prometheus metrics on this port (0 disables)",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default=os.getenv("WORKER_METRICS_HOST", "127.0.0.1"),
+        help="interface for the metrics port (unauthenticated; default loopback only)",
+    )
     args = parser.parse_args()
     allowed_types = {value.strip() for value in args.types.split(",") if value.strip()}
     unsupported = allowed_types - JOB_TYPES
     if not allowed_types or unsupported:
         parser.error(f"invalid worker types: {sorted(unsupported) or 'empty list'}")
+    set_process_role("worker")
     session = get_session()
     heartbeat_path = os.getenv("WORKER_HEARTBEAT_PATH", HEARTBEAT_PATH)
     if args.healthcheck:
@@ -185,6 +238,12 @@ def main() -> int:
             raise RuntimeError("worker heartbeat is missing") from exc
         session.close()
         return 0
+    # LLM concurrency limits are shared across worker replicas and the web process.
+    use_postgres()
+    enable_usage_ledger()
+    enable_usage_writer()
+    if args.metrics_port:
+        metrics.serve(args.metrics_port, get_session, host=args.metrics_host)
     coordinator = args.scheduler
     if (
         coordinator
@@ -194,7 +253,7 @@ def main() -> int:
         return 1
     storage = None
     work_dir = os.getenv("DOCUMENT_WORK_DIR", "/app/work")
-    if "document_prepare" in allowed_types:
+    if allowed_types & {"document_prepare", "storage_usage_reconcile"}:
         from library.config_loader import load_config
         from library.storage import storage_from_config
 
@@ -215,20 +274,26 @@ def main() -> int:
             continue
         started = time.monotonic()
         logger.info("job start id=%s type=%s attempt=%s", job.id, job.type, job.attempt)
+        outcome = "failed"
         try:
             if job.status == "cancel_requested":
+                outcome = "cancelled"
                 finish(session, job, "cancelled")
                 continue
             result = execute(session, job, storage=storage, work_dir=work_dir)
             finish(session, job, "done", result=result)
+            outcome = "done"
         except Exception as exc:
             from library.document_processing_service import DocumentJobCancelled
 
             if isinstance(exc, DocumentJobCancelled):
+                outcome = "cancelled"
                 finish(session, job, "cancelled", error=str(exc))
                 continue
             logger.exception("job failed id=%s", job.id)
             handle_job_failure(session, job, exc)
+        finally:
+            metrics.observe_job_run(job.type, outcome, time.monotonic() - started)
         logger.info("job end id=%s elapsed=%.2fs", job.id, time.monotonic() - started)
 
 
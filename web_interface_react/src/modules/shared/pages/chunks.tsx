@@ -38,6 +38,18 @@ interface Chunk {
   text_preview?: string | null;
 }
 
+// Chunk streamed from a running analysis, before the run is stored.
+interface LiveChunk {
+  seq: number;
+  position: number;
+  type: string | null;
+  topic: string | null;
+  summary: string | null;
+  corrected_text: string | null;
+  rewrite_ratio: number | null;
+  original_text: string | null;
+}
+
 interface CitedPublicationSummary {
   id: number;
   publication_id: number;
@@ -628,7 +640,8 @@ const Chunks = () => {
   const [jobStatus, setJobStatus]   = React.useState<string | null>(null);
   const [jobId, setJobId]           = React.useState<string | null>(null);
   const [cloudFerroIssue, setCloudFerroIssue] = React.useState<{ status: string; error: string | null } | null>(null);
-  const jobPollRef = React.useRef<ReturnType<typeof setInterval> | null>(null);
+  const jobPollRef = React.useRef<AbortController | null>(null);
+  const [liveChunks, setLiveChunks] = React.useState<LiveChunk[]>([]);
   const [newModel, setNewModel]     = React.useState(MODELS[0]);
   const [newMode, setNewMode]       = React.useState("transcript");
   const [splitOnly, setSplitOnly]   = React.useState(false);
@@ -901,33 +914,43 @@ const Chunks = () => {
   // ── Job polling ──
 
   const pollJob = React.useCallback((jid: string) => {
-    if (jobPollRef.current) clearInterval(jobPollRef.current);
-    const check = async () => {
-      try {
-        const r = await fetch(`${apiUrl}/analysis_job/${jid}`, {
-          headers: { "x-api-key": apiKey ?? "" },
-        });
-        const data = await r.json();
-        setJobStatus(data.job?.progress ?? data.job?.status ?? data.status);
-        if (data.job?.status === "done") {
-          if (jobPollRef.current) clearInterval(jobPollRef.current);
-          jobPollRef.current = null;
-          setJobId(null);
-          await fetchRuns();
-          if (data.job.run_id) setSelectedRun(data.job.run_id);
-        } else if (data.job?.status === "failed") {
-          if (jobPollRef.current) clearInterval(jobPollRef.current);
-          jobPollRef.current = null;
+    jobPollRef.current?.abort();
+    const controller = new AbortController();
+    jobPollRef.current = controller;
+    setLiveChunks([]);
+    // Long-poll: the backend holds each request until a chunk is committed or
+    // the job ends, so chunks appear as soon as the worker saves them.
+    (async () => {
+      let cursor = 0;
+      while (!controller.signal.aborted) {
+        try {
+          const r = await fetch(`${apiUrl}/analysis_job/${jid}/chunks?after=${cursor}&wait=25`, {
+            headers: { "x-api-key": apiKey ?? "" }, signal: controller.signal,
+          });
+          const data = await r.json();
+          if (!r.ok) throw new Error(data.message);
+          cursor = data.cursor;
+          if (data.chunks?.length) setLiveChunks(prev => [...prev, ...data.chunks]);
+          setJobStatus(data.job?.progress ?? data.job?.status ?? data.status);
+          if (!data.finished) continue;
+          if (jobPollRef.current === controller) jobPollRef.current = null;
           setJobId(null);
-          setError("Analiza nie powiodła się: " + (data.job.error ?? ""));
+          setLiveChunks([]);
+          if (data.job.status === "done") {
+            await fetchRuns();
+            if (data.job.run_id) setSelectedRun(data.job.run_id);
+          } else {
+            setError("Analiza nie powiodła się: " + (data.job.error ?? ""));
+          }
+          return;
+        } catch {
+          if (controller.signal.aborted) return;
+          // A transient connection problem must not detach a persistent job.
+          setJobStatus("Oczekiwanie na backend…");
+          await new Promise(resolve => setTimeout(resolve, 5000));
         }
-      } catch {
-        // A transient connection problem must not detach a persistent job.
-        setJobStatus("Oczekiwanie na backend…");
       }
-    };
-    void check();
-    jobPollRef.current = setInterval(check, 5000);
+    })();
   }, [apiUrl, apiKey, fetchRuns]);
 
   React.useEffect(() => {
@@ -948,7 +971,7 @@ const Chunks = () => {
     })();
     return () => {
       cancelled = true;
-      if (jobPollRef.current) clearInterval(jobPollRef.current);
+      jobPollRef.current?.abort();
       jobPollRef.current = null;
     };
   }, [id, apiUrl, apiKey, pollJob]);
@@ -2338,6 +2361,18 @@ const Chunks = () => {
         <strong>Job czeka na CloudFerro.</strong> Podział i automatyczne wzbogacanie są opóźnione przez zewnętrzną usługę, nie przez backend.
         {cloudFerroIssue.error ? ` Ostatni błąd: ${cloudFerroIssue.error}.` : ""} <NavLink to="/service-status" style={{ color: "inherit", fontWeight: 700 }}>Szczegóły statusu</NavLink>
       </div>}
+      {jobId && liveChunks.length > 0 && <div style={{ clear: "both", marginBottom: 10, padding: "8px 12px", borderRadius: 6, background: "#f8fafc", border: "1px solid #e2e8f0" }}>
+        <strong>Przeanalizowane fragmenty ({liveChunks.length})</strong>
+        <ol style={{ margin: "6px 0 0", paddingLeft: 22, maxHeight: 260, overflowY: "auto", fontSize: "0.9em" }}>
+          {[...liveChunks].sort((a, b) => a.position - b.position).map(chunk => (
+            <li key={chunk.seq} value={chunk.position} style={{ marginBottom: 4 }}>
+              <span style={{ fontWeight: 700, color: chunk.type === "TEMAT" ? "#166534" : "#64748b" }}>{chunk.type ?? "?"}</span>
+              {chunk.topic && <> · {chunk.topic}</>}
+              {chunk.summary && <div style={{ color: "#475569" }}>{chunk.summary}</div>}
+            </li>
+          ))}
+        </ol>
+      </div>}
       <div style={{ display: "flex", alignItems: "center", gap: 16, marginBottom: 6, flexWrap: "wrap" }}>
         <h2 style={{ margin: 0 }}>
           Przegląd chunków — {docTitle || `dokument #${id}`}
@@ -23,6 +23,9 @@ interface PersonDocument {
   confidence: string;
   mention_count: number;
   role: string;
+  // Pre-aggregated per-chapter counts when the document's entity occurrences
+  // are indexed; null = fetch them from /document/:id/entity_occurrences.
+  occurrences: ChapterOccurrence[] | null;
 }
 
 // Per-chapter occurrence counts (GET /document/:id/entity_occurrences?text=)
@@ -118,6 +121,11 @@ const Persons = () => {
       });
       return;
     }
+    if (doc.occurrences) {
+      const indexed = doc.occurrences;
+      setOccurrences((prev) => ({ ...prev, [doc.id]: indexed }));
+      return;
+    }
     setOccurrences((prev) => ({ ...prev, [doc.id]: "loading" }));
     try {
       const response = await axios.get(`${apiUrl}/document/${doc.id}/entity_occurrences`, {